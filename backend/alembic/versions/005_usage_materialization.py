@@ -0,0 +1,69 @@
+"""Usage Statistics Materialization
+
+Revision ID: 005_usage_materialization
+Revises: 004_ops_truth_tables
+Create Date: 2026-10-18
+
+Implements:
+- Daily usage buckets per product
+- Rolling 7/30/90-day sums and sums of squares on usage_statistics
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "005_usage_materialization"
+down_revision: Union[str, None] = "004_ops_truth_tables"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+WINDOW_COLUMNS = [
+    (f"{name}_{days}d", column_type)
+    for name, column_type in (
+        ("days", sa.Integer),
+        ("consumed", sa.BigInteger),
+        ("burn_days", sa.Integer),
+        ("consumed_sq", sa.BigInteger),
+    )
+    for days in (7, 30, 90)
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "usage_daily_buckets",
+        sa.Column("product_id", postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("consumed", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("received", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("product_id", "day"),
+        sa.CheckConstraint("consumed >= 0 AND received >= 0", name="usage_bucket_non_negative"),
+    )
+    op.create_index("idx_usage_bucket_day", "usage_daily_buckets", ["day"])
+
+    op.add_column("usage_statistics", sa.Column("trend", sa.String(20), nullable=False,
+                                                server_default=sa.text("'stable'")))
+    op.add_column("usage_statistics", sa.Column("as_of_day", sa.Date(), nullable=True))
+    for name, column_type in WINDOW_COLUMNS:
+        op.add_column("usage_statistics", sa.Column(name, column_type(), nullable=False,
+                                                    server_default=sa.text("0")))
+    op.add_column("usage_statistics", sa.Column("last_quantity", sa.Integer(), nullable=True))
+    op.add_column("usage_statistics", sa.Column("last_observed_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("idx_usage_as_of_day", "usage_statistics", ["as_of_day"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_usage_as_of_day", table_name="usage_statistics")
+    op.drop_column("usage_statistics", "last_observed_at")
+    op.drop_column("usage_statistics", "last_quantity")
+    for name, _ in reversed(WINDOW_COLUMNS):
+        op.drop_column("usage_statistics", name)
+    op.drop_column("usage_statistics", "as_of_day")
+    op.drop_column("usage_statistics", "trend")
+    op.drop_index("idx_usage_bucket_day", table_name="usage_daily_buckets")
+    op.drop_table("usage_daily_buckets")
@@ -0,0 +1,32 @@
+"""Vendor Order Terms
+
+Revision ID: 006_vendor_order_terms
+Revises: 005_usage_materialization
+Create Date: 2026-10-18
+
+Implements:
+- Minimum order quantity and case pack per vendor product
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "006_vendor_order_terms"
+down_revision: Union[str, None] = "005_usage_materialization"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("vendor_products", sa.Column("min_order_qty", sa.Integer(), nullable=False, server_default="1"))
+    op.add_column("vendor_products", sa.Column("case_pack", sa.Integer(), nullable=False, server_default="1"))
+    op.create_check_constraint("vendor_products_moq_positive", "vendor_products", "min_order_qty > 0")
+    op.create_check_constraint("vendor_products_case_pack_positive", "vendor_products", "case_pack > 0")
+
+
+def downgrade() -> None:
+    op.drop_constraint("vendor_products_case_pack_positive", "vendor_products", type_="check")
+    op.drop_constraint("vendor_products_moq_positive", "vendor_products", type_="check")
+    op.drop_column("vendor_products", "case_pack")
+    op.drop_column("vendor_products", "min_order_qty")
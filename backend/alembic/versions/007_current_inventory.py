@@ -0,0 +1,51 @@
+"""Current Inventory Read Model
+
+Revision ID: 007_current_inventory
+Revises: 006_vendor_order_terms
+Create Date: 2026-10-18
+
+Implements:
+- current_inventory: latest quantity, confidence and scan time per product
+- Backfill from the latest snapshot of each product
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "007_current_inventory"
+down_revision: Union[str, None] = "006_vendor_order_terms"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "current_inventory",
+        sa.Column("product_id", postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("snapshot_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("confidence_score", sa.Numeric(5, 4), nullable=True),
+        sa.Column("scanned_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("location_tag", sa.String(255), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.CheckConstraint("quantity >= 0", name="current_inventory_quantity_non_negative"),
+    )
+    op.create_index("idx_current_inventory_location", "current_inventory", ["location_tag"])
+
+    op.execute(
+        """
+        INSERT INTO current_inventory (product_id, snapshot_id, quantity, confidence_score, scanned_at, location_tag)
+        SELECT DISTINCT ON (product_id)
+               product_id, id, quantity, confidence_score, scanned_at, location_tag
+        FROM inventory_snapshots
+        ORDER BY product_id, scanned_at DESC, id DESC
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_current_inventory_location", table_name="current_inventory")
+    op.drop_table("current_inventory")
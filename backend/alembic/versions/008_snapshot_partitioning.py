@@ -0,0 +1,155 @@
+"""Inventory Snapshot Partitioning
+
+Revision ID: 008_snapshot_partitioning
+Revises: 007_current_inventory
+Create Date: 2026-10-18
+
+Implements:
+- inventory_snapshots range-partitioned by month on scanned_at
+  (primary key becomes (id, scanned_at); a DEFAULT partition catches
+  rows outside the created months)
+- ensure_inventory_snapshot_partitions() to create upcoming months
+- (product_id, scanned_at DESC) and (scanned_by, scanned_at DESC)
+  composite indexes; BRIN on scanned_at replaces the btree
+- inventory_snapshot_daily: daily rollup of snapshots past retention
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "008_snapshot_partitioning"
+down_revision: Union[str, None] = "007_current_inventory"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Months created ahead of now; the DEFAULT partition covers any gap
+MONTHS_AHEAD = 3
+
+SNAPSHOT_COLUMNS = "id, product_id, quantity, confidence_score, scanned_at, scanned_by, scan_method, location_tag"
+
+ENSURE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_inventory_snapshot_partitions(from_month date, months_ahead integer)
+RETURNS integer LANGUAGE plpgsql AS $$
+DECLARE
+    partition_month date := date_trunc('month', from_month)::date;
+    last_month date := (date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => months_ahead))::date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    WHILE partition_month <= last_month LOOP
+        partition_name := format('inventory_snapshots_%s', to_char(partition_month, 'YYYY_MM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF inventory_snapshots FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                partition_month::timestamp AT TIME ZONE 'UTC',
+                (partition_month + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+            );
+            created := created + 1;
+        END IF;
+        partition_month := (partition_month + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END
+$$
+"""
+
+
+def _create_snapshot_table(*constraints, **kwargs) -> None:
+    op.create_table(
+        "inventory_snapshots",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("product_id", postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("confidence_score", sa.Numeric(5, 4), nullable=True),
+        sa.Column("scanned_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("scanned_by", sa.String(100), nullable=False),
+        sa.Column("scan_method", sa.String(50), nullable=False),
+        sa.Column("location_tag", sa.String(255), nullable=True),
+        sa.CheckConstraint("quantity >= 0", name="snapshots_quantity_non_negative"),
+        sa.CheckConstraint("confidence_score IS NULL OR (confidence_score >= 0 AND confidence_score <= 1)",
+                           name="snapshots_confidence_range"),
+        sa.CheckConstraint("scan_method IN ('manual', 'barcode', 'silhouette', 'volumetric')",
+                           name="snapshots_method_valid"),
+        *constraints,
+        **kwargs,
+    )
+
+
+def upgrade() -> None:
+    op.rename_table("inventory_snapshots", "inventory_snapshots_legacy")
+    op.execute("ALTER TABLE inventory_snapshots_legacy RENAME CONSTRAINT inventory_snapshots_pkey "
+               "TO inventory_snapshots_legacy_pkey")
+    for index in ("idx_snapshots_product", "idx_snapshots_scanned_at", "idx_snapshots_scanned_by"):
+        op.drop_index(index, table_name="inventory_snapshots_legacy")
+
+    _create_snapshot_table(
+        sa.PrimaryKeyConstraint("id", "scanned_at", name="inventory_snapshots_pkey"),
+        postgresql_partition_by="RANGE (scanned_at)",
+    )
+    op.execute(ENSURE_PARTITIONS_FUNCTION)
+    op.execute(
+        "SELECT ensure_inventory_snapshot_partitions("
+        "coalesce((SELECT min(scanned_at) FROM inventory_snapshots_legacy), now())::date, "
+        f"{MONTHS_AHEAD})"
+    )
+    op.execute("CREATE TABLE inventory_snapshots_default PARTITION OF inventory_snapshots DEFAULT")
+
+    # Indexes on the parent cascade to every partition
+    op.create_index("idx_snapshots_product_time", "inventory_snapshots",
+                    ["product_id", sa.text("scanned_at DESC")])
+    op.create_index("idx_snapshots_scanned_by_time", "inventory_snapshots",
+                    ["scanned_by", sa.text("scanned_at DESC")])
+    op.create_index("idx_snapshots_scanned_at_brin", "inventory_snapshots", ["scanned_at"],
+                    postgresql_using="brin")
+
+    # Legacy rows could have a NULL scanned_at, which a partition key cannot be
+    op.execute(
+        f"INSERT INTO inventory_snapshots ({SNAPSHOT_COLUMNS}) "
+        f"SELECT {SNAPSHOT_COLUMNS.replace('scanned_at', 'coalesce(scanned_at, now())')} "
+        "FROM inventory_snapshots_legacy"
+    )
+    op.drop_table("inventory_snapshots_legacy")
+
+    op.create_table(
+        "inventory_snapshot_daily",
+        sa.Column("product_id", postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("open_quantity", sa.Integer(), nullable=False),
+        sa.Column("close_quantity", sa.Integer(), nullable=False),
+        sa.Column("min_quantity", sa.Integer(), nullable=False),
+        sa.Column("max_quantity", sa.Integer(), nullable=False),
+        sa.Column("snapshot_count", sa.Integer(), nullable=False),
+        sa.Column("first_scanned_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_scanned_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("product_id", "day"),
+    )
+    op.create_index("idx_snapshot_daily_day", "inventory_snapshot_daily", ["day"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_snapshot_daily_day", table_name="inventory_snapshot_daily")
+    op.drop_table("inventory_snapshot_daily")
+
+    op.rename_table("inventory_snapshots", "inventory_snapshots_partitioned")
+    op.execute("ALTER TABLE inventory_snapshots_partitioned RENAME CONSTRAINT inventory_snapshots_pkey "
+               "TO inventory_snapshots_partitioned_pkey")
+    for index in ("idx_snapshots_product_time", "idx_snapshots_scanned_by_time", "idx_snapshots_scanned_at_brin"):
+        op.drop_index(index, table_name="inventory_snapshots_partitioned")
+
+    _create_snapshot_table(sa.PrimaryKeyConstraint("id", name="inventory_snapshots_pkey"))
+    op.execute(
+        f"INSERT INTO inventory_snapshots ({SNAPSHOT_COLUMNS}) "
+        f"SELECT {SNAPSHOT_COLUMNS} FROM inventory_snapshots_partitioned"
+    )
+    op.drop_table("inventory_snapshots_partitioned")  # drops every partition
+    op.execute("DROP FUNCTION ensure_inventory_snapshot_partitions(date, integer)")
+
+    op.create_index("idx_snapshots_product", "inventory_snapshots", ["product_id"])
+    op.create_index("idx_snapshots_scanned_at", "inventory_snapshots", ["scanned_at"])
+    op.create_index("idx_snapshots_scanned_by", "inventory_snapshots", ["scanned_by"])
@@ -0,0 +1,26 @@
+"""Product Name Keyset Index
+
+Revision ID: 009_product_name_keyset
+Revises: 008_snapshot_partitioning
+Create Date: 2026-10-18
+
+Implements:
+- (name, id) index on products so paged and streamed product listings
+  (keyset on name, id) read in index order instead of sorting the catalog
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "009_product_name_keyset"
+down_revision: Union[str, None] = "008_snapshot_partitioning"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("idx_products_name_id", "products", ["name", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_products_name_id", table_name="products")
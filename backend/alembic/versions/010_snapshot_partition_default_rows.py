@@ -0,0 +1,118 @@
+"""Snapshot Partitions Absorb DEFAULT Rows
+
+Revision ID: 010_snapshot_partition_default_rows
+Revises: 009_product_name_keyset
+Create Date: 2026-10-18
+
+Implements:
+- ensure_inventory_snapshot_partitions() moves rows for a new month out
+  of the DEFAULT partition before creating it. Postgres refuses to
+  create a partition while DEFAULT holds rows in its range, so one
+  snapshot that arrived before its month existed blocked every later
+  run. Such months are built as a plain table, filled from DEFAULT and
+  attached, all in the caller's transaction
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "010_snapshot_partition_default_rows"
+down_revision: Union[str, None] = "009_product_name_keyset"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ENSURE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_inventory_snapshot_partitions(from_month date, months_ahead integer)
+RETURNS integer LANGUAGE plpgsql AS $$
+DECLARE
+    partition_month date := date_trunc('month', from_month)::date;
+    last_month date := (date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => months_ahead))::date;
+    partition_name text;
+    range_start timestamptz;
+    range_end timestamptz;
+    in_default boolean;
+    created integer := 0;
+BEGIN
+    WHILE partition_month <= last_month LOOP
+        partition_name := format('inventory_snapshots_%s', to_char(partition_month, 'YYYY_MM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            range_start := partition_month::timestamp AT TIME ZONE 'UTC';
+            range_end := (partition_month + interval '1 month')::timestamp AT TIME ZONE 'UTC';
+            in_default := false;
+            IF to_regclass('inventory_snapshots_default') IS NOT NULL THEN
+                SELECT EXISTS (
+                    SELECT 1 FROM inventory_snapshots_default
+                    WHERE scanned_at >= range_start AND scanned_at < range_end
+                ) INTO in_default;
+            END IF;
+
+            IF in_default THEN
+                -- Move the month's rows out of DEFAULT, then attach (indexes
+                -- and foreign keys are cloned from the parent on attach)
+                EXECUTE format(
+                    'CREATE TABLE %I (LIKE inventory_snapshots INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                    partition_name
+                );
+                EXECUTE format(
+                    'WITH moved AS ('
+                    '    DELETE FROM inventory_snapshots_default'
+                    '    WHERE scanned_at >= %L AND scanned_at < %L RETURNING *'
+                    ') INSERT INTO %I SELECT * FROM moved',
+                    range_start, range_end, partition_name
+                );
+                EXECUTE format(
+                    'ALTER TABLE inventory_snapshots ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, range_start, range_end
+                );
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF inventory_snapshots FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, range_start, range_end
+                );
+            END IF;
+            created := created + 1;
+        END IF;
+        partition_month := (partition_month + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END
+$$
+"""
+
+
+# As created by 008, for downgrade
+PREVIOUS_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_inventory_snapshot_partitions(from_month date, months_ahead integer)
+RETURNS integer LANGUAGE plpgsql AS $$
+DECLARE
+    partition_month date := date_trunc('month', from_month)::date;
+    last_month date := (date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => months_ahead))::date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    WHILE partition_month <= last_month LOOP
+        partition_name := format('inventory_snapshots_%s', to_char(partition_month, 'YYYY_MM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF inventory_snapshots FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                partition_month::timestamp AT TIME ZONE 'UTC',
+                (partition_month + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+            );
+            created := created + 1;
+        END IF;
+        partition_month := (partition_month + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    op.execute(ENSURE_PARTITIONS_FUNCTION)
+
+
+def downgrade() -> None:
+    op.execute(PREVIOUS_FUNCTION)
@@ -0,0 +1,31 @@
+"""Order Delivery Time
+
+Revision ID: 011_order_delivered_at
+Revises: 010_snapshot_partition_default_rows
+Create Date: 2026-10-18
+
+Implements:
+- orders.delivered_at, set when an order is marked delivered. Lead-time
+  statistics read it instead of updated_at, which any later edit to the
+  order moves
+- Existing delivered orders are backfilled from updated_at, the best
+  record of their delivery available
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "011_order_delivered_at"
+down_revision: Union[str, None] = "010_snapshot_partition_default_rows"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("orders", sa.Column("delivered_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE orders SET delivered_at = updated_at WHERE status = 'delivered'")
+
+
+def downgrade() -> None:
+    op.drop_column("orders", "delivered_at")
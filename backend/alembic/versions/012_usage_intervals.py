@@ -0,0 +1,68 @@
+"""Usage Statistics Count Snapshot Intervals
+
+Revision ID: 012_usage_intervals
+Revises: 011_order_delivered_at
+Create Date: 2026-10-18
+
+Implements:
+- usage_daily_buckets count the snapshot intervals starting each day,
+  with the sum of squares of their consumption, so usage_statistics
+  reproduces the raw burn rate (per interval, not per observed day)
+- usage_statistics.days_* / burn_days_* become intervals_* /
+  burn_intervals_*, plus the open interval's event units
+- Existing aggregates used the old definition and are cleared; run
+  `python -m app.ml.usage_stats rebuild` afterwards. Until then burn
+  rates are computed from raw snapshots
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "012_usage_intervals"
+down_revision: Union[str, None] = "011_order_delivered_at"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+WINDOWS = (7, 30, 90)
+
+RENAMES = [
+    (f"{old}_{days}d", f"{new}_{days}d")
+    for old, new in (("days", "intervals"), ("burn_days", "burn_intervals"))
+    for days in WINDOWS
+]
+
+BUCKET_COLUMNS = [
+    ("intervals", sa.Integer),
+    ("burn_intervals", sa.Integer),
+    ("consumed_sq", sa.BigInteger),
+]
+
+OPEN_COLUMNS = ["open_consumed", "open_received"]
+
+
+def upgrade() -> None:
+    op.execute("DELETE FROM usage_daily_buckets")
+    op.execute("DELETE FROM usage_statistics WHERE as_of_day IS NOT NULL")
+
+    for name, column_type in BUCKET_COLUMNS:
+        op.add_column("usage_daily_buckets", sa.Column(name, column_type(), nullable=False,
+                                                       server_default=sa.text("0")))
+    for old, new in RENAMES:
+        op.alter_column("usage_statistics", old, new_column_name=new)
+    for name in OPEN_COLUMNS:
+        op.add_column("usage_statistics", sa.Column(name, sa.BigInteger(), nullable=False,
+                                                    server_default=sa.text("0")))
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM usage_daily_buckets")
+    op.execute("DELETE FROM usage_statistics WHERE as_of_day IS NOT NULL")
+
+    for name in reversed(OPEN_COLUMNS):
+        op.drop_column("usage_statistics", name)
+    for old, new in reversed(RENAMES):
+        op.alter_column("usage_statistics", new, new_column_name=old)
+    for name, _ in reversed(BUCKET_COLUMNS):
+        op.drop_column("usage_daily_buckets", name)
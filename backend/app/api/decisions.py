@@ -16,6 +16,7 @@ from app.decision import (
     DecisionExecutor,
     DecisionTrace,
     TraceStore,
+    CheckpointStore,
     create_reorder_dag,
     create_disposal_dag,
 )
@@ -25,6 +26,7 @@ router = APIRouter(prefix="/decisions", tags=["Decisions"])
 
 # Global instances
 _trace_store = TraceStore()
+_checkpoint_store = CheckpointStore()
 
 
 # ============================================
@@ -117,7 +119,7 @@ async def execute_reorder_decision(
         context["approved_by"] = str(request.approved_by)
     
     # Execute
-    executor = DecisionExecutor(org_id, _trace_store)
+    executor = DecisionExecutor(org_id, _trace_store, _checkpoint_store)
     
     # Register executors
     async def submit_order(ctx: Dict[str, Any]) -> Dict[str, Any]:
@@ -137,7 +139,7 @@ async def execute_reorder_decision(
         dag_name=trace.dag_name,
         status=trace.status,
         duration_ms=trace.duration_ms,
-        events_count=len(trace.events),
+        events_count=trace.event_count,
         explanation=trace.explain(),
     )
 
@@ -172,7 +174,7 @@ async def execute_disposal_decision(
         "loss_type": request.loss_type,
     }
     
-    executor = DecisionExecutor(org_id, _trace_store)
+    executor = DecisionExecutor(org_id, _trace_store, _checkpoint_store)
     
     # Register executors
     async def execute_disposal(ctx: Dict[str, Any]) -> Dict[str, Any]:
@@ -191,7 +193,7 @@ async def execute_disposal_decision(
         dag_name=trace.dag_name,
         status=trace.status,
         duration_ms=trace.duration_ms,
-        events_count=len(trace.events),
+        events_count=trace.event_count,
         explanation=trace.explain(),
     )
 
@@ -221,6 +223,7 @@ async def get_trace(trace_id: UUID) -> Dict[str, Any]:
             }
             for e in trace.events
         ],
+        "timings": trace.timings.model_dump(),
         "explanation": trace.explain(),
     }
 
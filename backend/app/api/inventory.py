@@ -4,18 +4,31 @@ Inventory snapshots and product management
 """
 
 import uuid
+from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import any_, bindparam, insert, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import InventorySnapshot, Product, get_db
+from app.core.pagination import NDJSON_MEDIA_TYPE, decode_cursor, keyset, page, stream_ndjson, wants_ndjson
+from app.db import InventorySnapshot, Product, after_commit, get_db, get_primary_read_db, get_read_db
+from app.ml.dashboard import get_dashboard_refresher
+from app.ml.usage_stats import get_usage_worker
+from app.services.barcode_cache import get_barcode_cache
+from app.services.current_inventory import below_par_query, snapshot_row, upsert_current_inventory
 from app.models.schemas import (
+    BarcodeResolveRequest,
+    BarcodeResolveResult,
+    InventorySnapshotBulkCreate,
+    InventorySnapshotBulkResult,
     InventorySnapshotCreate,
     InventorySnapshotRead,
     ProductCreate,
     ProductRead,
+    SnapshotRowStatus,
 )
 
 router = APIRouter(prefix="/inventory", tags=["Inventory"])
@@ -27,17 +40,34 @@ router = APIRouter(prefix="/inventory", tags=["Inventory"])
 
 @router.get("/products", response_model=list[ProductRead])
 async def list_products(
+    request: Request,
+    response: Response,
     risk_category: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[ProductRead]:
-    """List all products, optionally filtered by risk category."""
+    """
+    List products by name, optionally filtered by risk category.
+    
+    With `limit`, returns one page and sets X-Next-Cursor when there are
+    more; pass it back as `cursor`. With `Accept: application/x-ndjson`,
+    streams every matching product (after `cursor`) instead.
+    """
     query = select(Product)
     if risk_category:
         query = query.where(Product.risk_category == risk_category)
-    query = query.order_by(Product.name)
+    after = decode_cursor(cursor, "products", (str, uuid.UUID)) if cursor else None
+    query = keyset(query, (Product.name, Product.id), after)
     
-    result = await db.execute(query)
-    products = result.scalars().all()
+    if wants_ndjson(request):
+        return StreamingResponse(stream_ndjson(query, ProductRead), media_type=NDJSON_MEDIA_TYPE)
+    if limit is None:
+        result = await db.execute(query)
+        return [ProductRead.model_validate(p) for p in result.scalars()]
+    
+    result = await db.execute(query.limit(limit + 1))
+    products = page(result.scalars().all(), limit, response, "products", lambda p: (p.name, p.id))
     return [ProductRead.model_validate(p) for p in products]
 
 
@@ -57,7 +87,7 @@ async def create_product(
 @router.get("/products/{product_id}", response_model=ProductRead)
 async def get_product(
     product_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> ProductRead:
     """Get a specific product by ID."""
     result = await db.execute(select(Product).where(Product.id == product_id))
@@ -75,11 +105,10 @@ async def get_product(
 @router.get("/products/barcode/{barcode}", response_model=ProductRead)
 async def get_product_by_barcode(
     barcode: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_primary_read_db),
 ) -> ProductRead:
-    """Get a product by barcode (for scanner integration)."""
-    result = await db.execute(select(Product).where(Product.barcode == barcode))
-    product = result.scalar_one_or_none()
+    """Get a product by barcode (for scanner integration; served from the barcode cache)."""
+    product = (await get_barcode_cache().resolve(db, [barcode])).get(barcode)
     
     if not product:
         raise HTTPException(
@@ -87,7 +116,25 @@ async def get_product_by_barcode(
             detail=f"Product with barcode {barcode} not found",
         )
     
-    return ProductRead.model_validate(product)
+    return product
+
+
+@router.post("/products/barcode:resolve", response_model=BarcodeResolveResult)
+async def resolve_barcodes(
+    payload: BarcodeResolveRequest,
+    db: AsyncSession = Depends(get_primary_read_db),
+) -> BarcodeResolveResult:
+    """
+    Resolve many barcodes at once (a scan pass's worth).
+    
+    Cached barcodes cost nothing; the rest are looked up in one query.
+    Unknown barcodes are listed in `missing` rather than failing the call.
+    """
+    products = await get_barcode_cache().resolve(db, payload.barcodes)
+    return BarcodeResolveResult(
+        products=products,
+        missing=[b for b in dict.fromkeys(payload.barcodes) if b not in products],
+    )
 
 
 # =============================================================================
@@ -96,15 +143,24 @@ async def get_product_by_barcode(
 
 @router.get("/snapshots", response_model=list[InventorySnapshotRead])
 async def list_snapshots(
+    request: Request,
+    response: Response,
     product_id: Optional[uuid.UUID] = None,
     scanned_by: Optional[str] = None,
-    limit: int = Query(100, le=1000),
-    db: AsyncSession = Depends(get_db),
+    since: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[InventorySnapshotRead]:
     """
     List inventory snapshots with optional filters.
     
-    Returns most recent snapshots first.
+    Returns most recent snapshots first. `since` (optional) only returns
+    snapshots scanned at or after that time.
+    
+    Sets X-Next-Cursor when there are more; pass it back as `cursor`.
+    With `Accept: application/x-ndjson`, streams every matching snapshot
+    (after `cursor`, ignoring `limit`) instead.
     """
     query = select(InventorySnapshot)
     
@@ -112,11 +168,17 @@ async def list_snapshots(
         query = query.where(InventorySnapshot.product_id == product_id)
     if scanned_by:
         query = query.where(InventorySnapshot.scanned_by == scanned_by)
+    if since is not None:
+        query = query.where(InventorySnapshot.scanned_at >= since)
     
-    query = query.order_by(InventorySnapshot.scanned_at.desc()).limit(limit)
+    after = decode_cursor(cursor, "snapshots", (datetime, uuid.UUID)) if cursor else None
+    query = keyset(query, (InventorySnapshot.scanned_at, InventorySnapshot.id), after, descending=True)
     
-    result = await db.execute(query)
-    snapshots = result.scalars().all()
+    if wants_ndjson(request):
+        return StreamingResponse(stream_ndjson(query, InventorySnapshotRead), media_type=NDJSON_MEDIA_TYPE)
+    
+    result = await db.execute(query.limit(limit + 1))
+    snapshots = page(result.scalars().all(), limit, response, "snapshots", lambda s: (s.scanned_at, s.id))
     return [InventorySnapshotRead.model_validate(s) for s in snapshots]
 
 
@@ -146,13 +208,80 @@ async def create_snapshot(
     db.add(db_snapshot)
     await db.flush()
     await db.refresh(db_snapshot)
+    await upsert_current_inventory(db, [snapshot_row(db_snapshot)])
+    
+    # Keep usage_statistics and prediction dashboards current, once the row is committed
+    usage_worker = get_usage_worker()
+    product_id, scanned_at, quantity = db_snapshot.product_id, db_snapshot.scanned_at, db_snapshot.quantity
+    after_commit(db, lambda: usage_worker.submit_snapshot(product_id, scanned_at, quantity))
+    after_commit(db, get_dashboard_refresher().mark_dirty)
+    
     return InventorySnapshotRead.model_validate(db_snapshot)
 
 
+@router.post("/snapshots:bulk", response_model=InventorySnapshotBulkResult)
+async def create_snapshots_bulk(
+    payload: InventorySnapshotBulkCreate,
+    db: AsyncSession = Depends(get_db),
+) -> InventorySnapshotBulkResult:
+    """
+    Record many inventory snapshots at once (full-shelf scans).
+    
+    Product ids are checked with one query; rows for unknown products are
+    rejected and the rest are inserted in batched multi-row INSERTs. The
+    current_inventory read model is updated in the same transaction. All
+    rows share one scanned_at.
+    """
+    scanned_at = datetime.now(timezone.utc)
+    
+    requested = list({s.product_id for s in payload.snapshots})
+    known_result = await db.execute(
+        select(Product.id).where(
+            Product.id == any_(bindparam("product_ids", requested, type_=ARRAY(PG_UUID(as_uuid=True))))
+        )
+    )
+    known = set(known_result.scalars())
+    
+    rows = []
+    results = []
+    for index, snapshot in enumerate(payload.snapshots):
+        if snapshot.product_id not in known:
+            results.append(SnapshotRowStatus(
+                index=index,
+                status="rejected",
+                error=f"Product {snapshot.product_id} not found",
+            ))
+            continue
+        row = {"id": uuid.uuid4(), **snapshot.model_dump(), "scanned_at": scanned_at}
+        rows.append(row)
+        results.append(SnapshotRowStatus(index=index, status="created", snapshot_id=row["id"]))
+    
+    if rows:
+        await db.execute(insert(InventorySnapshot), rows)
+        await upsert_current_inventory(db, rows)
+        
+        usage_worker = get_usage_worker()
+        
+        def submit_snapshots() -> None:
+            for row in rows:
+                usage_worker.submit_snapshot(row["product_id"], scanned_at, row["quantity"])
+        
+        # Workers read these rows back, so they hear about them only once committed
+        after_commit(db, submit_snapshots)
+        after_commit(db, get_dashboard_refresher().mark_dirty)
+    
+    return InventorySnapshotBulkResult(
+        created=len(rows),
+        rejected=len(results) - len(rows),
+        scanned_at=scanned_at,
+        results=results,
+    )
+
+
 @router.get("/snapshots/latest/{product_id}", response_model=InventorySnapshotRead)
 async def get_latest_snapshot(
     product_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> InventorySnapshotRead:
     """Get the most recent inventory snapshot for a product."""
     query = (
@@ -176,41 +305,31 @@ async def get_latest_snapshot(
 
 @router.get("/below-par", response_model=list[dict])
 async def get_products_below_par(
-    db: AsyncSession = Depends(get_db),
+    risk_category: Optional[str] = None,
+    location_tag: Optional[str] = None,
+    from_snapshots: bool = Query(False, description="Read the latest snapshots instead of current_inventory"),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[dict]:
     """
     Get products where latest inventory is below par level.
     
-    Used for Smart Par Engine reorder recommendations.
+    Used for Smart Par Engine reorder recommendations. One query against
+    the current_inventory read model, sorted by shortage.
     """
-    # Get all products with their par levels
-    products_result = await db.execute(select(Product))
-    products = products_result.scalars().all()
-    
-    below_par = []
-    
-    for product in products:
-        # Get latest snapshot for this product
-        snapshot_query = (
-            select(InventorySnapshot)
-            .where(InventorySnapshot.product_id == product.id)
-            .order_by(InventorySnapshot.scanned_at.desc())
-            .limit(1)
-        )
-        snapshot_result = await db.execute(snapshot_query)
-        latest = snapshot_result.scalar_one_or_none()
-        
-        current_qty = latest.quantity if latest else 0
-        
-        if current_qty < product.par_level:
-            below_par.append({
-                "product_id": str(product.id),
-                "product_name": product.name,
-                "barcode": product.barcode,
-                "par_level": product.par_level,
-                "current_quantity": current_qty,
-                "shortage": product.par_level - current_qty,
-                "last_scanned": latest.scanned_at.isoformat() if latest else None,
-            })
-    
-    return sorted(below_par, key=lambda x: x["shortage"], reverse=True)
+    result = await db.execute(below_par_query(risk_category, location_tag, from_snapshots))
+    
+    return [
+        {
+            "product_id": str(row.id),
+            "product_name": row.name,
+            "barcode": row.barcode,
+            "risk_category": row.risk_category,
+            "par_level": row.par_level,
+            "current_quantity": row.current_quantity,
+            "shortage": row.shortage,
+            "confidence_score": float(row.confidence_score) if row.confidence_score is not None else None,
+            "location_tag": row.location_tag,
+            "last_scanned": row.scanned_at.isoformat() if row.scanned_at else None,
+        }
+        for row in result
+    ]
@@ -0,0 +1,22 @@
+"""
+PROVENIQ Ops - Metrics API
+
+Prometheus exposition of in-process metrics:
+- Decision DAG, node, gate and executor latency histograms
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Prometheus text exposition of all registered metrics"""
+    return PlainTextResponse(
+        metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -4,15 +4,20 @@ PROVENIQ Ops - Predictions API
 API endpoints for ML-powered predictions:
 - Burn rate calculations
 - Stockout predictions
+- Demand forecasts
+- Reorder proposals
+- Waste image classification
 - Alerts
 """
 
 from typing import Optional, List
 from uuid import UUID
 from datetime import datetime
+from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
 
 from app.ml import (
     get_burn_rate_calculator,
@@ -21,6 +26,10 @@ from app.ml import (
     StockoutPrediction,
     StockoutAlert,
 )
+from app.ml.dashboard import get_dashboard_refresher
+from app.ml.forecast import get_demand_forecaster
+from app.ml.reorder import VendorTerms, get_reorder_optimizer, get_vendor_terms
+from app.ml.waste_inference import InvalidImageError, get_waste_inference
 
 router = APIRouter(prefix="/predictions", tags=["Predictions"])
 
@@ -71,12 +80,32 @@ class AlertResponse(BaseModel):
     message: str
 
 
+class DemandForecastRequest(BaseModel):
+    """Request for demand forecasts"""
+    product_ids: Optional[List[str]] = None  # Default: every SKU with history
+    horizon_days: int = 14
+
+
+class DemandForecastResponse(BaseModel):
+    """Demand forecast response"""
+    product_id: str
+    start_date: str
+    daily_forecast: List[float]
+    total_forecast: float
+    daily_demand: float
+    trend_per_day: float
+    seasonal_indices: List[float]  # Monday..Sunday
+    data_points: int
+    confidence: float
+
+
 class ProductInput(BaseModel):
     """Product input for predictions"""
     product_id: str
     name: Optional[str] = None
     current_quantity: int
     par_level: int
+    pending_orders_qty: Optional[int] = None  # Default: open orders on record
 
 
 class BulkPredictionRequest(BaseModel):
@@ -84,6 +113,64 @@ class BulkPredictionRequest(BaseModel):
     products: List[ProductInput]
 
 
+class ReorderProductInput(ProductInput):
+    """Product input for reorder proposals; vendor terms default to the records on file"""
+    unit_cost_micros: Optional[int] = Field(None, ge=0)
+    min_order_qty: Optional[int] = Field(None, ge=1)
+    case_pack: Optional[int] = Field(None, ge=1)
+    lead_time_hours: Optional[int] = Field(None, ge=0)
+    lead_time_std_hours: Optional[float] = Field(None, ge=0)
+
+
+class ReorderRequest(BaseModel):
+    """Request for a reorder proposal"""
+    products: List[ReorderProductInput]
+
+
+class ReorderResponse(BaseModel):
+    """Reorder recommendation response"""
+    product_id: str
+    product_name: Optional[str]
+    vendor_id: Optional[str]
+    current_quantity: int
+    pending_orders_qty: int
+    daily_demand: float
+    safety_stock: int
+    reorder_point: int
+    economic_order_qty: int
+    recommended_order_qty: int
+    order_cost_micros: int
+    constrained_by: Optional[str]
+
+
+class WasteClassificationResponse(BaseModel):
+    """Waste image classification response"""
+    predicted_class: str
+    confidence: float
+    class_probabilities: dict[str, float]
+    model_used: str
+    model_version: str
+    image_hash: Optional[str]
+    classification_time_ms: int
+
+
+def _batch_inputs(request: BaseModel) -> tuple[list[dict], dict[UUID, list[dict]]]:
+    """Product dicts and caller-supplied pending orders for predict_batch"""
+    products = []
+    pending_orders = {}
+    for p in request.products:
+        product_id = UUID(p.product_id)
+        products.append({
+            "id": product_id,
+            "name": p.name,
+            "current_quantity": p.current_quantity,
+            "par_level": p.par_level,
+        })
+        if p.pending_orders_qty is not None:
+            pending_orders[product_id] = [{"quantity": p.pending_orders_qty}]
+    return products, pending_orders
+
+
 # ============================================
 # Endpoints
 # ============================================
@@ -153,25 +240,19 @@ async def predict_stockout(
 
 
 @router.post("/stockout/bulk", response_model=List[StockoutResponse])
-async def predict_stockouts_bulk(request: BulkPredictionRequest) -> List[StockoutResponse]:
+async def predict_stockouts_bulk(
+    request: BulkPredictionRequest,
+    top_k: Optional[int] = Query(None, ge=1, description="Only return the k highest-risk products"),
+) -> List[StockoutResponse]:
     """
     Predict stockouts for multiple products.
     
     Returns predictions sorted by risk (highest first).
     """
     predictor = get_stockout_predictor()
+    products, pending_orders = _batch_inputs(request)
     
-    products = [
-        {
-            "id": UUID(p.product_id),
-            "name": p.name,
-            "current_quantity": p.current_quantity,
-            "par_level": p.par_level,
-        }
-        for p in request.products
-    ]
-    
-    results = await predictor.predict_all_stockouts(products)
+    results = await predictor.predict_batch(products, pending_orders, top_k=top_k)
     
     return [
         StockoutResponse(
@@ -192,6 +273,132 @@ async def predict_stockouts_bulk(request: BulkPredictionRequest) -> List[Stockou
     ]
 
 
+@router.post("/demand", response_model=List[DemandForecastResponse])
+async def forecast_demand(
+    request: DemandForecastRequest,
+    org_id: UUID = UUID("00000000-0000-0000-0000-000000000001"),  # TODO: Get from auth
+) -> List[DemandForecastResponse]:
+    """
+    Forecast daily demand per product.
+    
+    Trend plus day-of-week seasonality fitted over the last 8 weeks of
+    consumption; the fit is reused until new consumption is recorded.
+    """
+    if not 1 <= request.horizon_days <= 90:
+        raise HTTPException(status_code=422, detail="horizon_days must be between 1 and 90")
+    
+    forecaster = get_demand_forecaster()
+    product_ids = [UUID(pid) for pid in request.product_ids] if request.product_ids is not None else None
+    
+    results = await forecaster.forecast(product_ids, request.horizon_days, org_id=org_id)
+    
+    return [
+        DemandForecastResponse(
+            product_id=str(r.product_id),
+            start_date=r.start_date.isoformat(),
+            daily_forecast=[float(v) for v in r.daily_forecast],
+            total_forecast=float(r.total_forecast),
+            daily_demand=float(r.daily_demand),
+            trend_per_day=float(r.trend_per_day),
+            seasonal_indices=[float(v) for v in r.seasonal_indices],
+            data_points=r.data_points,
+            confidence=float(r.confidence),
+        )
+        for r in results
+    ]
+
+
+@router.post("/reorder", response_model=List[ReorderResponse])
+async def propose_reorders(
+    request: ReorderRequest,
+    only_needed: bool = Query(True, description="Only return products that need an order"),
+) -> List[ReorderResponse]:
+    """
+    Build an order proposal for a batch of products.
+    
+    EOQ plus safety stock from burn-rate variance and vendor lead times,
+    rounded to vendor minimums and case packs, net of open orders.
+    """
+    optimizer = get_reorder_optimizer()
+    products, pending_orders = _batch_inputs(request)
+    
+    overrides = {}
+    for p in request.products:
+        fields = {
+            field: getattr(p, field)
+            for field in ("unit_cost_micros", "min_order_qty", "case_pack", "lead_time_hours")
+            if getattr(p, field) is not None
+        }
+        if p.lead_time_std_hours is not None:
+            fields["lead_time_std_hours"] = Decimal(str(p.lead_time_std_hours))
+        if fields:
+            overrides[UUID(p.product_id)] = fields
+    
+    # Overrides replace single fields; the rest come from the terms on file
+    vendor_terms = {}
+    if overrides:
+        stored = await get_vendor_terms(optimizer.burn_calculator.db, list(overrides))
+        vendor_terms = {
+            product_id: stored.get(product_id, VendorTerms()).model_copy(update=fields)
+            for product_id, fields in overrides.items()
+        }
+    
+    if only_needed:
+        results = await optimizer.order_proposal(products, pending_orders, vendor_terms)
+    else:
+        results = await optimizer.optimize(products, pending_orders, vendor_terms)
+    
+    return [
+        ReorderResponse(
+            product_id=str(r.product_id),
+            product_name=r.product_name,
+            vendor_id=str(r.vendor_id) if r.vendor_id else None,
+            current_quantity=r.current_quantity,
+            pending_orders_qty=r.pending_orders_qty,
+            daily_demand=float(r.daily_demand),
+            safety_stock=r.safety_stock,
+            reorder_point=r.reorder_point,
+            economic_order_qty=r.economic_order_qty,
+            recommended_order_qty=r.recommended_order_qty,
+            order_cost_micros=r.order_cost_micros,
+            constrained_by=r.constrained_by,
+        )
+        for r in results
+    ]
+
+
+@router.post("/waste/classify", response_model=WasteClassificationResponse)
+async def classify_waste_image(
+    image: UploadFile = File(...),
+    product_id: Optional[UUID] = Form(None),
+) -> WasteClassificationResponse:
+    """
+    Classify waste/spoilage from a photo.
+    
+    Concurrent uploads are micro-batched onto the model; re-uploads of the
+    same image are answered from cache. Low-confidence results come back
+    as requires_human_review.
+    """
+    image_data = await image.read()
+    if not image_data:
+        raise HTTPException(status_code=422, detail="Empty image")
+    
+    try:
+        result = await get_waste_inference().classify(image_data, product_id)
+    except InvalidImageError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    return WasteClassificationResponse(
+        predicted_class=result.predicted_class,
+        confidence=float(result.confidence),
+        class_probabilities=result.class_probabilities,
+        model_used=result.model_used,
+        model_version=result.model_version,
+        image_hash=result.image_hash,
+        classification_time_ms=result.classification_time_ms,
+    )
+
+
 @router.post("/alerts", response_model=List[AlertResponse])
 async def get_stockout_alerts(
     request: BulkPredictionRequest,
@@ -204,18 +411,9 @@ async def get_stockout_alerts(
     Alerts are sorted by severity (emergency > critical > warning).
     """
     predictor = get_stockout_predictor()
+    products, pending_orders = _batch_inputs(request)
     
-    products = [
-        {
-            "id": UUID(p.product_id),
-            "name": p.name,
-            "current_quantity": p.current_quantity,
-            "par_level": p.par_level,
-        }
-        for p in request.products
-    ]
-    
-    alerts = await predictor.get_alerts(products, threshold_hours=threshold_hours)
+    alerts = await predictor.get_alerts(products, threshold_hours=threshold_hours, pending_orders=pending_orders)
     
     # Sort by severity
     severity_order = {"emergency": 0, "critical": 1, "warning": 2}
@@ -238,53 +436,33 @@ async def get_stockout_alerts(
 
 
 @router.get("/dashboard")
-async def get_prediction_dashboard() -> dict:
+async def get_prediction_dashboard(
+    request: Request,
+    org_id: UUID = UUID("00000000-0000-0000-0000-000000000001"),  # TODO: Get from auth
+) -> Response:
     """
     Get prediction dashboard summary.
     
     Returns overview of all predictions with counts by risk level.
+    Served from a precomputed snapshot (refreshed on a schedule and on
+    inventory changes); supports If-None-Match for 304 responses.
     Uses mock data for demo purposes.
     """
-    predictor = get_stockout_predictor()
-    
-    # Mock product data for demo
-    from uuid import uuid4
-    mock_products = [
-        {"id": uuid4(), "name": "Chicken Breast", "current_quantity": 15, "par_level": 20},
-        {"id": uuid4(), "name": "Ground Beef", "current_quantity": 8, "par_level": 15},
-        {"id": uuid4(), "name": "Salmon Fillet", "current_quantity": 3, "par_level": 10},
-        {"id": uuid4(), "name": "Yellow Onions", "current_quantity": 45, "par_level": 30},
-        {"id": uuid4(), "name": "Romaine Lettuce", "current_quantity": 12, "par_level": 25},
-    ]
-    
-    predictions = await predictor.predict_all_stockouts(mock_products)
-    alerts = await predictor.get_alerts(mock_products, threshold_hours=72)
-    
-    # Count by risk level
-    risk_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
-    for p in predictions:
-        risk_counts[p.risk_level] = risk_counts.get(p.risk_level, 0) + 1
+    snapshot = await get_dashboard_refresher().get_or_refresh(org_id)
+    # computed_at moves on every refresh while the ETag covers content only,
+    # so it travels as a header (also sent with 304s), not in the body
+    headers = {
+        "ETag": snapshot.etag,
+        "Cache-Control": "private, no-cache",
+        "X-Dashboard-Version": str(snapshot.version),
+        "X-Dashboard-Computed-At": snapshot.computed_at.isoformat(),
+    }
     
-    # Count by severity
-    alert_counts = {"emergency": 0, "critical": 0, "warning": 0}
-    for a in alerts:
-        alert_counts[a.severity] = alert_counts.get(a.severity, 0) + 1
+    if_none_match = request.headers.get("if-none-match", "")
+    if snapshot.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
     
-    return {
-        "summary": {
-            "total_products": len(predictions),
-            "products_at_risk": len([p for p in predictions if p.risk_level in ["critical", "high"]]),
-            "active_alerts": len(alerts),
-        },
-        "risk_breakdown": risk_counts,
-        "alert_breakdown": alert_counts,
-        "top_risks": [
-            {
-                "product_name": p.product_name,
-                "hours_to_stockout": float(p.hours_to_stockout),
-                "risk_level": p.risk_level,
-                "action": p.action,
-            }
-            for p in predictions[:5]
-        ],
-    }
+    return JSONResponse(
+        {**snapshot.data, "version": snapshot.version},
+        headers=headers,
+    )
@@ -4,15 +4,21 @@ Vendor Bridge and aggregation endpoints
 """
 
 import uuid
+from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from app.db import Vendor, VendorProduct, get_db
+from app.db import Order, Vendor, VendorProduct, after_commit, get_db, get_primary_read_db, get_read_db
+from app.db.models import VendorLeadTime
+from app.ml.lead_times import LeadTimeQuantiles, get_lead_time_stats, lead_time_hours
 from app.models.schemas import (
+    OrderStatus,
     VendorCreate,
     VendorProductBase,
     VendorProductRead,
@@ -28,7 +34,7 @@ router = APIRouter(prefix="/vendors", tags=["Vendor Bridge"])
 @router.get("/", response_model=list[VendorRead])
 async def list_vendors(
     active_only: bool = True,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[VendorRead]:
     """List all vendors, optionally filtered by active status."""
     query = select(Vendor)
@@ -67,7 +73,7 @@ async def create_vendor(
 @router.get("/{vendor_id}", response_model=VendorRead)
 async def get_vendor(
     vendor_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> VendorRead:
     """Get a specific vendor by ID."""
     result = await db.execute(select(Vendor).where(Vendor.id == vendor_id))
@@ -160,3 +166,83 @@ async def get_vendor_switch_log() -> list[dict]:
         }
         for entry in log
     ]
+
+
+# =============================================================================
+# LEAD TIMES
+# =============================================================================
+
+@router.post("/orders/{order_id}/delivered")
+async def mark_order_delivered(
+    order_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """
+    Mark an open order delivered and record its lead time.
+    
+    Keeps vendor_lead_times.avg_lead_time_hours in step with the
+    in-process lead-time distributions, which take the delivery once the
+    transaction commits.
+    """
+    result = await db.execute(
+        select(Order).options(selectinload(Order.items)).where(Order.id == order_id)
+    )
+    order = result.scalar_one_or_none()
+    
+    if not order:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Order {order_id} not found",
+        )
+    if order.status not in (OrderStatus.SUBMITTED.value, OrderStatus.CONFIRMED.value) or not order.submitted_at:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Order {order_id} is {order.status}; only submitted orders can be delivered",
+        )
+    
+    delivered_at = datetime.now(timezone.utc)
+    order.status = OrderStatus.DELIVERED.value
+    order.delivered_at = delivered_at
+    
+    stats = get_lead_time_stats()
+    await stats.ensure_loaded(db)
+    product_ids = sorted({item.product_id for item in order.items})
+    hours = lead_time_hours(order.submitted_at, delivered_at)
+    vendor_id, submitted_at = order.vendor_id, order.submitted_at
+    after_commit(db, lambda: stats.record_order_delivered(vendor_id, product_ids, submitted_at, delivered_at))
+    
+    for product_id in product_ids:
+        mean_hours = stats.mean_with_delivery(order.vendor_id, product_id, hours)
+        avg_hours = round(mean_hours) if mean_hours is not None else hours
+        await db.execute(
+            insert(VendorLeadTime)
+            .values(product_id=product_id, vendor_id=order.vendor_id, avg_lead_time_hours=avg_hours)
+            .on_conflict_do_update(
+                index_elements=["product_id", "vendor_id"],
+                set_={"avg_lead_time_hours": avg_hours},
+            )
+        )
+    
+    return {
+        "order_id": str(order_id),
+        "status": order.status,
+        "lead_time_hours": hours,
+        "products": len(product_ids),
+    }
+
+
+@router.get("/{vendor_id}/lead-times", response_model=Optional[LeadTimeQuantiles])
+async def get_vendor_lead_times(
+    vendor_id: uuid.UUID,
+    product_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_primary_read_db),
+) -> Optional[LeadTimeQuantiles]:
+    """
+    Lead-time quantiles (p50/p90/p99) for a vendor, or a vendor/product pair.
+    
+    Served from cache; a pair with too few deliveries falls back to the
+    vendor-wide distribution. Null when there is not enough history.
+    """
+    stats = get_lead_time_stats()
+    await stats.ensure_loaded(db)
+    return stats.get(vendor_id, product_id)
@@ -16,6 +16,7 @@ from typing import Optional
 from fastapi import APIRouter, Query
 
 from app.core.types import Money
+from app.ml.forecast import demand_map, get_demand_forecaster
 from app.models.whatif import (
     DemandForecastSnapshot,
     DemandShiftScenario,
@@ -249,6 +250,36 @@ async def update_demand_snapshot(
     }
 
 
+@router.post("/state/demand/forecast")
+async def load_demand_forecast(
+    product_ids: list[uuid.UUID] = Query(default=[]),
+    horizon_days: int = Query(7, ge=1, le=90),
+) -> dict:
+    """
+    Load the demand snapshot from DemandForecaster instead of hand-entered values.
+    
+    Daily demand is each product's mean forecast over the horizon (every
+    SKU with history if no product_ids are given); confidence is the mean
+    across products.
+    """
+    results = await get_demand_forecaster().forecast(product_ids or None, horizon_days)
+    confidence = (
+        sum(r.confidence for r in results) / len(results)
+        if results else Decimal("0.80")
+    )
+    snapshot = DemandForecastSnapshot(
+        daily_demand=demand_map(results),
+        horizon_days=horizon_days,
+        forecast_confidence=confidence.quantize(Decimal("0.01")),
+    )
+    whatif_simulator.update_demand_snapshot(snapshot)
+    return {
+        "status": "updated",
+        "products": len(snapshot.daily_demand),
+        "forecast_id": str(snapshot.forecast_id),
+    }
+
+
 @router.post("/state/liquidity")
 async def update_liquidity_snapshot(
     cash_balance_dollars: str,
@@ -15,7 +15,8 @@ These bridges enable the PROVENIQ flywheel:
 from .claimsiq import ClaimsIQBridge, get_claimsiq_bridge
 from .bids import BidsBridge, get_bids_bridge
 from .capital import CapitalBridge, get_capital_bridge
-from .ledger import LedgerBridge, get_ledger_bridge
+from .ledger import LedgerAck, LedgerBridge, get_ledger_bridge
+from .ledger_writer import LedgerWriter, get_ledger_writer
 from .events import (
     # Loss Events (Ops → ClaimsIQ)
     LossDetectedEvent,
@@ -37,10 +38,13 @@ __all__ = [
     "BidsBridge", 
     "CapitalBridge",
     "LedgerBridge",
+    "LedgerWriter",
+    "LedgerAck",
     "get_claimsiq_bridge",
     "get_bids_bridge",
     "get_capital_bridge",
     "get_ledger_bridge",
+    "get_ledger_writer",
     # Events
     "LossDetectedEvent",
     "EvidenceCapturedEvent",
@@ -5,18 +5,31 @@ CANONICAL SCHEMA v1.0.0
 - Uses DOMAIN_NOUN_VERB_PAST event naming
 - Publishes to /api/v1/events/canonical endpoint
 - Includes idempotency_key for duplicate prevention
+
+Scan, shrinkage, order and delivery events are queued for the batched
+background writer (ledger_writer); write_event posts one event and
+waits for its Ledger entry. Events the Ledger rejects outright are kept
+in a dead-letter file (LEDGER_DEAD_LETTER_PATH) for inspection and
+re-submission.
 """
 
+import asyncio
 import hashlib
 import json
 import logging
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import uuid4
-import httpx
 
+import httpx
 from pydantic import BaseModel
 
+from app.bridges.ledger_writer import get_ledger_writer
+from app.core.config import settings
+from app.core.http import get_http_clients
+from app.core.metrics import metrics
+from app.core.spool import FileSpool
+
 logger = logging.getLogger(__name__)
 
 LEDGER_API_URL = "http://localhost:8006"
@@ -24,6 +37,18 @@ SCHEMA_VERSION = "1.0.0"
 PRODUCER = "ops"
 PRODUCER_VERSION = "1.0.0"
 
+# Ledger busy, down (any 5xx) or refusing our credentials: keep the events and retry
+RETRYABLE_STATUS = (401, 403, 408, 429)
+
+# A batch gets longer to answer than single calls (HTTP_TIMEOUT)
+BATCH_TIMEOUT = httpx.Timeout(settings.LEDGER_BATCH_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT)
+
+DEAD_LETTERS = metrics.gauge("ledger_dead_letter_events", "Ledger events rejected and kept in the dead-letter file")
+
+
+def _retryable(status_code: int) -> bool:
+    return status_code in RETRYABLE_STATUS or status_code >= 500
+
 
 class LedgerWriteResult(BaseModel):
     """Result of writing to the Ledger"""
@@ -33,6 +58,12 @@ class LedgerWriteResult(BaseModel):
     created_at: str
 
 
+class LedgerAck(BaseModel):
+    """Event accepted for delivery by the Ledger writer"""
+    idempotency_key: str
+    correlation_id: str
+
+
 class LedgerBridge:
     """
     Bridge to PROVENIQ Ledger for audit trail.
@@ -44,35 +75,34 @@ class LedgerBridge:
     - Vendor deliveries
     """
     
-    def __init__(self, base_url: str = LEDGER_API_URL):
+    def __init__(self, base_url: str = LEDGER_API_URL, dead_letter_path: str = settings.LEDGER_DEAD_LETTER_PATH):
         self.base_url = base_url
+        # Cleared when the Ledger answers the batch endpoint with 404/405
+        self._batch_supported = True
+        self.dead_letters = FileSpool(dead_letter_path)
     
     def _hash_payload(self, payload: dict) -> str:
         """Calculate SHA256 hash of payload."""
         payload_str = json.dumps(payload, sort_keys=True)
         return hashlib.sha256(payload_str.encode()).hexdigest()
 
-    async def write_event(
+    def build_event(
         self,
         event_type: str,
         asset_id: Optional[str],
         actor_id: str,
         payload: dict,
         correlation_id: Optional[str] = None,
-    ) -> Optional[LedgerWriteResult]:
-        """Write a canonical event to the Ledger."""
-        corr_id = correlation_id or str(uuid4())
-        idempotency_key = f"ops_{uuid4()}"
+    ) -> dict:
+        """Canonical event envelope for the Ledger."""
         occurred_at = datetime.utcnow().isoformat() + "Z"
-        canonical_hash = self._hash_payload(payload)
-
-        canonical_event = {
+        return {
             "schema_version": SCHEMA_VERSION,
             "event_type": event_type,
             "occurred_at": occurred_at,
             "committed_at": occurred_at,
-            "correlation_id": corr_id,
-            "idempotency_key": idempotency_key,
+            "correlation_id": correlation_id or str(uuid4()),
+            "idempotency_key": f"ops_{uuid4()}",
             "producer": PRODUCER,
             "producer_version": PRODUCER_VERSION,
             "subject": {
@@ -82,32 +112,121 @@ class LedgerBridge:
                 **payload,
                 "actor_id": actor_id,
             },
-            "canonical_hash_hex": canonical_hash,
+            "canonical_hash_hex": self._hash_payload(payload),
         }
 
+    async def write_event(
+        self,
+        event_type: str,
+        asset_id: Optional[str],
+        actor_id: str,
+        payload: dict,
+        correlation_id: Optional[str] = None,
+    ) -> Optional[LedgerWriteResult]:
+        """Write a canonical event to the Ledger and wait for its entry."""
+        canonical_event = self.build_event(event_type, asset_id, actor_id, payload, correlation_id)
+
         try:
-            async with httpx.AsyncClient() as client:
+            client = get_http_clients().get(self.base_url)
+            response = await client.post(
+                f"{self.base_url}/api/v1/events/canonical",
+                json=canonical_event,
+            )
+            
+            if response.status_code not in (200, 201):
+                logger.warning(f"[LEDGER] Write failed: {response.status_code} {response.text}")
+                return None
+            
+            data = response.json()
+            
+            return LedgerWriteResult(
+                event_id=data.get("event_id", ""),
+                sequence_number=data.get("sequence_number", 0),
+                entry_hash=data.get("entry_hash", ""),
+                created_at=data.get("committed_at", ""),
+            )
+        except Exception as e:
+            logger.error(f"[LEDGER] Write error: {e}")
+            return None
+    
+    def enqueue_event(
+        self,
+        event_type: str,
+        asset_id: Optional[str],
+        actor_id: str,
+        payload: dict,
+        correlation_id: Optional[str] = None,
+    ) -> LedgerAck:
+        """Queue a canonical event for the background Ledger writer."""
+        canonical_event = self.build_event(event_type, asset_id, actor_id, payload, correlation_id)
+        get_ledger_writer().submit(canonical_event)
+        return LedgerAck(
+            idempotency_key=canonical_event["idempotency_key"],
+            correlation_id=canonical_event["correlation_id"],
+        )
+    
+    async def post_events(self, events: List[dict]) -> int:
+        """
+        Post events in order, as one batch where the Ledger accepts it.
+        
+        Returns how many were handled (recorded, or rejected as invalid
+        and moved to the dead-letter file); fewer than len(events) means
+        the Ledger stopped answering and the rest should be retried.
+        """
+        client = get_http_clients().get(self.base_url)
+        if self._batch_supported and len(events) > 1:
+            try:
+                response = await client.post(
+                    f"{self.base_url}/api/v1/events/canonical/batch",
+                    json={"events": events},
+                    timeout=BATCH_TIMEOUT,
+                )
+            except httpx.HTTPError as e:
+                logger.warning(f"[LEDGER] Batch write error: {e}")
+                return 0
+            if response.status_code in (200, 201):
+                return len(events)
+            if response.status_code in (404, 405):
+                logger.info("[LEDGER] No batch endpoint; writing events one at a time")
+                self._batch_supported = False
+            elif _retryable(response.status_code):
+                logger.warning(f"[LEDGER] Batch write failed: {response.status_code}")
+                return 0
+            # Otherwise an event in the batch was rejected: send singly to isolate it
+        
+        rejected = []
+        handled = len(events)
+        for index, event in enumerate(events):
+            try:
                 response = await client.post(
                     f"{self.base_url}/api/v1/events/canonical",
-                    json=canonical_event,
-                    timeout=10.0,
+                    json=event,
                 )
-                
-                if response.status_code not in (200, 201):
-                    logger.warning(f"[LEDGER] Write failed: {response.status_code} {response.text}")
-                    return None
-                
-                data = response.json()
-                
-                return LedgerWriteResult(
-                    event_id=data.get("event_id", ""),
-                    sequence_number=data.get("sequence_number", 0),
-                    entry_hash=data.get("entry_hash", ""),
-                    created_at=data.get("committed_at", ""),
+            except httpx.HTTPError as e:
+                logger.warning(f"[LEDGER] Write error: {e}")
+                handled = index
+                break
+            if _retryable(response.status_code):
+                logger.warning(f"[LEDGER] Write failed: {response.status_code}")
+                handled = index
+                break
+            if response.status_code not in (200, 201, 409):
+                logger.error(
+                    f"[LEDGER] Event {event['idempotency_key']} rejected, moved to dead letters: "
+                    f"{response.status_code} {response.text}"
                 )
-        except Exception as e:
-            logger.error(f"[LEDGER] Write error: {e}")
-            return None
+                rejected.append({
+                    "event": event,
+                    "status_code": response.status_code,
+                    "response": response.text[:2000],
+                    "rejected_at": datetime.utcnow().isoformat() + "Z",
+                })
+        
+        if rejected:
+            # Raises if the file can't be written, so the writer retries the batch
+            await asyncio.to_thread(self.dead_letters.append, rejected)
+            DEAD_LETTERS.set(self.dead_letters.pending)
+        return handled
     
     async def write_scan_completed(
         self,
@@ -115,9 +234,9 @@ class LedgerBridge:
         user_id: str,
         items_scanned: int,
         discrepancies_found: int,
-    ) -> Optional[LedgerWriteResult]:
+    ) -> LedgerAck:
         """Record inventory scan completion."""
-        return await self.write_event(
+        return self.enqueue_event(
             event_type="OPS_SCAN_COMPLETED",
             asset_id=None,
             actor_id=user_id,
@@ -138,9 +257,9 @@ class LedgerBridge:
         unit_cost_cents: int,
         shrinkage_type: str,
         detected_by: str,
-    ) -> Optional[LedgerWriteResult]:
+    ) -> LedgerAck:
         """Record shrinkage detection."""
-        return await self.write_event(
+        return self.enqueue_event(
             event_type="OPS_SHRINKAGE_DETECTED",
             asset_id=item_id,
             actor_id=detected_by,
@@ -163,9 +282,9 @@ class LedgerBridge:
         total_cents: int,
         item_count: int,
         placed_by: str,
-    ) -> Optional[LedgerWriteResult]:
+    ) -> LedgerAck:
         """Record order placement."""
-        return await self.write_event(
+        return self.enqueue_event(
             event_type="OPS_ORDER_PLACED",
             asset_id=order_id,
             actor_id=placed_by,
@@ -186,9 +305,9 @@ class LedgerBridge:
         items_received: int,
         items_rejected: int,
         received_by: str,
-    ) -> Optional[LedgerWriteResult]:
+    ) -> LedgerAck:
         """Record delivery receipt."""
-        return await self.write_event(
+        return self.enqueue_event(
             event_type="OPS_DELIVERY_RECEIVED",
             asset_id=order_id,
             actor_id=received_by,
@@ -0,0 +1,234 @@
+"""
+PROVENIQ Ops - Ledger Writer
+
+Background writer for Ledger audit events:
+- Callers enqueue and return at once with the event's idempotency key
+- One task posts events in order, LEDGER_BATCH_SIZE at a time, or
+  whatever has gathered once the oldest is LEDGER_FLUSH_INTERVAL old
+- While the Ledger is unreachable, events are appended to a local spool
+  file (LEDGER_SPOOL_PATH) and replayed in order, before anything newer,
+  once it answers again (checked every LEDGER_RETRY_INTERVAL)
+- Events carry idempotency keys, so a batch re-sent after an ambiguous
+  failure is not recorded twice
+
+A spool left behind by a previous process is replayed on start.
+"""
+
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.spool import FileSpool
+
+logger = logging.getLogger(__name__)
+
+
+# Posts events in order; returns how many were handled before the Ledger stopped answering
+Sender = Callable[[List[Dict[str, Any]]], Awaitable[int]]
+
+BUFFERED = metrics.gauge("ledger_writer_buffered_events", "Ledger events waiting in memory")
+SPOOLED = metrics.gauge("ledger_spool_pending_events", "Ledger events waiting in the spool file")
+
+
+# ============================================
+# Writer
+# ============================================
+
+class LedgerWriter:
+    """
+    Buffers canonical events and posts them in batches from a single
+    background task, so the Ledger receives them in submission order.
+    """
+    
+    def __init__(
+        self,
+        send: Sender,
+        batch_size: int = settings.LEDGER_BATCH_SIZE,
+        flush_interval: float = settings.LEDGER_FLUSH_INTERVAL,
+        retry_interval: float = settings.LEDGER_RETRY_INTERVAL,
+        max_buffer: int = settings.LEDGER_MAX_BUFFER,
+        spool_path: str = settings.LEDGER_SPOOL_PATH,
+    ):
+        self.send = send
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.max_buffer = max_buffer
+        self.spool = FileSpool(spool_path)
+        
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._oldest: Optional[float] = None
+        self._retry_at = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        
+        self.written = 0
+        self.batches = 0
+        self.spilled = 0
+    
+    # ---------- Submission ----------
+    
+    def submit(self, event: Dict[str, Any]) -> None:
+        """Queue an event; it is posted (or spooled) by the background task"""
+        if not self._buffer:
+            self._oldest = time.monotonic()
+        self._buffer.append(event)
+        if len(self._buffer) >= min(self.batch_size, self.max_buffer):
+            self._wakeup.set()
+        self._ensure_running()
+    
+    def _ensure_running(self) -> None:
+        if self._stopping or (self._task is not None and not self._task.done()):
+            return
+        try:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        except RuntimeError:
+            # No event loop (scripts): events wait for start()
+            pass
+    
+    async def start(self) -> None:
+        """Start the writer, replaying any spool left by a previous process"""
+        self._stopping = False
+        if self.spool.pending:
+            logger.info(f"Ledger spool holds {self.spool.pending} undelivered events; replaying")
+        self._ensure_running()
+    
+    async def stop(self) -> None:
+        """Post what is buffered (spooling it if the Ledger is down) and stop"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        elif self._buffer:
+            await self._drain()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "buffered": len(self._buffer),
+            "spooled": self.spool.pending,
+            "written": self.written,
+            "batches": self.batches,
+            "spilled": self.spilled,
+        }
+    
+    # ---------- Background Task ----------
+    
+    async def _run(self) -> None:
+        while True:
+            await self._wait()
+            try:
+                await self._drain()
+            except Exception as e:
+                logger.error(f"Ledger writer error: {e}")
+                self._retry_at = time.monotonic() + self.retry_interval
+            if self._stopping:
+                return
+    
+    async def _wait(self) -> None:
+        """Until a batch is full, the oldest event is due, or a spool retry is due"""
+        now = time.monotonic()
+        deadlines = []
+        if self._buffer:
+            deadlines.append(self._oldest + self.flush_interval)
+        if self.spool.pending:
+            deadlines.append(self._retry_at)
+        timeout = max(0.0, min(deadlines) - now) if deadlines else None
+        
+        self._wakeup.clear()
+        if self._stopping or len(self._buffer) >= self.batch_size or timeout == 0:
+            return
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+    
+    def _due(self) -> bool:
+        return self._stopping or len(self._buffer) >= self.batch_size or (
+            self._oldest is not None and time.monotonic() - self._oldest >= self.flush_interval
+        )
+    
+    async def _drain(self) -> None:
+        # Spooled events go first: nothing newer may overtake them
+        if self.spool.pending and not self._stopping and time.monotonic() >= self._retry_at:
+            await self._replay()
+        if self.spool.pending or len(self._buffer) > self.max_buffer:
+            await self._spill()
+            return
+        
+        while self._buffer and self._due():
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            self._oldest = time.monotonic() if self._buffer else None
+            handled = await self._send(batch)
+            self.written += handled
+            self.batches += 1
+            if handled < len(batch):
+                self._buffer.extendleft(reversed(batch[handled:]))
+                self._retry_at = time.monotonic() + self.retry_interval
+                logger.warning(f"Ledger unreachable; spooling {len(self._buffer)} events")
+                await self._spill()
+                return
+        BUFFERED.set(len(self._buffer))
+    
+    async def _send(self, events: List[Dict[str, Any]]) -> int:
+        try:
+            return await self.send(events)
+        except Exception as e:
+            logger.error(f"Ledger write failed: {e}")
+            return 0
+    
+    async def _replay(self) -> None:
+        while self.spool.pending:
+            entries = await asyncio.to_thread(self.spool.read, self.batch_size)
+            if not entries:
+                # Count out of step with the file (edited by hand?): nothing left to send
+                await asyncio.to_thread(self.spool.clear)
+                break
+            handled = await self._send([event for _, event in entries])
+            self.written += handled
+            self.batches += 1
+            if handled:
+                await asyncio.to_thread(self.spool.commit, entries[handled - 1][0], handled)
+            SPOOLED.set(self.spool.pending)
+            if handled < len(entries):
+                self._retry_at = time.monotonic() + self.retry_interval
+                return
+        logger.info("Ledger spool replayed")
+    
+    async def _spill(self) -> None:
+        """Move buffered events to the end of the spool"""
+        events = list(self._buffer)
+        self._buffer.clear()
+        self._oldest = None
+        if events:
+            try:
+                await asyncio.to_thread(self.spool.append, events)
+                self.spilled += len(events)
+            except OSError as e:
+                logger.error(f"Ledger spool write failed, keeping {len(events)} events in memory: {e}")
+                self._buffer.extendleft(reversed(events))
+                self._oldest = time.monotonic()
+                self._retry_at = time.monotonic() + self.retry_interval
+        BUFFERED.set(len(self._buffer))
+        SPOOLED.set(self.spool.pending)
+
+
+# ============================================
+# Singleton Instance
+# ============================================
+
+_writer_instance: Optional[LedgerWriter] = None
+
+
+def get_ledger_writer() -> LedgerWriter:
+    """Get Ledger writer instance"""
+    global _writer_instance
+    if _writer_instance is None:
+        from app.bridges.ledger import get_ledger_bridge
+        _writer_instance = LedgerWriter(get_ledger_bridge().post_events)
+    return _writer_instance
@@ -1,19 +1,13 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
-from app.core.config import settings
-
-
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-)
-
-async_session_maker = async_sessionmaker(
+# One engine and pool per process: sessions come from app.db.session
+from app.db.session import (
+    async_session_factory as async_session_maker,
     engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
+    get_db,
+    get_primary_read_db,
+    get_read_db,
+    read_session_factory,
 )
 
 
@@ -22,14 +16,12 @@ class Base(DeclarativeBase):
     pass
 
 
-async def get_db() -> AsyncSession:
-    """Dependency for getting async database session."""
-    async with async_session_maker() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+__all__ = [
+    "Base",
+    "engine",
+    "async_session_maker",
+    "read_session_factory",
+    "get_db",
+    "get_read_db",
+    "get_primary_read_db",
+]
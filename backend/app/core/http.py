@@ -0,0 +1,120 @@
+"""
+PROVENIQ Ops - Shared HTTP Clients
+
+One httpx.AsyncClient per origin (scheme, host, port), shared by every
+caller for the life of the process:
+- Keep-alive pools, so Ledger/ClaimsIQ calls reuse open connections
+  instead of paying TCP (and TLS) setup per call
+- HTTP/2 on TLS origins when the h2 package is installed
+- Timeouts and connection limits from settings
+- Connection failures retried by the transport (HTTP_RETRIES); requests
+  that reached the server are never replayed
+
+Closed on application shutdown; a client requested after that is
+simply recreated.
+"""
+
+from typing import Dict, Optional, Tuple, Union
+import logging
+import ssl
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+Origin = Tuple[str, str, Optional[int]]
+
+
+def origin_of(url: str) -> Origin:
+    parsed = httpx.URL(url)
+    return parsed.scheme, parsed.host, parsed.port
+
+
+class HttpClientRegistry:
+    """Application-scoped httpx clients keyed by origin"""
+    
+    def __init__(
+        self,
+        timeout: float = settings.HTTP_TIMEOUT,
+        connect_timeout: float = settings.HTTP_CONNECT_TIMEOUT,
+        max_connections: int = settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = settings.HTTP_MAX_KEEPALIVE,
+        keepalive_expiry: float = settings.HTTP_KEEPALIVE_EXPIRY,
+        retries: int = settings.HTTP_RETRIES,
+        http2: bool = settings.HTTP2_ENABLED,
+        verify: Union[bool, str, ssl.SSLContext] = True,
+    ):
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.retries = retries
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.verify = verify
+        self._clients: Dict[Origin, httpx.AsyncClient] = {}
+    
+    def get(self, url: str) -> httpx.AsyncClient:
+        """
+        The shared client for url's origin. Callers pass absolute URLs
+        (or their own base) per request; the client carries no base_url.
+        """
+        origin = origin_of(url)
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = self._clients[origin] = self._create(origin)
+        return client
+    
+    def _create(self, origin: Origin) -> httpx.AsyncClient:
+        scheme, host, port = origin
+        http2 = self.http2 and scheme == "https"
+        logger.info(f"HTTP client pool for {scheme}://{host}{f':{port}' if port else ''} (http2={http2})")
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            transport=httpx.AsyncHTTPTransport(
+                retries=self.retries,
+                limits=self.limits,
+                http2=http2,
+                verify=self.verify,
+            ),
+        )
+    
+    async def start(self, *urls: Optional[str]) -> None:
+        """Create the pools for known services up front"""
+        for url in urls:
+            if url:
+                self.get(url)
+    
+    async def aclose(self) -> None:
+        """Close every pooled connection (application shutdown)"""
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {"clients": len(self._clients)}
+
+
+# ============================================
+# Singleton Instance
+# ============================================
+
+_registry_instance: Optional[HttpClientRegistry] = None
+
+
+def get_http_clients() -> HttpClientRegistry:
+    """Get shared HTTP client registry"""
+    global _registry_instance
+    if _registry_instance is None:
+        _registry_instance = HttpClientRegistry()
+    return _registry_instance
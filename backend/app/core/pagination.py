@@ -0,0 +1,140 @@
+"""
+PROVENIQ Ops - Keyset Pagination & NDJSON Streaming
+
+List endpoints page by key rather than by offset:
+- A cursor holds the sort key of the last row returned; the next page
+  is a range scan starting after it, at the same cost at any depth
+- Cursors are opaque (base64 JSON) and tagged with the listing they
+  belong to
+- With `Accept: application/x-ndjson` every matching row is streamed
+  from a server-side cursor, one JSON object per line, STREAM_CHUNK_SIZE
+  rows at a time, so memory stays flat for any export size
+"""
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence, Tuple, Type, TypeVar
+from uuid import UUID
+import json
+
+from fastapi import HTTPException, Request, Response, status
+from pydantic import BaseModel
+from sqlalchemy import ColumnElement, Select, literal, tuple_
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+STREAM_CHUNK_SIZE = 500
+
+Row = TypeVar("Row")
+
+
+# ============================================
+# Cursors
+# ============================================
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _decode_value(value: Any, type_: type) -> Any:
+    if type_ is datetime:
+        return datetime.fromisoformat(value)
+    if type_ is UUID:
+        return UUID(value)
+    if not isinstance(value, type_):
+        raise TypeError(f"expected {type_.__name__}")
+    return value
+
+
+def encode_cursor(kind: str, key: Sequence[Any]) -> str:
+    """Opaque cursor for a sort key of the `kind` listing"""
+    payload = json.dumps({"k": kind, "v": [_encode_value(v) for v in key]}, separators=(",", ":"))
+    return urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, kind: str, types: Sequence[type]) -> Tuple[Any, ...]:
+    """Sort key from a cursor; 400 if it is malformed or from another listing"""
+    try:
+        payload = json.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values = payload["v"]
+        if payload["k"] != kind or len(values) != len(types):
+            raise ValueError("cursor does not match this listing")
+        return tuple(_decode_value(v, t) for v, t in zip(values, types))
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor; pass back the X-Next-Cursor of this listing",
+        )
+
+
+# ============================================
+# Queries
+# ============================================
+
+def keyset(
+    query: Select,
+    columns: Sequence[ColumnElement],
+    after: Optional[Tuple[Any, ...]] = None,
+    descending: bool = False,
+) -> Select:
+    """
+    Order query by columns (all in one direction) and, given the key of
+    the last row seen, start after it. The last column must be unique.
+    """
+    if after is not None:
+        key = tuple_(*columns)
+        bound = tuple_(*(literal(value, column.type) for column, value in zip(columns, after)))
+        query = query.where(key < bound if descending else key > bound)
+    return query.order_by(*(column.desc() if descending else column for column in columns))
+
+
+def page(
+    rows: Sequence[Row],
+    limit: int,
+    response: Response,
+    kind: str,
+    key: Callable[[Row], Sequence[Any]],
+) -> List[Row]:
+    """
+    Trim rows fetched with limit + 1 to limit, setting the next-page
+    cursor header when there are more.
+    """
+    if len(rows) <= limit:
+        return list(rows)
+    rows = rows[:limit]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(kind, key(rows[-1]))
+    return list(rows)
+
+
+# ============================================
+# Streaming
+# ============================================
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def stream_ndjson(
+    query: Select,
+    schema: Type[BaseModel],
+    session_factory: Optional[async_sessionmaker] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Rows of query as NDJSON, read through a server-side cursor.
+    
+    Uses its own read-only session (on the replica when configured): the
+    response body is sent after the request's dependencies (and their
+    session) may already have closed.
+    """
+    if session_factory is None:
+        from app.db.session import read_session_factory as session_factory
+    
+    async with session_factory() as session:
+        result = await session.stream_scalars(query.execution_options(yield_per=STREAM_CHUNK_SIZE))
+        async for rows in result.partitions():
+            yield "".join(schema.model_validate(row).model_dump_json() + "\n" for row in rows).encode()
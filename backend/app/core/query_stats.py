@@ -0,0 +1,206 @@
+"""
+PROVENIQ Ops - Query Statistics & N+1 Detection
+
+Per-request accounting of database work, fed by the engine events in
+app.db.session:
+- Query count, total DB time and statement shapes per request
+- A statement shape repeated N_PLUS_ONE_THRESHOLD+ times in one request
+  is flagged as a likely N+1 (a query issued inside a loop)
+- Statements slower than SLOW_QUERY_MS are logged, in or out of requests
+- Aggregates per route (method + path template) for the admin endpoint
+
+Enabled with DB_QUERY_STATS (defaults to DEBUG). When disabled the
+middleware is not installed and recording is a context-variable lookup.
+"""
+
+from collections import Counter
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Dict, List, Optional
+import logging
+import re
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+SLOW_QUERY_MS = settings.DB_SLOW_QUERY_MS
+N_PLUS_ONE_THRESHOLD = settings.DB_N_PLUS_ONE_THRESHOLD
+
+# Statement shapes kept per route in the report
+MAX_SHAPES_PER_ROUTE = 20
+
+QUERIES_PER_REQUEST = metrics.histogram(
+    "http_request_db_queries",
+    "Database statements executed per request",
+    ("route",),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 500),
+)
+
+_BIND = re.compile(r"\$\d+|%\(\w+\)s|\?")
+_BIND_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement with literals and bind parameters folded, so loop iterations match"""
+    shape = _LITERAL.sub("?", _BIND.sub("?", statement))
+    return _SPACE.sub(" ", _BIND_LIST.sub("?...", shape)).strip()
+
+
+# ============================================
+# Per Request
+# ============================================
+
+class RequestQueries:
+    """Database work of one request"""
+    __slots__ = ("route", "count", "seconds", "slow", "shapes")
+    
+    def __init__(self, route: str = ""):
+        self.route = route
+        self.count = 0
+        self.seconds = 0.0
+        self.slow = 0
+        self.shapes: Counter = Counter()
+    
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> Dict[str, int]:
+        """Shapes executed at least threshold times (likely N+1)"""
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def record_query(statement: str, seconds: float, database: str = "primary") -> None:
+    """Engine hook: account one executed statement"""
+    request = _current.get()
+    slow = seconds * 1000 >= SLOW_QUERY_MS
+    if slow:
+        logger.warning(
+            f"Slow query ({seconds * 1000:.0f} ms, {database}"
+            f"{', ' + request.route if request and request.route else ''}): {statement_shape(statement)[:500]}"
+        )
+    if request is None:
+        return
+    request.count += 1
+    request.seconds += seconds
+    request.slow += slow
+    request.shapes[statement_shape(statement)] += 1
+
+
+# ============================================
+# Per Route
+# ============================================
+
+class RouteQueryStats:
+    """Accumulated database work of one route"""
+    
+    def __init__(self, route: str):
+        self.route = route
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.seconds = 0.0
+        self.slow_queries = 0
+        self.n_plus_one_requests = 0
+        # shape -> [requests flagged, most repeats in one request]
+        self.n_plus_one: Dict[str, List[int]] = {}
+    
+    def add(self, request: RequestQueries) -> None:
+        self.requests += 1
+        self.queries += request.count
+        self.max_queries = max(self.max_queries, request.count)
+        self.seconds += request.seconds
+        self.slow_queries += request.slow
+        
+        repeated = request.repeated()
+        if repeated:
+            self.n_plus_one_requests += 1
+        for shape, count in repeated.items():
+            entry = self.n_plus_one.get(shape)
+            if entry is None:
+                if len(self.n_plus_one) >= MAX_SHAPES_PER_ROUTE:
+                    continue
+                entry = self.n_plus_one[shape] = [0, 0]
+            entry[0] += 1
+            entry[1] = max(entry[1], count)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "route": self.route,
+            "requests": self.requests,
+            "queries": self.queries,
+            "avg_queries": round(self.queries / self.requests, 2) if self.requests else 0,
+            "max_queries": self.max_queries,
+            "db_time_ms": round(self.seconds * 1000, 1),
+            "avg_db_time_ms": round(self.seconds * 1000 / self.requests, 2) if self.requests else 0,
+            "slow_queries": self.slow_queries,
+            "n_plus_one_requests": self.n_plus_one_requests,
+            "n_plus_one": [
+                {"statement": shape, "requests": flagged, "max_repeats": repeats}
+                for shape, (flagged, repeats) in sorted(self.n_plus_one.items(), key=lambda i: -i[1][1])
+            ],
+        }
+
+
+class QueryStatsRegistry:
+    """Per-route aggregates across requests"""
+    
+    def __init__(self):
+        self._routes: Dict[str, RouteQueryStats] = {}
+        self._lock = Lock()
+    
+    def add(self, request: RequestQueries) -> None:
+        QUERIES_PER_REQUEST.observe(request.count, route=request.route)
+        repeated = request.repeated()
+        if repeated:
+            shape, count = max(repeated.items(), key=lambda i: i[1])
+            logger.warning(f"Possible N+1 on {request.route}: {count} x {shape[:300]}")
+        with self._lock:
+            stats = self._routes.get(request.route)
+            if stats is None:
+                stats = self._routes[request.route] = RouteQueryStats(request.route)
+            stats.add(request)
+    
+    def report(self, sort: str = "db_time_ms", limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = [stats.to_dict() for stats in self._routes.values()]
+        return sorted(rows, key=lambda row: row[sort], reverse=True)[:limit]
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+query_stats = QueryStatsRegistry()
+
+
+# ============================================
+# Middleware
+# ============================================
+
+class QueryStatsMiddleware:
+    """ASGI middleware scoping query accounting to each HTTP request"""
+    
+    def __init__(self, app, registry: QueryStatsRegistry = query_stats):
+        self.app = app
+        self.registry = registry
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request = RequestQueries()
+        token = _current.set(request)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            # Route template once routing has matched; unmatched paths share one bucket
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            request.route = f"{scope['method']} {route}"
+            self.registry.add(request)
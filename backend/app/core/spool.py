@@ -0,0 +1,96 @@
+"""
+PROVENIQ Ops - File Spool
+
+Append-only local spool for records that cannot be delivered yet:
+- The Ledger writer spools events while the Ledger is unreachable
+- The event bus spills subscriber overflow under the spill policy
+
+Records are JSON objects, one per line; a line torn by a crash is
+dropped when the spool is reopened.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class FileSpool:
+    """
+    Append-only NDJSON file of records awaiting delivery, read back in
+    the order written.
+    
+    Replay progress is a byte offset kept in a sidecar file; both are
+    removed once everything has been delivered. With fsync, appended
+    records survive a crash; without, the spool is only overflow storage.
+    """
+    
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = Path(path)
+        self.fsync = fsync
+        self.offset_path = self.path.with_name(self.path.name + ".offset")
+        self.offset = self._read_offset()
+        self.pending = self._recover()
+    
+    def _read_offset(self) -> int:
+        try:
+            return int(self.offset_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return 0
+    
+    def _recover(self) -> int:
+        """Count undelivered records, dropping a line torn by a crash mid-append"""
+        if not self.path.exists():
+            return 0
+        with self.path.open("r+b") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                logger.warning(f"Spool {self.path}: discarding incomplete last line ({len(data) - end} bytes)")
+                f.truncate(end)
+        return data[self.offset:end].count(b"\n")
+    
+    def append(self, records: Sequence[Dict[str, Any]]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+        with self.path.open("ab") as f:
+            f.write(data.encode())
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        self.pending += len(records)
+    
+    def read(self, limit: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """Up to limit records from the replay position, each with the offset just past it"""
+        entries: List[Tuple[int, Dict[str, Any]]] = []
+        if not self.pending:
+            return entries
+        with self.path.open("rb") as f:
+            f.seek(self.offset)
+            offset = self.offset
+            for line in f:
+                offset += len(line)
+                entries.append((offset, json.loads(line)))
+                if len(entries) >= limit:
+                    break
+        return entries
+    
+    def commit(self, offset: int, delivered: int) -> None:
+        """Mark the records before offset delivered"""
+        self.pending -= delivered
+        if self.pending <= 0:
+            self.clear()
+            return
+        self.offset = offset
+        temporary = self.offset_path.with_name(self.offset_path.name + ".tmp")
+        temporary.write_text(str(offset))
+        os.replace(temporary, self.offset_path)
+    
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self.offset_path.unlink(missing_ok=True)
+        self.offset = 0
+        self.pending = 0
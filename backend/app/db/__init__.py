@@ -1,11 +1,23 @@
 # Database module
-from app.db.session import get_db, engine, async_session_factory
+from app.db.session import (
+    get_db,
+    get_read_db,
+    get_primary_read_db,
+    after_commit,
+    engine,
+    async_session_factory,
+    read_session_factory,
+)
 from app.db.models import Base, Vendor, Product, VendorProduct, InventorySnapshot, Order, OrderItem, BishopStateLog
 
 __all__ = [
     "get_db",
+    "get_read_db",
+    "get_primary_read_db",
+    "after_commit",
     "engine", 
     "async_session_factory",
+    "read_session_factory",
     "Base",
     "Vendor",
     "Product", 
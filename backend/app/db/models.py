@@ -4,13 +4,15 @@ Authoritative database schema implementation
 """
 
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Optional
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     CheckConstraint,
+    Date,
     DateTime,
     ForeignKey,
     Index,
@@ -19,6 +21,7 @@ from sqlalchemy import (
     String,
     Text,
     UniqueConstraint,
+    desc,
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
@@ -98,6 +101,7 @@ class Product(Base):
         ),
         Index("idx_products_barcode", "barcode", postgresql_where="barcode IS NOT NULL"),
         Index("idx_products_risk", "risk_category"),
+        Index("idx_products_name_id", "name", "id"),
     )
 
 
@@ -118,6 +122,8 @@ class VendorProduct(Base):
     vendor_sku: Mapped[str] = mapped_column(String(100), nullable=False)
     current_price: Mapped[Decimal] = mapped_column(Numeric(12, 4), nullable=False)
     stock_available: Mapped[Optional[int]] = mapped_column(Integer)
+    min_order_qty: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    case_pack: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
     last_synced_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -138,6 +144,8 @@ class VendorProduct(Base):
             "stock_available IS NULL OR stock_available >= 0",
             name="vendor_products_stock_non_negative",
         ),
+        CheckConstraint("min_order_qty > 0", name="vendor_products_moq_positive"),
+        CheckConstraint("case_pack > 0", name="vendor_products_case_pack_positive"),
         UniqueConstraint("vendor_id", "product_id"),
         UniqueConstraint("vendor_id", "vendor_sku"),
         Index("idx_vendor_products_vendor", "vendor_id"),
@@ -146,7 +154,7 @@ class VendorProduct(Base):
 
 
 class InventorySnapshot(Base):
-    """Timestamped scan records with provenance."""
+    """Timestamped scan records with provenance, range-partitioned by month."""
     
     __tablename__ = "inventory_snapshots"
     
@@ -158,8 +166,9 @@ class InventorySnapshot(Base):
     )
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
     confidence_score: Mapped[Optional[Decimal]] = mapped_column(Numeric(5, 4))
+    # Partition key, so part of the primary key
     scanned_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
+        DateTime(timezone=True), primary_key=True, server_default=func.now()
     )
     scanned_by: Mapped[str] = mapped_column(String(100), nullable=False, default="bishop")
     scan_method: Mapped[str] = mapped_column(String(50), nullable=False, default="manual")
@@ -178,9 +187,55 @@ class InventorySnapshot(Base):
             "scan_method IN ('manual', 'barcode', 'silhouette', 'volumetric')",
             name="snapshots_method_valid",
         ),
-        Index("idx_snapshots_product", "product_id"),
-        Index("idx_snapshots_scanned_at", "scanned_at"),
-        Index("idx_snapshots_scanned_by", "scanned_by"),
+        Index("idx_snapshots_product_time", "product_id", desc("scanned_at")),
+        Index("idx_snapshots_scanned_by_time", "scanned_by", desc("scanned_at")),
+        Index("idx_snapshots_scanned_at_brin", "scanned_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (scanned_at)"},
+    )
+
+
+class InventorySnapshotDaily(Base):
+    """Daily per-product rollup of snapshots past raw retention."""
+    
+    __tablename__ = "inventory_snapshot_daily"
+    
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    open_quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    close_quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    min_quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    max_quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    snapshot_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_scanned_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_scanned_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    
+    __table_args__ = (
+        Index("idx_snapshot_daily_day", "day"),
+    )
+
+
+class CurrentInventory(Base):
+    """Latest snapshot per product, maintained on every snapshot write."""
+    
+    __tablename__ = "current_inventory"
+    
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    snapshot_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    confidence_score: Mapped[Optional[Decimal]] = mapped_column(Numeric(5, 4))
+    scanned_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    location_tag: Mapped[Optional[str]] = mapped_column(String(255))
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+    
+    __table_args__ = (
+        CheckConstraint("quantity >= 0", name="current_inventory_quantity_non_negative"),
+        Index("idx_current_inventory_location", "location_tag"),
     )
 
 
@@ -205,6 +260,7 @@ class Order(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
     submitted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    delivered_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     
     # Relationships
     vendor: Mapped["Vendor"] = relationship(back_populates="orders")
@@ -298,12 +354,60 @@ class UsageStatistics(Base):
     avg_daily_burn_30d: Mapped[Decimal] = mapped_column(Numeric(12, 4), nullable=False, default=0)
     avg_daily_burn_90d: Mapped[Decimal] = mapped_column(Numeric(12, 4), nullable=False, default=0)
     variance_coefficient: Mapped[Decimal] = mapped_column(Numeric(8, 4), nullable=False, default=0)
+    trend: Mapped[str] = mapped_column(String(20), nullable=False, default="stable")
     last_calculated: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
     
+    # Rolling aggregates over usage_daily_buckets, as of `as_of_day` (inclusive).
+    # intervals_* counts snapshot intervals; burn_intervals_* those that consumed.
+    as_of_day: Mapped[Optional[date]] = mapped_column(Date)
+    intervals_7d: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    intervals_30d: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    intervals_90d: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    consumed_7d: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    consumed_30d: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    consumed_90d: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    burn_intervals_7d: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    burn_intervals_30d: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    burn_intervals_90d: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    consumed_sq_7d: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    consumed_sq_30d: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    consumed_sq_90d: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    
+    # Baseline for the next snapshot delta, and event units since that snapshot
+    last_quantity: Mapped[Optional[int]] = mapped_column(Integer)
+    last_observed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    open_consumed: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    open_received: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    
     __table_args__ = (
         Index("idx_usage_product", "product_id"),
+        Index("idx_usage_as_of_day", "as_of_day"),
+    )
+
+
+class UsageDailyBucket(Base):
+    """Per-product totals of the snapshot intervals starting each day, feeding usage_statistics."""
+    
+    __tablename__ = "usage_daily_buckets"
+    
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    consumed: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    received: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    intervals: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    burn_intervals: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    consumed_sq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+    
+    __table_args__ = (
+        CheckConstraint("consumed >= 0 AND received >= 0", name="usage_bucket_non_negative"),
+        Index("idx_usage_bucket_day", "day"),
     )
 
 
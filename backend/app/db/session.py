@@ -1,33 +1,182 @@
 """
 PROVENIQ Ops - Database Session Management
 Async SQLAlchemy configuration for PostgreSQL
+
+One primary engine (and, when DATABASE_REPLICA_URL is set, one replica
+engine) for the whole process; app.core.database re-exports it.
+
+- get_db: read-write session on the primary, committed after the request
+- get_read_db: read-only session, on the replica when configured; never
+  commits, so reads hold no primary connection and skip the COMMIT trip
+- get_primary_read_db: read-only session on the primary, for reads that
+  must see the latest commit (e.g. filling caches invalidated on write)
+- after_commit: run a callback once the session's transaction commits
+  (dropped on rollback), for side effects that must not see uncommitted rows
+
+Every engine reports query latency and pool usage to app.core.metrics,
+and each statement to app.core.query_stats (slow-query log, N+1 checks).
 """
 
-from typing import AsyncGenerator
+import logging
+import time
+from typing import AsyncGenerator, Callable, List, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.core.query_stats import record_query
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+QUERY_DURATION = metrics.histogram(
+    "db_query_duration_seconds",
+    "Database statement execution time",
+    ("database",),
+)
+CONNECTION_HELD = metrics.histogram(
+    "db_pool_connection_held_seconds",
+    "Time a pooled connection stays checked out",
+    ("database",),
+)
+CONNECTIONS_IN_USE = metrics.gauge(
+    "db_pool_connections_in_use",
+    "Pooled connections currently checked out",
+    ("database",),
 )
 
-async_session_factory = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
+
+# ============================================
+# Engines
+# ============================================
+
+def instrument_engine(engine: AsyncEngine, database: str) -> AsyncEngine:
+    """Record statement timings and pool checkouts for an engine"""
+    sync_engine = engine.sync_engine
+    pool = sync_engine.pool
+    in_use = 0
+    
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+    
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_started"].pop()
+        QUERY_DURATION.observe(seconds, database=database)
+        record_query(statement, seconds, database)
+    
+    @event.listens_for(sync_engine, "handle_error")
+    def _failed_execute(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+    
+    @event.listens_for(pool, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        nonlocal in_use
+        in_use += 1
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        CONNECTIONS_IN_USE.set(in_use, database=database)
+    
+    @event.listens_for(pool, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        nonlocal in_use
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is not None:
+            in_use -= 1
+            CONNECTION_HELD.observe(time.perf_counter() - started, database=database)
+        CONNECTIONS_IN_USE.set(in_use, database=database)
+    
+    return engine
+
+
+def create_engine(url: str, database: str) -> AsyncEngine:
+    """Pooled, instrumented engine sized from settings"""
+    return instrument_engine(
+        create_async_engine(
+            url,
+            echo=settings.DEBUG,
+            pool_pre_ping=True,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        ),
+        database,
+    )
+
+
+engine = create_engine(settings.DATABASE_URL, "primary")
+
+# Same pool as the primary; transactions are opened READ ONLY
+primary_read_engine = engine.execution_options(postgresql_readonly=True)
+
+replica_engine: Optional[AsyncEngine] = (
+    create_engine(settings.DATABASE_REPLICA_URL, "replica").execution_options(postgresql_readonly=True)
+    if settings.DATABASE_REPLICA_URL
+    else None
 )
+read_engine = replica_engine or primary_read_engine
+
+
+def _session_factory(bind: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
+async_session_factory = _session_factory(engine)
+read_session_factory = _session_factory(read_engine)
+primary_read_session_factory = _session_factory(primary_read_engine)
 
 
+async def dispose_engines() -> None:
+    """Close every pooled connection (application shutdown)"""
+    await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+
+
+# ============================================
+# Post-commit Hooks
+# ============================================
+
+AFTER_COMMIT_KEY = "after_commit_callbacks"
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Run `callback` after the session's transaction commits; dropped on rollback"""
+    session.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    callbacks: List[Callable[[], None]] = session.info.pop(AFTER_COMMIT_KEY, [])
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            # The transaction is committed; a failed side effect must not fail the request
+            logger.error(f"After-commit callback failed: {e}")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_commit(session: Session, previous_transaction) -> None:
+    session.info.pop(AFTER_COMMIT_KEY, None)
+
+
+# ============================================
+# Dependencies
+# ============================================
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for database session injection."""
     async with async_session_factory() as session:
@@ -39,3 +188,15 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Read-only session dependency (replica when configured); never commits."""
+    async with read_session_factory() as session:
+        yield session
+
+
+async def get_primary_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Read-only session dependency on the primary; never commits."""
+    async with primary_read_session_factory() as session:
+        yield session
@@ -13,6 +13,8 @@ from .dag import DecisionDAG, DecisionNode, DecisionGate, create_reorder_dag, cr
 from .executor import DecisionExecutor
 from .policies import PolicyEngine, PolicyResult
 from .trace import DecisionTrace, TraceStore
+from .checkpoint import CheckpointStore, NodeCheckpoint
+from .replay import ReplayPolicyEngine, ReplayReport, replay_trace, replay_many
 
 __all__ = [
     "DecisionDAG",
@@ -25,4 +27,10 @@ __all__ = [
     "PolicyResult",
     "DecisionTrace",
     "TraceStore",
+    "CheckpointStore",
+    "NodeCheckpoint",
+    "ReplayPolicyEngine",
+    "ReplayReport",
+    "replay_trace",
+    "replay_many",
 ]
@@ -0,0 +1,131 @@
+"""
+PROVENIQ Ops - Decision Checkpoints
+
+Per-node execution checkpoints for resumable DAGs.
+When a DAG blocks on an approval gate, resumption restarts at the
+blocked node instead of re-walking (and re-billing) upstream gates.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
+from uuid import UUID
+from pydantic import BaseModel, Field
+import logging
+
+from .dag import DecisionDAG, DecisionNode, NodeStatus
+
+logger = logging.getLogger(__name__)
+
+
+class GateCheckpoint(BaseModel):
+    """Recorded outcome of a single gate evaluation"""
+    gate_id: str
+    status: NodeStatus
+    result: Optional[Dict[str, Any]] = None
+    checked_at: Optional[datetime] = None
+
+
+class NodeCheckpoint(BaseModel):
+    """Recorded outcome of a single node execution"""
+    node_id: str
+    status: NodeStatus
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    gates: List[GateCheckpoint] = []
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    recorded_at: datetime = Field(default_factory=datetime.utcnow)
+
+    @classmethod
+    def from_node(cls, node: DecisionNode) -> "NodeCheckpoint":
+        """Capture the runtime state of a node"""
+        return cls(
+            node_id=node.node_id,
+            status=node.status,
+            result=node.result,
+            error=node.error,
+            gates=[
+                GateCheckpoint(
+                    gate_id=gate.gate_id,
+                    status=gate.status,
+                    result=gate.result,
+                    checked_at=gate.checked_at,
+                )
+                for gate in node.gates
+            ],
+            started_at=node.started_at,
+            completed_at=node.completed_at,
+        )
+
+    def restore(self, node: DecisionNode) -> None:
+        """Apply this checkpoint to a node"""
+        node.status = self.status
+        node.result = self.result
+        node.error = self.error
+        node.started_at = self.started_at
+        node.completed_at = self.completed_at
+
+        gates = {gate.gate_id: gate for gate in node.gates}
+        for gate_cp in self.gates:
+            gate = gates.get(gate_cp.gate_id)
+            if gate:
+                gate.status = gate_cp.status
+                gate.result = gate_cp.result
+                gate.checked_at = gate_cp.checked_at
+
+
+class CheckpointStore:
+    """
+    Storage for node checkpoints, keyed by trace ID.
+
+    The executor drops a trace's checkpoints once it passes or fails;
+    traces left blocked (never approved) expire after max_age.
+    """
+
+    def __init__(self, max_age: timedelta = timedelta(days=7)):
+        self.max_age = max_age
+        # Least recently checkpointed trace first
+        self._checkpoints: "OrderedDict[UUID, Dict[str, NodeCheckpoint]]" = OrderedDict()
+
+    async def save(self, trace_id: UUID, checkpoint: NodeCheckpoint) -> None:
+        """Save (or replace) the checkpoint for a node"""
+        self._checkpoints.setdefault(trace_id, {})[checkpoint.node_id] = checkpoint
+        self._checkpoints.move_to_end(trace_id)
+        self._expire(checkpoint.recorded_at - self.max_age)
+        logger.debug(f"Checkpointed {checkpoint.node_id} -> {checkpoint.status} (trace: {trace_id})")
+
+    async def load(self, trace_id: UUID) -> Dict[str, NodeCheckpoint]:
+        """Load all node checkpoints for a trace"""
+        return dict(self._checkpoints.get(trace_id, {}))
+
+    async def delete(self, trace_id: UUID) -> None:
+        """Drop checkpoints for a trace"""
+        self._checkpoints.pop(trace_id, None)
+
+    def _expire(self, cutoff: datetime) -> None:
+        """Drop traces whose latest checkpoint is older than cutoff"""
+        while self._checkpoints:
+            trace_id, checkpoints = next(iter(self._checkpoints.items()))
+            if max(cp.recorded_at for cp in checkpoints.values()) >= cutoff:
+                break
+            del self._checkpoints[trace_id]
+            logger.info(f"Expired checkpoints for trace {trace_id}")
+
+    async def restore(self, dag: DecisionDAG) -> int:
+        """
+        Apply stored checkpoints to a DAG.
+
+        Returns:
+            Number of nodes restored
+        """
+        checkpoints = await self.load(dag.trace_id)
+        restored = 0
+
+        for node_id, checkpoint in checkpoints.items():
+            node = dag.nodes.get(node_id)
+            if node:
+                checkpoint.restore(node)
+                restored += 1
+
+        return restored
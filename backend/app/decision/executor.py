@@ -9,10 +9,14 @@ from typing import Dict, Any, Callable, Awaitable, Optional
 from datetime import datetime
 from uuid import UUID
 import logging
+import time
+
+from app.core.metrics import metrics
 
 from .dag import DecisionDAG, DecisionNode, DecisionGate, NodeStatus
 from .policies import PolicyEngine, PolicyResult
 from .trace import DecisionTrace, TraceStore
+from .checkpoint import CheckpointStore, NodeCheckpoint
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +24,33 @@ logger = logging.getLogger(__name__)
 # Type for execution functions
 ExecuteFn = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
 
+# Latency histograms and reuse counts (exported on /metrics)
+DAG_DURATION = metrics.histogram(
+    "decision_dag_duration_seconds",
+    "Wall time of a decision DAG run (resumed runs are observed separately)",
+    ("dag", "status"),
+)
+NODE_DURATION = metrics.histogram(
+    "decision_node_duration_seconds",
+    "Wall time of a decision node including its gates and executor",
+    ("dag", "node"),
+)
+GATE_DURATION = metrics.histogram(
+    "decision_gate_duration_seconds",
+    "Policy gate evaluation time (source: live bridges or a replay recording)",
+    ("gate_type", "gate", "source"),
+)
+GATE_REUSED = metrics.counter(
+    "decision_gate_reused_total",
+    "Gates not re-evaluated on resume because they passed before the block",
+    ("gate_type", "gate"),
+)
+EXECUTOR_DURATION = metrics.histogram(
+    "decision_executor_duration_seconds",
+    "Time spent inside registered execution functions",
+    ("executor", "outcome"),
+)
+
 
 class DecisionExecutor:
     """
@@ -30,16 +61,20 @@ class DecisionExecutor:
     2. All gates must pass before node execution
     3. Every decision is traced for audit
     4. Reproducible: same input → same output
+    5. Resumable: blocked DAGs resume from per-node checkpoints
     """
     
     def __init__(
         self,
         org_id: UUID,
         trace_store: Optional[TraceStore] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        policy_engine: Optional[PolicyEngine] = None,
     ):
         self.org_id = org_id
-        self.policy_engine = PolicyEngine(org_id)
+        self.policy_engine = policy_engine or PolicyEngine(org_id)
         self.trace_store = trace_store or TraceStore()
+        self.checkpoint_store = checkpoint_store or CheckpointStore()
         
         # Registered execution functions
         self._executors: Dict[str, ExecuteFn] = {}
@@ -74,17 +109,42 @@ class DecisionExecutor:
         )
         
         dag.started_at = datetime.utcnow()
-        dag.status = NodeStatus.IN_PROGRESS
         trace.start()
         
         logger.info(f"Starting DAG execution: {dag.name} (trace: {trace.trace_id})")
         
+        await self._run(dag, context, trace)
+        
+        return trace
+    
+    async def _run(
+        self,
+        dag: DecisionDAG,
+        context: Dict[str, Any],
+        trace: DecisionTrace,
+        resume: bool = False,
+    ) -> None:
+        """
+        Walk the DAG in dependency order, checkpointing every node.
+        
+        When resuming, nodes that already passed are not re-executed;
+        their checkpointed results are merged back into the context.
+        """
+        dag.status = NodeStatus.IN_PROGRESS
+        run_started = time.perf_counter()
+        
         # Execute nodes in order
         execution_order = dag.get_execution_order()
         
         for node_id in execution_order:
             node = dag.nodes[node_id]
             
+            if resume and node.status == NodeStatus.PASSED:
+                context.update(node.result or {})
+                continue
+            
+            node_started = time.perf_counter()
+            
             # Check if dependencies passed
             deps_passed = all(
                 dag.nodes[dep_id].status == NodeStatus.PASSED
@@ -94,10 +154,11 @@ class DecisionExecutor:
             if not deps_passed:
                 node.status = NodeStatus.BLOCKED
                 trace.log_node_blocked(node_id, "Dependencies not met")
+                await self._checkpoint(dag, node)
                 continue
             
             # Execute node
-            node_result = await self._execute_node(node, context, trace)
+            node_result = await self._execute_node(node, context, trace, resume=resume)
             
             if node_result["status"] == "passed":
                 node.status = NodeStatus.PASSED
@@ -112,15 +173,27 @@ class DecisionExecutor:
                 node.status = NodeStatus.FAILED
                 node.error = node_result.get("error")
                 dag.status = NodeStatus.FAILED
-                break
             
             node.completed_at = datetime.utcnow()
+            
+            node_seconds = time.perf_counter() - node_started
+            NODE_DURATION.observe(node_seconds, dag=dag.name, node=node_id)
+            trace.timings.add_node(node_id, node_seconds)
+            
+            await self._checkpoint(dag, node)
+            
+            if node.status == NodeStatus.FAILED:
+                break
         
         # Finalize
         dag.completed_at = datetime.utcnow()
         if dag.status != NodeStatus.FAILED:
             dag.status = NodeStatus.PASSED if dag.is_complete() else NodeStatus.BLOCKED
         
+        run_seconds = time.perf_counter() - run_started
+        DAG_DURATION.observe(run_seconds, dag=dag.name, status=dag.status.value)
+        trace.timings.add_dag(run_seconds)
+        
         trace.complete(
             status=dag.status.value,
             final_context=context,
@@ -129,15 +202,26 @@ class DecisionExecutor:
         # Persist trace
         await self.trace_store.save(trace)
         
-        logger.info(f"DAG execution complete: {dag.name} -> {dag.status}")
+        # Only a trace waiting on a blocked node can be resumed; otherwise
+        # its checkpoints are spent
+        waiting = dag.status != NodeStatus.FAILED and any(
+            node.status == NodeStatus.BLOCKED for node in dag.nodes.values()
+        )
+        if not waiting:
+            await self.checkpoint_store.delete(dag.trace_id)
         
-        return trace
+        logger.info(f"DAG execution complete: {dag.name} -> {dag.status}")
+    
+    async def _checkpoint(self, dag: DecisionDAG, node: DecisionNode) -> None:
+        """Persist the current state of a node for later resumption"""
+        await self.checkpoint_store.save(dag.trace_id, NodeCheckpoint.from_node(node))
     
     async def _execute_node(
         self,
         node: DecisionNode,
         context: Dict[str, Any],
         trace: DecisionTrace,
+        resume: bool = False,
     ) -> Dict[str, Any]:
         """Execute a single node with its gates"""
         node.started_at = datetime.utcnow()
@@ -147,7 +231,22 @@ class DecisionExecutor:
         
         # Check all gates
         for gate in node.gates:
+            if resume and gate.status == NodeStatus.PASSED:
+                # Already passed before the block - don't re-query bridges
+                trace.log_gate_reused(node.node_id, gate.gate_id)
+                GATE_REUSED.inc(gate_type=gate.gate_type.value, gate=gate.gate_id)
+                continue
+            
+            gate_started = time.perf_counter()
             gate_result = await self.policy_engine.evaluate_gate(gate, context)
+            gate_seconds = time.perf_counter() - gate_started
+            GATE_DURATION.observe(
+                gate_seconds,
+                gate_type=gate.gate_type.value,
+                gate=gate.gate_id,
+                source="replay" if gate_result.replayed else "live",
+            )
+            trace.timings.add_gate(node.node_id, gate.gate_id, gate_seconds)
             
             gate.status = NodeStatus.PASSED if gate_result.passed else NodeStatus.FAILED
             gate.result = gate_result.details
@@ -167,12 +266,15 @@ class DecisionExecutor:
         
         # All gates passed, execute the node
         if node.execute_fn and node.execute_fn in self._executors:
+            executor_started = time.perf_counter()
             try:
                 executor = self._executors[node.execute_fn]
                 result = await executor(context)
+                self._observe_executor(node.execute_fn, executor_started, "ok", trace)
                 trace.log_node_complete(node.node_id, result)
                 return {"status": "passed", "result": result}
             except Exception as e:
+                self._observe_executor(node.execute_fn, executor_started, "error", trace)
                 logger.error(f"Node {node.node_id} execution failed: {e}")
                 trace.log_node_error(node.node_id, str(e))
                 return {"status": "failed", "error": str(e)}
@@ -181,6 +283,18 @@ class DecisionExecutor:
         trace.log_node_complete(node.node_id, {})
         return {"status": "passed", "result": {}}
     
+    def _observe_executor(
+        self,
+        execute_fn: str,
+        started: float,
+        outcome: str,
+        trace: DecisionTrace,
+    ) -> None:
+        """Record time spent inside a registered execution function"""
+        seconds = time.perf_counter() - started
+        EXECUTOR_DURATION.observe(seconds, executor=execute_fn, outcome=outcome)
+        trace.timings.add_executor(execute_fn, seconds)
+    
     async def get_pending_approvals(self, dag: DecisionDAG) -> list:
         """Get list of nodes waiting for approval"""
         pending = []
@@ -208,18 +322,44 @@ class DecisionExecutor:
     ) -> DecisionTrace:
         """
         Provide approval for a blocked node and resume execution.
+        
+        Resumes from the stored checkpoints: upstream nodes that passed are
+        not re-executed, gates that already passed are not re-evaluated, and
+        events are appended to the original trace. Falls back to a full
+        re-execution when no checkpoints exist for the DAG.
         """
         # Add approval to context
         context["approval_token"] = approval_token
         context["approved_by"] = str(approved_by)
         
-        # Reset the blocked node
+        trace = await self.trace_store.get(dag.trace_id)
+        restored = await self.checkpoint_store.restore(dag)
+        
+        if trace is None or not restored:
+            logger.info(f"No checkpoints for trace {dag.trace_id}, re-executing {dag.name}")
+            self._reset_for_approval(dag, node_id)
+            return await self.execute(dag, context)
+        
+        # Everything that did not pass is re-entered; the approved node
+        # keeps its passed gates and only re-checks approval gates
+        for node in dag.nodes.values():
+            if node.status != NodeStatus.PASSED:
+                node.status = NodeStatus.PENDING
+                node.error = None
+        self._reset_for_approval(dag, node_id)
+        
+        trace.log_resumed(node_id, str(approved_by))
+        logger.info(f"Resuming DAG execution: {dag.name} at {node_id} (trace: {trace.trace_id})")
+        
+        await self._run(dag, context, trace, resume=True)
+        
+        return trace
+    
+    def _reset_for_approval(self, dag: DecisionDAG, node_id: str) -> None:
+        """Reset the blocked node and its approval gates"""
         node = dag.nodes.get(node_id)
         if node:
             node.status = NodeStatus.PENDING
             for gate in node.gates:
                 if gate.gate_type.value == "approval":
                     gate.status = NodeStatus.PENDING
-        
-        # Resume execution
-        return await self.execute(dag, context)
@@ -28,6 +28,7 @@ class PolicyResult(BaseModel):
     evaluated_at: datetime = datetime.utcnow()
     requires_action: bool = False
     action_type: Optional[str] = None  # "approval_needed", "evidence_needed", etc.
+    replayed: bool = False  # Served from a replay recording rather than evaluated live
 
 
 class PolicyEngine:
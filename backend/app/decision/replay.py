@@ -0,0 +1,415 @@
+"""
+PROVENIQ Ops - Decision Replay
+
+Deterministic replay of stored decision traces.
+
+The executor promises "same input → same output". Replay checks that promise
+(and the impact of policy changes) by re-running stored traces:
+- External gates (liquidity, coverage, vendor) return their recorded results
+  instead of calling Capital/ClaimsIQ/vendor bridges
+- Internal gates (threshold, criticality, approval) are re-evaluated with the
+  current policy code
+- Node executors return their recorded results (no side effects)
+
+Outcomes are diffed against the original trace. Large volumes (a full day of
+production traces) are replayed in a process pool.
+"""
+
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+import asyncio
+import json
+import logging
+import os
+import time
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from .checkpoint import CheckpointStore
+from .dag import DecisionDAG, DecisionGate, GateType, create_disposal_dag, create_reorder_dag
+from .executor import DecisionExecutor
+from .policies import PolicyEngine, PolicyResult
+from .trace import DecisionTrace, TraceStore
+
+logger = logging.getLogger(__name__)
+
+
+# Gates whose results depend on external systems and are always replayed
+EXTERNAL_GATE_TYPES: FrozenSet[GateType] = frozenset({
+    GateType.LIQUIDITY,
+    GateType.COVERAGE,
+    GateType.VENDOR,
+})
+
+# Rebuilds a DAG from a trace's initial context
+DagFactory = Callable[[Dict[str, Any]], DecisionDAG]
+
+_DAG_FACTORIES: Dict[str, DagFactory] = {
+    "Reorder Decision": lambda ctx: create_reorder_dag(
+        product_id=ctx.get("product_id"),
+        quantity=ctx.get("quantity", 0),
+        vendor_id=ctx.get("vendor_id", ""),
+    ),
+    "Disposal Decision": lambda ctx: create_disposal_dag(
+        item_id=ctx.get("item_id"),
+        quantity=ctx.get("quantity", 0),
+        reason=ctx.get("reason", ""),
+    ),
+}
+
+
+def register_dag_factory(dag_name: str, factory: DagFactory) -> None:
+    """Register how to rebuild a DAG (by name) for replay"""
+    _DAG_FACTORIES[dag_name] = factory
+
+
+# ============================================
+# Models
+# ============================================
+
+class ReplayResult(BaseModel):
+    """Outcome of replaying a single trace"""
+    trace_id: UUID
+    dag_name: str
+    matched: bool
+    original_status: str
+    replay_status: Optional[str] = None
+    divergences: List[str] = []
+    error: Optional[str] = None
+
+
+class ReplayReport(BaseModel):
+    """Aggregate outcome of a replay run"""
+    total: int = 0
+    matched: int = 0
+    diverged: int = 0
+    errors: int = 0
+    elapsed_seconds: float = 0.0
+    traces_per_second: float = 0.0
+    workers: int = 0
+    # Capped sample of divergent/failed traces
+    samples: List[ReplayResult] = []
+
+    @property
+    def is_clean(self) -> bool:
+        return self.diverged == 0 and self.errors == 0
+
+
+# ============================================
+# Replaying policy engine
+# ============================================
+
+class ReplayPolicyEngine(PolicyEngine):
+    """
+    Policy engine that answers gates from a recorded trace.
+
+    Recorded results are consumed in order per gate, so gates evaluated
+    more than once (e.g. before and after an approval) replay faithfully.
+    """
+
+    def __init__(
+        self,
+        org_id: UUID,
+        recorded: Dict[str, Deque[Tuple[bool, str, Dict[str, Any]]]],
+        replay_gate_types: FrozenSet[GateType] = EXTERNAL_GATE_TYPES,
+    ):
+        super().__init__(org_id)
+        self.recorded = recorded
+        self.replay_gate_types = replay_gate_types
+        self.missing: List[str] = []
+
+    @classmethod
+    def from_trace(
+        cls,
+        trace: DecisionTrace,
+        replay_gate_types: FrozenSet[GateType] = EXTERNAL_GATE_TYPES,
+    ) -> "ReplayPolicyEngine":
+        """Collect recorded gate results from a trace"""
+        recorded: Dict[str, Deque[Tuple[bool, str, Dict[str, Any]]]] = defaultdict(deque)
+
+        for event_type, _, gate_id, _, details in trace.iter_records():
+            if event_type == "gate_evaluated" and gate_id:
+                recorded[gate_id].append((
+                    details.get("passed", False),
+                    details.get("message", ""),
+                    details.get("details") or {},
+                ))
+
+        return cls(trace.org_id, recorded, replay_gate_types)
+
+    async def evaluate_gate(
+        self,
+        gate: DecisionGate,
+        context: Dict[str, Any],
+    ) -> PolicyResult:
+        if gate.gate_type not in self.replay_gate_types:
+            return await super().evaluate_gate(gate, context)
+
+        results = self.recorded.get(gate.gate_id)
+        if not results:
+            # Never fall through to a live bridge during replay
+            self.missing.append(gate.gate_id)
+            return PolicyResult(
+                passed=False,
+                gate_type=gate.gate_type,
+                message=f"No recorded result for gate {gate.gate_id}",
+            )
+
+        passed, message, details = results.popleft()
+        return PolicyResult(
+            passed=passed,
+            gate_type=gate.gate_type,
+            message=message,
+            details=details,
+            replayed=True,
+        )
+
+
+# ============================================
+# Single-trace replay
+# ============================================
+
+def _outcome_signature(trace: DecisionTrace) -> List[Tuple[Any, ...]]:
+    """Outcome-relevant events of a trace (no timestamps or IDs)"""
+    signature = []
+
+    for event_type, node_id, gate_id, message, details in trace.iter_records():
+        if event_type == "gate_evaluated":
+            signature.append((event_type, node_id, gate_id, details.get("passed")))
+        elif event_type in ("node_blocked", "node_error"):
+            signature.append((event_type, node_id, message))
+        elif event_type in ("node_completed", "gate_reused", "trace_resumed"):
+            signature.append((event_type, node_id, gate_id))
+
+    return signature
+
+
+def _normalize(value: Any) -> Any:
+    """JSON-normalize a value so stored and live contexts compare equal"""
+    return json.loads(to_json(value, fallback=str))
+
+
+def diff_traces(original: DecisionTrace, replayed: DecisionTrace) -> List[str]:
+    """Describe how a replayed trace differs from the original"""
+    divergences = []
+
+    if original.status != replayed.status:
+        divergences.append(f"status: {original.status} -> {replayed.status}")
+
+    expected = _outcome_signature(original)
+    actual = _outcome_signature(replayed)
+    if expected != actual:
+        for index, (exp, act) in enumerate(zip(expected, actual)):
+            if exp != act:
+                divergences.append(f"event {index}: {exp} -> {act}")
+                break
+        else:
+            divergences.append(f"event count: {len(expected)} -> {len(actual)}")
+
+    if _normalize(original.final_context) != _normalize(replayed.final_context):
+        divergences.append("final_context differs")
+
+    return divergences
+
+
+async def replay_trace(
+    trace: DecisionTrace,
+    replay_gate_types: FrozenSet[GateType] = EXTERNAL_GATE_TYPES,
+) -> ReplayResult:
+    """
+    Re-run a stored trace and diff its outcome.
+
+    Approval resumptions recorded in the trace are replayed through
+    `provide_approval` so the checkpointed resume path is exercised too.
+    """
+    factory = _DAG_FACTORIES.get(trace.dag_name)
+    if factory is None:
+        return ReplayResult(
+            trace_id=trace.trace_id,
+            dag_name=trace.dag_name,
+            matched=False,
+            original_status=trace.status,
+            error=f"No DAG factory registered for '{trace.dag_name}'",
+        )
+
+    dag = factory(trace.initial_context)
+    dag.trace_id = trace.trace_id
+    dag.dag_id = trace.dag_id
+
+    # Recorded node results, consumed per execute_fn in execution order
+    node_results: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+    resumes: List[Tuple[str, str]] = []
+    for event_type, node_id, _, _, details in trace.iter_records():
+        if event_type == "node_completed" and node_id in dag.nodes:
+            execute_fn = dag.nodes[node_id].execute_fn
+            if execute_fn:
+                node_results[execute_fn].append(details.get("result") or {})
+        elif event_type == "trace_resumed":
+            resumes.append((node_id, details.get("approved_by")))
+
+    executor = DecisionExecutor(
+        trace.org_id,
+        trace_store=TraceStore(),
+        checkpoint_store=CheckpointStore(),
+        policy_engine=ReplayPolicyEngine.from_trace(trace, replay_gate_types),
+    )
+
+    def recorded_executor(execute_fn: str):
+        async def replay(ctx: Dict[str, Any]) -> Dict[str, Any]:
+            results = node_results[execute_fn]
+            return results.popleft() if results else {}
+        return replay
+
+    for node in dag.nodes.values():
+        if node.execute_fn:
+            executor.register_executor(node.execute_fn, recorded_executor(node.execute_fn))
+
+    try:
+        context = dict(trace.initial_context)
+        replayed = await executor.execute(dag, context)
+        approval_token = trace.final_context.get("approval_token", "")
+        for node_id, approved_by in resumes:
+            replayed = await executor.provide_approval(
+                dag, node_id, UUID(approved_by), approval_token, context,
+            )
+    except Exception as e:
+        return ReplayResult(
+            trace_id=trace.trace_id,
+            dag_name=trace.dag_name,
+            matched=False,
+            original_status=trace.status,
+            error=f"{type(e).__name__}: {e}",
+        )
+
+    divergences = diff_traces(trace, replayed)
+    if executor.policy_engine.missing:
+        divergences.append(f"unrecorded gates: {sorted(set(executor.policy_engine.missing))}")
+
+    return ReplayResult(
+        trace_id=trace.trace_id,
+        dag_name=trace.dag_name,
+        matched=not divergences,
+        original_status=trace.status,
+        replay_status=replayed.status,
+        divergences=divergences,
+    )
+
+
+# ============================================
+# Bulk replay (process pool)
+# ============================================
+
+def _replay_chunk(
+    payloads: List[str],
+    replay_gate_types: FrozenSet[GateType],
+    max_samples: int,
+) -> Tuple[int, int, int, List[ReplayResult]]:
+    """Worker entry point: replay a chunk of serialized traces"""
+    async def run() -> Tuple[int, int, int, List[ReplayResult]]:
+        matched = diverged = errors = 0
+        samples: List[ReplayResult] = []
+
+        for payload in payloads:
+            try:
+                trace = DecisionTrace.from_json(payload)
+            except Exception as e:
+                errors += 1
+                logger.warning(f"Unreadable trace skipped: {e}")
+                continue
+
+            result = await replay_trace(trace, replay_gate_types)
+            if result.error:
+                errors += 1
+            elif result.matched:
+                matched += 1
+                continue
+            else:
+                diverged += 1
+
+            if len(samples) < max_samples:
+                samples.append(result)
+
+        return matched, diverged, errors, samples
+
+    return asyncio.run(run())
+
+
+def _chunks(payloads: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(payloads)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def replay_many(
+    payloads: Iterable[str],
+    workers: Optional[int] = None,
+    chunk_size: int = 500,
+    replay_gate_types: FrozenSet[GateType] = EXTERNAL_GATE_TYPES,
+    max_samples: int = 100,
+    initializer: Optional[Callable[[], None]] = None,
+) -> ReplayReport:
+    """
+    Replay serialized traces (DecisionTrace.to_json output) in bulk.
+
+    Payloads are streamed: at most two chunks per worker are in flight, so
+    a day of traces can be replayed from a file or cursor without loading
+    it all into memory.
+
+    Args:
+        payloads: Iterable of trace JSON strings
+        workers: Process count (default: CPU count). 0 replays in-process.
+        chunk_size: Traces per worker task
+        replay_gate_types: Gate types answered from recorded results
+        max_samples: Cap on divergent/failed results kept in the report
+        initializer: Run once per worker (and in-process), e.g. to register
+            custom DAG factories
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    report = ReplayReport(workers=workers)
+    started = time.perf_counter()
+
+    def merge(outcome: Tuple[int, int, int, List[ReplayResult]]) -> None:
+        matched, diverged, errors, samples = outcome
+        report.matched += matched
+        report.diverged += diverged
+        report.errors += errors
+        report.total += matched + diverged + errors
+        report.samples.extend(samples[:max_samples - len(report.samples)])
+
+    if workers == 0:
+        if initializer:
+            initializer()
+        for chunk in _chunks(payloads, chunk_size):
+            merge(_replay_chunk(chunk, replay_gate_types, max_samples))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer) as pool:
+            in_flight = set()
+            for chunk in _chunks(payloads, chunk_size):
+                if len(in_flight) >= workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        merge(future.result())
+                in_flight.add(pool.submit(_replay_chunk, chunk, replay_gate_types, max_samples))
+
+            for future in wait(in_flight).done:
+                merge(future.result())
+
+    report.elapsed_seconds = time.perf_counter() - started
+    if report.elapsed_seconds > 0:
+        report.traces_per_second = report.total / report.elapsed_seconds
+
+    logger.info(
+        f"Replayed {report.total} traces in {report.elapsed_seconds:.1f}s "
+        f"({report.traces_per_second:.0f}/s): {report.matched} matched, "
+        f"{report.diverged} diverged, {report.errors} errors"
+    )
+
+    return report
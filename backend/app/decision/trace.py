@@ -5,12 +5,16 @@ Immutable audit trail for all decisions.
 Enables "Explain-This" and "What happened last time" features.
 """
 
-from typing import Dict, Any, List, Optional
-from datetime import datetime
-from uuid import UUID, uuid4
-from pydantic import BaseModel, Field
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from array import array
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4, uuid5
+from pydantic import BaseModel, Field, PrivateAttr
+from pydantic_core import to_json
 import logging
 import json
+import sys
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +30,254 @@ class TraceEvent(BaseModel):
     details: Dict[str, Any] = {}
 
 
+# Interned event kinds shared by every buffer: (event_type, message template,
+# detail keys). Detail keys describe how details are stored compactly:
+# None -> a plain dict, one key -> the bare value, several keys -> a tuple.
+_EVENT_KINDS: List[Tuple[str, str, Optional[Tuple[str, ...]]]] = []
+_EVENT_KIND_IDS: Dict[Tuple[str, str, Optional[Tuple[str, ...]]], int] = {}
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _event_kind(
+    event_type: str,
+    template: str,
+    detail_keys: Optional[Tuple[str, ...]] = None,
+) -> int:
+    """Get (or register) the interned id for an event kind"""
+    key = (event_type, template, detail_keys)
+    kind = _EVENT_KIND_IDS.get(key)
+    if kind is None:
+        kind = len(_EVENT_KINDS)
+        _EVENT_KINDS.append((
+            sys.intern(event_type),
+            sys.intern(template),
+            tuple(sys.intern(k) for k in detail_keys) if detail_keys is not None else None,
+        ))
+        _EVENT_KIND_IDS[key] = kind
+    return kind
+
+
+TRACE_STARTED = _event_kind("trace_started", "Decision execution started")
+TRACE_COMPLETED = _event_kind("trace_completed", "Decision execution completed: {}")
+TRACE_RESUMED = _event_kind("trace_resumed", "Decision execution resumed after approval", ("approved_by",))
+NODE_STARTED = _event_kind("node_started", "Node '{}' started")
+NODE_COMPLETED = _event_kind("node_completed", "Node completed successfully", ("result",))
+NODE_BLOCKED = _event_kind("node_blocked", "Node blocked: {}")
+NODE_ERROR = _event_kind("node_error", "Node failed: {}", ("error",))
+GATE_EVALUATED = _event_kind("gate_evaluated", "Gate '{}' evaluated: {}", ("passed", "message", "details"))
+GATE_REUSED = _event_kind("gate_reused", "Gate '{}' already passed, reusing checkpoint")
+
+
+class TraceBuffer:
+    """
+    Compact append-only event log for a trace.
+    
+    Events are stored as parallel columns: an interned kind id (event type,
+    message template, detail layout), a float UTC timestamp, node/gate ids,
+    the template arguments and the detail values. TraceEvent models are only
+    built when materialized; event IDs are derived from the trace ID and
+    sequence so they are stable across materializations.
+    """
+    
+    __slots__ = ("_kinds", "_timestamps", "_node_ids", "_gate_ids", "_args", "_details", "_event_ids")
+    
+    def __init__(self):
+        self._kinds = array("H")
+        self._timestamps = array("d")
+        self._node_ids: List[Optional[str]] = []
+        self._gate_ids: List[Optional[str]] = []
+        # None, a single argument, or a tuple of arguments
+        self._args: List[Any] = []
+        # Detail values in the layout of the event kind
+        self._details: List[Any] = []
+        # Explicit IDs for events loaded from legacy storage (seq -> id)
+        self._event_ids: Optional[Dict[int, UUID]] = None
+    
+    def __len__(self) -> int:
+        return len(self._kinds)
+    
+    def append(
+        self,
+        kind: int,
+        args: Any = None,
+        node_id: Optional[str] = None,
+        gate_id: Optional[str] = None,
+        details: Any = None,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """Append an event without allocating a model"""
+        self._kinds.append(kind)
+        self._timestamps.append(time.time() if timestamp is None else timestamp)
+        self._node_ids.append(node_id)
+        self._gate_ids.append(gate_id)
+        self._args.append(args)
+        self._details.append(details)
+    
+    def append_event(self, event: TraceEvent) -> None:
+        """Append an already-materialized event (e.g. loaded from storage)"""
+        if self._event_ids is None:
+            self._event_ids = {}
+        self._event_ids[len(self)] = event.event_id
+        self.append(
+            _event_kind(event.event_type, "{}"),
+            event.message,
+            node_id=event.node_id,
+            gate_id=event.gate_id,
+            details=event.details or None,
+            timestamp=(event.timestamp - _EPOCH).total_seconds(),
+        )
+    
+    def message(self, seq: int) -> str:
+        """Format the message of a single event"""
+        template = _EVENT_KINDS[self._kinds[seq]][1]
+        args = self._args[seq]
+        if args is None:
+            return template
+        if type(args) is tuple:
+            return template.format(*args)
+        return template.format(args)
+    
+    def details(self, seq: int) -> Dict[str, Any]:
+        """Expand the detail values of a single event into a dict"""
+        values = self._details[seq]
+        keys = _EVENT_KINDS[self._kinds[seq]][2]
+        if keys is None:
+            return values or {}
+        if len(keys) == 1:
+            return {keys[0]: values}
+        return dict(zip(keys, values))
+    
+    def iter_messages(self) -> Iterator[str]:
+        """Iterate formatted messages without building models"""
+        for seq in range(len(self)):
+            yield self.message(seq)
+    
+    def iter_timestamps(self) -> Iterator[datetime]:
+        """Iterate event timestamps (naive UTC) without building models"""
+        for timestamp in self._timestamps:
+            yield _EPOCH + timedelta(seconds=timestamp)
+    
+    def iter_records(self) -> Iterator[Tuple[str, Optional[str], Optional[str], str, Dict[str, Any]]]:
+        """Iterate (event_type, node_id, gate_id, message, details) without building models"""
+        for seq in range(len(self)):
+            yield (
+                _EVENT_KINDS[self._kinds[seq]][0],
+                self._node_ids[seq],
+                self._gate_ids[seq],
+                self.message(seq),
+                self.details(seq),
+            )
+    
+    def materialize(self, trace_id: UUID, start: int = 0) -> List[TraceEvent]:
+        """Build TraceEvent models for events from `start` onwards"""
+        explicit_ids = self._event_ids or {}
+        events = []
+        
+        for seq in range(start, len(self)):
+            event_id = explicit_ids.get(seq) or uuid5(trace_id, str(seq))
+            events.append(TraceEvent(
+                event_id=event_id,
+                timestamp=_EPOCH + timedelta(seconds=self._timestamps[seq]),
+                event_type=_EVENT_KINDS[self._kinds[seq]][0],
+                node_id=self._node_ids[seq],
+                gate_id=self._gate_ids[seq],
+                message=self.message(seq),
+                details=self.details(seq),
+            ))
+        
+        return events
+    
+    def to_columns(self) -> Dict[str, Any]:
+        """
+        Columnar representation for storage.
+        
+        Kinds are written as a per-trace table plus one index per event, so
+        the stored form stays independent of process-local kind ids.
+        """
+        local_ids: Dict[int, int] = {}
+        kind_table = []
+        kind_index = []
+        for kind in self._kinds:
+            local = local_ids.get(kind)
+            if local is None:
+                local = local_ids[kind] = len(kind_table)
+                kind_table.append(_EVENT_KINDS[kind])
+            kind_index.append(local)
+        
+        columns = {
+            "kinds": kind_table,
+            "kind_index": kind_index,
+            "timestamps": self._timestamps.tolist(),
+            "node_ids": self._node_ids,
+            "gate_ids": self._gate_ids,
+            "args": self._args,
+            "details": self._details,
+        }
+        if self._event_ids:
+            columns["event_ids"] = {str(seq): str(event_id) for seq, event_id in self._event_ids.items()}
+        return columns
+    
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Any]) -> "TraceBuffer":
+        """Rebuild a buffer from its columnar representation"""
+        kind_table = [
+            (_event_kind(event_type, template, tuple(keys) if keys is not None else None), keys)
+            for event_type, template, keys in columns["kinds"]
+        ]
+        
+        buffer = cls()
+        for local, timestamp, node_id, gate_id, args, details in zip(
+            columns["kind_index"],
+            columns["timestamps"],
+            columns["node_ids"],
+            columns["gate_ids"],
+            columns["args"],
+            columns["details"],
+        ):
+            kind, keys = kind_table[local]
+            buffer.append(
+                kind,
+                tuple(args) if isinstance(args, list) else args,
+                node_id=node_id,
+                gate_id=gate_id,
+                details=tuple(details) if keys is not None and len(keys) > 1 else details,
+                timestamp=timestamp,
+            )
+        
+        event_ids = columns.get("event_ids")
+        if event_ids:
+            buffer._event_ids = {int(seq): UUID(event_id) for seq, event_id in event_ids.items()}
+        
+        return buffer
+
+
+class TraceTimings(BaseModel):
+    """
+    Latency breakdown of a decision execution, in milliseconds.
+    
+    Values accumulate across resumed runs, so `dag_ms` is time spent
+    executing (not time spent waiting for approval).
+    """
+    dag_ms: float = 0.0
+    node_ms: Dict[str, float] = {}
+    gate_ms: Dict[str, float] = {}  # "node_id/gate_id"
+    executor_ms: Dict[str, float] = {}
+    
+    def add_dag(self, seconds: float) -> None:
+        self.dag_ms += seconds * 1000
+    
+    def add_node(self, node_id: str, seconds: float) -> None:
+        self.node_ms[node_id] = self.node_ms.get(node_id, 0.0) + seconds * 1000
+    
+    def add_gate(self, node_id: str, gate_id: str, seconds: float) -> None:
+        key = f"{node_id}/{gate_id}"
+        self.gate_ms[key] = self.gate_ms.get(key, 0.0) + seconds * 1000
+    
+    def add_executor(self, execute_fn: str, seconds: float) -> None:
+        self.executor_ms[execute_fn] = self.executor_ms.get(execute_fn, 0.0) + seconds * 1000
+
+
 class DecisionTrace(BaseModel):
     """
     Immutable trace of a decision execution.
@@ -35,6 +287,9 @@ class DecisionTrace(BaseModel):
     - Explain-This feature
     - Decision memory ("What happened last time")
     - Debugging and analysis
+    
+    Events are recorded into a compact TraceBuffer; `events` materializes
+    TraceEvent models on first access.
     """
     trace_id: UUID = Field(default_factory=uuid4)
     dag_id: UUID
@@ -50,17 +305,45 @@ class DecisionTrace(BaseModel):
     initial_context: Dict[str, Any] = {}
     final_context: Dict[str, Any] = {}
     
-    # Events
-    events: List[TraceEvent] = []
-    
     # Outcome
     status: str = "pending"  # pending, passed, failed, blocked
     error: Optional[str] = None
     
+    # Latency breakdown (filled by the executor)
+    timings: TraceTimings = Field(default_factory=TraceTimings)
+    
+    # Events
+    _buffer: TraceBuffer = PrivateAttr(default_factory=TraceBuffer)
+    _materialized: Optional[List[TraceEvent]] = PrivateAttr(default=None)
+    
+    @property
+    def events(self) -> List[TraceEvent]:
+        """Materialized trace events (built lazily, extended on append)"""
+        if self._materialized is None:
+            self._materialized = []
+        if len(self._materialized) < len(self._buffer):
+            self._materialized.extend(
+                self._buffer.materialize(self.trace_id, start=len(self._materialized))
+            )
+        return self._materialized
+    
+    @property
+    def event_count(self) -> int:
+        """Number of recorded events (does not materialize)"""
+        return len(self._buffer)
+    
+    def iter_messages(self) -> Iterator[str]:
+        """Iterate event messages (does not materialize)"""
+        return self._buffer.iter_messages()
+    
+    def iter_records(self) -> Iterator[Tuple[str, Optional[str], Optional[str], str, Dict[str, Any]]]:
+        """Iterate (event_type, node_id, gate_id, message, details) (does not materialize)"""
+        return self._buffer.iter_records()
+    
     def start(self) -> None:
         """Mark trace as started"""
         self.started_at = datetime.utcnow()
-        self._log_event("trace_started", "Decision execution started")
+        self._log_event(TRACE_STARTED)
     
     def complete(self, status: str, final_context: Dict[str, Any]) -> None:
         """Mark trace as complete"""
@@ -71,81 +354,63 @@ class DecisionTrace(BaseModel):
         if self.started_at:
             self.duration_ms = int((self.completed_at - self.started_at).total_seconds() * 1000)
         
-        self._log_event("trace_completed", f"Decision execution completed: {status}")
+        self._log_event(TRACE_COMPLETED, status)
     
     def log_node_start(self, node_id: str, node_name: str) -> None:
         """Log node execution start"""
-        self._log_event(
-            "node_started",
-            f"Node '{node_name}' started",
-            node_id=node_id,
-        )
+        self._log_event(NODE_STARTED, node_name, node_id=node_id)
     
     def log_node_complete(self, node_id: str, result: Dict[str, Any]) -> None:
         """Log node execution complete"""
-        self._log_event(
-            "node_completed",
-            f"Node completed successfully",
-            node_id=node_id,
-            details={"result": result},
-        )
+        self._log_event(NODE_COMPLETED, node_id=node_id, details=result)
     
     def log_node_blocked(self, node_id: str, reason: str) -> None:
         """Log node blocked"""
-        self._log_event(
-            "node_blocked",
-            f"Node blocked: {reason}",
-            node_id=node_id,
-        )
+        self._log_event(NODE_BLOCKED, reason, node_id=node_id)
     
     def log_node_error(self, node_id: str, error: str) -> None:
         """Log node error"""
-        self._log_event(
-            "node_error",
-            f"Node failed: {error}",
-            node_id=node_id,
-            details={"error": error},
-        )
+        self._log_event(NODE_ERROR, error, node_id=node_id, details=error)
         self.error = error
     
     def log_gate_result(self, node_id: str, gate_id: str, result: Any) -> None:
         """Log gate evaluation result"""
         self._log_event(
-            "gate_evaluated",
-            f"Gate '{gate_id}' evaluated: {'passed' if result.passed else 'failed'}",
+            GATE_EVALUATED,
+            (gate_id, "passed" if result.passed else "failed"),
             node_id=node_id,
             gate_id=gate_id,
-            details={
-                "passed": result.passed,
-                "message": result.message,
-                "details": result.details,
-            },
+            details=(result.passed, result.message, result.details),
         )
     
+    def log_gate_reused(self, node_id: str, gate_id: str) -> None:
+        """Log a gate skipped on resume because it already passed"""
+        self._log_event(GATE_REUSED, gate_id, node_id=node_id, gate_id=gate_id)
+    
+    def log_resumed(self, node_id: str, approved_by: str) -> None:
+        """Log resumption of a blocked trace after approval"""
+        self._log_event(TRACE_RESUMED, node_id=node_id, details=approved_by)
+    
     def _log_event(
         self,
-        event_type: str,
-        message: str,
+        kind: int,
+        args: Any = None,
         node_id: Optional[str] = None,
         gate_id: Optional[str] = None,
-        details: Dict[str, Any] = {},
+        details: Any = None,
     ) -> None:
         """Internal method to log an event"""
-        event = TraceEvent(
-            event_type=event_type,
-            node_id=node_id,
-            gate_id=gate_id,
-            message=message,
-            details=details,
-        )
-        self.events.append(event)
-        logger.debug(f"[Trace {self.trace_id}] {event_type}: {message}")
+        self._buffer.append(kind, args, node_id=node_id, gate_id=gate_id, details=details)
+        if logger.isEnabledFor(logging.DEBUG):
+            seq = len(self._buffer) - 1
+            logger.debug(f"[Trace {self.trace_id}] {_EVENT_KINDS[kind][0]}: {self._buffer.message(seq)}")
     
     def explain(self) -> str:
         """
         Generate human-readable explanation of the decision.
         
-        Used for "Explain-This" feature.
+        Used for "Explain-This" feature. Rendered straight from the buffer,
+        so explaining a trace does not materialize its events.
         """
         lines = [
             f"# Decision: {self.dag_name}",
@@ -156,18 +421,18 @@ class DecisionTrace(BaseModel):
             "## Execution Timeline:",
         ]
         
-        for event in self.events:
-            timestamp = event.timestamp.strftime("%H:%M:%S.%f")[:-3]
+        for at, (_, node_id, gate_id, message, details) in zip(self._buffer.iter_timestamps(), self.iter_records()):
+            timestamp = at.strftime("%H:%M:%S.%f")[:-3]
             prefix = ""
-            if event.node_id:
-                prefix = f"[{event.node_id}]"
-            if event.gate_id:
-                prefix = f"[{event.node_id}/{event.gate_id}]"
+            if node_id:
+                prefix = f"[{node_id}]"
+            if gate_id:
+                prefix = f"[{node_id}/{gate_id}]"
             
-            lines.append(f"  {timestamp} {prefix} {event.message}")
+            lines.append(f"  {timestamp} {prefix} {message}")
             
-            if event.details:
-                for key, value in event.details.items():
+            if details:
+                for key, value in details.items():
                     if key != "result":  # Skip verbose result dumps
                         lines.append(f"           {key}: {value}")
         
@@ -178,13 +443,38 @@ class DecisionTrace(BaseModel):
         return "\n".join(lines)
     
     def to_json(self) -> str:
-        """Serialize trace to JSON for storage"""
-        return self.model_dump_json(indent=2)
+        """
+        Serialize trace to JSON for storage.
+        
+        Events are written in columnar form ("event_log") straight from the
+        buffer, without materializing TraceEvent models. Output is compact
+        (not indented) since it is a storage format.
+        """
+        data = self.model_dump()
+        data["event_log"] = self._buffer.to_columns()
+        return to_json(data).decode()
     
     @classmethod
     def from_json(cls, json_str: str) -> "DecisionTrace":
-        """Deserialize trace from JSON"""
-        return cls.model_validate_json(json_str)
+        """
+        Deserialize trace from JSON.
+        
+        Accepts both the columnar "event_log" form and the legacy "events"
+        list of TraceEvent objects.
+        """
+        data = json.loads(json_str)
+        event_log = data.pop("event_log", None)
+        legacy_events = data.pop("events", None)
+        
+        trace = cls.model_validate(data)
+        
+        if event_log is not None:
+            trace._buffer = TraceBuffer.from_columns(event_log)
+        elif legacy_events:
+            for event in legacy_events:
+                trace._buffer.append_event(TraceEvent.model_validate(event))
+        
+        return trace
 
 
 class TraceStore:
@@ -258,8 +548,8 @@ class TraceStore:
                 continue
             
             # Search in events
-            for event in trace.events:
-                if query_lower in event.message.lower():
+            for message in trace.iter_messages():
+                if query_lower in message.lower():
                     matches.append(trace)
                     break
         
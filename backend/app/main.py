@@ -3,13 +3,51 @@
 Restaurant & Retail Inventory Operations (Bishop FSM)
 """
 
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.bridges.ledger_writer import get_ledger_writer
 from app.core.config import settings
+from app.core.http import get_http_clients
+from app.core.query_stats import QueryStatsMiddleware
+from app.db.session import dispose_engines
 from app.routers import auth, admin
 from app.modules.bishop import bishop_router
-from app.api import inventory, vendors, decisions, predictions
+from app.api import inventory, vendors, decisions, predictions, metrics
+from app.ml.dashboard import get_dashboard_refresher
+from app.ml.usage_stats import get_usage_worker
+from app.ml.waste_inference import get_waste_inference
+from app.services.barcode_cache import get_barcode_cache
+from app.services.events import OpsEventType, event_publisher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Start background workers, warm caches and open HTTP pools; drain and close them on shutdown."""
+    await get_usage_worker().start()
+    
+    refresher = get_dashboard_refresher()
+    event_publisher.subscribe(OpsEventType.INVENTORY_UPDATED.value, refresher.on_inventory_event)
+    await refresher.start()
+    
+    await get_waste_inference().start()
+    await get_barcode_cache().warm()
+    await get_http_clients().start(settings.LEDGER_API_URL, event_publisher.claimsiq_url)
+    await get_ledger_writer().start()
+    
+    yield
+    
+    await event_publisher.stop()
+    await get_waste_inference().stop()
+    await get_dashboard_refresher().stop()
+    await get_usage_worker().stop()
+    await get_ledger_writer().stop()  # Flushes or spools pending Ledger events
+    await get_http_clients().aclose()
+    await dispose_engines()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -17,6 +55,7 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -28,15 +67,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request query counts, slow-query log and N+1 detection
+if settings.query_stats_enabled:
+    app.add_middleware(QueryStatsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
-if settings.DEBUG:
-    app.include_router(admin.router)
+app.include_router(admin.router)  # Bootstrap is DEBUG-only; diagnostics need ADMIN_API_KEY outside DEBUG
 app.include_router(bishop_router)  # BISHOP module (restaurant/retail inventory)
 app.include_router(inventory.router)  # Inventory API
 app.include_router(vendors.router)  # Vendors API
 app.include_router(decisions.router)  # Decision DAG API
 app.include_router(predictions.router)  # ML Predictions API
+app.include_router(metrics.router)  # Prometheus metrics
 
 
 @app.get("/")
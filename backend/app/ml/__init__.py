@@ -7,7 +7,13 @@ Currently uses deterministic fallbacks.
 
 P0 Features (Implemented):
 - Burn Rate Calculation
+- Usage Statistics Materialization
 - Stockout Prediction
+- Streaming Anomaly Detection
+- Seasonal Demand Forecasting
+- Reorder Quantity Optimization
+- Vendor Lead-Time Statistics
+- Batched Waste Image Inference
 
 P1 Features (Pending):
 - Vision (container fill estimation, item classification)
@@ -27,12 +33,45 @@ from app.ml.burn_rate import (
     BurnRateResult,
     get_burn_rate_calculator,
 )
+from app.ml.usage_stats import (
+    UsageStatisticsWorker,
+    UsageSummary,
+    get_usage_worker,
+)
 from app.ml.stockout import (
     StockoutPredictor,
     StockoutPrediction,
     StockoutAlert,
     get_stockout_predictor,
 )
+from app.ml.anomaly import (
+    StreamingAnomalyDetector,
+    get_anomaly_detector,
+)
+from app.ml.forecast import (
+    DemandForecaster,
+    DemandForecastResult,
+    get_demand_forecaster,
+)
+from app.ml.lead_times import (
+    LeadTimeQuantiles,
+    LeadTimeStatistics,
+    get_lead_time_stats,
+)
+from app.ml.reorder import (
+    ReorderOptimizer,
+    ReorderRecommendation,
+    get_reorder_optimizer,
+)
+from app.ml.waste_inference import (
+    WasteInferenceService,
+    get_waste_inference,
+)
+from app.ml.dashboard import (
+    DashboardRefresher,
+    DashboardSnapshot,
+    get_dashboard_refresher,
+)
 
 __all__ = [
     # Interfaces
@@ -45,9 +84,35 @@ __all__ = [
     "BurnRateCalculator",
     "BurnRateResult",
     "get_burn_rate_calculator",
+    # Usage Statistics
+    "UsageStatisticsWorker",
+    "UsageSummary",
+    "get_usage_worker",
     # Stockout Prediction
     "StockoutPredictor",
     "StockoutPrediction",
     "StockoutAlert",
     "get_stockout_predictor",
+    # Anomaly Detection
+    "StreamingAnomalyDetector",
+    "get_anomaly_detector",
+    # Demand Forecasting
+    "DemandForecaster",
+    "DemandForecastResult",
+    "get_demand_forecaster",
+    # Lead Times
+    "LeadTimeQuantiles",
+    "LeadTimeStatistics",
+    "get_lead_time_stats",
+    # Reorder Optimization
+    "ReorderOptimizer",
+    "ReorderRecommendation",
+    "get_reorder_optimizer",
+    # Waste Image Inference
+    "WasteInferenceService",
+    "get_waste_inference",
+    # Dashboard Snapshots
+    "DashboardRefresher",
+    "DashboardSnapshot",
+    "get_dashboard_refresher",
 ]
@@ -0,0 +1,246 @@
+"""
+PROVENIQ Ops - Streaming Anomaly Detection
+
+Keeps running statistics per (entity_type, entity_id) so each observation
+is scored and folded in with O(1) work:
+- Welford count/mean/M2 for the long-run baseline
+- Optional EWMA mean/variance for baselines that should follow drift
+
+Callers send only the new observation; no history is shipped or re-scanned.
+Scoring is the same z-score rule as the MLInterface fallback.
+"""
+
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+import math
+import time
+
+from pydantic import BaseModel
+
+from .interfaces import AnomalyResult
+
+
+# Deviation (in standard deviations) above which an observation is anomalous
+ANOMALY_THRESHOLD = 2.0
+
+# Deviation that maps to anomaly_score 1
+SCORE_SATURATION = 4.0
+
+StateKey = Tuple[str, UUID]
+
+
+# ============================================
+# Running Statistics
+# ============================================
+
+class RunningStats:
+    """
+    Welford accumulator with an optional exponentially weighted twin.
+    
+    Slotted to keep one entry per entity small.
+    """
+    
+    __slots__ = ("count", "mean", "m2", "ewma", "ewvar")
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.ewma = 0.0
+        self.ewvar = 0.0
+    
+    @classmethod
+    def from_values(cls, values: Iterable[float], alpha: Optional[float] = None) -> "RunningStats":
+        """Accumulate a history in one pass"""
+        stats = cls()
+        for value in values:
+            stats.update(value, alpha)
+        return stats
+    
+    def update(self, value: float, alpha: Optional[float] = None) -> None:
+        """Fold in one observation"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        
+        if alpha is None:
+            return
+        if self.count == 1:
+            self.ewma = value
+            self.ewvar = 0.0
+        else:
+            # West's incremental form of the exponentially weighted variance
+            diff = value - self.ewma
+            increment = alpha * diff
+            self.ewma += increment
+            self.ewvar = (1 - alpha) * (self.ewvar + diff * increment)
+    
+    @property
+    def variance(self) -> float:
+        """Population variance"""
+        return self.m2 / self.count if self.count else 0.0
+    
+    def baseline(self, use_ewma: bool = False) -> Tuple[float, float]:
+        """(center, standard deviation); a flat history counts as std 1"""
+        if use_ewma:
+            center, variance = self.ewma, self.ewvar
+        else:
+            center, variance = self.mean, self.variance
+        return center, math.sqrt(variance) if variance > 0 else 1.0
+
+
+def score_observation(
+    stats: RunningStats,
+    observed_value: Any,
+    numeric_observed: float,
+    use_ewma: bool = False,
+    model_used: str = "fallback_zscore",
+) -> AnomalyResult:
+    """Z-score an observation against accumulated statistics"""
+    center, std = stats.baseline(use_ewma)
+    deviation = abs(numeric_observed - center) / std
+    
+    is_anomaly = deviation > ANOMALY_THRESHOLD
+    anomaly_type = None
+    if is_anomaly:
+        anomaly_type = "high_outlier" if numeric_observed > center else "low_outlier"
+    
+    return AnomalyResult(
+        is_anomaly=is_anomaly,
+        anomaly_score=min(Decimal(str(deviation / SCORE_SATURATION)), Decimal("1")),
+        anomaly_type=anomaly_type,
+        baseline_value=center,
+        observed_value=observed_value,
+        deviation_factor=Decimal(str(round(deviation, 2))),
+        model_used=model_used,
+    )
+
+
+# ============================================
+# Data Models
+# ============================================
+
+class Observation(BaseModel):
+    """One value to score in a batch"""
+    entity_type: str
+    entity_id: UUID
+    value: Any
+
+
+# ============================================
+# Detector
+# ============================================
+
+class StreamingAnomalyDetector:
+    """
+    Scores observations against per-entity running statistics.
+    
+    Each observation is scored against the state *before* it and then
+    folded in, so a batch gives the same results as sequential calls.
+    """
+    
+    def __init__(self, alpha: Optional[float] = None, min_observations: int = 1):
+        """
+        Args:
+            alpha: EWMA smoothing factor; when set, scoring uses the EWMA
+                baseline instead of the all-time mean
+            min_observations: History needed before anything is flagged
+        """
+        if alpha is not None and not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.min_observations = max(1, min_observations)
+        self._states: Dict[StateKey, RunningStats] = {}
+    
+    # ---------- Scoring ----------
+    
+    def observe(
+        self,
+        entity_type: str,
+        entity_id: UUID,
+        observed_value: Any,
+        update: bool = True,
+    ) -> AnomalyResult:
+        """Score an observation, then add it to the entity's baseline"""
+        started = time.perf_counter()
+        
+        try:
+            numeric_observed = float(observed_value)
+        except (ValueError, TypeError):
+            return AnomalyResult(
+                is_anomaly=False,
+                anomaly_score=Decimal("0"),
+                observed_value=observed_value,
+                model_used="fallback_non_numeric",
+            )
+        
+        key = (entity_type, entity_id)
+        stats = self._states.get(key)
+        
+        if stats is None or stats.count < self.min_observations:
+            result = AnomalyResult(
+                is_anomaly=False,
+                anomaly_score=Decimal("0"),
+                observed_value=observed_value,
+                model_used="fallback_no_history",
+            )
+        else:
+            result = score_observation(
+                stats,
+                observed_value,
+                numeric_observed,
+                use_ewma=self.alpha is not None,
+                model_used="streaming_ewma" if self.alpha is not None else "streaming_zscore",
+            )
+        
+        if update:
+            if stats is None:
+                stats = self._states[key] = RunningStats()
+            stats.update(numeric_observed, self.alpha)
+        
+        result.detection_time_ms = int((time.perf_counter() - started) * 1000)
+        return result
+    
+    def observe_batch(self, observations: Iterable[Observation], update: bool = True) -> List[AnomalyResult]:
+        """Score many observations in one call, in order"""
+        return [
+            self.observe(o.entity_type, o.entity_id, o.value, update=update)
+            for o in observations
+        ]
+    
+    # ---------- State ----------
+    
+    def seed(self, entity_type: str, entity_id: UUID, values: Iterable[Any]) -> None:
+        """Warm an entity's baseline from existing history (non-numeric values skipped)"""
+        stats = self._states.setdefault((entity_type, entity_id), RunningStats())
+        for value in values:
+            try:
+                stats.update(float(value), self.alpha)
+            except (ValueError, TypeError):
+                continue
+    
+    def get_state(self, entity_type: str, entity_id: UUID) -> Optional[RunningStats]:
+        return self._states.get((entity_type, entity_id))
+    
+    def reset(self, entity_type: str, entity_id: UUID) -> None:
+        self._states.pop((entity_type, entity_id), None)
+    
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+# ============================================
+# Singleton Instance
+# ============================================
+
+_detector_instance: Optional[StreamingAnomalyDetector] = None
+
+
+def get_anomaly_detector() -> StreamingAnomalyDetector:
+    """Get anomaly detector instance"""
+    global _detector_instance
+    if _detector_instance is None:
+        _detector_instance = StreamingAnomalyDetector()
+    return _detector_instance
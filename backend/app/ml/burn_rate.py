@@ -7,9 +7,14 @@ Uses time-series analysis for accurate consumption tracking.
 This is P0 ML - the foundation for all predictive features.
 """
 
-from datetime import datetime, timedelta
+from array import array
+from bisect import bisect_left
+from datetime import datetime, time, timedelta, timezone
 from decimal import Decimal
-from typing import Optional, List, Dict, Any
+from itertools import groupby
+from math import isqrt
+from operator import itemgetter
+from typing import Optional, List, Dict, Any, AsyncIterator, Sequence, Tuple
 from uuid import UUID
 import logging
 
@@ -20,6 +25,93 @@ from sqlalchemy.ext.asyncio import AsyncSession
 logger = logging.getLogger(__name__)
 
 
+# ============================================
+# Fixed-Point Arithmetic
+# ============================================
+# Quantities never pass through floats (see core/types.py). Rates and the
+# variance coefficient are computed as integers scaled by RATE_SCALE, which
+# matches the Numeric(12, 4) columns in usage_statistics.
+
+RATE_PLACES = 4
+RATE_SCALE = 10 ** RATE_PLACES
+
+# Rows fetched per round trip when streaming snapshots in bulk
+BULK_FETCH_SIZE = 10_000
+
+
+def as_utc(moment: datetime) -> datetime:
+    """
+    Aware UTC datetime for comparing with scanned_at (timestamptz).
+    
+    Naive values are taken to be UTC already, as datetime.utcnow() gives.
+    """
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def window_start(as_of: datetime, days: int) -> datetime:
+    """
+    Midnight starting a window of `days` whole days that ends on as_of's day.
+    
+    Windows are calendar days (UTC), so usage_statistics' daily buckets
+    cover exactly the snapshots the raw path reads.
+    """
+    as_of = as_utc(as_of)
+    return datetime.combine(as_of.date() - timedelta(days=days - 1), time.min, tzinfo=timezone.utc)
+
+
+def _div_round(numerator: int, denominator: int) -> int:
+    """Non-negative integer division, rounded half up"""
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def _to_decimal(scaled: int, places: int = RATE_PLACES) -> Decimal:
+    """Fixed-point int -> Decimal with exactly `places` decimal places"""
+    return Decimal(scaled).scaleb(-places)
+
+
+def rate_from_sums(total: int, count: int) -> int:
+    """Average per observation as a RATE_SCALE fixed-point int"""
+    if count <= 0:
+        return 0
+    return _div_round(total * RATE_SCALE, count)
+
+
+def variance_from_sums(count: int, total: int, squares: int) -> Decimal:
+    """
+    Coefficient of variation (std/mean) from count, sum and sum of squares.
+    
+        cv = sqrt(n*Q - S^2) / S
+    
+    evaluated in integers and rounded half up to RATE_PLACES.
+    """
+    if count < 2 or total == 0:
+        return Decimal("0")
+    
+    spread = count * squares - total * total
+    
+    # floor(2 * cv * RATE_SCALE), then round half up
+    twice_scaled = isqrt(4 * spread * RATE_SCALE * RATE_SCALE // (total * total))
+    return _to_decimal((twice_scaled + 1) // 2)
+
+
+def trend_from_sums(first_total: int, first_count: int, second_total: int, second_count: int) -> str:
+    """
+    Compare the recent half's average against the older half's, with a 10%
+    threshold. Cross-multiplied to stay in integers; an empty half is stable.
+    """
+    second = 10 * second_total * first_count
+    first = first_total * second_count
+    
+    if second > 11 * first:
+        return "increasing"
+    elif second < 9 * first:
+        return "decreasing"
+    else:
+        return "stable"
+
+
 # ============================================
 # Data Models
 # ============================================
@@ -48,7 +140,7 @@ class BurnRateResult(BaseModel):
     confidence: Decimal = Decimal("0.5")
     
     # Timestamps
-    calculated_at: datetime = Field(default_factory=datetime.utcnow)
+    calculated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     last_snapshot_at: Optional[datetime] = None
 
 
@@ -62,6 +154,43 @@ class DailyConsumption(BaseModel):
     net_change: int = 0
 
 
+class SnapshotSeries:
+    """
+    Time-ordered snapshot columns for one product.
+    
+    Holds only what burn rates need (scan time and quantity), so a single
+    90-day fetch can be sliced into the 30- and 7-day windows in memory.
+    """
+    
+    __slots__ = ("timestamps", "quantities")
+    
+    def __init__(
+        self,
+        timestamps: Optional[List[datetime]] = None,
+        quantities: Optional[array] = None,
+    ):
+        self.timestamps: List[datetime] = timestamps if timestamps is not None else []
+        self.quantities: array = quantities if quantities is not None else array("q")
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    def append(self, scanned_at: datetime, quantity: int) -> None:
+        self.timestamps.append(scanned_at)
+        self.quantities.append(quantity)
+    
+    def extend(self, timestamps: Sequence[datetime], quantities: Sequence[int]) -> None:
+        self.timestamps.extend(timestamps)
+        self.quantities.extend(quantities)
+    
+    def start_index(self, start: datetime) -> int:
+        """Index of the first snapshot scanned at or after `start`"""
+        if self.timestamps and self.timestamps[0].tzinfo is None:
+            # Naive series (fixtures, scripts) are taken to be UTC
+            start = as_utc(start).replace(tzinfo=None)
+        return bisect_left(self.timestamps, start)
+
+
 # ============================================
 # Burn Rate Calculator
 # ============================================
@@ -71,15 +200,21 @@ class BurnRateCalculator:
     Calculates burn rates from inventory snapshot history.
     
     Algorithm:
-    1. Fetch snapshots for product over time windows (7d, 30d, 90d)
-    2. Calculate daily deltas (accounting for receiving)
+    1. Fetch snapshots for the 90d window once; slice 30d/7d in memory
+    2. Calculate deltas between consecutive snapshots (accounting for receiving)
     3. Compute average burn rate per window
     4. Calculate variance for confidence scoring
     5. Detect trend (increasing/decreasing/stable)
+    
+    A window of w days covers the snapshot intervals that start on the last
+    w calendar days (UTC) up to as_of; usage_statistics materializes the
+    same definition (see app/ml/usage_stats.py).
     """
     
-    def __init__(self, db: Optional[AsyncSession] = None):
+    def __init__(self, db: Optional[AsyncSession] = None, use_materialized: bool = True):
         self.db = db
+        # Read usage_statistics when it is current; see app/ml/usage_stats.py
+        self.use_materialized = use_materialized
     
     async def calculate_burn_rate(
         self,
@@ -96,90 +231,214 @@ class BurnRateCalculator:
         Returns:
             BurnRateResult with burn rates and confidence
         """
-        if as_of is None:
-            as_of = datetime.utcnow()
+        as_of = as_utc(as_of) if as_of is not None else datetime.now(timezone.utc)
+        
+        materialized = await self._get_materialized([product_id], as_of)
+        if product_id in materialized:
+            return self._burn_rate_from_summary(materialized[product_id])
+        
+        # Fetch the widest window once; narrower windows are slices of it
+        series = await self._get_snapshot_series(product_id, as_of, days=90)
         
-        # Get snapshots for each window
-        snapshots_7d = await self._get_snapshots(product_id, as_of, days=7)
-        snapshots_30d = await self._get_snapshots(product_id, as_of, days=30)
-        snapshots_90d = await self._get_snapshots(product_id, as_of, days=90)
+        return self._burn_rate_from_series(product_id, series, as_of)
+    
+    async def calculate_all_burn_rates(
+        self,
+        product_ids: Optional[List[UUID]] = None,
+        as_of: Optional[datetime] = None,
+        bulk: bool = True,
+    ) -> List[BurnRateResult]:
+        """
+        Calculate burn rates for multiple products.
         
-        # Calculate daily consumption for each window
-        consumption_7d = self._calculate_daily_consumption(snapshots_7d)
-        consumption_30d = self._calculate_daily_consumption(snapshots_30d)
-        consumption_90d = self._calculate_daily_consumption(snapshots_90d)
+        By default uses the bulk path (one snapshot scan for all products);
+        bulk=False falls back to one query per product.
+        """
+        if bulk:
+            return await self.calculate_burn_rates_bulk(product_ids, as_of)
         
-        # Calculate burn rates
-        burn_7d = self._average_burn_rate(consumption_7d)
-        burn_30d = self._average_burn_rate(consumption_30d)
-        burn_90d = self._average_burn_rate(consumption_90d)
+        as_of = as_utc(as_of) if as_of is not None else datetime.now(timezone.utc)
         
-        # Weighted average: 50% 7d, 30% 30d, 20% 90d
-        weighted = (
-            burn_7d * Decimal("0.5") +
-            burn_30d * Decimal("0.3") +
-            burn_90d * Decimal("0.2")
+        if product_ids is None:
+            # Get all products with snapshots
+            product_ids = await self._get_products_with_snapshots()
+        
+        results = []
+        for product_id in product_ids:
+            result = await self.calculate_burn_rate(product_id, as_of)
+            results.append(result)
+        
+        return results
+    
+    async def calculate_burn_rates_bulk(
+        self,
+        product_ids: Optional[List[UUID]] = None,
+        as_of: Optional[datetime] = None,
+    ) -> List[BurnRateResult]:
+        """
+        Calculate burn rates for many products from a single snapshot scan.
+        
+        Snapshots for the 90d window are streamed ordered by
+        (product_id, scanned_at) and partitioned in one pass; each partition
+        goes through the same computation as calculate_burn_rate, so results
+        are identical to the per-product path.
+        
+        Args:
+            product_ids: Products to analyze (default: all with snapshots)
+            as_of: Calculate as of this date (default: now)
+        
+        Returns:
+            One BurnRateResult per product, in product_ids order
+        """
+        as_of = as_utc(as_of) if as_of is not None else datetime.now(timezone.utc)
+        
+        # Only filter the scan when the caller named products
+        filter_ids = product_ids
+        if product_ids is None:
+            product_ids = await self._get_products_with_snapshots()
+        
+        # Current materialized statistics first; scan snapshots for the rest
+        computed: Dict[UUID, BurnRateResult] = {
+            product_id: self._burn_rate_from_summary(summary)
+            for product_id, summary in (await self._get_materialized(product_ids, as_of)).items()
+        }
+        if computed:
+            filter_ids = [product_id for product_id in product_ids if product_id not in computed]
+        
+        pending = product_ids if filter_ids is None else filter_ids
+        if pending:
+            async for product_id, series in self._iter_snapshot_series(filter_ids, pending, as_of, days=90):
+                computed[product_id] = self._burn_rate_from_series(product_id, series, as_of)
+        
+        # Products without snapshots in the window get the empty-series result
+        results = []
+        for product_id in product_ids:
+            result = computed.get(product_id)
+            if result is None:
+                result = self._burn_rate_from_series(product_id, SnapshotSeries(), as_of)
+            results.append(result)
+        
+        logger.info(f"Bulk burn rates: {len(results)} products, {len(computed)} with usage data")
+        return results
+    
+    async def _get_materialized(
+        self,
+        product_ids: List[UUID],
+        as_of: datetime,
+    ) -> Dict[UUID, Any]:
+        """Current usage_statistics summaries, keyed by product"""
+        if not self.use_materialized or not product_ids:
+            return {}
+        
+        from app.ml.usage_stats import get_usage_worker
+        
+        try:
+            return await get_usage_worker().get_summaries(product_ids, as_of, db=self.db)
+        except Exception as e:
+            # Materialization is an optimization; raw snapshots remain the source of truth
+            logger.warning(f"Usage statistics unavailable, computing from snapshots: {e}")
+            return {}
+    
+    def _burn_rate_from_summary(self, summary: Any) -> BurnRateResult:
+        """BurnRateResult from a materialized UsageSummary"""
+        recent = (
+            summary.last_observed_at is not None
+            and as_utc(summary.last_observed_at).date() > summary.as_of_day - timedelta(days=7)
+        )
+        weighted = _div_round(
+            5 * int(summary.burn_rate_7d.scaleb(RATE_PLACES)) +
+            3 * int(summary.burn_rate_30d.scaleb(RATE_PLACES)) +
+            2 * int(summary.burn_rate_90d.scaleb(RATE_PLACES)),
+            10,
+        )
+        
+        return BurnRateResult(
+            product_id=summary.product_id,
+            burn_rate_7d=summary.burn_rate_7d,
+            burn_rate_30d=summary.burn_rate_30d,
+            burn_rate_90d=summary.burn_rate_90d,
+            weighted_burn_rate=_to_decimal(weighted),
+            variance_coefficient=summary.variance_coefficient,
+            trend=summary.trend,
+            data_points_7d=summary.data_points_7d,
+            data_points_30d=summary.data_points_30d,
+            data_points_90d=summary.data_points_90d,
+            confidence=self._calculate_confidence(
+                summary.data_points_7d,
+                summary.data_points_30d,
+                summary.data_points_90d,
+                summary.variance_coefficient,
+            ),
+            # As on the raw path: only when a snapshot falls in the 7d window
+            last_snapshot_at=summary.last_observed_at if recent else None,
         )
+    
+    def _burn_rate_from_series(
+        self,
+        product_id: UUID,
+        series: SnapshotSeries,
+        as_of: datetime,
+    ) -> BurnRateResult:
+        """Compute all burn rate metrics from a product's 90d snapshot series"""
+        # consumed[i] is the consumption between snapshot i and i+1, so a
+        # window starting at snapshot k covers consumed[k:]
+        consumed_90d = memoryview(self._calculate_daily_consumption(series.quantities))
+        start_30d = min(series.start_index(window_start(as_of, 30)), len(consumed_90d))
+        start_15d = min(series.start_index(window_start(as_of, 15)), len(consumed_90d))
+        consumed_30d = consumed_90d[start_30d:]
+        consumed_7d = consumed_90d[min(series.start_index(window_start(as_of, 7)), len(consumed_90d)):]
+        
+        # Calculate burn rates (fixed-point)
+        burn_7d = self._scaled_burn_rate(consumed_7d)
+        burn_30d = self._scaled_burn_rate(consumed_30d)
+        burn_90d = self._scaled_burn_rate(consumed_90d)
+        
+        # Weighted average: 50% 7d, 30% 30d, 20% 90d
+        weighted = _div_round(5 * burn_7d + 3 * burn_30d + 2 * burn_90d, 10)
         
         # Calculate variance coefficient
-        all_burns = [c.consumed for c in consumption_30d if c.consumed > 0]
+        all_burns = [c for c in consumed_30d if c > 0]
         variance_coef = self._calculate_variance_coefficient(all_burns)
         
-        # Detect trend
-        trend = self._detect_trend(consumption_30d)
+        # Detect trend: older 15 days against the recent 15
+        trend = self._detect_trend(consumed_30d, midpoint=start_15d - start_30d)
         
         # Calculate confidence based on data quality
         confidence = self._calculate_confidence(
-            len(consumption_7d),
-            len(consumption_30d),
-            len(consumption_90d),
+            len(consumed_7d),
+            len(consumed_30d),
+            len(consumed_90d),
             variance_coef,
         )
         
-        # Get last snapshot timestamp
+        # Get last snapshot timestamp (series is time-ordered)
         last_snapshot_at = None
-        if snapshots_7d:
-            last_snapshot_at = max(s["scanned_at"] for s in snapshots_7d)
+        if series.start_index(window_start(as_of, 7)) < len(series):
+            last_snapshot_at = series.timestamps[-1]
         
         return BurnRateResult(
             product_id=product_id,
-            burn_rate_7d=burn_7d,
-            burn_rate_30d=burn_30d,
-            burn_rate_90d=burn_90d,
-            weighted_burn_rate=weighted,
+            burn_rate_7d=_to_decimal(burn_7d),
+            burn_rate_30d=_to_decimal(burn_30d),
+            burn_rate_90d=_to_decimal(burn_90d),
+            weighted_burn_rate=_to_decimal(weighted),
             variance_coefficient=variance_coef,
             trend=trend,
-            data_points_7d=len(consumption_7d),
-            data_points_30d=len(consumption_30d),
-            data_points_90d=len(consumption_90d),
+            data_points_7d=len(consumed_7d),
+            data_points_30d=len(consumed_30d),
+            data_points_90d=len(consumed_90d),
             confidence=confidence,
             last_snapshot_at=last_snapshot_at,
         )
     
-    async def calculate_all_burn_rates(
-        self,
-        product_ids: Optional[List[UUID]] = None,
-    ) -> List[BurnRateResult]:
-        """Calculate burn rates for multiple products"""
-        if product_ids is None:
-            # Get all products with snapshots
-            product_ids = await self._get_products_with_snapshots()
-        
-        results = []
-        for product_id in product_ids:
-            result = await self.calculate_burn_rate(product_id)
-            results.append(result)
-        
-        return results
-    
-    async def _get_snapshots(
+    async def _get_snapshot_series(
         self,
         product_id: UUID,
         as_of: datetime,
         days: int,
-    ) -> List[Dict[str, Any]]:
+    ) -> SnapshotSeries:
         """
-        Fetch snapshots for a product within time window.
+        Fetch (scanned_at, quantity) for a product within time window.
         
         In production, this queries the database.
         Currently uses mock data for testing.
@@ -188,13 +447,13 @@ class BurnRateCalculator:
             # Mock data for testing
             return self._generate_mock_snapshots(product_id, as_of, days)
         
-        # Real database query
+        # Real database query - only the columns burn rates need
         from app.db import InventorySnapshot
         
-        start_date = as_of - timedelta(days=days)
+        start_date = window_start(as_of, days)
         
         query = (
-            select(InventorySnapshot)
+            select(InventorySnapshot.scanned_at, InventorySnapshot.quantity)
             .where(InventorySnapshot.product_id == product_id)
             .where(InventorySnapshot.scanned_at >= start_date)
             .where(InventorySnapshot.scanned_at <= as_of)
@@ -202,152 +461,182 @@ class BurnRateCalculator:
         )
         
         result = await self.db.execute(query)
-        snapshots = result.scalars().all()
-        
-        return [
-            {
-                "id": s.id,
-                "product_id": s.product_id,
-                "quantity": s.quantity,
-                "scanned_at": s.scanned_at,
-                "scan_method": s.scan_method,
-            }
-            for s in snapshots
-        ]
+        
+        series = SnapshotSeries()
+        for scanned_at, quantity in result:
+            series.append(scanned_at, quantity)
+        
+        return series
+    
+    async def _iter_snapshot_series(
+        self,
+        filter_ids: Optional[List[UUID]],
+        product_ids: List[UUID],
+        as_of: datetime,
+        days: int,
+    ) -> AsyncIterator[Tuple[UUID, SnapshotSeries]]:
+        """
+        Partition a (product_id, scanned_at)-ordered snapshot stream into
+        one SnapshotSeries per product, in a single pass.
+        """
+        current_id: Optional[UUID] = None
+        series: Optional[SnapshotSeries] = None
+        
+        async for rows in self._stream_snapshot_rows(
+            filter_ids, product_ids, window_start(as_of, days), as_of
+        ):
+            for product_id, group in groupby(rows, key=itemgetter(0)):
+                # A product's rows may continue from the previous batch
+                if product_id != current_id:
+                    if series is not None:
+                        yield current_id, series
+                    current_id, series = product_id, SnapshotSeries()
+                _, timestamps, quantities = zip(*group)
+                series.extend(timestamps, quantities)
+        
+        if series is not None:
+            yield current_id, series
+    
+    async def _stream_snapshot_rows(
+        self,
+        filter_ids: Optional[List[UUID]],
+        product_ids: List[UUID],
+        start_date: datetime,
+        end_date: datetime,
+    ) -> AsyncIterator[Sequence[Tuple[UUID, datetime, int]]]:
+        """
+        Stream batches of (product_id, scanned_at, quantity), ordered by
+        product then time.
+        
+        One query for all products; rows arrive in BULK_FETCH_SIZE batches so
+        memory stays flat regardless of store size.
+        """
+        if self.db is None:
+            # Mock data for testing
+            days = (end_date.date() - start_date.date()).days + 1
+            for product_id in product_ids:
+                series = self._generate_mock_snapshots(product_id, end_date, days)
+                yield [
+                    (product_id, scanned_at, quantity)
+                    for scanned_at, quantity in zip(series.timestamps, series.quantities)
+                ]
+            return
+        
+        from app.db import InventorySnapshot
+        
+        query = (
+            select(
+                InventorySnapshot.product_id,
+                InventorySnapshot.scanned_at,
+                InventorySnapshot.quantity,
+            )
+            .where(InventorySnapshot.scanned_at >= start_date)
+            .where(InventorySnapshot.scanned_at <= end_date)
+            .order_by(InventorySnapshot.product_id, InventorySnapshot.scanned_at)
+            .execution_options(yield_per=BULK_FETCH_SIZE)
+        )
+        if filter_ids is not None:
+            query = query.where(InventorySnapshot.product_id.in_(filter_ids))
+        
+        result = await self.db.stream(query)
+        async for rows in result.partitions(BULK_FETCH_SIZE):
+            yield rows
     
     def _generate_mock_snapshots(
         self,
         product_id: UUID,
         as_of: datetime,
         days: int,
-    ) -> List[Dict[str, Any]]:
-        """Generate mock snapshot data for testing"""
+    ) -> SnapshotSeries:
+        """Generate mock snapshot data for testing (seeded per product)"""
         import random
-        from uuid import uuid4
         
-        snapshots = []
-        current_qty = random.randint(50, 200)
+        rng = random.Random(product_id.int)
+        series = SnapshotSeries()
+        current_qty = rng.randint(50, 200)
+        start = window_start(as_of, days)
         
         for day in range(days, 0, -1):
             date = as_of - timedelta(days=day)
             
             # Simulate daily consumption (5-15 units)
-            consumed = random.randint(5, 15)
+            consumed = rng.randint(5, 15)
             
             # Occasional receiving (every 5-7 days)
             received = 0
-            if day % random.randint(5, 7) == 0:
-                received = random.randint(30, 60)
+            if day % rng.randint(5, 7) == 0:
+                received = rng.randint(30, 60)
             
             current_qty = max(0, current_qty - consumed + received)
             
-            snapshots.append({
-                "id": uuid4(),
-                "product_id": product_id,
-                "quantity": current_qty,
-                "scanned_at": date,
-                "scan_method": "barcode",
-            })
+            if as_utc(date) >= start:
+                series.append(date, current_qty)
         
-        return snapshots
+        return series
     
     def _calculate_daily_consumption(
         self,
-        snapshots: List[Dict[str, Any]],
-    ) -> List[DailyConsumption]:
-        """Calculate daily consumption from sequential snapshots"""
-        if len(snapshots) < 2:
-            return []
+        quantities: Sequence[int],
+    ) -> array:
+        """
+        Calculate consumption between sequential snapshots.
         
-        consumption = []
+        Returns an int array where element i is the units consumed between
+        snapshot i and i+1 (net decreases only; increases are receiving).
+        """
+        consumed = array("q")
         
-        for i in range(1, len(snapshots)):
-            prev = snapshots[i - 1]
-            curr = snapshots[i]
-            
-            starting = prev["quantity"]
-            ending = curr["quantity"]
-            
-            # Net change (negative = consumption, positive = receiving)
-            net_change = ending - starting
-            
-            # Estimate consumed vs received
-            if net_change < 0:
-                consumed = abs(net_change)
-                received = 0
-            else:
-                consumed = 0
-                received = net_change
-            
-            consumption.append(DailyConsumption(
-                date=curr["scanned_at"],
-                starting_qty=starting,
-                ending_qty=ending,
-                consumed=consumed,
-                received=received,
-                net_change=net_change,
-            ))
+        previous = None
+        for quantity in quantities:
+            if previous is not None:
+                consumed.append(previous - quantity if quantity < previous else 0)
+            previous = quantity
         
-        return consumption
+        return consumed
+    
+    def _scaled_burn_rate(
+        self,
+        consumed: Sequence[int],
+    ) -> int:
+        """Average daily burn rate as a RATE_SCALE fixed-point int"""
+        return rate_from_sums(sum(consumed), len(consumed))
     
     def _average_burn_rate(
         self,
-        consumption: List[DailyConsumption],
+        consumed: Sequence[int],
     ) -> Decimal:
         """Calculate average daily burn rate"""
-        if not consumption:
-            return Decimal("0")
-        
-        total_consumed = sum(c.consumed for c in consumption)
-        days = len(consumption)
-        
-        return Decimal(str(total_consumed / days)) if days > 0 else Decimal("0")
+        return _to_decimal(self._scaled_burn_rate(consumed))
     
     def _calculate_variance_coefficient(
         self,
-        values: List[int],
+        values: Sequence[int],
     ) -> Decimal:
         """Calculate coefficient of variation (std/mean)"""
-        if not values or len(values) < 2:
-            return Decimal("0")
-        
-        mean = sum(values) / len(values)
-        if mean == 0:
-            return Decimal("0")
-        
-        variance = sum((x - mean) ** 2 for x in values) / len(values)
-        std = variance ** 0.5
-        
-        cv = std / mean
-        return Decimal(str(round(cv, 4)))
+        return variance_from_sums(len(values), sum(values), sum(v * v for v in values))
     
     def _detect_trend(
         self,
-        consumption: List[DailyConsumption],
+        consumed: Sequence[int],
+        midpoint: Optional[int] = None,
     ) -> str:
         """
         Detect consumption trend.
         
-        Uses simple linear regression slope.
+        Compares the average of the recent part of the window (from
+        `midpoint`, default half the points) against the older part, with a
+        10% threshold.
         """
-        if len(consumption) < 7:
+        if len(consumed) < 7:
             return "stable"
         
         # Get recent vs older consumption
-        midpoint = len(consumption) // 2
-        first_half = [c.consumed for c in consumption[:midpoint]]
-        second_half = [c.consumed for c in consumption[midpoint:]]
-        
-        avg_first = sum(first_half) / len(first_half) if first_half else 0
-        avg_second = sum(second_half) / len(second_half) if second_half else 0
-        
-        # 10% threshold for trend detection
-        if avg_second > avg_first * 1.1:
-            return "increasing"
-        elif avg_second < avg_first * 0.9:
-            return "decreasing"
-        else:
-            return "stable"
+        if midpoint is None:
+            midpoint = len(consumed) // 2
+        return trend_from_sums(
+            sum(consumed[:midpoint]), midpoint,
+            sum(consumed[midpoint:]), len(consumed) - midpoint,
+        )
     
     def _calculate_confidence(
         self,
@@ -362,23 +651,25 @@ class BurnRateCalculator:
         Factors:
         - More data points = higher confidence
         - Lower variance = higher confidence
+        
+        Computed in RATE_SCALE units and returned with two decimal places.
         """
-        # Base confidence from data availability
-        data_score = min(1.0, (points_7d * 0.1 + points_30d * 0.02 + points_90d * 0.005))
+        # Base confidence from data availability: 0.1 / 0.02 / 0.005 per point
+        data_score = min(RATE_SCALE, points_7d * 1000 + points_30d * 200 + points_90d * 50)
         
-        # Penalize high variance
-        variance_penalty = min(0.3, float(variance_coef) * 0.3)
+        # Penalize high variance: 0.3 * cv, capped at 0.3
+        scaled_cv = int(variance_coef.scaleb(RATE_PLACES))
+        variance_penalty = min(3000, _div_round(3 * scaled_cv, 10))
         
-        confidence = max(0.2, data_score - variance_penalty)
+        confidence = max(2000, data_score - variance_penalty)
         
-        return Decimal(str(round(confidence, 2)))
+        return _to_decimal(_div_round(confidence, 100), places=2)
     
     async def _get_products_with_snapshots(self) -> List[UUID]:
         """Get all products that have snapshot data"""
         if self.db is None:
-            # Mock: return some UUIDs
-            from uuid import uuid4
-            return [uuid4() for _ in range(5)]
+            # Mock: return some stable UUIDs
+            return [UUID(int=i) for i in range(1, 6)]
         
         from app.db import InventorySnapshot
         
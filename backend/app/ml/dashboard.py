@@ -0,0 +1,308 @@
+"""
+PROVENIQ Ops - Prediction Dashboard Snapshots
+
+Precomputes the prediction dashboard per org so requests never run
+predictions inline:
+- Refreshed on a schedule, and (debounced) when inventory changes
+- Each refresh with new content bumps the snapshot version
+- Served with an ETag derived from the content; unchanged dashboards
+  answer If-None-Match with 304
+- Snapshots are kept for the max_orgs most recently viewed orgs
+
+Dashboard cost therefore depends on refresh frequency, not on catalog size
+or the number of viewers.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from hashlib import sha256
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from uuid import UUID, uuid5, NAMESPACE_URL
+import asyncio
+import json
+import logging
+import time
+
+from pydantic import BaseModel, Field
+
+from app.core.metrics import metrics
+
+from .stockout import StockoutPredictor, get_stockout_predictor
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_ORG_ID = UUID("00000000-0000-0000-0000-000000000001")
+
+REFRESH_DURATION = metrics.histogram(
+    "dashboard_refresh_duration_seconds",
+    "Time to recompute a prediction dashboard snapshot",
+    ("trigger",),
+)
+
+# Returns the products for an org: dicts with id, name, current_quantity, par_level
+CatalogLoader = Callable[[UUID], Awaitable[List[Dict[str, Any]]]]
+
+
+# ============================================
+# Data Models
+# ============================================
+
+class DashboardSnapshot(BaseModel):
+    """A computed dashboard for one org"""
+    org_id: UUID
+    version: int
+    etag: str
+    computed_at: datetime = Field(default_factory=datetime.utcnow)
+    duration_ms: int = 0
+    data: Dict[str, Any]
+
+
+# ============================================
+# Catalog
+# ============================================
+
+_DEMO_PRODUCTS = [
+    ("Chicken Breast", 15, 20),
+    ("Ground Beef", 8, 15),
+    ("Salmon Fillet", 3, 10),
+    ("Yellow Onions", 45, 30),
+    ("Romaine Lettuce", 12, 25),
+]
+
+
+async def demo_catalog(org_id: UUID) -> List[Dict[str, Any]]:
+    """Mock product data for demo; ids are stable per org and product name"""
+    return [
+        {
+            "id": uuid5(NAMESPACE_URL, f"{org_id}/{name}"),
+            "name": name,
+            "current_quantity": quantity,
+            "par_level": par_level,
+        }
+        for name, quantity, par_level in _DEMO_PRODUCTS
+    ]
+
+
+# ============================================
+# Refresher
+# ============================================
+
+class DashboardRefresher:
+    """Keeps a versioned dashboard snapshot per org"""
+    
+    def __init__(
+        self,
+        predictor: Optional[StockoutPredictor] = None,
+        catalog_loader: CatalogLoader = demo_catalog,
+        interval_seconds: float = 300,
+        debounce_seconds: float = 5,
+        alert_threshold_hours: int = 72,
+        max_orgs: int = 1000,
+    ):
+        self.predictor = predictor
+        self.catalog_loader = catalog_loader
+        self.interval_seconds = interval_seconds
+        self.debounce_seconds = debounce_seconds
+        self.alert_threshold_hours = alert_threshold_hours
+        self.max_orgs = max_orgs
+        
+        self._snapshots: Dict[UUID, DashboardSnapshot] = {}
+        # Orgs kept current, least recently viewed first
+        self._orgs: "OrderedDict[UUID, None]" = OrderedDict.fromkeys([DEFAULT_ORG_ID])
+        self._locks: Dict[UUID, asyncio.Lock] = {}
+        # Completed refreshes per org, for single-flight
+        self._generations: Dict[UUID, int] = {}
+        self._dirty: Set[UUID] = set()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    # ---------- Reads ----------
+    
+    def get(self, org_id: UUID) -> Optional[DashboardSnapshot]:
+        """Current snapshot for an org, if one has been computed"""
+        return self._snapshots.get(org_id)
+    
+    async def get_or_refresh(self, org_id: UUID) -> DashboardSnapshot:
+        """Current snapshot, computing the first one on demand"""
+        self._track(org_id)
+        snapshot = self._snapshots.get(org_id)
+        if snapshot is None:
+            snapshot = await self.refresh(org_id, trigger="initial")
+        return snapshot
+    
+    def _track(self, org_id: UUID) -> None:
+        """Mark an org as viewed, forgetting the least recently viewed past max_orgs"""
+        self._orgs[org_id] = None
+        self._orgs.move_to_end(org_id)
+        while len(self._orgs) > self.max_orgs:
+            evicted, _ = self._orgs.popitem(last=False)
+            self._snapshots.pop(evicted, None)
+            self._locks.pop(evicted, None)
+            self._generations.pop(evicted, None)
+            self._dirty.discard(evicted)
+    
+    # ---------- Refresh ----------
+    
+    async def refresh(self, org_id: UUID, trigger: str = "manual") -> DashboardSnapshot:
+        """Recompute an org's dashboard. Concurrent calls share one computation."""
+        lock = self._locks.setdefault(org_id, asyncio.Lock())
+        generation = self._generations.get(org_id, 0)
+        
+        async with lock:
+            # Another caller finished a refresh while we waited
+            current = self._snapshots.get(org_id)
+            if current is not None and self._generations.get(org_id, 0) != generation:
+                return current
+            
+            started = time.perf_counter()
+            data = await self._compute(org_id)
+            elapsed = time.perf_counter() - started
+            REFRESH_DURATION.observe(elapsed, trigger=trigger)
+            
+            etag = _content_etag(data)
+            if current is not None and current.etag == etag:
+                # Same content: keep version and ETag so clients stay cached
+                snapshot = current.model_copy(update={"computed_at": datetime.utcnow()})
+            else:
+                snapshot = DashboardSnapshot(
+                    org_id=org_id,
+                    version=(current.version + 1) if current else 1,
+                    etag=etag,
+                    duration_ms=int(elapsed * 1000),
+                    data=data,
+                )
+                logger.info(f"Dashboard for org {org_id} refreshed to v{snapshot.version} ({trigger})")
+            
+            # An org forgotten while computing stays forgotten
+            if org_id in self._orgs:
+                self._snapshots[org_id] = snapshot
+                self._generations[org_id] = generation + 1
+            return snapshot
+    
+    async def _compute(self, org_id: UUID) -> Dict[str, Any]:
+        predictor = self.predictor or get_stockout_predictor()
+        products = await self.catalog_loader(org_id)
+        
+        predictions = await predictor.predict_batch(products)
+        alerts = predictor.alerts_from_predictions(predictions, self.alert_threshold_hours)
+        
+        # Count by risk level
+        risk_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
+        for p in predictions:
+            risk_counts[p.risk_level] = risk_counts.get(p.risk_level, 0) + 1
+        
+        # Count by severity
+        alert_counts = {"emergency": 0, "critical": 0, "warning": 0}
+        for a in alerts:
+            alert_counts[a.severity] = alert_counts.get(a.severity, 0) + 1
+        
+        return {
+            "summary": {
+                "total_products": len(predictions),
+                "products_at_risk": len([p for p in predictions if p.risk_level in ["critical", "high"]]),
+                "active_alerts": len(alerts),
+            },
+            "risk_breakdown": risk_counts,
+            "alert_breakdown": alert_counts,
+            "top_risks": [
+                {
+                    "product_name": p.product_name,
+                    "hours_to_stockout": float(p.hours_to_stockout),
+                    "risk_level": p.risk_level,
+                    "action": p.action,
+                }
+                for p in predictions[:5]
+            ],
+        }
+    
+    # ---------- Change Notifications ----------
+    
+    def mark_dirty(self, org_id: Optional[UUID] = None) -> None:
+        """
+        Schedule a refresh after inventory changes (debounced).
+        
+        Without an org, every known org is refreshed. Orgs nobody has
+        viewed are skipped; their first view computes a snapshot.
+        """
+        if org_id is None:
+            self._dirty.update(self._orgs)
+        elif org_id in self._orgs:
+            self._dirty.add(org_id)
+        else:
+            return
+        if self._wake is not None:
+            self._wake.set()
+    
+    async def on_inventory_event(self, event: Any) -> None:
+        """Event bus handler for ops.inventory.updated"""
+        payload = getattr(event, "payload", None) or {}
+        org_id = payload.get("org_id") or payload.get("business_id")
+        self.mark_dirty(UUID(str(org_id)) if org_id else None)
+    
+    # ---------- Lifecycle ----------
+    
+    async def start(self) -> None:
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            logger.info("Dashboard refresher started")
+    
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._wake = None
+        logger.info("Dashboard refresher stopped")
+    
+    async def _run(self) -> None:
+        next_scheduled = time.monotonic()
+        while True:
+            timeout = max(0.0, next_scheduled - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            
+            if time.monotonic() >= next_scheduled:
+                orgs, trigger = list(self._orgs), "schedule"
+                self._dirty.clear()
+                next_scheduled = time.monotonic() + self.interval_seconds
+            else:
+                # Coalesce bursts of inventory changes into one refresh
+                await asyncio.sleep(self.debounce_seconds)
+                orgs, trigger = set(self._dirty), "inventory"
+                self._dirty.clear()
+            self._wake.clear()
+            
+            for org_id in orgs:
+                try:
+                    await self.refresh(org_id, trigger=trigger)
+                except Exception as e:
+                    logger.error(f"Dashboard refresh failed for org {org_id}: {e}")
+
+
+def _content_etag(data: Dict[str, Any]) -> str:
+    """Strong ETag over the canonical JSON of the dashboard content"""
+    body = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return '"' + sha256(body.encode()).hexdigest()[:32] + '"'
+
+
+# ============================================
+# Singleton Instance
+# ============================================
+
+_refresher_instance: Optional[DashboardRefresher] = None
+
+
+def get_dashboard_refresher() -> DashboardRefresher:
+    """Get dashboard refresher instance"""
+    global _refresher_instance
+    if _refresher_instance is None:
+        _refresher_instance = DashboardRefresher()
+    return _refresher_instance
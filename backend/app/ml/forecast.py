@@ -0,0 +1,402 @@
+"""
+PROVENIQ Ops - Seasonal Demand Forecasting
+
+Forecasts daily demand per SKU from ConsumptionEvent history:
+- Linear trend (least squares over the history window)
+- Day-of-week seasonal indices (multiplicative, averaging 1)
+
+All SKUs are fitted together as one (SKUs x days) matrix with NumPy, and
+fitted parameters are cached per org until new consumption events arrive.
+Forecasts feed rebalance, what-if and cost-of-delay as daily_demand.
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+from uuid import UUID
+import logging
+import random
+
+import numpy as np
+from pydantic import BaseModel, Field
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .burn_rate import RATE_PLACES
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_ORG_ID = UUID("00000000-0000-0000-0000-000000000001")
+
+# Eight whole weeks: every weekday is seen equally often
+HISTORY_DAYS = 56
+
+DEFAULT_HORIZON_DAYS = 14
+
+# Trend/seasonality refinement passes in fit_seasonal
+SEASONAL_PASSES = 3
+
+MIN_CONFIDENCE = 0.3
+MAX_CONFIDENCE = 0.95
+
+# ============================================
+# Data Models
+# ============================================
+
+class DemandForecastResult(BaseModel):
+    """Demand forecast for one SKU"""
+    product_id: UUID
+    start_date: date
+    horizon_days: int
+    
+    # Forecast
+    daily_forecast: List[Decimal] = []
+    total_forecast: Decimal = Decimal("0")
+    daily_demand: Decimal = Decimal("0")  # Mean over the horizon
+    
+    # Fitted parameters
+    trend_per_day: Decimal = Decimal("0")
+    seasonal_indices: List[Decimal] = []  # Monday..Sunday
+    
+    # Quality
+    data_points: int = 0  # Days with recorded consumption
+    confidence: Decimal = Decimal("0.3")
+    
+    calculated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class SeasonalFit:
+    """
+    Fitted trend and day-of-week parameters for a set of SKUs.
+    
+    Row i of every array belongs to product_ids[i]. Day t = 0 is
+    start_date; the history covers days 0..days-1.
+    """
+    
+    __slots__ = (
+        "product_ids", "index", "start_date", "days",
+        "intercept", "slope", "seasonal", "data_points", "confidence",
+    )
+    
+    def __init__(
+        self,
+        product_ids: Sequence[UUID],
+        start_date: date,
+        days: int,
+        intercept: np.ndarray,
+        slope: np.ndarray,
+        seasonal: np.ndarray,
+        data_points: np.ndarray,
+        confidence: np.ndarray,
+    ):
+        self.product_ids = list(product_ids)
+        self.index = {pid: i for i, pid in enumerate(self.product_ids)}
+        self.start_date = start_date
+        self.days = days
+        self.intercept = intercept
+        self.slope = slope
+        self.seasonal = seasonal
+        self.data_points = data_points
+        self.confidence = confidence
+    
+    def project(self, horizon_days: int, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """(SKUs x horizon) daily forecast starting the day after the history"""
+        if rows is None:
+            rows = np.arange(len(self.product_ids))
+        t = np.arange(self.days, self.days + horizon_days)
+        trend = self.intercept[rows, None] + self.slope[rows, None] * t
+        dow = (self.start_date.weekday() + t) % 7
+        return np.clip(trend, 0, None) * self.seasonal[rows][:, dow]
+
+
+# ============================================
+# Fitting
+# ============================================
+
+def fit_seasonal(
+    product_ids: Sequence[UUID],
+    demand: np.ndarray,
+    start_date: date,
+) -> SeasonalFit:
+    """
+    Fit trend and day-of-week indices to a (SKUs x days) demand matrix.
+    
+    Vectorized over SKUs: a few matrix products per pass, no per-SKU loop.
+    """
+    demand = np.asarray(demand, dtype=np.float64)
+    n, days = demand.shape
+    t = np.arange(days, dtype=np.float64)
+    
+    mean = demand.mean(axis=1) if days else np.zeros(n)
+    t_centered = t - t.mean()
+    t_ss = t_centered @ t_centered
+    
+    dow = (start_date.weekday() + np.arange(days)) % 7
+    one_hot = np.zeros((days, 7))
+    one_hot[np.arange(days), dow] = 1.0
+    observed = demand @ one_hot
+    
+    # Alternate between the line and the indices: a weekly pattern leaks
+    # into a line fitted on raw demand, so refit it on deseasonalized demand
+    seasonal = np.ones((n, 7))
+    for _ in range(SEASONAL_PASSES):
+        daily_index = seasonal[:, dow]
+        adjusted = np.divide(demand, daily_index, out=np.zeros_like(demand), where=daily_index > 0)
+        slope = adjusted @ t_centered / t_ss if days > 1 else np.zeros(n)
+        intercept = adjusted.mean(axis=1) - slope * t.mean() if days else np.zeros(n)
+        
+        # Seasonal index per weekday: observed / trend on that weekday
+        expected = np.outer(intercept, one_hot.sum(axis=0)) + np.outer(slope, t @ one_hot)
+        seasonal = np.ones((n, 7))
+        np.divide(observed, expected, out=seasonal, where=expected > 0)
+        seasonal = np.clip(seasonal, 0, None)
+        # Normalize so the indices average 1 (a week's total matches the trend)
+        seasonal_mean = seasonal.mean(axis=1, keepdims=True)
+        np.divide(seasonal, seasonal_mean, out=seasonal, where=seasonal_mean > 0)
+    
+    # Confidence from in-sample fit: 1 - RMSE / mean demand
+    fitted = (intercept[:, None] + slope[:, None] * t) * seasonal[:, dow]
+    rmse = np.sqrt(((demand - fitted) ** 2).mean(axis=1)) if days else np.zeros(n)
+    relative_error = np.ones(n)
+    np.divide(rmse, mean, out=relative_error, where=mean > 0)
+    confidence = np.clip(1 - relative_error, MIN_CONFIDENCE, MAX_CONFIDENCE)
+    
+    return SeasonalFit(
+        product_ids=product_ids,
+        start_date=start_date,
+        days=days,
+        intercept=intercept,
+        slope=slope,
+        seasonal=seasonal,
+        data_points=np.count_nonzero(demand, axis=1),
+        confidence=confidence,
+    )
+
+
+def demand_matrix(
+    rows: Sequence[Tuple[UUID, date, Any]],
+    start_date: date,
+    days: int,
+) -> Tuple[List[UUID], np.ndarray]:
+    """Pivot (product_id, day, quantity) rows into a (SKUs x days) matrix"""
+    product_ids = sorted({row[0] for row in rows})
+    index = {pid: i for i, pid in enumerate(product_ids)}
+    
+    matrix = np.zeros((len(product_ids), days))
+    if rows:
+        row_idx = np.fromiter((index[r[0]] for r in rows), dtype=np.intp, count=len(rows))
+        col_idx = np.fromiter(((r[1] - start_date).days for r in rows), dtype=np.intp, count=len(rows))
+        values = np.fromiter((float(r[2]) for r in rows), dtype=np.float64, count=len(rows))
+        inside = (col_idx >= 0) & (col_idx < days)
+        np.add.at(matrix, (row_idx[inside], col_idx[inside]), values[inside])
+    
+    return product_ids, matrix
+
+
+# ============================================
+# Forecaster
+# ============================================
+
+class DemandForecaster:
+    """
+    Fits and serves seasonal demand forecasts.
+    
+    Fits are cached per org together with the SKUs they cover and a
+    watermark of those SKUs' consumption history (event count and latest
+    recorded_at). A forecast only refits when the watermark moves, i.e.
+    when new data has arrived, or when it asks for a different SKU set.
+    """
+    
+    def __init__(self, db: Optional[AsyncSession] = None, history_days: int = HISTORY_DAYS):
+        self.db = db
+        self.history_days = history_days
+        self._fits: Dict[UUID, Tuple[Hashable, SeasonalFit]] = {}
+    
+    async def forecast(
+        self,
+        product_ids: Optional[List[UUID]] = None,
+        horizon_days: int = DEFAULT_HORIZON_DAYS,
+        as_of: Optional[datetime] = None,
+        org_id: UUID = DEFAULT_ORG_ID,
+    ) -> List[DemandForecastResult]:
+        """
+        Forecast daily demand for the next horizon_days, starting on as_of's date.
+        
+        Returns results in product_ids order (all fitted SKUs if omitted).
+        SKUs without history forecast zero at minimum confidence.
+        """
+        fit = await self.get_fit(org_id, as_of, product_ids)
+        if product_ids is None:
+            product_ids = fit.product_ids
+        
+        rows = np.fromiter((fit.index.get(pid, -1) for pid in product_ids), dtype=np.intp, count=len(product_ids))
+        known = rows >= 0
+        projected = np.zeros((len(product_ids), horizon_days))
+        projected[known] = fit.project(horizon_days, rows[known])
+        
+        # Everything derived in bulk; per SKU only the Decimal conversion remains
+        slope = np.zeros(len(product_ids))
+        seasonal = np.ones((len(product_ids), 7))
+        data_points = np.zeros(len(product_ids), dtype=np.int64)
+        confidence = np.full(len(product_ids), MIN_CONFIDENCE)
+        slope[known] = fit.slope[rows[known]]
+        seasonal[known] = fit.seasonal[rows[known]]
+        data_points[known] = fit.data_points[rows[known]]
+        confidence[known] = fit.confidence[rows[known]]
+        
+        start = fit.start_date + timedelta(days=fit.days)
+        columns = zip(
+            product_ids,
+            _decimals(projected),
+            _decimals(projected.sum(axis=1)),
+            _decimals(projected.mean(axis=1) if horizon_days else np.zeros(len(product_ids))),
+            _decimals(slope),
+            _decimals(seasonal),
+            data_points.tolist(),
+            _decimals(confidence, places=2),
+        )
+        # Values are already typed and rounded, so skip re-validation
+        return [
+            DemandForecastResult.model_construct(
+                product_id=product_id,
+                start_date=start,
+                horizon_days=horizon_days,
+                daily_forecast=daily,
+                total_forecast=total,
+                daily_demand=mean,
+                trend_per_day=trend,
+                seasonal_indices=indices,
+                data_points=points,
+                confidence=conf,
+                calculated_at=datetime.utcnow(),
+            )
+            for product_id, daily, total, mean, trend, indices, points, conf in columns
+        ]
+    
+    async def get_fit(
+        self,
+        org_id: UUID = DEFAULT_ORG_ID,
+        as_of: Optional[datetime] = None,
+        product_ids: Optional[List[UUID]] = None,
+    ) -> SeasonalFit:
+        """Cached fit for an org; refits when the history watermark moves"""
+        end_date = (as_of or datetime.utcnow()).date()
+        start_date = end_date - timedelta(days=self.history_days)
+        # Fits cover the requested SKUs only, so the SKU set is part of the key
+        scope = frozenset(product_ids) if product_ids is not None else None
+        watermark = (start_date, scope, await self._get_watermark(start_date, end_date, product_ids))
+        
+        cached = self._fits.get(org_id)
+        if cached is not None and cached[0] == watermark:
+            return cached[1]
+        
+        rows = await self._load_history(start_date, end_date, product_ids)
+        ids, matrix = demand_matrix(rows, start_date, self.history_days)
+        fit = fit_seasonal(ids, matrix, start_date)
+        self._fits[org_id] = (watermark, fit)
+        logger.info(f"Fitted demand forecast for {len(ids)} SKUs (org {org_id})")
+        return fit
+    
+    def invalidate(self, org_id: Optional[UUID] = None) -> None:
+        """Drop cached fits (all orgs if none given)"""
+        if org_id is None:
+            self._fits.clear()
+        else:
+            self._fits.pop(org_id, None)
+    
+    # ---------- Data Access ----------
+    
+    async def _get_watermark(
+        self,
+        start_date: date,
+        end_date: date,
+        product_ids: Optional[List[UUID]],
+    ) -> Hashable:
+        """Cheap summary of the history that changes whenever events are added"""
+        if self.db is None:
+            return "mock"
+        
+        from app.db.models import ConsumptionEvent
+        
+        query = (
+            select(func.count(), func.max(ConsumptionEvent.recorded_at))
+            .where(ConsumptionEvent.recorded_at >= start_date)
+            .where(ConsumptionEvent.recorded_at < end_date)
+        )
+        if product_ids is not None:
+            query = query.where(ConsumptionEvent.product_id.in_(product_ids))
+        result = await self.db.execute(query)
+        return tuple(result.one())
+    
+    async def _load_history(
+        self,
+        start_date: date,
+        end_date: date,
+        product_ids: Optional[List[UUID]],
+    ) -> List[Tuple[UUID, date, int]]:
+        """Daily consumed quantity per product, one aggregated query"""
+        if self.db is None:
+            return self._generate_mock_history(product_ids or [], start_date, end_date)
+        
+        from app.db.models import ConsumptionEvent
+        
+        day = func.date(ConsumptionEvent.recorded_at).label("day")
+        query = (
+            select(ConsumptionEvent.product_id, day, func.sum(-ConsumptionEvent.qty_delta))
+            .where(ConsumptionEvent.event_type == "consumption")
+            .where(ConsumptionEvent.recorded_at >= start_date)
+            .where(ConsumptionEvent.recorded_at < end_date)
+            .group_by(ConsumptionEvent.product_id, day)
+        )
+        if product_ids is not None:
+            query = query.where(ConsumptionEvent.product_id.in_(product_ids))
+        result = await self.db.execute(query)
+        return [tuple(row) for row in result]
+    
+    def _generate_mock_history(
+        self,
+        product_ids: List[UUID],
+        start_date: date,
+        end_date: date,
+    ) -> List[Tuple[UUID, date, int]]:
+        """Generate mock daily consumption with a weekend lift, seeded per product"""
+        rows = []
+        for product_id in product_ids:
+            rng = random.Random(product_id.int)
+            base = rng.randint(5, 30)
+            weekend_lift = 1 + rng.random() * 0.6
+            day = start_date
+            while day < end_date:
+                factor = weekend_lift if day.weekday() >= 5 else 1.0
+                rows.append((product_id, day, max(0, round(base * factor + rng.gauss(0, base * 0.1)))))
+                day += timedelta(days=1)
+        return rows
+
+
+def demand_map(results: List[DemandForecastResult]) -> Dict[str, Decimal]:
+    """{"product_id": daily_units} as what-if and cost-of-delay snapshots expect"""
+    return {str(r.product_id): r.daily_demand for r in results}
+
+
+def _decimals(values: np.ndarray, places: int = RATE_PLACES) -> list:
+    """Round an array and convert it (nested) to Decimals"""
+    rounded = np.round(values, places) + 0.0  # + 0.0 drops negative zeros
+    if rounded.ndim > 1:
+        return [[Decimal(repr(v)) for v in row] for row in rounded.tolist()]
+    return [Decimal(repr(v)) for v in rounded.tolist()]
+
+
+# ============================================
+# Singleton Instance
+# ============================================
+
+_forecaster_instance: Optional[DemandForecaster] = None
+
+
+def get_demand_forecaster() -> DemandForecaster:
+    """Get demand forecaster instance"""
+    global _forecaster_instance
+    if _forecaster_instance is None:
+        _forecaster_instance = DemandForecaster()
+    return _forecaster_instance
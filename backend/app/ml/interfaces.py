@@ -128,7 +128,7 @@ class MLInterfaceBase(ABC):
         entity_type: str,
         entity_id: uuid.UUID,
         observed_value: Any,
-        historical_values: list[Any],
+        historical_values: Optional[list[Any]] = None,
         context: Optional[dict] = None,
     ) -> AnomalyResult:
         """
@@ -138,7 +138,8 @@ class MLInterfaceBase(ABC):
             entity_type: Type of entity (scan, order, price, etc.)
             entity_id: Entity identifier
             observed_value: Current observation
-            historical_values: Historical baseline
+            historical_values: Historical baseline; None scores against
+                (and updates) the entity's streaming baseline
             context: Additional context (time, location, etc.)
         
         Returns:
@@ -311,16 +312,24 @@ class MLInterface(MLInterfaceBase):
         entity_type: str,
         entity_id: uuid.UUID,
         observed_value: Any,
-        historical_values: list[Any],
+        historical_values: Optional[list[Any]] = None,
         context: Optional[dict] = None,
     ) -> AnomalyResult:
         """
         Detect anomaly using simple statistical thresholds.
         
         Fallback logic:
-            - Calculate mean and std of historical
-            - Flag if observed > mean + 2*std
+            - Mean and std of the baseline (one Welford pass)
+            - Flag if observed is more than 2*std from the mean
+        
+        Without historical_values the entity's streaming baseline is used
+        and the observation is folded into it, so each call is O(1).
         """
+        from app.ml.anomaly import RunningStats, get_anomaly_detector, score_observation
+        
+        if historical_values is None:
+            return get_anomaly_detector().observe(entity_type, entity_id, observed_value)
+        
         if not historical_values:
             return AnomalyResult(
                 is_anomaly=False,
@@ -330,35 +339,8 @@ class MLInterface(MLInterfaceBase):
             )
         
         try:
-            numeric_history = [float(v) for v in historical_values]
-            numeric_observed = float(observed_value)
-            
-            mean = sum(numeric_history) / len(numeric_history)
-            variance = sum((x - mean) ** 2 for x in numeric_history) / len(numeric_history)
-            std = variance ** 0.5 if variance > 0 else 1
-            
-            deviation = abs(numeric_observed - mean) / std if std > 0 else 0
-            
-            # Z-score based anomaly detection
-            is_anomaly = deviation > 2.0
-            anomaly_score = min(Decimal(str(deviation / 4)), Decimal("1"))
-            
-            anomaly_type = None
-            if is_anomaly:
-                if numeric_observed > mean:
-                    anomaly_type = "high_outlier"
-                else:
-                    anomaly_type = "low_outlier"
-            
-            return AnomalyResult(
-                is_anomaly=is_anomaly,
-                anomaly_score=anomaly_score,
-                anomaly_type=anomaly_type,
-                baseline_value=mean,
-                observed_value=observed_value,
-                deviation_factor=Decimal(str(round(deviation, 2))),
-                model_used="fallback_zscore",
-            )
+            stats = RunningStats.from_values(float(v) for v in historical_values)
+            return score_observation(stats, observed_value, float(observed_value))
             
         except (ValueError, TypeError):
             return AnomalyResult(
@@ -368,6 +350,25 @@ class MLInterface(MLInterfaceBase):
                 model_used="fallback_non_numeric",
             )
     
+    def detect_anomalies(
+        self,
+        observations: list[dict],
+    ) -> list[AnomalyResult]:
+        """
+        Score many observations against their streaming baselines.
+        
+        Args:
+            observations: Dicts with entity_type, entity_id and value
+        
+        Returns:
+            One AnomalyResult per observation, in order
+        """
+        from app.ml.anomaly import Observation, get_anomaly_detector
+        
+        return get_anomaly_detector().observe_batch(
+            Observation.model_validate(o) for o in observations
+        )
+    
     def classify_waste_image(
         self,
         image_data: bytes,
@@ -0,0 +1,238 @@
+"""
+PROVENIQ Ops - Vendor Lead-Time Statistics
+
+Keeps lead-time distributions per (vendor, product) and per vendor:
+- Whole-hour histograms updated as each delivery is recorded
+- p50/p90/p99, mean and standard deviation served from an in-process cache
+- A cache entry is dropped only when a delivery for its key arrives
+
+Predictions read quantiles from memory instead of aggregating delivery
+history on each call. History is loaded once per process from delivered
+orders (submitted_at to delivered_at).
+"""
+
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+import asyncio
+import logging
+import math
+
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+QUANTILES = (Decimal("0.5"), Decimal("0.9"), Decimal("0.99"))
+
+# Observations needed before a distribution is used over coarser fallbacks
+MIN_SAMPLES = 3
+
+# Lead times are clamped into the histogram range (60 days)
+MAX_LEAD_TIME_HOURS = 24 * 60
+
+LeadTimeKey = Tuple[UUID, Optional[UUID]]  # (vendor_id, product_id); None = all products
+
+
+def lead_time_hours(submitted_at: datetime, delivered_at: datetime) -> int:
+    """Whole hours from submission to delivery"""
+    return round((delivered_at - submitted_at).total_seconds() / 3600)
+
+
+# ============================================
+# Data Models
+# ============================================
+
+class LeadTimeQuantiles(BaseModel):
+    """Lead-time distribution summary for a vendor or vendor/product pair"""
+    vendor_id: UUID
+    product_id: Optional[UUID] = None  # None: across all of the vendor's products
+    
+    samples: int
+    mean_hours: Decimal
+    std_hours: Decimal
+    p50_hours: int
+    p90_hours: int
+    p99_hours: int
+    
+    version: int  # Deliveries recorded for this key
+    computed_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class LeadTimeHistogram:
+    """Counts of observed lead times by whole hour"""
+    
+    __slots__ = ("counts", "samples", "total", "total_sq")
+    
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.samples = 0
+        self.total = 0
+        self.total_sq = 0
+    
+    def add(self, hours: int) -> None:
+        hours = min(max(hours, 0), MAX_LEAD_TIME_HOURS)
+        self.counts[hours] = self.counts.get(hours, 0) + 1
+        self.samples += 1
+        self.total += hours
+        self.total_sq += hours * hours
+    
+    def quantiles(self, levels: Tuple[Decimal, ...] = QUANTILES) -> List[int]:
+        """Nearest-rank quantiles, one pass over the sorted buckets"""
+        ranks = [max(1, math.ceil(level * self.samples)) for level in levels]
+        results: List[int] = []
+        seen = 0
+        for hours in sorted(self.counts):
+            seen += self.counts[hours]
+            while len(results) < len(ranks) and seen >= ranks[len(results)]:
+                results.append(hours)
+        return results
+    
+    def summary(self, vendor_id: UUID, product_id: Optional[UUID], version: int) -> LeadTimeQuantiles:
+        # Exact integer variance: (n * sum(x^2) - sum(x)^2) / n^2
+        n = self.samples
+        variance_num = n * self.total_sq - self.total * self.total
+        p50, p90, p99 = self.quantiles()
+        return LeadTimeQuantiles(
+            vendor_id=vendor_id,
+            product_id=product_id,
+            samples=n,
+            mean_hours=(Decimal(self.total) / n).quantize(Decimal("0.01"), ROUND_HALF_UP),
+            std_hours=(Decimal(variance_num).sqrt() / n).quantize(Decimal("0.01"), ROUND_HALF_UP),
+            p50_hours=p50,
+            p90_hours=p90,
+            p99_hours=p99,
+            version=version,
+        )
+
+
+# ============================================
+# Statistics Service
+# ============================================
+
+class LeadTimeStatistics:
+    """Incremental lead-time quantiles with change-based cache invalidation"""
+    
+    def __init__(self, min_samples: int = MIN_SAMPLES):
+        self.min_samples = min_samples
+        self._histograms: Dict[LeadTimeKey, LeadTimeHistogram] = {}
+        self._versions: Dict[LeadTimeKey, int] = {}
+        self._cache: Dict[LeadTimeKey, LeadTimeQuantiles] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+    
+    # ---------- Updates ----------
+    
+    def record_delivery(self, vendor_id: UUID, product_id: UUID, lead_time_hours: int) -> None:
+        """Add one delivery to the pair's and the vendor's distributions"""
+        for key in ((vendor_id, product_id), (vendor_id, None)):
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LeadTimeHistogram()
+            histogram.add(lead_time_hours)
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._cache.pop(key, None)
+    
+    def record_order_delivered(
+        self,
+        vendor_id: UUID,
+        product_ids: List[UUID],
+        submitted_at: datetime,
+        delivered_at: datetime,
+    ) -> int:
+        """Record a delivered order's lead time for each product on it"""
+        hours = lead_time_hours(submitted_at, delivered_at)
+        for product_id in product_ids:
+            self.record_delivery(vendor_id, product_id, hours)
+        return hours
+    
+    # ---------- Reads ----------
+    
+    def mean_with_delivery(
+        self,
+        vendor_id: UUID,
+        product_id: UUID,
+        lead_time_hours: int,
+    ) -> Optional[Decimal]:
+        """
+        The pair's mean lead time as it will be once a delivery is recorded,
+        without recording it; None while the pair would still have fewer
+        than min_samples deliveries.
+        """
+        histogram = self._histograms.get((vendor_id, product_id))
+        samples = (histogram.samples if histogram else 0) + 1
+        if samples < self.min_samples:
+            return None
+        total = (histogram.total if histogram else 0) + min(max(lead_time_hours, 0), MAX_LEAD_TIME_HOURS)
+        return (Decimal(total) / samples).quantize(Decimal("0.01"), ROUND_HALF_UP)
+    
+    def get(self, vendor_id: UUID, product_id: Optional[UUID] = None) -> Optional[LeadTimeQuantiles]:
+        """
+        Lead-time quantiles for a vendor/product pair.
+        
+        Falls back to the vendor-wide distribution while the pair has fewer
+        than min_samples deliveries; None when neither has enough.
+        """
+        keys = [(vendor_id, product_id), (vendor_id, None)] if product_id else [(vendor_id, None)]
+        for key in keys:
+            histogram = self._histograms.get(key)
+            if histogram is None or histogram.samples < self.min_samples:
+                continue
+            cached = self._cache.get(key)
+            if cached is None:
+                cached = self._cache[key] = histogram.summary(key[0], key[1], self._versions[key])
+            return cached
+        return None
+    
+    # ---------- Loading ----------
+    
+    async def ensure_loaded(self, db: Optional[AsyncSession]) -> None:
+        """Load delivery history once per process"""
+        if self._loaded or db is None:
+            return
+        async with self._load_lock:
+            if not self._loaded:
+                await self.rebuild(db)
+    
+    async def rebuild(self, db: AsyncSession) -> int:
+        """Rebuild all distributions from delivered orders (one query)"""
+        from sqlalchemy import select
+        from app.db import Order, OrderItem
+        
+        query = (
+            select(Order.vendor_id, OrderItem.product_id, Order.submitted_at, Order.delivered_at)
+            .join(OrderItem, OrderItem.order_id == Order.id)
+            .where(Order.status == "delivered")
+            .where(Order.submitted_at.is_not(None))
+            .where(Order.delivered_at.is_not(None))
+        )
+        result = await db.execute(query)
+        
+        self._histograms.clear()
+        self._versions.clear()
+        self._cache.clear()
+        deliveries = 0
+        for vendor_id, product_id, submitted_at, delivered_at in result:
+            self.record_delivery(vendor_id, product_id, lead_time_hours(submitted_at, delivered_at))
+            deliveries += 1
+        
+        self._loaded = True
+        logger.info(f"Loaded {deliveries} deliveries into lead-time statistics")
+        return deliveries
+
+
+# ============================================
+# Singleton Instance
+# ============================================
+
+_stats_instance: Optional[LeadTimeStatistics] = None
+
+
+def get_lead_time_stats() -> LeadTimeStatistics:
+    """Get lead-time statistics instance"""
+    global _stats_instance
+    if _stats_instance is None:
+        _stats_instance = LeadTimeStatistics()
+    return _stats_instance
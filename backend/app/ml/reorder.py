@@ -0,0 +1,341 @@
+"""
+PROVENIQ Ops - Reorder Quantity Optimization
+
+Computes order proposals for a whole catalog in one vectorized pass:
+- Safety stock from burn-rate variance and lead-time variability
+- Reorder point = lead-time demand + safety stock
+- Economic order quantity (EOQ) from ordering and holding costs
+- Vendor minimum order quantities and case packs
+- Units already on open orders count toward the inventory position
+
+Inputs are gathered with one query each (burn rates, open orders, vendor
+terms), so a full store's proposal is a single call.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import logging
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from .burn_rate import BurnRateCalculator, get_burn_rate_calculator
+from .lead_times import get_lead_time_stats
+from .stockout import _pending_quantity, get_pending_quantities
+
+logger = logging.getLogger(__name__)
+
+
+DAYS_PER_YEAR = 365
+
+# Defaults when a product has no vendor terms on record
+DEFAULT_LEAD_TIME_HOURS = 48  # VendorLeadTime.avg_lead_time_hours default
+DEFAULT_ORDERING_COST_MICROS = 25_000_000  # $25 per purchase order
+DEFAULT_HOLDING_RATE = Decimal("0.25")  # Annual holding cost, fraction of unit cost
+DEFAULT_REVIEW_DAYS = 7  # Cover ordered when EOQ is undefined (no unit cost)
+
+
+# ============================================
+# Data Models
+# ============================================
+
+class VendorTerms(BaseModel):
+    """Ordering terms for a product from its preferred vendor"""
+    vendor_id: Optional[UUID] = None
+    unit_cost_micros: int = 0
+    min_order_qty: int = 1
+    case_pack: int = 1
+    lead_time_hours: int = DEFAULT_LEAD_TIME_HOURS
+    lead_time_std_hours: Decimal = Decimal("0")
+
+
+class ReorderRecommendation(BaseModel):
+    """Reorder recommendation for a product"""
+    product_id: UUID
+    product_name: Optional[str] = None
+    vendor_id: Optional[UUID] = None
+    
+    # Position
+    current_quantity: int
+    pending_orders_qty: int = 0
+    inventory_position: int
+    
+    # Policy
+    daily_demand: Decimal = Decimal("0")
+    safety_stock: int = 0
+    reorder_point: int = 0
+    economic_order_qty: int = 0
+    
+    # Recommendation
+    recommended_order_qty: int = 0
+    order_cost_micros: int = 0
+    constrained_by: Optional[str] = None  # min_order_qty, case_pack
+    
+    calculated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# ============================================
+# Vectorized Policy
+# ============================================
+
+def reorder_policy(
+    daily_demand: np.ndarray,
+    demand_cv: np.ndarray,
+    inventory_position: np.ndarray,
+    lead_time_days: np.ndarray,
+    lead_time_std_days: np.ndarray,
+    unit_cost_micros: np.ndarray,
+    min_order_qty: np.ndarray,
+    case_pack: np.ndarray,
+    z: float,
+    ordering_cost_micros: float = DEFAULT_ORDERING_COST_MICROS,
+    holding_rate: float = float(DEFAULT_HOLDING_RATE),
+    review_days: float = DEFAULT_REVIEW_DAYS,
+) -> Dict[str, np.ndarray]:
+    """
+    Continuous-review reorder policy for every SKU at once.
+    
+    When the inventory position is at or below the reorder point, orders up
+    to reorder point + EOQ, then applies the vendor minimum and rounds up to
+    whole cases. All outputs are integer unit counts.
+    """
+    demand_std = daily_demand * demand_cv
+    
+    # Demand variability over the lead time plus lead-time variability
+    safety_stock = z * np.sqrt(
+        lead_time_days * demand_std ** 2 + daily_demand ** 2 * lead_time_std_days ** 2
+    )
+    reorder_point = daily_demand * lead_time_days + safety_stock
+    
+    # EOQ = sqrt(2DS / H); without a unit cost, cover the review period
+    annual_holding = unit_cost_micros * holding_rate
+    eoq = daily_demand * review_days
+    priced = (annual_holding > 0) & (daily_demand > 0)
+    eoq[priced] = np.sqrt(
+        2 * daily_demand[priced] * DAYS_PER_YEAR * ordering_cost_micros / annual_holding[priced]
+    )
+    
+    needed = (daily_demand > 0) & (inventory_position <= reorder_point)
+    raw_qty = np.where(needed, np.ceil(reorder_point + eoq - inventory_position), 0)
+    
+    with_moq = np.where(raw_qty > 0, np.maximum(raw_qty, min_order_qty), 0)
+    quantity = np.ceil(with_moq / case_pack) * case_pack
+    
+    return {
+        "safety_stock": np.ceil(safety_stock).astype(np.int64),
+        "reorder_point": np.ceil(reorder_point).astype(np.int64),
+        "economic_order_qty": np.ceil(eoq).astype(np.int64),
+        "quantity": quantity.astype(np.int64),
+        "moq_applied": with_moq > raw_qty,
+        "case_applied": quantity > with_moq,
+    }
+
+
+# ============================================
+# Optimizer
+# ============================================
+
+class ReorderOptimizer:
+    """
+    Batch reorder-quantity optimizer.
+    
+    Lead times come from the observed delivery distributions; products
+    without delivery history fall back to VendorLeadTime, with the spread
+    approximated from reliability (std = avg * (1 - reliability)).
+    """
+    
+    def __init__(
+        self,
+        burn_calculator: Optional[BurnRateCalculator] = None,
+        service_level: Decimal = Decimal("0.95"),
+        ordering_cost_micros: int = DEFAULT_ORDERING_COST_MICROS,
+        holding_rate: Decimal = DEFAULT_HOLDING_RATE,
+    ):
+        if not Decimal("0") < service_level < Decimal("1"):
+            raise ValueError("service_level must be between 0 and 1")
+        self.burn_calculator = burn_calculator or get_burn_rate_calculator()
+        self.service_level = service_level
+        self.ordering_cost_micros = ordering_cost_micros
+        self.holding_rate = holding_rate
+    
+    async def optimize(
+        self,
+        products: List[Dict[str, Any]],
+        pending_orders: Optional[Dict[UUID, List[Dict[str, Any]]]] = None,
+        vendor_terms: Optional[Dict[UUID, VendorTerms]] = None,
+        as_of: Optional[datetime] = None,
+    ) -> List[ReorderRecommendation]:
+        """
+        Recommend order quantities for a batch of products.
+        
+        Args:
+            products: Product dicts with id, name, current_quantity
+            pending_orders: Dict mapping product_id to list of pending orders
+                (default: open orders on record)
+            vendor_terms: Dict mapping product_id to VendorTerms
+                (default: cheapest vendor on record)
+            as_of: Burn-rate reference time
+        
+        Returns:
+            One recommendation per product, in input order
+        """
+        if not products:
+            return []
+        
+        product_ids = [p["id"] if isinstance(p["id"], UUID) else UUID(str(p["id"])) for p in products]
+        db = self.burn_calculator.db
+        
+        pending_qty = await get_pending_quantities(
+            db, [pid for pid in product_ids if not pending_orders or pid not in pending_orders]
+        )
+        if pending_orders:
+            for product_id, orders in pending_orders.items():
+                pending_qty[product_id] = _pending_quantity(orders)
+        
+        terms = await get_vendor_terms(
+            db, [pid for pid in product_ids if not vendor_terms or pid not in vendor_terms]
+        )
+        if vendor_terms:
+            terms.update(vendor_terms)
+        
+        burn_results = await self.burn_calculator.calculate_all_burn_rates(product_ids, as_of=as_of)
+        
+        default_terms = VendorTerms()
+        sku_terms = [terms.get(pid, default_terms) for pid in product_ids]
+        on_hand = np.array([p.get("current_quantity", 0) for p in products], dtype=np.float64)
+        pending = np.array([pending_qty.get(pid, 0) for pid in product_ids], dtype=np.float64)
+        
+        policy = reorder_policy(
+            daily_demand=np.array([float(b.weighted_burn_rate) for b in burn_results]),
+            demand_cv=np.array([float(b.variance_coefficient) for b in burn_results]),
+            inventory_position=on_hand + pending,
+            lead_time_days=np.array([t.lead_time_hours / 24 for t in sku_terms]),
+            lead_time_std_days=np.array([float(t.lead_time_std_hours) / 24 for t in sku_terms]),
+            unit_cost_micros=np.array([t.unit_cost_micros for t in sku_terms], dtype=np.float64),
+            min_order_qty=np.array([t.min_order_qty for t in sku_terms], dtype=np.float64),
+            case_pack=np.array([t.case_pack for t in sku_terms], dtype=np.float64),
+            z=NormalDist().inv_cdf(float(self.service_level)),
+            ordering_cost_micros=self.ordering_cost_micros,
+            holding_rate=float(self.holding_rate),
+        )
+        
+        columns = zip(
+            products, product_ids, burn_results, sku_terms,
+            on_hand.astype(np.int64).tolist(),
+            pending.astype(np.int64).tolist(),
+            policy["safety_stock"].tolist(),
+            policy["reorder_point"].tolist(),
+            policy["economic_order_qty"].tolist(),
+            policy["quantity"].tolist(),
+            policy["moq_applied"].tolist(),
+            policy["case_applied"].tolist(),
+        )
+        
+        return [
+            ReorderRecommendation(
+                product_id=product_id,
+                product_name=product.get("name"),
+                vendor_id=sku.vendor_id,
+                current_quantity=current,
+                pending_orders_qty=pending_units,
+                inventory_position=current + pending_units,
+                daily_demand=burn.weighted_burn_rate,
+                safety_stock=safety_stock,
+                reorder_point=reorder_point,
+                economic_order_qty=eoq,
+                recommended_order_qty=quantity,
+                # Integer micros: exact for any realistic quantity
+                order_cost_micros=quantity * sku.unit_cost_micros,
+                constrained_by="case_pack" if case_applied else "min_order_qty" if moq_applied else None,
+            )
+            for (product, product_id, burn, sku, current, pending_units,
+                 safety_stock, reorder_point, eoq, quantity, moq_applied, case_applied) in columns
+        ]
+    
+    async def order_proposal(
+        self,
+        products: List[Dict[str, Any]],
+        pending_orders: Optional[Dict[UUID, List[Dict[str, Any]]]] = None,
+        vendor_terms: Optional[Dict[UUID, VendorTerms]] = None,
+    ) -> List[ReorderRecommendation]:
+        """Only the products that need an order, grouped by vendor"""
+        recommendations = await self.optimize(products, pending_orders, vendor_terms)
+        lines = [r for r in recommendations if r.recommended_order_qty > 0]
+        lines.sort(key=lambda r: (str(r.vendor_id or ""), -r.order_cost_micros))
+        return lines
+
+
+async def get_vendor_terms(db: Optional[Any], product_ids: List[UUID]) -> Dict[UUID, VendorTerms]:
+    """Cheapest vendor's terms and lead time per product, from one query"""
+    if db is None or not product_ids:
+        return {}
+    
+    from sqlalchemy import and_, select
+    from sqlalchemy.dialects.postgresql import distinct_on
+    from app.core.types import MICROS_PER_UNIT
+    from app.db.models import VendorLeadTime, VendorProduct
+    
+    query = (
+        select(
+            VendorProduct.product_id,
+            VendorProduct.vendor_id,
+            VendorProduct.current_price,
+            VendorProduct.min_order_qty,
+            VendorProduct.case_pack,
+            VendorLeadTime.avg_lead_time_hours,
+            VendorLeadTime.reliability_score,
+        )
+        .outerjoin(
+            VendorLeadTime,
+            and_(
+                VendorLeadTime.vendor_id == VendorProduct.vendor_id,
+                VendorLeadTime.product_id == VendorProduct.product_id,
+            ),
+        )
+        .where(VendorProduct.product_id.in_(product_ids))
+        .order_by(VendorProduct.product_id, VendorProduct.current_price)
+        .ext(distinct_on(VendorProduct.product_id))
+    )
+    result = await db.execute(query)
+    
+    lead_time_stats = get_lead_time_stats()
+    await lead_time_stats.ensure_loaded(db)
+    
+    terms = {}
+    for product_id, vendor_id, price, moq, case_pack, lead_hours, reliability in result:
+        observed = lead_time_stats.get(vendor_id, product_id)
+        if observed is not None:
+            lead_hours = int(observed.mean_hours.to_integral_value())
+            lead_std = observed.std_hours
+        else:
+            # No delivery history yet: spread approximated from reliability
+            lead_hours = lead_hours if lead_hours is not None else DEFAULT_LEAD_TIME_HOURS
+            reliability = reliability if reliability is not None else Decimal("1")
+            lead_std = Decimal(lead_hours) * (1 - reliability)
+        terms[product_id] = VendorTerms(
+            vendor_id=vendor_id,
+            unit_cost_micros=int(price * MICROS_PER_UNIT),
+            min_order_qty=moq,
+            case_pack=case_pack,
+            lead_time_hours=lead_hours,
+            lead_time_std_hours=lead_std,
+        )
+    return terms
+
+
+# ============================================
+# Singleton Instance
+# ============================================
+
+_optimizer_instance: Optional[ReorderOptimizer] = None
+
+
+def get_reorder_optimizer() -> ReorderOptimizer:
+    """Get reorder optimizer instance"""
+    global _optimizer_instance
+    if _optimizer_instance is None:
+        _optimizer_instance = ReorderOptimizer()
+    return _optimizer_instance
@@ -14,6 +14,7 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Optional, List, Dict, Any
 from uuid import UUID
+import heapq
 import logging
 
 from pydantic import BaseModel, Field
@@ -23,6 +24,10 @@ from .burn_rate import BurnRateCalculator, BurnRateResult, get_burn_rate_calcula
 logger = logging.getLogger(__name__)
 
 
+# Order statuses whose quantities are still on the way
+PENDING_ORDER_STATUSES = ("queued", "submitted", "confirmed")
+
+
 # ============================================
 # Data Models
 # ============================================
@@ -114,21 +119,43 @@ class StockoutPredictor:
             current_quantity: Current on-hand inventory
             par_level: Target minimum inventory level
             pending_orders: List of pending orders for this product
+                (default: open orders in the database, as in predict_batch)
             product_name: Optional product name for display
         
         Returns:
             StockoutPrediction with timing and recommendations
         """
-        now = datetime.utcnow()
-        
         # Get burn rate
         burn_result = await self.burn_calculator.calculate_burn_rate(product_id)
-        burn_rate = burn_result.weighted_burn_rate
         
-        # Account for pending orders
-        pending_qty = 0
-        if pending_orders:
-            pending_qty = sum(o.get("quantity", 0) for o in pending_orders)
+        if pending_orders is None:
+            pending = await self._get_pending_quantities([product_id])
+            pending_qty = pending.get(product_id, 0)
+        else:
+            pending_qty = _pending_quantity(pending_orders)
+        
+        return self._predict(
+            product_id=product_id,
+            current_quantity=current_quantity,
+            par_level=par_level,
+            pending_qty=pending_qty,
+            burn_result=burn_result,
+            product_name=product_name,
+            now=datetime.utcnow(),
+        )
+    
+    def _predict(
+        self,
+        product_id: UUID,
+        current_quantity: int,
+        par_level: int,
+        pending_qty: int,
+        burn_result: BurnRateResult,
+        product_name: Optional[str],
+        now: datetime,
+    ) -> StockoutPrediction:
+        """Prediction for one product from an already computed burn rate"""
+        burn_rate = burn_result.weighted_burn_rate
         
         # Calculate hours to stockout
         if burn_rate <= 0:
@@ -193,50 +220,82 @@ class StockoutPredictor:
             pending_orders_qty=pending_qty,
         )
     
-    async def predict_all_stockouts(
+    async def predict_batch(
         self,
         products: List[Dict[str, Any]],
         pending_orders: Optional[Dict[UUID, List[Dict[str, Any]]]] = None,
+        top_k: Optional[int] = None,
     ) -> List[StockoutPrediction]:
         """
-        Predict stockouts for all products.
+        Predict stockouts for a set of products in one pass.
+        
+        Burn rates come from one bulk calculation. Pending quantities come
+        from `pending_orders` where given, otherwise from open orders in the
+        database (one grouped query).
         
         Args:
             products: List of product dicts with id, name, current_quantity, par_level
             pending_orders: Dict mapping product_id to list of pending orders
+            top_k: Return only the k highest-risk predictions
         
         Returns:
-            List of predictions sorted by risk (highest first)
+            Predictions sorted by risk (highest first)
         """
-        predictions = []
+        now = datetime.utcnow()
         
+        product_ids = []
         for product in products:
             product_id = product.get("id") or product.get("product_id")
             if isinstance(product_id, str):
                 product_id = UUID(product_id)
-            
-            product_orders = None
-            if pending_orders and product_id in pending_orders:
-                product_orders = pending_orders[product_id]
-            
-            prediction = await self.predict_stockout(
+            product_ids.append(product_id)
+        
+        pending_qty = await self._get_pending_quantities(
+            [pid for pid in product_ids if not pending_orders or pid not in pending_orders]
+        )
+        if pending_orders:
+            for product_id, orders in pending_orders.items():
+                pending_qty[product_id] = _pending_quantity(orders)
+        
+        burn_results = await self.burn_calculator.calculate_all_burn_rates(product_ids, as_of=now)
+        
+        predictions = [
+            self._predict(
                 product_id=product_id,
                 current_quantity=product.get("current_quantity", 0),
                 par_level=product.get("par_level", 0),
-                pending_orders=product_orders,
+                pending_qty=pending_qty.get(product_id, 0),
+                burn_result=burn_result,
                 product_name=product.get("name"),
+                now=now,
             )
-            predictions.append(prediction)
+            for product, product_id, burn_result in zip(products, product_ids, burn_results)
+        ]
         
-        # Sort by risk (highest first)
-        predictions.sort(key=lambda p: float(p.risk_score), reverse=True)
+        return _rank_by_risk(predictions, top_k)
+    
+    async def predict_all_stockouts(
+        self,
+        products: List[Dict[str, Any]],
+        pending_orders: Optional[Dict[UUID, List[Dict[str, Any]]]] = None,
+    ) -> List[StockoutPrediction]:
+        """
+        Predict stockouts for all products.
         
-        return predictions
+        Args:
+            products: List of product dicts with id, name, current_quantity, par_level
+            pending_orders: Dict mapping product_id to list of pending orders
+        
+        Returns:
+            List of predictions sorted by risk (highest first)
+        """
+        return await self.predict_batch(products, pending_orders)
     
     async def get_alerts(
         self,
         products: List[Dict[str, Any]],
         threshold_hours: int = 72,
+        pending_orders: Optional[Dict[UUID, List[Dict[str, Any]]]] = None,
     ) -> List[StockoutAlert]:
         """
         Get stockout alerts for products at risk.
@@ -244,11 +303,20 @@ class StockoutPredictor:
         Args:
             products: List of products to check
             threshold_hours: Alert if stockout within this many hours
+            pending_orders: Dict mapping product_id to list of pending orders
         
         Returns:
             List of alerts for at-risk products
         """
-        predictions = await self.predict_all_stockouts(products)
+        predictions = await self.predict_batch(products, pending_orders)
+        return self.alerts_from_predictions(predictions, threshold_hours)
+    
+    def alerts_from_predictions(
+        self,
+        predictions: List[StockoutPrediction],
+        threshold_hours: int = 72,
+    ) -> List[StockoutAlert]:
+        """Build alerts for predictions that stock out within the threshold"""
         alerts = []
         
         for pred in predictions:
@@ -284,6 +352,9 @@ class StockoutPredictor:
         
         return alerts
     
+    async def _get_pending_quantities(self, product_ids: List[UUID]) -> Dict[UUID, int]:
+        return await get_pending_quantities(self.burn_calculator.db, product_ids)
+    
     def _assess_risk(
         self,
         hours_to_stockout: Decimal,
@@ -376,6 +447,48 @@ class StockoutPredictor:
         return min(Decimal("0.95"), base_confidence)
 
 
+async def get_pending_quantities(db: Optional[Any], product_ids: List[UUID]) -> Dict[UUID, int]:
+    """Units on open orders per product, from one grouped query"""
+    if db is None or not product_ids:
+        return {}
+    
+    from sqlalchemy import func, select
+    from app.db import Order, OrderItem
+    
+    query = (
+        select(OrderItem.product_id, func.sum(OrderItem.quantity))
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(OrderItem.product_id.in_(product_ids))
+        .where(Order.status.in_(PENDING_ORDER_STATUSES))
+        .group_by(OrderItem.product_id)
+    )
+    result = await db.execute(query)
+    return {product_id: int(quantity) for product_id, quantity in result}
+
+
+def _pending_quantity(orders: Optional[List[Dict[str, Any]]]) -> int:
+    """Total units across pending orders"""
+    if not orders:
+        return 0
+    return sum(o.get("quantity", 0) for o in orders)
+
+
+def _rank_by_risk(
+    predictions: List[StockoutPrediction],
+    top_k: Optional[int] = None,
+) -> List[StockoutPrediction]:
+    """
+    Highest risk first. With top_k, selects via a heap in O(n log k)
+    instead of sorting everything; ties keep input order either way.
+    """
+    def key(p: StockoutPrediction) -> Decimal:
+        return p.risk_score
+    
+    if top_k is not None and top_k < len(predictions):
+        return heapq.nlargest(top_k, predictions, key=key)
+    return sorted(predictions, key=key, reverse=True)
+
+
 # ============================================
 # Singleton Instance
 # ============================================
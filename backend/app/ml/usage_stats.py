@@ -0,0 +1,801 @@
+"""
+PROVENIQ Ops - Usage Statistics Materialization
+
+Incrementally maintains per-product usage aggregates so predictions don't
+rescan raw inventory_snapshots:
+- usage_daily_buckets: per product and day, the snapshot intervals starting
+  that day with their units consumed/received and sum of squares
+- usage_statistics: rolling 7/30/90-day sums over those buckets, plus the
+  derived burn rates, variance coefficient and trend
+
+The aggregates follow BurnRateCalculator's raw definition: one observation
+per pair of consecutive snapshots, counted on the day of the first, over
+windows of whole days. ConsumptionEvents recorded between two snapshots
+are folded into that interval, so consumption offset by receiving within
+it is not netted out.
+
+Each new snapshot or ConsumptionEvent is queued to UsageStatisticsWorker,
+which applies it to the product's buckets and adjusts the rolling sums in
+place. A roll-forward at each midnight evicts buckets that age out of each
+window, deleting their rows in the same transaction. A batch that fails to
+apply is retried, then split by product so one bad product can't lose the
+rest.
+
+Backfill / repair:
+    python -m app.ml.usage_stats rebuild [--product-id UUID ...]
+"""
+
+import argparse
+import asyncio
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+import logging
+
+from pydantic import BaseModel
+from sqlalchemy import Integer, cast, delete, null, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .burn_rate import (
+    BULK_FETCH_SIZE,
+    _to_decimal,
+    rate_from_sums,
+    trend_from_sums,
+    variance_from_sums,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Rolling windows in days. 15d is the recent half of the 30d window, used
+# for trend detection; it is not persisted.
+WINDOWS: Tuple[int, ...] = (7, 15, 30, 90)
+PERSISTED_WINDOWS: Tuple[int, ...] = (7, 30, 90)
+HORIZON_DAYS = 90
+
+# Same minimum as BurnRateCalculator._detect_trend
+MIN_TREND_POINTS = 7
+
+# Attempts per failed job; the delay doubles after each
+RETRY_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 1.0
+
+
+# ============================================
+# Data Models
+# ============================================
+
+class UsageSummary(BaseModel):
+    """Materialized burn rate inputs for one product as of a day"""
+    product_id: UUID
+    as_of_day: date
+    
+    burn_rate_7d: Decimal = Decimal("0")
+    burn_rate_30d: Decimal = Decimal("0")
+    burn_rate_90d: Decimal = Decimal("0")
+    variance_coefficient: Decimal = Decimal("0")
+    trend: str = "stable"
+    
+    data_points_7d: int = 0
+    data_points_30d: int = 0
+    data_points_90d: int = 0
+    
+    last_observed_at: Optional[datetime] = None
+    
+    @classmethod
+    def from_row(cls, row: Any) -> "UsageSummary":
+        """Build from a usage_statistics row"""
+        return cls(
+            product_id=row.product_id,
+            as_of_day=row.as_of_day,
+            burn_rate_7d=row.avg_daily_burn_7d,
+            burn_rate_30d=row.avg_daily_burn_30d,
+            burn_rate_90d=row.avg_daily_burn_90d,
+            variance_coefficient=row.variance_coefficient,
+            trend=row.trend,
+            data_points_7d=row.intervals_7d,
+            data_points_30d=row.intervals_30d,
+            data_points_90d=row.intervals_90d,
+            last_observed_at=row.last_observed_at,
+        )
+
+
+class ProductUsage:
+    """
+    Rolling usage state for one product.
+    
+    Buckets cover the last HORIZON_DAYS days ending at `as_of_day`; each
+    window w holds sums over buckets with age < w. All sums are additive,
+    so closing an interval adds to its bucket and every window containing
+    it, and rolling forward subtracts buckets as they age out; updates
+    never rescan history.
+    """
+    
+    __slots__ = (
+        "product_id",
+        "as_of_day",
+        "last_quantity",
+        "last_observed_at",
+        "open_consumed",
+        "open_received",
+        "buckets",
+        "intervals",
+        "consumed",
+        "burn_intervals",
+        "squares",
+    )
+    
+    def __init__(self, product_id: UUID, as_of_day: date):
+        self.product_id = product_id
+        self.as_of_day = as_of_day
+        self.last_quantity: Optional[int] = None
+        self.last_observed_at: Optional[datetime] = None
+        # Event units since the last snapshot, added when its interval closes
+        self.open_consumed = 0
+        self.open_received = 0
+        # day -> [consumed, received, intervals, burn_intervals, squares]
+        self.buckets: Dict[date, List[int]] = {}
+        self.intervals = dict.fromkeys(WINDOWS, 0)
+        self.consumed = dict.fromkeys(WINDOWS, 0)
+        self.burn_intervals = dict.fromkeys(WINDOWS, 0)
+        self.squares = dict.fromkeys(WINDOWS, 0)
+    
+    def _add(self, window: int, bucket: Sequence[int], sign: int) -> None:
+        consumed, _, intervals, burn_intervals, squares = bucket
+        self.intervals[window] += sign * intervals
+        self.consumed[window] += sign * consumed
+        self.burn_intervals[window] += sign * burn_intervals
+        self.squares[window] += sign * squares
+    
+    def roll_to(self, day: date) -> None:
+        """Advance as_of_day, evicting buckets that leave each window"""
+        if day <= self.as_of_day:
+            return
+        
+        for bucket_day in list(self.buckets):
+            age_before = (self.as_of_day - bucket_day).days
+            age_after = (day - bucket_day).days
+            bucket = self.buckets[bucket_day]
+            for window in WINDOWS:
+                if age_before < window <= age_after:
+                    self._add(window, bucket, -1)
+            if age_after >= HORIZON_DAYS:
+                del self.buckets[bucket_day]
+        
+        self.as_of_day = day
+    
+    def record(self, day: date, bucket: Sequence[int]) -> bool:
+        """
+        Add [consumed, received, intervals, burn_intervals, squares] to a
+        day's bucket. Returns False if the day is past the horizon.
+        """
+        self.roll_to(day)
+        
+        age = (self.as_of_day - day).days
+        if age >= HORIZON_DAYS:
+            return False
+        
+        for window in WINDOWS:
+            if age < window:
+                self._add(window, bucket, 1)
+        
+        existing = self.buckets.get(day)
+        if existing is None:
+            self.buckets[day] = list(bucket)
+        else:
+            for i, value in enumerate(bucket):
+                existing[i] += value
+        return True
+    
+    def observe_snapshot(self, scanned_at: datetime, quantity: int) -> Optional[date]:
+        """
+        Apply a snapshot, closing the interval since the previous one.
+        
+        The interval consumed what events recorded in it plus any further
+        drop to this snapshot; it is counted on the previous snapshot's day.
+        Returns the touched bucket day, or None if nothing was recorded.
+        Out-of-order snapshots are ignored; a rebuild reconciles them.
+        """
+        if self.last_observed_at is not None and scanned_at < self.last_observed_at:
+            logger.debug(f"Out-of-order snapshot for {self.product_id} at {scanned_at}; skipped")
+            return None
+        
+        previous, started_at = self.last_quantity, self.last_observed_at
+        consumed, received = self.open_consumed, self.open_received
+        self.last_quantity = quantity
+        self.last_observed_at = scanned_at
+        self.open_consumed = self.open_received = 0
+        self.roll_to(scanned_at.date())
+        
+        # The first snapshot only sets the baseline
+        if previous is None:
+            return None
+        
+        delta = quantity - previous
+        consumed += -delta if delta < 0 else 0
+        received += delta if delta > 0 else 0
+        day = started_at.date()
+        interval = [consumed, received, 1, 1 if consumed > 0 else 0, consumed * consumed]
+        if not self.record(day, interval):
+            return None
+        return day
+    
+    def observe_event(self, recorded_at: datetime, qty_delta: int) -> Optional[date]:
+        """
+        Apply a ConsumptionEvent (negative delta = consumption).
+        
+        The event's units join the open interval and the snapshot baseline
+        moves with them, so the next snapshot only measures unrecorded
+        change. Events before the first snapshot, or older than the latest
+        one, fall outside any open interval and are ignored. Returns None:
+        nothing is recorded until the interval closes.
+        """
+        if self.last_quantity is None or recorded_at < self.last_observed_at:
+            return None
+        
+        if qty_delta < 0:
+            self.open_consumed -= qty_delta
+        else:
+            self.open_received += qty_delta
+        self.last_quantity = max(0, self.last_quantity + qty_delta)
+        return None
+    
+    def summary(self) -> UsageSummary:
+        """Derived burn rate inputs as of as_of_day"""
+        if self.intervals[30] < MIN_TREND_POINTS:
+            trend = "stable"
+        else:
+            trend = trend_from_sums(
+                self.consumed[30] - self.consumed[15], self.intervals[30] - self.intervals[15],
+                self.consumed[15], self.intervals[15],
+            )
+        
+        return UsageSummary(
+            product_id=self.product_id,
+            as_of_day=self.as_of_day,
+            burn_rate_7d=_to_decimal(rate_from_sums(self.consumed[7], self.intervals[7])),
+            burn_rate_30d=_to_decimal(rate_from_sums(self.consumed[30], self.intervals[30])),
+            burn_rate_90d=_to_decimal(rate_from_sums(self.consumed[90], self.intervals[90])),
+            variance_coefficient=variance_from_sums(self.burn_intervals[30], self.consumed[30], self.squares[30]),
+            trend=trend,
+            data_points_7d=self.intervals[7],
+            data_points_30d=self.intervals[30],
+            data_points_90d=self.intervals[90],
+            last_observed_at=self.last_observed_at,
+        )
+    
+    def to_row_values(self) -> Dict[str, Any]:
+        """Column values for usage_statistics"""
+        summary = self.summary()
+        values: Dict[str, Any] = {
+            "product_id": self.product_id,
+            "as_of_day": self.as_of_day,
+            "avg_daily_burn_7d": summary.burn_rate_7d,
+            "avg_daily_burn_30d": summary.burn_rate_30d,
+            "avg_daily_burn_90d": summary.burn_rate_90d,
+            "variance_coefficient": summary.variance_coefficient,
+            "trend": summary.trend,
+            "last_quantity": self.last_quantity,
+            "last_observed_at": self.last_observed_at,
+            "open_consumed": self.open_consumed,
+            "open_received": self.open_received,
+            "last_calculated": datetime.utcnow(),
+        }
+        for window in PERSISTED_WINDOWS:
+            values[f"intervals_{window}d"] = self.intervals[window]
+            values[f"consumed_{window}d"] = self.consumed[window]
+            values[f"burn_intervals_{window}d"] = self.burn_intervals[window]
+            values[f"consumed_sq_{window}d"] = self.squares[window]
+        return values
+    
+    @classmethod
+    def from_rows(
+        cls,
+        product_id: UUID,
+        as_of_day: date,
+        last_quantity: Optional[int],
+        last_observed_at: Optional[datetime],
+        buckets: Iterable[Tuple[date, Sequence[int]]],
+        open_consumed: int = 0,
+        open_received: int = 0,
+    ) -> "ProductUsage":
+        """Rehydrate from a usage_statistics row and its daily buckets"""
+        usage = cls(product_id, as_of_day)
+        usage.last_quantity = last_quantity
+        usage.last_observed_at = last_observed_at
+        usage.open_consumed = open_consumed
+        usage.open_received = open_received
+        for day, bucket in buckets:
+            if 0 <= (as_of_day - day).days < HORIZON_DAYS:
+                usage.record(day, bucket)
+        return usage
+
+
+class Observation(BaseModel):
+    """A queued snapshot or consumption event"""
+    product_id: UUID
+    observed_at: datetime
+    quantity: Optional[int] = None  # snapshot
+    qty_delta: Optional[int] = None  # consumption event
+    
+    def apply(self, usage: ProductUsage) -> Optional[date]:
+        if self.quantity is not None:
+            return usage.observe_snapshot(self.observed_at, self.quantity)
+        return usage.observe_event(self.observed_at, self.qty_delta or 0)
+
+
+# ============================================
+# Worker
+# ============================================
+
+class UsageStatisticsWorker:
+    """
+    Background job keeping usage_statistics current.
+    
+    Writers call submit_snapshot / submit_consumption_event (non-blocking);
+    the worker drains the queue in batches, one transaction per batch.
+    Without a session factory, state is kept in memory only.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        batch_size: int = 500,
+        retry_delay: float = RETRY_DELAY_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self._states: Dict[UUID, ProductUsage] = {}
+        self._queue: "asyncio.Queue[Observation]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        # Day the states were last rolled forward to
+        self._rolled_day: date = datetime.utcnow().date()
+    
+    # ---------- Intake ----------
+    
+    def submit_snapshot(self, product_id: UUID, scanned_at: datetime, quantity: int) -> None:
+        """Queue a new inventory snapshot"""
+        self._queue.put_nowait(Observation(
+            product_id=product_id, observed_at=scanned_at, quantity=quantity,
+        ))
+    
+    def submit_consumption_event(self, product_id: UUID, recorded_at: datetime, qty_delta: int) -> None:
+        """Queue a new ConsumptionEvent"""
+        self._queue.put_nowait(Observation(
+            product_id=product_id, observed_at=recorded_at, qty_delta=qty_delta,
+        ))
+    
+    # ---------- Lifecycle ----------
+    
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Usage statistics worker started")
+    
+    async def stop(self) -> None:
+        """Drain pending observations, then stop"""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Usage statistics worker stopped")
+    
+    async def flush(self) -> None:
+        """Apply everything queued so far"""
+        if self._task is not None:
+            await self._queue.join()
+            return
+        while not self._queue.empty():
+            await self._apply_batch(self._take_batch())
+    
+    async def _run(self) -> None:
+        while True:
+            # Wake at midnight even without new data
+            try:
+                first = await asyncio.wait_for(self._queue.get(), timeout=_seconds_until_midnight())
+            except asyncio.TimeoutError:
+                first = None
+            
+            batch = []
+            if first is not None:
+                batch = [first] + self._take_batch(self.batch_size - 1, mark_done=False)
+                await self._apply_safely(batch)
+            
+            # Checked after every batch too, so a busy queue can't skip the roll-forward
+            today = datetime.utcnow().date()
+            if today > self._rolled_day:
+                await self._safely(self.roll_forward, "roll-forward")
+                self._rolled_day = today
+            
+            for _ in batch:
+                self._queue.task_done()
+    
+    async def _safely(self, job: Callable[[], Awaitable[Any]], name: str = "job") -> bool:
+        """Run a job, retrying with backoff. Returns False if every attempt failed."""
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                await job()
+                return True
+            except Exception as e:
+                logger.warning(f"Usage statistics {name} failed (attempt {attempt + 1}/{RETRY_ATTEMPTS}): {e}")
+                if attempt + 1 < RETRY_ATTEMPTS:
+                    await asyncio.sleep(self.retry_delay * 2 ** attempt)
+        return False
+    
+    async def _apply_safely(self, batch: List[Observation]) -> None:
+        if await self._safely(lambda: self.apply(batch), "batch"):
+            return
+        
+        # Still failing: apply product by product so one bad product doesn't lose the rest
+        by_product: Dict[UUID, List[Observation]] = {}
+        for observation in batch:
+            by_product.setdefault(observation.product_id, []).append(observation)
+        if len(by_product) == 1:
+            failed = list(by_product)
+        else:
+            failed = [
+                product_id
+                for product_id, observations in by_product.items()
+                if not await self._safely(lambda: self.apply(observations), f"update for {product_id}")
+            ]
+        if failed:
+            logger.error(
+                f"Usage statistics dropped updates for {len(failed)} products; "
+                f"repair with: python -m app.ml.usage_stats rebuild "
+                + " ".join(f"--product-id {product_id}" for product_id in failed)
+            )
+    
+    def _take_batch(self, limit: Optional[int] = None, mark_done: bool = True) -> List[Observation]:
+        batch = []
+        limit = self.batch_size if limit is None else limit
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+            if mark_done:
+                self._queue.task_done()
+        return batch
+    
+    async def _apply_batch(self, batch: List[Observation]) -> None:
+        if batch:
+            await self.apply(batch)
+    
+    # ---------- Updates ----------
+    
+    async def apply(self, observations: Sequence[Observation]) -> None:
+        """Apply observations in order, persisting touched products"""
+        if self.session_factory is None:
+            for observation in observations:
+                usage = self._states.get(observation.product_id)
+                if usage is None:
+                    usage = self._states[observation.product_id] = ProductUsage(
+                        observation.product_id, observation.observed_at.date(),
+                    )
+                observation.apply(usage)
+            return
+        
+        product_ids = {o.product_id for o in observations}
+        async with self.session_factory() as session:
+            states = await self._load_states(session, product_ids, lock=True)
+            touched: Dict[UUID, set] = {}
+            for observation in observations:
+                usage = states.get(observation.product_id)
+                if usage is None:
+                    usage = states[observation.product_id] = ProductUsage(
+                        observation.product_id, observation.observed_at.date(),
+                    )
+                day = observation.apply(usage)
+                touched.setdefault(observation.product_id, set())
+                if day is not None:
+                    touched[observation.product_id].add(day)
+            
+            await self._save_states(session, [states[pid] for pid in touched], touched)
+            await session.commit()
+    
+    async def roll_forward(self, as_of: Optional[datetime] = None) -> int:
+        """Evict aged-out buckets for every product. Returns products rolled."""
+        day = (as_of or datetime.utcnow()).date()
+        
+        if self.session_factory is None:
+            for usage in self._states.values():
+                usage.roll_to(day)
+            return len(self._states)
+        
+        from app.db.models import UsageStatistics
+        
+        rolled = 0
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(UsageStatistics.product_id).where(UsageStatistics.as_of_day < day)
+            )
+            stale = [row[0] for row in result]
+        
+        for i in range(0, len(stale), self.batch_size):
+            async with self.session_factory() as session:
+                states = await self._load_states(session, stale[i:i + self.batch_size], lock=True)
+                for usage in states.values():
+                    usage.roll_to(day)
+                await self._save_states(session, list(states.values()), {})
+                await session.commit()
+                rolled += len(states)
+        
+        logger.info(f"Rolled usage statistics forward to {day} for {rolled} products")
+        return rolled
+    
+    async def rebuild(
+        self,
+        product_ids: Optional[List[UUID]] = None,
+        as_of: Optional[datetime] = None,
+    ) -> int:
+        """
+        Recompute buckets and statistics from raw snapshots and consumption
+        events (backfill / repair). Returns products rebuilt.
+        """
+        as_of = as_of or datetime.utcnow()
+        day = as_of.date()
+        start = datetime.combine(day - timedelta(days=HORIZON_DAYS - 1), time.min)
+        
+        if self.session_factory is None:
+            # Nothing persisted to rebuild from; just realign in-memory state
+            return await self.roll_forward(as_of)
+        
+        from app.db.models import ConsumptionEvent, InventorySnapshot, UsageDailyBucket, UsageStatistics
+        
+        snapshots = select(
+            InventorySnapshot.product_id.label("product_id"),
+            InventorySnapshot.scanned_at.label("observed_at"),
+            InventorySnapshot.quantity.label("quantity"),
+            cast(null(), Integer).label("qty_delta"),
+        ).where(InventorySnapshot.scanned_at >= start, InventorySnapshot.scanned_at <= as_of)
+        events = select(
+            ConsumptionEvent.product_id,
+            ConsumptionEvent.recorded_at,
+            cast(null(), Integer),
+            ConsumptionEvent.qty_delta,
+        ).where(ConsumptionEvent.recorded_at >= start, ConsumptionEvent.recorded_at <= as_of)
+        if product_ids is not None:
+            snapshots = snapshots.where(InventorySnapshot.product_id.in_(product_ids))
+            events = events.where(ConsumptionEvent.product_id.in_(product_ids))
+        
+        combined = union_all(snapshots, events).subquery()
+        query = (
+            select(combined)
+            .order_by(combined.c.product_id, combined.c.observed_at)
+            .execution_options(yield_per=BULK_FETCH_SIZE)
+        )
+        
+        rebuilt: Dict[UUID, ProductUsage] = {}
+        async with self.session_factory() as session:
+            result = await session.stream(query)
+            async for rows in result.partitions(BULK_FETCH_SIZE):
+                for product_id, group in groupby(rows, key=itemgetter(0)):
+                    usage = rebuilt.get(product_id)
+                    for _, observed_at, quantity, qty_delta in group:
+                        if usage is None:
+                            usage = rebuilt[product_id] = ProductUsage(product_id, observed_at.date())
+                        if quantity is not None:
+                            usage.observe_snapshot(observed_at, quantity)
+                        else:
+                            usage.observe_event(observed_at, qty_delta)
+        
+        ids = list(rebuilt)
+        for i in range(0, len(ids), self.batch_size):
+            chunk = [rebuilt[pid] for pid in ids[i:i + self.batch_size]]
+            async with self.session_factory() as session:
+                for usage in chunk:
+                    usage.roll_to(day)
+                chunk_ids = [usage.product_id for usage in chunk]
+                await session.execute(
+                    delete(UsageDailyBucket)
+                    .where(UsageDailyBucket.product_id.in_(chunk_ids))
+                    .where(UsageDailyBucket.day >= start.date())
+                )
+                await session.execute(
+                    delete(UsageStatistics).where(UsageStatistics.product_id.in_(chunk_ids))
+                )
+                await self._save_states(session, chunk, {u.product_id: set(u.buckets) for u in chunk})
+                await session.commit()
+        
+        logger.info(f"Rebuilt usage statistics for {len(ids)} products as of {day}")
+        return len(ids)
+    
+    # ---------- Reads ----------
+    
+    async def get_summaries(
+        self,
+        product_ids: Sequence[UUID],
+        as_of: datetime,
+        db: Optional[AsyncSession] = None,
+    ) -> Dict[UUID, UsageSummary]:
+        """
+        Materialized summaries current as of `as_of`'s day.
+        
+        Products without a current row are omitted; callers fall back to
+        computing from raw snapshots.
+        """
+        day = as_of.date()
+        
+        if db is None:
+            summaries = {}
+            for product_id in product_ids:
+                usage = self._states.get(product_id)
+                if usage is None or usage.as_of_day > day:
+                    continue
+                usage.roll_to(day)
+                summaries[product_id] = usage.summary()
+            return summaries
+        
+        from app.db.models import UsageStatistics
+        
+        result = await db.execute(
+            select(UsageStatistics)
+            .where(UsageStatistics.product_id.in_(list(product_ids)))
+            .where(UsageStatistics.as_of_day == day)
+        )
+        return {row.product_id: UsageSummary.from_row(row) for row in result.scalars()}
+    
+    # ---------- Persistence ----------
+    
+    async def _load_states(
+        self,
+        session: AsyncSession,
+        product_ids: Iterable[UUID],
+        lock: bool = False,
+    ) -> Dict[UUID, ProductUsage]:
+        from app.db.models import UsageDailyBucket, UsageStatistics
+        
+        product_ids = list(product_ids)
+        query = select(
+            UsageStatistics.product_id,
+            UsageStatistics.as_of_day,
+            UsageStatistics.last_quantity,
+            UsageStatistics.last_observed_at,
+            UsageStatistics.open_consumed,
+            UsageStatistics.open_received,
+        ).where(UsageStatistics.product_id.in_(product_ids))
+        if lock:
+            # Serializes concurrent workers per product
+            query = query.with_for_update()
+        rows = (await session.execute(query)).all()
+        
+        stats = {row.product_id: row for row in rows if row.as_of_day is not None}
+        if not stats:
+            return {}
+        
+        oldest = min(row.as_of_day for row in stats.values()) - timedelta(days=HORIZON_DAYS - 1)
+        result = await session.execute(
+            select(
+                UsageDailyBucket.product_id,
+                UsageDailyBucket.day,
+                UsageDailyBucket.consumed,
+                UsageDailyBucket.received,
+                UsageDailyBucket.intervals,
+                UsageDailyBucket.burn_intervals,
+                UsageDailyBucket.consumed_sq,
+            )
+            .where(UsageDailyBucket.product_id.in_(list(stats)))
+            .where(UsageDailyBucket.day >= oldest)
+            .order_by(UsageDailyBucket.product_id, UsageDailyBucket.day)
+        )
+        buckets: Dict[UUID, List[Tuple[date, Sequence[int]]]] = {}
+        for product_id, day, *bucket in result:
+            buckets.setdefault(product_id, []).append((day, bucket))
+        
+        return {
+            product_id: ProductUsage.from_rows(
+                product_id, row.as_of_day, row.last_quantity, row.last_observed_at,
+                buckets.get(product_id, []), row.open_consumed, row.open_received,
+            )
+            for product_id, row in stats.items()
+        }
+    
+    async def _save_states(
+        self,
+        session: AsyncSession,
+        states: Sequence[ProductUsage],
+        touched_days: Dict[UUID, set],
+    ) -> None:
+        from sqlalchemy.dialects.postgresql import insert
+        from app.db.models import UsageDailyBucket, UsageStatistics
+        
+        bucket_rows = [
+            {
+                "product_id": usage.product_id,
+                "day": day,
+                "consumed": bucket[0],
+                "received": bucket[1],
+                "intervals": bucket[2],
+                "burn_intervals": bucket[3],
+                "consumed_sq": bucket[4],
+            }
+            for usage in states
+            for day in touched_days.get(usage.product_id, ())
+            if (bucket := usage.buckets.get(day)) is not None
+        ]
+        # Buckets roll_to evicted: older than the horizon of their product's as_of_day
+        evicted: Dict[date, List[UUID]] = {}
+        for usage in states:
+            cutoff = usage.as_of_day - timedelta(days=HORIZON_DAYS - 1)
+            evicted.setdefault(cutoff, []).append(usage.product_id)
+        for cutoff, product_ids in evicted.items():
+            await session.execute(
+                delete(UsageDailyBucket)
+                .where(UsageDailyBucket.product_id.in_(product_ids))
+                .where(UsageDailyBucket.day < cutoff)
+            )
+        
+        if bucket_rows:
+            stmt = insert(UsageDailyBucket).values(bucket_rows)
+            await session.execute(stmt.on_conflict_do_update(
+                index_elements=[UsageDailyBucket.product_id, UsageDailyBucket.day],
+                set_={
+                    name: stmt.excluded[name]
+                    for name in ("consumed", "received", "intervals", "burn_intervals", "consumed_sq")
+                },
+            ))
+        
+        if states:
+            stmt = insert(UsageStatistics).values([usage.to_row_values() for usage in states])
+            await session.execute(stmt.on_conflict_do_update(
+                index_elements=[UsageStatistics.product_id],
+                set_={
+                    name: stmt.excluded[name]
+                    for name in states[0].to_row_values()
+                    if name != "product_id"
+                },
+            ))
+
+
+def _seconds_until_midnight() -> float:
+    now = datetime.utcnow()
+    midnight = datetime.combine(now.date() + timedelta(days=1), time.min)
+    return max(1.0, (midnight - now).total_seconds())
+
+
+# ============================================
+# Singleton Instance
+# ============================================
+
+_worker_instance: Optional[UsageStatisticsWorker] = None
+
+
+def get_usage_worker() -> UsageStatisticsWorker:
+    """Get usage statistics worker instance"""
+    global _worker_instance
+    if _worker_instance is None:
+        from app.db.session import async_session_factory
+        _worker_instance = UsageStatisticsWorker(async_session_factory)
+    return _worker_instance
+
+
+# ============================================
+# Rebuild Command
+# ============================================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Usage statistics maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild = subparsers.add_parser("rebuild", help="Recompute from raw snapshots and consumption events")
+    rebuild.add_argument("--product-id", type=UUID, action="append", dest="product_ids")
+    subparsers.add_parser("roll", help="Roll all products forward to today")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    worker = get_usage_worker()
+    if args.command == "rebuild":
+        count = asyncio.run(worker.rebuild(args.product_ids))
+        print(f"rebuilt {count} products")
+    else:
+        count = asyncio.run(worker.roll_forward())
+        print(f"rolled {count} products")
+
+
+if __name__ == "__main__":
+    main()
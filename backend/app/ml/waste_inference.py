@@ -0,0 +1,408 @@
+"""
+PROVENIQ Ops - Batched Waste Image Inference
+
+Serves waste/spoilage image classification for many concurrent callers:
+- Requests queue up and are grouped into micro-batches, flushed when the
+  batch is full or the oldest request has waited max_delay_ms
+- Batches run on a CPU model (ONNX Runtime) in a worker process pool, so
+  inference never blocks the event loop
+- Results are cached by image content hash; identical images in flight
+  share one inference
+- A batch the model rejects is retried one image at a time, so an
+  undecodable upload fails only its own request
+
+One model call per batch amortizes per-call overhead and reads the model
+weights once for the whole batch, which is where CPU inference spends
+its time at batch size 1.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from decimal import Decimal
+from functools import partial
+from hashlib import sha256
+from typing import Callable, Dict, List, Optional, Protocol, Tuple, Union
+from uuid import UUID
+import asyncio
+import logging
+import os
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+from .interfaces import ClassificationResult, ml_interface
+
+logger = logging.getLogger(__name__)
+
+
+# Output order of every waste model
+WASTE_CLASSES = ("spoilage", "damage", "contamination", "mislabel", "acceptable")
+
+# Below this top-class probability the image goes to a person
+REVIEW_THRESHOLD = Decimal("0.6")
+
+BATCH_SIZE = metrics.histogram(
+    "waste_inference_batch_size",
+    "Images per waste classification model call",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+BATCH_DURATION = metrics.histogram(
+    "waste_inference_batch_duration_seconds",
+    "Time to classify one micro-batch of waste images",
+)
+
+
+class InvalidImageError(ValueError):
+    """The image bytes could not be decoded as a picture"""
+
+
+# ============================================
+# Models
+# ============================================
+
+class WasteImageModel(Protocol):
+    """A batch image classifier over WASTE_CLASSES"""
+    name: str
+    version: str
+    
+    def predict(self, images: List[bytes]) -> np.ndarray:
+        """Class probabilities, shape (len(images), len(WASTE_CLASSES))"""
+        ...
+
+
+class OnnxWasteModel:
+    """
+    ONNX Runtime classifier taking NCHW float32 RGB input.
+    
+    onnxruntime and Pillow are optional dependencies, imported when the
+    model is loaded (in the worker process).
+    """
+    
+    name = "onnx_waste_classifier"
+    
+    MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32).reshape(1, 3, 1, 1)
+    STD = np.array([0.229, 0.224, 0.225], dtype=np.float32).reshape(1, 3, 1, 1)
+    
+    def __init__(self, model_path: str, input_size: int = 224):
+        import onnxruntime
+        
+        options = onnxruntime.SessionOptions()
+        # Parallelism comes from the process pool; one thread per worker
+        options.intra_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.input_size = input_size
+        self.version = os.path.splitext(os.path.basename(model_path))[0]
+    
+    def _decode(self, data: bytes) -> np.ndarray:
+        from io import BytesIO
+        from PIL import Image
+        
+        try:
+            with Image.open(BytesIO(data)) as image:
+                rgb = image.convert("RGB").resize((self.input_size, self.input_size))
+        except Exception as e:
+            raise InvalidImageError(f"Undecodable image: {e}") from None
+        return np.asarray(rgb, dtype=np.float32)
+    
+    def _preprocess(self, images: List[bytes]) -> np.ndarray:
+        # Each image is decoded on its own, so the error names the bad one
+        pixels = np.stack([self._decode(data) for data in images])
+        batch = pixels.transpose(0, 3, 1, 2) / 255.0
+        return ((batch - self.MEAN) / self.STD).astype(np.float32)
+    
+    def predict(self, images: List[bytes]) -> np.ndarray:
+        logits = self.session.run(None, {self.input_name: self._preprocess(images)})[0]
+        shifted = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+ModelFactory = Callable[[], WasteImageModel]
+
+# (model name, model version, class probabilities)
+Prediction = Tuple[str, str, Tuple[float, ...]]
+
+# Per image: its prediction, or the error the model raised for it
+Outcome = Union[Prediction, Exception]
+
+
+def default_model_factory() -> Optional[ModelFactory]:
+    """The configured model, or None to keep the rule-based fallback"""
+    if not settings.WASTE_MODEL_PATH:
+        return None
+    return partial(OnnxWasteModel, settings.WASTE_MODEL_PATH)
+
+
+# ============================================
+# Worker Process
+# ============================================
+
+_worker_model: Optional[WasteImageModel] = None
+
+
+def _load_worker_model(factory: ModelFactory) -> None:
+    """Process pool initializer: load the model once per worker"""
+    global _worker_model
+    _worker_model = factory()
+
+
+def _predictions(images: List[bytes]) -> List[Prediction]:
+    probabilities = _worker_model.predict(images)
+    name, version = _worker_model.name, _worker_model.version
+    return [(name, version, tuple(row)) for row in probabilities.tolist()]
+
+
+def _predict_batch(images: List[bytes]) -> List[Outcome]:
+    """One outcome per image; a rejected batch is retried image by image"""
+    try:
+        return _predictions(images)
+    except Exception as e:
+        if len(images) == 1:
+            return [e]
+        logger.warning(f"Waste model rejected a batch of {len(images)}, retrying one at a time: {e}")
+    
+    outcomes: List[Outcome] = []
+    for image in images:
+        try:
+            outcomes.extend(_predictions([image]))
+        except Exception as e:
+            outcomes.append(e)
+    return outcomes
+
+
+# ============================================
+# Inference Service
+# ============================================
+
+class _Request:
+    __slots__ = ("image_hash", "image_data", "future")
+    
+    def __init__(self, image_hash: str, image_data: bytes, future: asyncio.Future):
+        self.image_hash = image_hash
+        self.image_data = image_data
+        self.future = future
+
+
+class WasteInferenceService:
+    """
+    Micro-batching front end for a waste image model.
+    
+    Up to `workers` batches run at once; while they do, the next batch
+    fills from the queue. With workers=0 the model runs in-process on a
+    thread (tests, single-core hosts).
+    """
+    
+    def __init__(
+        self,
+        model_factory: Optional[ModelFactory] = None,
+        max_batch_size: int = 32,
+        max_delay_ms: float = 10,
+        workers: Optional[int] = None,
+        cache_size: int = 10_000,
+    ):
+        self.model_factory = model_factory
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.cache_size = cache_size
+        
+        self._cache: "OrderedDict[str, Prediction]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight: set = set()
+        
+        self.requests = 0
+        self.cache_hits = 0
+        self.batches = 0
+        self.images = 0
+    
+    # ---------- Classification ----------
+    
+    async def classify(
+        self,
+        image_data: bytes,
+        product_id: Optional[UUID] = None,
+    ) -> ClassificationResult:
+        """Classify one image; waits for the batch it lands in"""
+        if self.model_factory is None:
+            return ml_interface.classify_waste_image(image_data, product_id)
+        
+        started = time.perf_counter()
+        self.requests += 1
+        image_hash = sha256(image_data).hexdigest()
+        
+        prediction = self._cache.get(image_hash)
+        if prediction is not None:
+            self._cache.move_to_end(image_hash)
+            self.cache_hits += 1
+        else:
+            future = self._pending.get(image_hash)
+            if future is None:
+                await self.start()
+                future = asyncio.get_running_loop().create_future()
+                self._pending[image_hash] = future
+                self._queue.put_nowait(_Request(image_hash, image_data, future))
+            # Shared with other callers of the same image; don't cancel it for them
+            prediction = await asyncio.shield(future)
+        
+        return _to_result(image_hash, prediction, started)
+    
+    async def classify_many(
+        self,
+        images: List[bytes],
+        product_id: Optional[UUID] = None,
+    ) -> List[ClassificationResult]:
+        """Classify several images, in order"""
+        return list(await asyncio.gather(*(self.classify(image, product_id) for image in images)))
+    
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "cached_images": len(self._cache),
+            "batches": self.batches,
+            "images": self.images,
+            "avg_batch_size": round(self.images / self.batches, 2) if self.batches else 0,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+        }
+    
+    # ---------- Batching ----------
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            await self._slots.acquire()
+            task = asyncio.create_task(self._infer(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+    
+    async def _infer(self, batch: List[_Request]) -> None:
+        started = time.perf_counter()
+        executor = self._executor
+        try:
+            outcomes = await asyncio.get_running_loop().run_in_executor(
+                executor, _predict_batch, [r.image_data for r in batch]
+            )
+        except Exception as e:
+            logger.error(f"Waste inference failed for a batch of {len(batch)}: {e}")
+            if isinstance(e, BrokenProcessPool) and executor is self._executor:
+                # Other batches on the broken pool fail too; only the first replaces it
+                self._executor = self._create_executor()
+                executor.shutdown(wait=False, cancel_futures=True)
+            for request in batch:
+                self._pending.pop(request.image_hash, None)
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+        
+        BATCH_SIZE.observe(len(batch))
+        BATCH_DURATION.observe(time.perf_counter() - started)
+        self.batches += 1
+        self.images += len(batch)
+        
+        for request, outcome in zip(batch, outcomes):
+            self._pending.pop(request.image_hash, None)
+            if isinstance(outcome, Exception):
+                if not request.future.done():
+                    request.future.set_exception(outcome)
+                continue
+            self._cache[request.image_hash] = outcome
+            if not request.future.done():
+                request.future.set_result(outcome)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+    
+    # ---------- Lifecycle ----------
+    
+    def _create_executor(self) -> Optional[Executor]:
+        if self.workers == 0:
+            # Default thread pool; the model lives in this process
+            _load_worker_model(self.model_factory)
+            return None
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_load_worker_model,
+            initargs=(self.model_factory,),
+        )
+    
+    async def start(self) -> None:
+        if self._task is None and self.model_factory is not None:
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(max(1, self.workers))
+            self._executor = self._create_executor()
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Waste inference started ({self.workers} workers, batch {self.max_batch_size})")
+    
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("Waste inference stopped"))
+        self._pending.clear()
+        self._task = None
+        self._executor = None
+        self._queue = None
+        logger.info("Waste inference stopped")
+
+
+def _to_result(image_hash: str, prediction: Prediction, started: float) -> ClassificationResult:
+    name, version, probabilities = prediction
+    best = max(range(len(WASTE_CLASSES)), key=probabilities.__getitem__)
+    confidence = Decimal(str(round(probabilities[best], 4)))
+    return ClassificationResult(
+        model_version=version,
+        predicted_class=WASTE_CLASSES[best] if confidence >= REVIEW_THRESHOLD else "requires_human_review",
+        confidence=min(confidence, Decimal("1")),
+        class_probabilities={c: round(p, 4) for c, p in zip(WASTE_CLASSES, probabilities)},
+        model_used=name,
+        classification_time_ms=int((time.perf_counter() - started) * 1000),
+        image_hash=image_hash[:16],
+    )
+
+
+# ============================================
+# Singleton Instance
+# ============================================
+
+_inference_instance: Optional[WasteInferenceService] = None
+
+
+def get_waste_inference() -> WasteInferenceService:
+    """Get waste inference service instance"""
+    global _inference_instance
+    if _inference_instance is None:
+        _inference_instance = WasteInferenceService(default_model_factory())
+    return _inference_instance
@@ -10,7 +10,7 @@ import uuid
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
-from typing import Literal, Optional
+from typing import Annotated, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
@@ -109,6 +109,22 @@ class ProductRead(ProductBase):
     updated_at: datetime
 
 
+MAX_BARCODE_RESOLVE = 1_000
+
+
+class BarcodeResolveRequest(BaseModel):
+    """Barcodes to resolve in one call (e.g. everything a scan pass read)."""
+    barcodes: list[Annotated[str, Field(min_length=1, max_length=100)]] = Field(
+        ..., min_length=1, max_length=MAX_BARCODE_RESOLVE
+    )
+
+
+class BarcodeResolveResult(BaseModel):
+    """Resolved products keyed by barcode; unknown barcodes in request order."""
+    products: dict[str, ProductRead]
+    missing: list[str]
+
+
 # =============================================================================
 # VENDOR PRODUCT SCHEMAS
 # =============================================================================
@@ -162,6 +178,30 @@ class InventorySnapshotRead(InventorySnapshotCreate):
     scanned_at: datetime
 
 
+MAX_BULK_SNAPSHOTS = 10_000
+
+
+class InventorySnapshotBulkCreate(BaseModel):
+    """Bulk snapshot payload (e.g. one full-shelf scan)."""
+    snapshots: list[InventorySnapshotCreate] = Field(..., min_length=1, max_length=MAX_BULK_SNAPSHOTS)
+
+
+class SnapshotRowStatus(BaseModel):
+    """Outcome of one row of a bulk snapshot request."""
+    index: int
+    status: Literal["created", "rejected"]
+    snapshot_id: Optional[uuid.UUID] = None
+    error: Optional[str] = None
+
+
+class InventorySnapshotBulkResult(BaseModel):
+    """Bulk snapshot response; results are in request order."""
+    created: int
+    rejected: int
+    scanned_at: datetime
+    results: list[SnapshotRowStatus]
+
+
 # =============================================================================
 # ORDER SCHEMAS
 # =============================================================================
@@ -213,6 +253,7 @@ class OrderRead(BaseModel):
     created_at: datetime
     updated_at: datetime
     submitted_at: Optional[datetime] = None
+    delivered_at: Optional[datetime] = None
     items: list[OrderItemRead] = []
 
 
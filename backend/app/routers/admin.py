@@ -1,13 +1,14 @@
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.query_stats import query_stats
 from app.models.user import User
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -78,3 +79,36 @@ async def bootstrap_user(
     await db.refresh(user)
 
     return {"status": "created", "user_id": str(user.id)}
+
+
+def require_admin_key(x_admin_key: Optional[str] = Header(default=None, alias="X-Admin-Key")) -> None:
+    # Without a configured key, diagnostics are open in DEBUG only
+    if not settings.ADMIN_API_KEY:
+        if settings.DEBUG:
+            return
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="ADMIN_API_KEY not configured",
+        )
+    if x_admin_key != settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin key")
+
+
+@router.get("/query-stats", dependencies=[Depends(require_admin_key)])
+async def get_query_stats(
+    sort: str = Query("db_time_ms", pattern="^(db_time_ms|avg_db_time_ms|queries|avg_queries|max_queries|slow_queries|n_plus_one_requests|requests)$"),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Per-route query counts, DB time, slow queries and likely N+1 statements."""
+    return {
+        "enabled": settings.query_stats_enabled,
+        "slow_query_ms": settings.DB_SLOW_QUERY_MS,
+        "n_plus_one_threshold": settings.DB_N_PLUS_ONE_THRESHOLD,
+        "routes": query_stats.report(sort, limit),
+    }
+
+
+@router.delete("/query-stats", dependencies=[Depends(require_admin_key)])
+async def reset_query_stats():
+    query_stats.reset()
+    return {"status": "reset"}
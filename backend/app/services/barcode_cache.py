@@ -0,0 +1,213 @@
+"""
+PROVENIQ Ops - Barcode Resolution Cache
+
+Scanners resolve a barcode for every item they read. The barcode ->
+product map is small and changes rarely, so it is held in process:
+- Warmed at startup with every barcoded product (the partial
+  idx_products_barcode index covers exactly those rows)
+- Misses fall through to the database, many barcodes in one query
+- Product writes committed through the ORM invalidate their entries,
+  including bulk UPDATE/DELETE statements on products
+
+Unknown barcodes are not cached, so a product created after a failed
+scan resolves on the next one.
+"""
+
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set
+from uuid import UUID
+import logging
+
+from sqlalchemy import String, any_, bindparam, event, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.db.models import Product
+from app.models.schemas import ProductRead
+
+logger = logging.getLogger(__name__)
+
+
+# session.info key for product writes awaiting commit
+PENDING_KEY = "barcode_cache_pending"
+
+
+class BarcodeCache:
+    """
+    In-process barcode -> product map.
+    
+    A generation counter guards against a lookup that started before an
+    invalidation writing its (stale) result back afterwards.
+    """
+    
+    def __init__(self, session_factory: Optional[async_sessionmaker] = None):
+        self.session_factory = session_factory
+        self._products: Dict[str, ProductRead] = {}
+        self._barcodes: Dict[UUID, str] = {}
+        self._generation = 0
+        self.warmed_at: Optional[datetime] = None
+        
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    # ---------- Lookup ----------
+    
+    async def resolve(self, db: AsyncSession, barcodes: Iterable[str]) -> Dict[str, ProductRead]:
+        """Products for the given barcodes; unknown barcodes are left out"""
+        found: Dict[str, ProductRead] = {}
+        missing: List[str] = []
+        for barcode in dict.fromkeys(barcodes):
+            product = self._products.get(barcode)
+            if product is not None:
+                found[barcode] = product
+            else:
+                missing.append(barcode)
+        self.hits += len(found)
+        self.misses += len(missing)
+        
+        if missing:
+            generation = self._generation
+            result = await db.execute(
+                select(Product).where(
+                    Product.barcode == any_(bindparam("barcodes", missing, type_=ARRAY(String)))
+                )
+            )
+            loaded = [ProductRead.model_validate(p) for p in result.scalars()]
+            if generation == self._generation:
+                self._store(loaded)
+            found.update((product.barcode, product) for product in loaded)
+        return found
+    
+    def get_stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "barcodes": len(self._products),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+            "invalidations": self.invalidations,
+            "warmed_at": self.warmed_at.isoformat() if self.warmed_at else None,
+        }
+    
+    # ---------- Maintenance ----------
+    
+    async def warm(self) -> int:
+        """
+        Load every barcoded product. Leaves the cache cold (lookups fall
+        through to the database) if the database is unreachable.
+        """
+        if self.session_factory is None:
+            return 0
+        generation = self._generation
+        try:
+            async with self.session_factory() as session:
+                result = await session.execute(select(Product).where(Product.barcode.isnot(None)))
+                loaded = [ProductRead.model_validate(p) for p in result.scalars()]
+        except Exception as e:
+            logger.warning(f"Barcode cache not warmed: {e}")
+            return 0
+        
+        if generation != self._generation:
+            # A product write landed mid-load; lookups fill the cache instead
+            return 0
+        self._store(loaded)
+        self.warmed_at = datetime.now(timezone.utc)
+        logger.info(f"Barcode cache warmed with {len(loaded)} products")
+        return len(loaded)
+    
+    def invalidate(self, product_ids: Iterable[UUID] = (), barcodes: Iterable[str] = ()) -> None:
+        """Drop entries by product (its cached barcode) and by barcode"""
+        self._generation += 1
+        self.invalidations += 1
+        for product_id in product_ids:
+            barcode = self._barcodes.pop(product_id, None)
+            if barcode is not None:
+                self._products.pop(barcode, None)
+        for barcode in barcodes:
+            product = self._products.pop(barcode, None)
+            if product is not None:
+                self._barcodes.pop(product.id, None)
+    
+    def clear(self) -> None:
+        self._generation += 1
+        self.invalidations += 1
+        self._products.clear()
+        self._barcodes.clear()
+    
+    def _store(self, products: Iterable[ProductRead]) -> None:
+        for product in products:
+            previous = self._barcodes.get(product.id)
+            if previous is not None and previous != product.barcode:
+                self._products.pop(previous, None)
+            self._products[product.barcode] = product
+            self._barcodes[product.id] = product.barcode
+
+
+# ============================================
+# ORM Invalidation
+# ============================================
+
+class _PendingWrites:
+    __slots__ = ("product_ids", "barcodes", "clear_all")
+    
+    def __init__(self):
+        self.product_ids: Set[UUID] = set()
+        self.barcodes: Set[str] = set()
+        self.clear_all = False
+
+
+def _pending(session: Session) -> _PendingWrites:
+    return session.info.setdefault(PENDING_KEY, _PendingWrites())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_product_writes(session: Session, flush_context) -> None:
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Product):
+            pending = _pending(session)
+            pending.product_ids.add(obj.id)
+            if obj.barcode is not None:
+                pending.barcodes.add(obj.barcode)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_product_writes(state: ORMExecuteState) -> None:
+    if (state.is_update or state.is_delete) and state.bind_mapper is not None \
+            and state.bind_mapper.class_ is Product:
+        _pending(state.session).clear_all = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_product_writes(session: Session) -> None:
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending is None or _cache_instance is None:
+        return
+    if pending.clear_all:
+        _cache_instance.clear()
+    else:
+        _cache_instance.invalidate(pending.product_ids, pending.barcodes)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_product_writes(session: Session, previous_transaction) -> None:
+    session.info.pop(PENDING_KEY, None)
+
+
+# ============================================
+# Singleton Instance
+# ============================================
+
+_cache_instance: Optional[BarcodeCache] = None
+
+
+def get_barcode_cache() -> BarcodeCache:
+    """Get barcode cache instance"""
+    global _cache_instance
+    if _cache_instance is None:
+        # Primary, not replica: a lagging replica could refill an invalidated entry
+        from app.db.session import primary_read_session_factory
+        _cache_instance = BarcodeCache(primary_read_session_factory)
+    return _cache_instance
@@ -0,0 +1,150 @@
+"""
+PROVENIQ Ops - Current Inventory Read Model
+
+current_inventory holds the latest snapshot per product so "what is on
+hand now" never scans snapshot history:
+- Upserted in the same transaction as each snapshot write
+- Out-of-order scans (older scanned_at) never replace a newer row
+- Below-par is one join of products against it, filterable by category
+  and location, in one round trip whatever the catalog size
+
+The LATERAL variant reads the latest snapshot per product directly, for
+checking the read model or for databases not yet migrated.
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+import uuid
+
+from sqlalchemy import Select, and_, func, select, true
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import CurrentInventory, InventorySnapshot, Product
+
+
+# ============================================
+# Maintenance
+# ============================================
+
+# Snapshot columns carried into current_inventory
+SNAPSHOT_FIELDS = ("id", "product_id", "quantity", "confidence_score", "scanned_at", "location_tag")
+
+
+def snapshot_row(snapshot: InventorySnapshot) -> Dict[str, Any]:
+    """Column values of a flushed snapshot"""
+    return {field: getattr(snapshot, field) for field in SNAPSHOT_FIELDS}
+
+
+def latest_per_product(snapshots: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    current_inventory rows for the newest of each product's snapshots,
+    ordered by product. On equal scan times the later snapshot wins.
+    """
+    latest: Dict[uuid.UUID, Mapping[str, Any]] = {}
+    for snapshot in snapshots:
+        current = latest.get(snapshot["product_id"])
+        if current is None or snapshot["scanned_at"] >= current["scanned_at"]:
+            latest[snapshot["product_id"]] = snapshot
+    
+    # Product order keeps row locks consistent across concurrent writers
+    return [
+        {
+            "product_id": product_id,
+            "snapshot_id": s["id"],
+            "quantity": s["quantity"],
+            "confidence_score": s["confidence_score"],
+            "scanned_at": s["scanned_at"],
+            "location_tag": s["location_tag"],
+        }
+        for product_id, s in sorted(latest.items())
+    ]
+
+
+async def upsert_current_inventory(db: AsyncSession, snapshots: Iterable[Mapping[str, Any]]) -> int:
+    """
+    Apply snapshot rows (SNAPSHOT_FIELDS) to current_inventory in one statement.
+    
+    Returns the number of products touched.
+    """
+    rows = latest_per_product(snapshots)
+    if not rows:
+        return 0
+    
+    # executemany: batched into multi-row INSERTs by the driver layer
+    stmt = insert(CurrentInventory)
+    excluded = stmt.excluded
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[CurrentInventory.product_id],
+        set_={
+            "snapshot_id": excluded.snapshot_id,
+            "quantity": excluded.quantity,
+            "confidence_score": excluded.confidence_score,
+            "scanned_at": excluded.scanned_at,
+            "location_tag": excluded.location_tag,
+            "updated_at": func.now(),
+        },
+        where=CurrentInventory.scanned_at <= excluded.scanned_at,
+    ), rows)
+    return len(rows)
+
+
+# ============================================
+# Queries
+# ============================================
+
+def below_par_query(
+    risk_category: Optional[str] = None,
+    location_tag: Optional[str] = None,
+    from_snapshots: bool = False,
+) -> Select:
+    """
+    Products whose latest quantity is below par, largest shortage first.
+    
+    Products never scanned count as zero on hand (and have no location,
+    so a location filter excludes them).
+    """
+    if from_snapshots:
+        latest = (
+            select(
+                InventorySnapshot.quantity,
+                InventorySnapshot.confidence_score,
+                InventorySnapshot.scanned_at,
+                InventorySnapshot.location_tag,
+            )
+            .where(InventorySnapshot.product_id == Product.id)
+            .order_by(InventorySnapshot.scanned_at.desc(), InventorySnapshot.id.desc())
+            .limit(1)
+            .lateral("latest")
+        )
+        join_on = true()
+    else:
+        latest = CurrentInventory.__table__
+        join_on = latest.c.product_id == Product.id
+    
+    current_qty = func.coalesce(latest.c.quantity, 0)
+    shortage = Product.par_level - current_qty
+    
+    conditions = [current_qty < Product.par_level]
+    if risk_category:
+        conditions.append(Product.risk_category == risk_category)
+    if location_tag:
+        conditions.append(latest.c.location_tag == location_tag)
+    
+    return (
+        select(
+            Product.id,
+            Product.name,
+            Product.barcode,
+            Product.par_level,
+            Product.risk_category,
+            current_qty.label("current_quantity"),
+            shortage.label("shortage"),
+            latest.c.confidence_score,
+            latest.c.scanned_at,
+            latest.c.location_tag,
+        )
+        .select_from(Product)
+        .outerjoin(latest, join_on)
+        .where(and_(*conditions))
+        .order_by(shortage.desc(), Product.name)
+    )
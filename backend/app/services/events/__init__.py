@@ -3,6 +3,7 @@ PROVENIQ Ops - Event Services
 Central event bus integration per INTER_APP_CONTRACT.md
 """
 
+from app.services.events.bus import BackpressurePolicy, EventLog, Subscription
 from app.services.events.publisher import (
     EventPayload,
     EventPublisher,
@@ -11,6 +12,9 @@ from app.services.events.publisher import (
 )
 
 __all__ = [
+    "BackpressurePolicy",
+    "EventLog",
+    "Subscription",
     "EventPayload",
     "EventPublisher",
     "OpsEventType",
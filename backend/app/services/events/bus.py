@@ -0,0 +1,270 @@
+"""
+PROVENIQ Ops - Event Bus Fan-out
+
+Delivery side of the EventPublisher:
+- Each subscriber gets a bounded queue and its own worker task, so a
+  slow handler delays only its own events, not the publisher or other
+  subscribers
+- A full queue is handled per subscriber by its backpressure policy:
+  block the publisher, drop the oldest queued event, or spill overflow
+  to a local file and feed it back in order as the queue drains (file
+  I/O runs in a worker thread, off the event loop)
+- Lag (publish to handler start) and queue depth are exported per
+  subscriber
+
+The event log is a ring buffer with a per-type index, so lookups by
+type touch only events of that type.
+"""
+
+from collections import deque
+from enum import Enum
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import re
+import time
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.spool import FileSpool
+
+logger = logging.getLogger(__name__)
+
+
+Handler = Callable[[Any], Awaitable[None]]
+
+SUBSCRIBER_LAG = metrics.histogram(
+    "event_subscriber_lag_seconds",
+    "Time from publish until the subscriber's handler started on the event",
+    ("event_type", "subscriber"),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+SUBSCRIBER_DEPTH = metrics.gauge(
+    "event_subscriber_queue_depth",
+    "Events waiting for a subscriber (queued and spilled)",
+    ("event_type", "subscriber"),
+)
+
+
+class BackpressurePolicy(str, Enum):
+    """What publish does when a subscriber's queue is full"""
+    BLOCK = "block"  # Wait for room: lossless, but the publisher slows to the subscriber
+    DROP_OLDEST = "drop_oldest"  # Discard the oldest queued event
+    SPILL = "spill"  # Append to the subscriber's spill file
+
+
+def handler_name(handler: Handler) -> str:
+    return getattr(handler, "__qualname__", None) or type(handler).__name__
+
+
+# ============================================
+# Subscription
+# ============================================
+
+class Subscription:
+    """One handler's queue and worker for one event type"""
+    
+    def __init__(
+        self,
+        event_type: str,
+        handler: Handler,
+        load: Callable[[Dict[str, Any]], Any],
+        queue_size: int = settings.EVENT_QUEUE_SIZE,
+        policy: BackpressurePolicy = BackpressurePolicy(settings.EVENT_BACKPRESSURE),
+        spill_dir: str = settings.EVENT_SPILL_DIR,
+    ):
+        self.event_type = event_type
+        self.handler = handler
+        self.name = handler_name(handler)
+        self.policy = BackpressurePolicy(policy)
+        self._load = load
+        self._queue: "asyncio.Queue[Tuple[Any, float]]" = asyncio.Queue(maxsize=queue_size)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._blocked = 0
+        self._spilling = 0
+        self._handling = 0
+        self._spool_lock = asyncio.Lock()
+        
+        self.spool: Optional[FileSpool] = None
+        if self.policy is BackpressurePolicy.SPILL:
+            filename = re.sub(r"[^\w.-]", "_", f"{event_type}.{self.name}") + ".ndjson"
+            # Overflow only: the handlers are in-process, so nothing is replayed across restarts
+            self.spool = FileSpool(str(Path(spill_dir) / filename), fsync=False)
+            self.spool.clear()
+        
+        self.delivered = 0
+        self.failed = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.last_lag = 0.0
+    
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() + (self.spool.pending if self.spool else 0)
+    
+    @property
+    def undelivered(self) -> int:
+        """Waiting events plus the one the handler is working on"""
+        return self.depth + self._handling
+    
+    # ---------- Publishing Side ----------
+    
+    async def offer(self, event: Any) -> None:
+        """Hand an event to this subscriber according to its policy"""
+        self._ensure_worker()
+        item = (event, time.monotonic())
+        if self.spool is not None and (self.spool.pending or self._spilling):
+            # Older events are spilled; queueing this one would overtake them
+            await self._spill(item)
+        elif not self._queue.full() and not self._blocked:
+            self._queue.put_nowait(item)
+        elif self.policy is BackpressurePolicy.BLOCK:
+            # Publishers already waiting go first, so order is kept
+            self._blocked += 1
+            try:
+                await self._queue.put(item)
+            finally:
+                self._blocked -= 1
+        elif self.policy is BackpressurePolicy.DROP_OLDEST:
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self.dropped += 1
+            self._queue.put_nowait(item)
+        else:
+            await self._spill(item)
+        SUBSCRIBER_DEPTH.set(self.depth, event_type=self.event_type, subscriber=self.name)
+    
+    async def _spill(self, item: Tuple[Any, float]) -> None:
+        event, published = item
+        record = {"event": event.model_dump(mode="json"), "published": published}
+        # Counted before the write so later offers queue behind it, not ahead
+        self._spilling += 1
+        try:
+            async with self._spool_lock:
+                await asyncio.to_thread(self.spool.append, [record])
+        finally:
+            self._spilling -= 1
+        self.spilled += 1
+    
+    # ---------- Worker ----------
+    
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done():
+            return
+        if self._loop is not loop:
+            # Queues belong to one loop; carry waiting events over to this one
+            pending = []
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            self._queue = asyncio.Queue(maxsize=self._queue.maxsize)
+            for item in pending:
+                self._queue.put_nowait(item)
+            self._spool_lock = asyncio.Lock()
+            self._loop = loop
+        self._task = loop.create_task(self._run())
+    
+    async def _run(self) -> None:
+        while True:
+            event, published = await self._queue.get()
+            self._handling = 1
+            try:
+                self.last_lag = time.monotonic() - published
+                SUBSCRIBER_LAG.observe(self.last_lag, event_type=self.event_type, subscriber=self.name)
+                await self.handler(event)
+                self.delivered += 1
+            except Exception as e:
+                # Log but don't stop delivering on subscriber errors
+                self.failed += 1
+                logger.warning(f"Event subscriber {self.name} failed on {self.event_type}: {e}")
+            finally:
+                self._handling = 0
+                # Refill before task_done so drain() never sees an empty queue with spilled events
+                await self._refill()
+                self._queue.task_done()
+                SUBSCRIBER_DEPTH.set(self.depth, event_type=self.event_type, subscriber=self.name)
+    
+    async def _refill(self) -> None:
+        """Move spilled events back into the queue as room frees up"""
+        if self.spool is None or not self.spool.pending:
+            return
+        async with self._spool_lock:
+            # While the spool holds events, offers spill rather than queue, so the room stays free
+            room = self._queue.maxsize - self._queue.qsize()
+            if room <= 0:
+                return
+            entries = await asyncio.to_thread(self.spool.read, room)
+            for _, record in entries:
+                self._queue.put_nowait((self._load(record["event"]), record["published"]))
+            if entries:
+                await asyncio.to_thread(self.spool.commit, entries[-1][0], len(entries))
+    
+    async def drain(self) -> None:
+        """Wait until every queued and spilled event has been handled"""
+        if self._task is not None and not self._task.done():
+            await self._queue.join()
+    
+    def close(self) -> None:
+        """Stop the worker, discarding anything still waiting"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.spool is not None:
+            self.spool.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "event_type": self.event_type,
+            "subscriber": self.name,
+            "policy": self.policy.value,
+            "queued": self._queue.qsize(),
+            "spooled": self.spool.pending if self.spool else 0,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "last_lag_ms": round(self.last_lag * 1000, 2),
+        }
+
+
+# ============================================
+# Event Log
+# ============================================
+
+class EventLog:
+    """
+    The most recent events, oldest evicted first, indexed by type.
+    
+    Events leave the log in publish order, so an evicted event is always
+    the oldest of its type and the index stays in step with a popleft.
+    """
+    
+    def __init__(self, max_events: int = settings.EVENT_LOG_SIZE):
+        self.max_events = max_events
+        self._events: Deque[Any] = deque()
+        self._by_type: Dict[str, Deque[Any]] = {}
+    
+    def append(self, event: Any) -> None:
+        if len(self._events) >= self.max_events:
+            evicted = self._events.popleft()
+            of_type = self._by_type[evicted.event_type]
+            of_type.popleft()
+            if not of_type:
+                del self._by_type[evicted.event_type]
+        self._events.append(event)
+        self._by_type.setdefault(event.event_type, deque()).append(event)
+    
+    def all(self) -> List[Any]:
+        return list(self._events)
+    
+    def of_type(self, event_type: str) -> List[Any]:
+        return list(self._by_type.get(event_type, ()))
+    
+    def clear(self) -> None:
+        self._events.clear()
+        self._by_type.clear()
+    
+    def __len__(self) -> int:
+        return len(self._events)
@@ -14,8 +14,13 @@ Ops MUST Publish:
     - ops.shrinkage.detected
     - ops.order.queued
     - ops.excess.flagged
+
+Subscribers are called from their own bounded queues (see bus.py), so
+publish returns once the event is logged and queued.
 """
 
+import asyncio
+import logging
 import os
 import uuid
 from datetime import datetime
@@ -23,9 +28,14 @@ from decimal import Decimal
 from enum import Enum
 from typing import Any, Optional
 
-import httpx
 from pydantic import BaseModel, Field
 
+from app.core.config import settings
+from app.core.http import get_http_clients
+from app.services.events.bus import BackpressurePolicy, EventLog, Handler, Subscription
+
+logger = logging.getLogger(__name__)
+
 
 class OpsEventType(str, Enum):
     """Ops event types per contract."""
@@ -126,15 +136,23 @@ class EventPublisher:
     - Google Pub/Sub
     - AWS SNS/SQS
     
-    For now, it logs events for testing and debugging.
-    Events are also forwarded to Ledger mock for storage.
+    For now, it keeps the most recent events for testing and debugging
+    and fans them out to in-process subscribers.
+    Shrinkage events are also forwarded to ClaimsIQ when configured.
     """
     
     def __init__(self) -> None:
-        self._event_log: list[EventPayload] = []
-        self._subscribers: dict[str, list[callable]] = {}
+        self._event_log = EventLog()
+        self._subscribers: dict[str, list[Subscription]] = {}
         self.claimsiq_url = os.getenv("CLAIMSIQ_API_URL")
         self.claimsiq_token = os.getenv("CLAIMSIQ_SERVICE_TOKEN")
+        if self.claimsiq_url:
+            # Spill rather than block: a slow ClaimsIQ must not hold up publishers
+            self.subscribe(
+                OpsEventType.SHRINKAGE_DETECTED.value,
+                self._forward_shrinkage_to_claimsiq,
+                policy=BackpressurePolicy.SPILL,
+            )
     
     async def publish(
         self,
@@ -165,35 +183,76 @@ class EventPublisher:
         # Log event
         self._event_log.append(event)
         
-        # Notify subscribers
-        await self._notify_subscribers(event)
+        # Queue for subscribers (waits only under the block policy with a full queue)
+        for subscription in list(self._subscribers.get(event.event_type, ())):
+            await subscription.offer(event)
         
         return event
     
-    async def _notify_subscribers(self, event: EventPayload) -> None:
-        """Notify all subscribers of an event."""
-        handlers = self._subscribers.get(event.event_type, [])
-        for handler in handlers:
-            try:
-                if callable(handler):
-                    await handler(event)
-            except Exception as e:
-                # Log but don't fail on subscriber errors
-                pass
-    
-    def subscribe(self, event_type: str, handler: callable) -> None:
-        """Subscribe to an event type."""
-        if event_type not in self._subscribers:
-            self._subscribers[event_type] = []
-        self._subscribers[event_type].append(handler)
+    def subscribe(
+        self,
+        event_type: str,
+        handler: Handler,
+        queue_size: Optional[int] = None,
+        policy: Optional[BackpressurePolicy] = None,
+    ) -> Subscription:
+        """
+        Subscribe to an event type.
+        
+        The handler runs in its own worker, one event at a time in publish
+        order. queue_size and policy default to EVENT_QUEUE_SIZE and
+        EVENT_BACKPRESSURE.
+        """
+        options = {}
+        if queue_size is not None:
+            options["queue_size"] = queue_size
+        if policy is not None:
+            options["policy"] = policy
+        subscription = Subscription(event_type, handler, EventPayload.model_validate, **options)
+        self._subscribers.setdefault(event_type, []).append(subscription)
+        return subscription
     
-    def unsubscribe(self, event_type: str, handler: callable) -> None:
-        """Unsubscribe from an event type."""
+    def unsubscribe(self, event_type: str, handler: Handler) -> None:
+        """Unsubscribe from an event type, discarding its undelivered events."""
+        for subscription in self._subscribers.get(event_type, []):
+            if subscription.handler == handler:
+                subscription.close()
         if event_type in self._subscribers:
             self._subscribers[event_type] = [
-                h for h in self._subscribers[event_type] if h != handler
+                s for s in self._subscribers[event_type] if s.handler != handler
             ]
     
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every subscriber has handled everything published so far.
+        
+        With a timeout, gives up after that many seconds, logs what each
+        subscriber still holds and returns False.
+        """
+        subscriptions = [s for subs in self._subscribers.values() for s in subs]
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(subscription.drain() for subscription in subscriptions)),
+                timeout,
+            )
+            return True
+        except asyncio.TimeoutError:
+            for subscription in subscriptions:
+                if subscription.undelivered:
+                    logger.warning(
+                        f"Event subscriber {subscription.name} on {subscription.event_type}: "
+                        f"{subscription.undelivered} events undelivered after {timeout}s"
+                    )
+            return False
+    
+    async def stop(self, timeout: float = settings.EVENT_DRAIN_TIMEOUT) -> None:
+        """Deliver what is queued (for up to timeout seconds), then stop the subscriber workers."""
+        if not await self.drain(timeout):
+            logger.warning("Stopping event subscribers; undelivered events are discarded")
+        for subscriptions in self._subscribers.values():
+            for subscription in subscriptions:
+                subscription.close()
+    
     # =========================================================================
     # CONVENIENCE METHODS FOR OPS EVENTS
     # =========================================================================
@@ -292,14 +351,11 @@ class EventPublisher:
             variance=variance,
             variance_value_micros=variance_value,
         )
-        event = await self.publish(
+        # Forwarded to ClaimsIQ by its subscriber when configured
+        return await self.publish(
             OpsEventType.SHRINKAGE_DETECTED,
             payload.model_dump(mode="json"),
         )
-
-        # Forward to ClaimsIQ ingestion endpoint (fire-and-forget)
-        await self._forward_shrinkage_to_claimsiq(event)
-        return event
     
     async def publish_order_queued(
         self,
@@ -356,29 +412,31 @@ class EventPublisher:
     # =========================================================================
     
     def get_event_log(self) -> list[dict]:
-        """Return event log for debugging."""
-        return [e.model_dump(mode="json") for e in self._event_log]
+        """Return event log (most recent EVENT_LOG_SIZE events) for debugging."""
+        return [e.model_dump(mode="json") for e in self._event_log.all()]
     
     def get_events_by_type(self, event_type: str) -> list[dict]:
-        """Get events filtered by type."""
-        return [
-            e.model_dump(mode="json") 
-            for e in self._event_log 
-            if e.event_type == event_type
-        ]
+        """Get logged events of one type."""
+        return [e.model_dump(mode="json") for e in self._event_log.of_type(event_type)]
     
     def clear_log(self) -> None:
         """Clear event log."""
         self._event_log.clear()
+    
+    def get_subscriber_stats(self) -> list[dict]:
+        """Queue depth, lag and delivery counts per subscriber."""
+        return [
+            subscription.get_stats()
+            for subscriptions in self._subscribers.values()
+            for subscription in subscriptions
+        ]
 
     # =========================================================================
     # FORWARDERS
     # =========================================================================
 
     async def _forward_shrinkage_to_claimsiq(self, event: EventPayload) -> None:
-        """Forward shrinkage event to ClaimsIQ ingest endpoint if configured."""
-        if not self.claimsiq_url:
-            return
+        """Forward shrinkage event to ClaimsIQ ingest endpoint."""
         try:
             url = self.claimsiq_url.rstrip("/") + "/v1/claimsiq/claims/shrinkage"
             headers = {
@@ -387,8 +445,8 @@ class EventPublisher:
             }
             if self.claimsiq_token:
                 headers["Authorization"] = f"Bearer {self.claimsiq_token}"
-            async with httpx.AsyncClient(timeout=5) as client:
-                await client.post(url, json=event.model_dump(mode="json"), headers=headers)
+            client = get_http_clients().get(url)
+            await client.post(url, json=event.model_dump(mode="json"), headers=headers)
         except Exception:
             # swallow failures to avoid blocking
             pass
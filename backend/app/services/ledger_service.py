@@ -6,6 +6,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.core.http import get_http_clients
 
 def canonicalize(data: Any) -> str:
     """Canonicalize JSON payload for hashing (Sort keys)."""
@@ -51,19 +52,18 @@ class LedgerService:
         }
         
         # 3. Send
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/events",
-                    json=envelope,
-                    timeout=5.0
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError as e:
-                print(f"Ledger Write Failed: {str(e)}")
-                # In robust system: queue for retry
-                # For now: fail loud
-                raise e
+        client = get_http_clients().get(self.base_url)
+        try:
+            response = await client.post(
+                f"{self.base_url}/events",
+                json=envelope,
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            print(f"Ledger Write Failed: {str(e)}")
+            # In robust system: queue for retry
+            # For now: fail loud
+            raise e
 
 ledger_service = LedgerService()
@@ -0,0 +1,175 @@
+"""
+PROVENIQ Ops - Snapshot Partition Maintenance & Rollup
+
+inventory_snapshots is range-partitioned by month on scanned_at:
+- ensure_partitions() creates the coming months ahead of time (rows
+  outside any month land in the DEFAULT partition, and move into their
+  month's partition when it is created)
+- rollup_snapshots() folds whole months past retention into
+  inventory_snapshot_daily, then drops those partitions outright, so
+  pruning old scans is a catalog operation instead of a mass DELETE
+
+Raw retention must stay above the 90-day burn-rate window.
+
+Run from cron:
+    python -m app.services.snapshot_retention partitions
+    python -m app.services.snapshot_retention rollup [--keep-months 6]
+"""
+
+from datetime import date, datetime, timezone
+from typing import Dict, List
+import argparse
+import asyncio
+import logging
+import re
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+MONTHS_AHEAD = 3
+KEEP_MONTHS = 6
+
+PARTITION_NAME = re.compile(r"^inventory_snapshots_(\d{4})_(\d{2})$")
+
+ROLLUP_SQL = text("""
+    INSERT INTO inventory_snapshot_daily (
+        product_id, day, open_quantity, close_quantity, min_quantity, max_quantity,
+        snapshot_count, first_scanned_at, last_scanned_at
+    )
+    SELECT
+        product_id,
+        (scanned_at AT TIME ZONE 'UTC')::date,
+        (array_agg(quantity ORDER BY scanned_at, id))[1],
+        (array_agg(quantity ORDER BY scanned_at DESC, id DESC))[1],
+        min(quantity),
+        max(quantity),
+        count(*),
+        min(scanned_at),
+        max(scanned_at)
+    FROM inventory_snapshots
+    WHERE scanned_at < :cutoff
+    GROUP BY 1, 2
+    ON CONFLICT (product_id, day) DO UPDATE SET
+        open_quantity = CASE WHEN excluded.first_scanned_at < inventory_snapshot_daily.first_scanned_at
+                             THEN excluded.open_quantity ELSE inventory_snapshot_daily.open_quantity END,
+        close_quantity = CASE WHEN excluded.last_scanned_at >= inventory_snapshot_daily.last_scanned_at
+                              THEN excluded.close_quantity ELSE inventory_snapshot_daily.close_quantity END,
+        min_quantity = least(inventory_snapshot_daily.min_quantity, excluded.min_quantity),
+        max_quantity = greatest(inventory_snapshot_daily.max_quantity, excluded.max_quantity),
+        snapshot_count = inventory_snapshot_daily.snapshot_count + excluded.snapshot_count,
+        first_scanned_at = least(inventory_snapshot_daily.first_scanned_at, excluded.first_scanned_at),
+        last_scanned_at = greatest(inventory_snapshot_daily.last_scanned_at, excluded.last_scanned_at)
+""")
+
+PARTITIONS_SQL = text("""
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = 'inventory_snapshots'
+""")
+
+
+def month_start(day: date, months_back: int = 0) -> date:
+    """First day of the month `months_back` months before `day`'s month"""
+    index = day.year * 12 + day.month - 1 - months_back
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def expired_partitions(names: List[str], cutoff: date) -> List[str]:
+    """Monthly partitions lying entirely before cutoff (a month start)"""
+    expired = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match and date(int(match.group(1)), int(match.group(2)), 1) < cutoff:
+            expired.append(name)
+    return sorted(expired)
+
+
+# ============================================
+# Maintenance
+# ============================================
+
+async def ensure_partitions(db: AsyncSession, months_ahead: int = MONTHS_AHEAD) -> int:
+    """Create monthly partitions from this month through months_ahead"""
+    today = datetime.now(timezone.utc).date()
+    result = await db.execute(
+        text("SELECT ensure_inventory_snapshot_partitions(:from_month, :months_ahead)"),
+        {"from_month": month_start(today), "months_ahead": months_ahead},
+    )
+    created = result.scalar_one()
+    if created:
+        logger.info(f"Created {created} inventory_snapshots partitions")
+    return created
+
+
+async def rollup_snapshots(db: AsyncSession, keep_months: int = KEEP_MONTHS) -> Dict[str, int]:
+    """
+    Roll snapshots older than keep_months whole months into daily rows
+    and drop them from the raw table.
+    
+    Runs in the caller's transaction: the rollup and the drop commit
+    together, so rows are never counted twice or lost.
+    """
+    today = datetime.now(timezone.utc).date()
+    cutoff = month_start(today, keep_months)
+    cutoff_at = datetime(cutoff.year, cutoff.month, 1, tzinfo=timezone.utc)
+    
+    rolled = await db.execute(ROLLUP_SQL, {"cutoff": cutoff_at})
+    
+    names = [row[0] for row in await db.execute(PARTITIONS_SQL)]
+    dropped = expired_partitions(names, cutoff)
+    for name in dropped:
+        await db.execute(text(f'ALTER TABLE inventory_snapshots DETACH PARTITION "{name}"'))
+        await db.execute(text(f'DROP TABLE "{name}"'))
+    
+    # Rows that landed outside the monthly partitions
+    deleted = await db.execute(
+        text("DELETE FROM inventory_snapshots_default WHERE scanned_at < :cutoff"),
+        {"cutoff": cutoff_at},
+    )
+    
+    stats = {
+        "daily_rows": rolled.rowcount,
+        "partitions_dropped": len(dropped),
+        "default_rows_deleted": deleted.rowcount,
+    }
+    logger.info(f"Rolled up snapshots before {cutoff}: {stats}")
+    return stats
+
+
+# ============================================
+# Command
+# ============================================
+
+async def _run(command: str, keep_months: int, months_ahead: int) -> Dict[str, int]:
+    from app.db.session import async_session_factory
+    
+    async with async_session_factory() as session:
+        async with session.begin():
+            if command == "partitions":
+                return {"partitions_created": await ensure_partitions(session, months_ahead)}
+            stats = await rollup_snapshots(session, keep_months)
+            stats["partitions_created"] = await ensure_partitions(session, months_ahead)
+            return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inventory snapshot partition maintenance")
+    parser.add_argument("command", choices=["partitions", "rollup"])
+    parser.add_argument("--keep-months", type=int, default=KEEP_MONTHS)
+    parser.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD)
+    args = parser.parse_args()
+    
+    if args.keep_months < 4:
+        parser.error("--keep-months must cover the 90-day burn-rate window (at least 4)")
+    
+    logging.basicConfig(level=logging.INFO)
+    print(asyncio.run(_run(args.command, args.keep_months, args.months_ahead)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""
+PROVENIQ Ops - Benchmarks
+
+Standalone performance benchmarks. Run from the backend directory:
+
+    python -m benchmarks.<module>
+"""
@@ -0,0 +1,188 @@
+"""
+PROVENIQ Ops - Burn Rate Benchmark
+
+Compares burn rate computation over 90 days of daily snapshots:
+- legacy: three overlapping window fetches (7/30/90d), one dict per row
+  and one pydantic DailyConsumption per snapshot pair
+- current: one 90-day fetch of (scanned_at, quantity) sliced in memory,
+  consumption as int arrays
+- bulk: one (product_id, scanned_at)-ordered stream for all products,
+  partitioned in a single pass; must match current exactly
+
+Snapshot "fetches" are served from memory (bisected per window) so the
+numbers isolate Python-side parsing and computation from DB latency. In
+production the bulk path also replaces one query per product with one scan.
+
+Usage:
+    python -m benchmarks.bench_burn_rate [--products 5000] [--days 90]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from app.ml.burn_rate import BULK_FETCH_SIZE, BurnRateCalculator, BurnRateResult, DailyConsumption, SnapshotSeries, window_start
+
+
+AS_OF = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+History = Dict[UUID, Tuple[List[datetime], List[int]]]
+
+
+def generate_history(products: int, days: int, seed: int) -> History:
+    """One scan per day per product with seeded consumption and receiving"""
+    rng = random.Random(seed)
+    history: History = {}
+
+    for _ in range(products):
+        product_id = UUID(int=rng.getrandbits(128))
+        quantity = rng.randint(50, 200)
+        timestamps, quantities = [], []
+        for day in range(days, 0, -1):
+            quantity = max(0, quantity - rng.randint(5, 15) + (rng.randint(30, 60) if day % 6 == 0 else 0))
+            timestamps.append(AS_OF - timedelta(days=day))
+            quantities.append(quantity)
+        history[product_id] = (timestamps, quantities)
+
+    return history
+
+
+def _window(history: History, product_id: UUID, as_of: datetime, days: int) -> Tuple[int, int]:
+    timestamps = history[product_id][0]
+    return bisect_left(timestamps, window_start(as_of, days)), bisect_right(timestamps, as_of)
+
+
+class InMemoryCalculator(BurnRateCalculator):
+    """Current calculator fed from in-memory history"""
+
+    def __init__(self, history: History):
+        super().__init__()
+        self.history = history
+        # The bulk scan as a driver would return it: (product_id, scanned_at)-ordered rows
+        self.rows = []
+        for product_id in sorted(history):
+            lo, hi = _window(history, product_id, AS_OF, 90)
+            timestamps, quantities = history[product_id]
+            self.rows.extend((product_id, timestamps[i], quantities[i]) for i in range(lo, hi))
+
+    async def _get_snapshot_series(self, product_id, as_of, days) -> SnapshotSeries:
+        lo, hi = _window(self.history, product_id, as_of, days)
+        timestamps, quantities = self.history[product_id]
+        series = SnapshotSeries()
+        for scanned_at, quantity in zip(timestamps[lo:hi], quantities[lo:hi]):
+            series.append(scanned_at, quantity)
+        return series
+
+    async def _stream_snapshot_rows(self, filter_ids, product_ids, start_date, end_date):
+        for i in range(0, len(self.rows), BULK_FETCH_SIZE):
+            yield self.rows[i:i + BULK_FETCH_SIZE]
+
+    async def _get_products_with_snapshots(self) -> List[UUID]:
+        return list(self.history)
+
+
+async def legacy_burn_rate(calc: BurnRateCalculator, history: History, product_id: UUID) -> BurnRateResult:
+    """The previous algorithm: three fetches, dict rows, DailyConsumption models"""
+
+    def fetch(days: int) -> List[dict]:
+        lo, hi = _window(history, product_id, AS_OF, days)
+        timestamps, quantities = history[product_id]
+        return [
+            {"quantity": q, "scanned_at": t, "product_id": product_id}
+            for t, q in zip(timestamps[lo:hi], quantities[lo:hi])
+        ]
+
+    def consumption(snapshots: List[dict]) -> List[DailyConsumption]:
+        rows = []
+        for prev, curr in zip(snapshots, snapshots[1:]):
+            net = curr["quantity"] - prev["quantity"]
+            rows.append(DailyConsumption(
+                date=curr["scanned_at"],
+                starting_qty=prev["quantity"],
+                ending_qty=curr["quantity"],
+                consumed=-net if net < 0 else 0,
+                received=net if net > 0 else 0,
+                net_change=net,
+            ))
+        return rows
+
+    s30 = fetch(30)
+    c7, c30, c90 = consumption(fetch(7)), consumption(s30), consumption(fetch(90))
+    # Trend compares intervals starting in the last 15 days against the rest
+    midpoint = sum(1 for s in s30 if s["scanned_at"] < window_start(AS_OF, 15))
+    b7 = calc._average_burn_rate([c.consumed for c in c7])
+    b30 = calc._average_burn_rate([c.consumed for c in c30])
+    b90 = calc._average_burn_rate([c.consumed for c in c90])
+    variance = calc._calculate_variance_coefficient([c.consumed for c in c30 if c.consumed > 0])
+    return BurnRateResult(
+        product_id=product_id,
+        burn_rate_7d=b7,
+        burn_rate_30d=b30,
+        burn_rate_90d=b90,
+        weighted_burn_rate=b7 * Decimal("0.5") + b30 * Decimal("0.3") + b90 * Decimal("0.2"),
+        variance_coefficient=variance,
+        trend=calc._detect_trend([c.consumed for c in c30], midpoint=midpoint),
+        data_points_7d=len(c7),
+        data_points_30d=len(c30),
+        data_points_90d=len(c90),
+        confidence=calc._calculate_confidence(len(c7), len(c30), len(c90), variance),
+    )
+
+
+async def run(products: int, days: int, seed: int) -> None:
+    history = generate_history(products, days, seed)
+    calc = InMemoryCalculator(history)
+
+    started = time.perf_counter()
+    legacy = [await legacy_burn_rate(calc, history, pid) for pid in history]
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    current = [await calc.calculate_burn_rate(pid, AS_OF) for pid in history]
+    current_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    bulk = await calc.calculate_all_burn_rates(as_of=AS_OF)
+    bulk_seconds = time.perf_counter() - started
+
+    mismatches = sum(
+        1 for a, b in zip(legacy, current)
+        if (a.burn_rate_7d, a.burn_rate_30d, a.burn_rate_90d, a.variance_coefficient, a.trend)
+        != (b.burn_rate_7d, b.burn_rate_30d, b.burn_rate_90d, b.variance_coefficient, b.trend)
+    )
+
+    print(f"products: {products} x {days} days")
+    print(f"legacy   {legacy_seconds:8.2f}s  ({products / legacy_seconds:10,.0f} products/s)")
+    print(f"current  {current_seconds:8.2f}s  ({products / current_seconds:10,.0f} products/s)  "
+          f"{legacy_seconds / current_seconds:.1f}x")
+    print(f"bulk     {bulk_seconds:8.2f}s  ({products / bulk_seconds:10,.0f} products/s)  "
+          f"{legacy_seconds / bulk_seconds:.1f}x")
+    print(f"queries  per-product {products}, bulk 2 (product list + one scan)")
+    print(f"mismatches vs legacy: {mismatches}")
+
+    exclude = {"calculated_at"}
+    bulk_mismatches = sum(
+        1 for a, b in zip(current, bulk)
+        if a.model_dump(exclude=exclude) != b.model_dump(exclude=exclude)
+    )
+    print(f"mismatches bulk vs per-product: {bulk_mismatches}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.products, args.days, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+PROVENIQ Ops - Event Bus Benchmark
+
+Publishes events with one slow subscriber (--slow-ms per event) and one
+fast one, and compares:
+- inline: every handler awaited in turn inside publish (the previous
+  behaviour)
+- bus: per-subscriber bounded queues and workers, for each backpressure
+  policy
+
+Reports publish latency p50/p99, how long the fast subscriber took to
+see every event, and what the slow subscriber received. Also times
+get_events_by_type against a full event log, comparing a scan of every
+event with the per-type index.
+
+Usage:
+    python -m benchmarks.bench_event_bus [--events 2000] [--slow-ms 2] \
+        [--queue-size 100] [--log-size 10000]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from typing import List
+
+from app.services.events.bus import BackpressurePolicy, Subscription
+from app.services.events.publisher import EventPayload, EventPublisher, OpsEventType
+
+
+TYPE = OpsEventType.INVENTORY_UPDATED
+
+
+class Counter:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.seen = 0
+        self.done_at = 0.0
+
+    async def __call__(self, event: EventPayload) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.seen += 1
+        self.done_at = time.perf_counter()
+
+
+async def run_mode(mode: str, args: argparse.Namespace, spill_dir: str) -> dict:
+    slow, fast = Counter(args.slow_ms / 1000), Counter()
+    publisher = EventPublisher()
+    if mode == "inline":
+        async def publish(payload):
+            event = EventPayload(event_type=TYPE.value, payload=payload)
+            for handler in (slow, fast):
+                await handler(event)
+    else:
+        policy = BackpressurePolicy(mode)
+        for handler in (slow, fast):
+            publisher._subscribers.setdefault(TYPE.value, []).append(Subscription(
+                TYPE.value, handler, EventPayload.model_validate,
+                queue_size=args.queue_size, policy=policy, spill_dir=spill_dir,
+            ))
+
+        async def publish(payload):
+            await publisher.publish(TYPE, payload)
+
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for n in range(args.events):
+        before = time.perf_counter()
+        await publish({"n": n})
+        latencies.append((time.perf_counter() - before) * 1000)
+        if n % 50 == 0:
+            # Let workers run, as a request handler yields between publishes
+            await asyncio.sleep(0)
+    published = time.perf_counter() - started
+    await publisher.stop()
+
+    ordered = sorted(latencies)
+    return {
+        "p50": statistics.median(ordered),
+        "p99": ordered[int(0.99 * (len(ordered) - 1))],
+        "published_s": published,
+        "fast_s": fast.done_at - started,
+        "slow_seen": slow.seen,
+    }
+
+
+def time_lookup(log_size: int) -> None:
+    publisher = EventPublisher()
+    publisher._event_log.max_events = log_size
+    types = list(OpsEventType)
+    for n in range(log_size):
+        publisher._event_log.append(EventPayload(event_type=types[n % len(types)].value, payload={"n": n}))
+    wanted = OpsEventType.SHRINKAGE_DETECTED.value
+
+    started = time.perf_counter()
+    scanned = [e for e in publisher._event_log.all() if e.event_type == wanted]
+    scan_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    indexed = publisher._event_log.of_type(wanted)
+    index_ms = (time.perf_counter() - started) * 1000
+    assert len(scanned) == len(indexed)
+    print(f"\nget_events_by_type over {log_size:,} events ({len(indexed):,} match): "
+          f"scan {scan_ms:.2f} ms, index {index_ms:.3f} ms (before serialisation)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--slow-ms", type=float, default=2.0)
+    parser.add_argument("--queue-size", type=int, default=100)
+    parser.add_argument("--log-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{args.events} events, slow subscriber {args.slow_ms} ms/event, queue size {args.queue_size}")
+    print(f"{'mode':<12} {'publish p50 ms':>15} {'publish p99 ms':>15} {'publish all s':>14} "
+          f"{'fast done s':>12} {'slow got':>9}")
+    with tempfile.TemporaryDirectory() as spill_dir:
+        for mode in ("inline", "block", "drop_oldest", "spill"):
+            r = asyncio.run(run_mode(mode, args, spill_dir))
+            print(f"{mode:<12} {r['p50']:>15.4f} {r['p99']:>15.4f} {r['published_s']:>14.2f} "
+                  f"{r['fast_s']:>12.2f} {r['slow_seen']:>9,}")
+    time_lookup(args.log_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+PROVENIQ Ops - Outbound HTTP Client Benchmark
+
+Writes Ledger events through LedgerBridge.write_event against a local
+stand-in Ledger server (a separate process speaking HTTP/1.1 keep-alive)
+and compares:
+- per_call: a new httpx.AsyncClient per event (the previous behaviour)
+- shared: the application-scoped client registry (app.core.http)
+
+Reports events/s, p50/p99 latency and the TCP connections the server
+accepted. --tls serves HTTPS with a throwaway self-signed certificate
+(needs the openssl CLI), where per-call handshakes cost the most.
+
+Usage:
+    python -m benchmarks.bench_http_clients [--events 2000] [--concurrency 32] \
+        [--latency-ms 1] [--tls]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import ssl
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import List, Optional
+
+import httpx
+
+from app.bridges.ledger import LedgerBridge
+from app.core import http as http_module
+from app.core.http import HttpClientRegistry
+
+
+# ============================================
+# Stand-in Ledger
+# ============================================
+
+def serve_stand_in_ledger(
+    port: int, cert: Optional[str], key: Optional[str], latency: float, connections, ready, requests=None,
+) -> None:
+    """Ledger stand-in answering every POST with a 201 entry, counting connections and requests"""
+    context = None
+    if cert:
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(cert, key)
+        context.set_alpn_protocols(["http/1.1"])
+
+    sequence = 0
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        nonlocal sequence
+        with connections.get_lock():
+            connections.value += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n")[1:]:
+                    name, _, value = line.partition(b":")
+                    if name.strip().lower() == b"content-length":
+                        length = int(value)
+                await reader.readexactly(length)
+                if requests is not None:
+                    with requests.get_lock():
+                        requests.value += 1
+                if latency:
+                    await asyncio.sleep(latency)
+                sequence += 1
+                body = json.dumps({
+                    "event_id": f"evt_{sequence}",
+                    "sequence_number": sequence,
+                    "entry_hash": "0" * 64,
+                    "committed_at": "2026-01-01T00:00:00Z",
+                }).encode()
+                writer.write(
+                    b"HTTP/1.1 201 Created\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ssl.SSLError):
+            pass
+        finally:
+            writer.close()
+
+    async def main() -> None:
+        server = await asyncio.start_server(handle, "127.0.0.1", port, ssl=context, backlog=1024)
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def self_signed(directory: str) -> tuple:
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-keyout", key, "-out", cert, "-subj", "/CN=localhost",
+            "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+# ============================================
+# Clients
+# ============================================
+
+class PerCallClients:
+    """Registry stand-in reproducing one AsyncClient per request"""
+
+    def __init__(self, verify):
+        self.verify = verify
+
+    def get(self, url: str) -> "PerCallClients":
+        return self
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        async with httpx.AsyncClient(verify=self.verify) as client:
+            return await client.post(url, **kwargs)
+
+    async def aclose(self) -> None:
+        pass
+
+
+async def run_mode(clients, base_url: str, events: int, concurrency: int) -> List[float]:
+    http_module._registry_instance = clients
+    bridge = LedgerBridge(base_url)
+    latencies: List[float] = []
+    remaining = iter(range(events))
+
+    async def writer() -> None:
+        for i in remaining:
+            started = time.perf_counter()
+            result = await bridge.write_event("OPS_SCAN_COMPLETED", None, "bench", {"n": i})
+            assert result is not None, "ledger write failed"
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    try:
+        await asyncio.gather(*(writer() for _ in range(concurrency)))
+    finally:
+        await clients.aclose()
+        http_module._registry_instance = None
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Server think time per request")
+    parser.add_argument("--port", type=int, default=18006)
+    parser.add_argument("--tls", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert = key = None
+        verify = True
+        if args.tls:
+            cert, key = self_signed(directory)
+            verify = ssl.create_default_context(cafile=cert)
+        scheme = "https" if args.tls else "http"
+        base_url = f"{scheme}://127.0.0.1:{args.port}"
+
+        connections = multiprocessing.Value("i", 0)
+        ready = multiprocessing.Event()
+        server = multiprocessing.Process(
+            target=serve_stand_in_ledger,
+            args=(args.port, cert, key, args.latency_ms / 1000, connections, ready),
+            daemon=True,
+        )
+        server.start()
+        ready.wait(10)
+
+        try:
+            print(f"{args.events} ledger writes, {args.concurrency} concurrent, {scheme}, "
+                  f"server latency {args.latency_ms} ms")
+            print(f"{'mode':<10} {'events/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'connections':>12}")
+            baseline = None
+            for mode in ("per_call", "shared"):
+                clients = PerCallClients(verify) if mode == "per_call" else HttpClientRegistry(verify=verify)
+                before = connections.value
+                started = time.perf_counter()
+                latencies = asyncio.run(run_mode(clients, base_url, args.events, args.concurrency))
+                rate = args.events / (time.perf_counter() - started)
+                baseline = baseline or rate
+                ordered = sorted(latencies)
+                print(
+                    f"{mode:<10} {rate:>10,.0f} {statistics.median(ordered):>8.2f} "
+                    f"{ordered[int(0.99 * (len(ordered) - 1))]:>8.2f} {connections.value - before:>12,}"
+                    + (f"   ({rate / baseline:.1f}x)" if mode != "per_call" else "")
+                )
+        finally:
+            server.terminate()
+            server.join()
+
+
+if __name__ == "__main__":
+    main()
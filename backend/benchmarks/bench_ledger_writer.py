@@ -0,0 +1,112 @@
+"""
+PROVENIQ Ops - Ledger Writer Benchmark
+
+Records scan events against a local stand-in Ledger (separate process)
+two ways:
+- direct: each caller awaits its own POST (write_event)
+- writer: callers enqueue (write_scan_completed) and the background
+  writer posts batches of --batch-size
+
+Reports caller latency p50/p99 (time until the caller may continue),
+total time until every event reached the Ledger, and the requests the
+Ledger served. The stand-in accepts any path, so the writer's batch
+endpoint is taken.
+
+Usage:
+    python -m benchmarks.bench_ledger_writer [--events 5000] [--concurrency 32] \
+        [--latency-ms 2] [--batch-size 100]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import tempfile
+import time
+from typing import List, Tuple
+
+from app.bridges import ledger_writer
+from app.bridges.ledger import LedgerBridge
+from app.bridges.ledger_writer import LedgerWriter
+from app.core import http as http_module
+from app.core.http import HttpClientRegistry
+from benchmarks.bench_http_clients import serve_stand_in_ledger
+
+
+async def run_mode(mode: str, base_url: str, args: argparse.Namespace, spool_dir: str) -> Tuple[List[float], float]:
+    http_module._registry_instance = HttpClientRegistry()
+    bridge = LedgerBridge(base_url)
+    writer = LedgerWriter(
+        bridge.post_events,
+        batch_size=args.batch_size,
+        flush_interval=0.05,
+        spool_path=f"{spool_dir}/{mode}.ndjson",
+    )
+    ledger_writer._writer_instance = writer
+    latencies: List[float] = []
+    remaining = iter(range(args.events))
+
+    async def caller() -> None:
+        for i in remaining:
+            started = time.perf_counter()
+            if mode == "direct":
+                result = await bridge.write_event("OPS_SCAN_COMPLETED", None, "bench", {"items_scanned": i})
+                assert result is not None, "ledger write failed"
+            else:
+                await bridge.write_scan_completed("loc-1", "bench", i, 0)
+                # Yield as a request handler would between scans
+                await asyncio.sleep(0)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(caller() for _ in range(args.concurrency)))
+        await writer.stop()
+        assert writer.spool.pending == 0, "events were spooled"
+        return latencies, time.perf_counter() - started
+    finally:
+        await http_module._registry_instance.aclose()
+        http_module._registry_instance = None
+        ledger_writer._writer_instance = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Server think time per request")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--port", type=int, default=18007)
+    args = parser.parse_args()
+
+    connections = multiprocessing.Value("i", 0)
+    requests = multiprocessing.Value("i", 0)
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(
+        target=serve_stand_in_ledger,
+        args=(args.port, None, None, args.latency_ms / 1000, connections, ready, requests),
+        daemon=True,
+    )
+    server.start()
+    ready.wait(10)
+
+    try:
+        print(f"{args.events} scan events, {args.concurrency} callers, server latency {args.latency_ms} ms, "
+              f"batch size {args.batch_size}")
+        print(f"{'mode':<8} {'caller p50 ms':>14} {'caller p99 ms':>14} {'events/s':>10} {'requests':>9}")
+        with tempfile.TemporaryDirectory() as spool_dir:
+            for mode in ("direct", "writer"):
+                before = requests.value
+                latencies, elapsed = asyncio.run(run_mode(mode, f"http://127.0.0.1:{args.port}", args, spool_dir))
+                ordered = sorted(latencies)
+                print(
+                    f"{mode:<8} {statistics.median(ordered):>14.3f} {ordered[int(0.99 * (len(ordered) - 1))]:>14.3f} "
+                    f"{args.events / elapsed:>10,.0f} {requests.value - before:>9,}"
+                )
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
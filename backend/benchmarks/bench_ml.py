@@ -0,0 +1,236 @@
+"""
+PROVENIQ Ops - ML Backtest & Throughput Benchmark
+
+Runs the ML package against seeded synthetic catalogs (app.ml.synthetic)
+and reports accuracy and speed side by side, per catalog size:
+- accuracy: burn-rate MAPE against held-out future demand, stockout
+  recall/precision within the alert window
+- speed: products/s for batch paths, p99 latency for per-call paths
+
+Components:
+- BurnRateCalculator: bulk scan (batch) and calculate_burn_rate (per call)
+- StockoutPredictor: predict_batch (batch) and predict_stockout (per call)
+- MLInterface: predict_depletion (per call), streaming detect_anomaly
+- DemandForecaster: 14-day forecast for the whole catalog, fit included
+  (target: 10k SKUs in under a second), and its MAPE against the first
+  14 days of future demand
+
+Snapshots are served from memory, so numbers isolate Python-side cost
+from DB latency. Per-call paths are timed on a sample of products.
+
+Usage:
+    python -m benchmarks.bench_ml [--sizes 1000,10000,100000] [--seed 42]
+"""
+
+import argparse
+import asyncio
+import math
+import time
+from datetime import timedelta
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.ml.anomaly import StreamingAnomalyDetector
+from app.ml.burn_rate import BULK_FETCH_SIZE, BurnRateCalculator, SnapshotSeries
+from app.ml.forecast import HISTORY_DAYS, DemandForecaster, fit_seasonal
+from app.ml.interfaces import MLInterface
+from app.ml.stockout import StockoutPredictor
+from app.ml.synthetic import SyntheticCatalog
+
+
+ALERT_WINDOW_HOURS = 72
+FORECAST_HORIZON_DAYS = 14
+SAMPLE_SIZE = 1000
+ANOMALY_OBSERVATIONS = 50_000
+
+
+class SyntheticCalculator(BurnRateCalculator):
+    """Burn rate calculator reading snapshots from a synthetic catalog"""
+
+    def __init__(self, catalog: SyntheticCatalog):
+        super().__init__(use_materialized=False)
+        self.catalog = catalog
+        self.index = {pid: i for i, pid in enumerate(catalog.product_ids)}
+
+    async def _get_snapshot_series(self, product_id, as_of, days) -> SnapshotSeries:
+        timestamps, quantities = self.catalog.series(self.index[product_id], days)
+        series = SnapshotSeries()
+        series.extend(timestamps, quantities)
+        return series
+
+    async def _stream_snapshot_rows(self, filter_ids, product_ids, start_date, end_date):
+        for batch in self.catalog.iter_rows(filter_ids or product_ids, BULK_FETCH_SIZE):
+            yield batch
+
+    async def _get_products_with_snapshots(self):
+        return list(self.catalog.product_ids)
+
+
+class SyntheticForecaster(DemandForecaster):
+    """Forecaster fitting on the last HISTORY_DAYS of a synthetic catalog"""
+
+    def __init__(self, catalog: SyntheticCatalog):
+        super().__init__()
+        self.catalog = catalog
+
+    async def _get_watermark(self, start_date, end_date, product_ids):
+        return "synthetic"
+
+    async def get_fit(self, org_id=None, as_of=None, product_ids=None):
+        # History comes pivoted already; time the fit, not building row tuples
+        end = self.catalog.history_days
+        start_date = self.catalog.as_of.date() + timedelta(days=1) - timedelta(days=HISTORY_DAYS)
+        return fit_seasonal(self.catalog.product_ids, self.catalog.demand[:, end - HISTORY_DAYS:end], start_date)
+
+
+# ============================================
+# Measurement
+# ============================================
+
+def p99_ms(samples: Sequence[float]) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(0.99 * len(ordered)) - 1)] * 1000
+
+
+async def time_calls(calls: Sequence[Callable]) -> Tuple[float, float]:
+    """(calls/s, p99 ms) over awaitable factories"""
+    durations = []
+    started = time.perf_counter()
+    for call in calls:
+        t0 = time.perf_counter()
+        await call()
+        durations.append(time.perf_counter() - t0)
+    return len(calls) / (time.perf_counter() - started), p99_ms(durations)
+
+
+def mape(predicted: np.ndarray, actual: np.ndarray) -> float:
+    """Mean absolute percentage error over products with actual demand"""
+    mask = actual > 0
+    return float(np.mean(np.abs(predicted[mask] - actual[mask]) / actual[mask]) * 100)
+
+
+def recall_precision(predicted_hours: np.ndarray, actual_hours: np.ndarray) -> Tuple[float, float]:
+    predicted = predicted_hours <= ALERT_WINDOW_HOURS
+    actual = actual_hours <= ALERT_WINDOW_HOURS
+    hits = np.count_nonzero(predicted & actual)
+    recall = hits / max(1, np.count_nonzero(actual))
+    precision = hits / max(1, np.count_nonzero(predicted))
+    return recall * 100, precision * 100
+
+
+# ============================================
+# Suite
+# ============================================
+
+async def run_size(count: int, seed: int) -> Dict[str, str]:
+    started = time.perf_counter()
+    catalog = SyntheticCatalog(count, seed=seed)
+    generate_seconds = time.perf_counter() - started
+
+    as_of = catalog.as_of
+    calc = SyntheticCalculator(catalog)
+    predictor = StockoutPredictor(calc)
+    ml = MLInterface()
+    products = catalog.products()
+    sample = products[:SAMPLE_SIZE]
+
+    actual_demand = catalog.future_daily_demand()
+    actual_hours = catalog.hours_to_stockout()
+
+    # ---------- BurnRateCalculator ----------
+    started = time.perf_counter()
+    burn = await calc.calculate_all_burn_rates(catalog.product_ids, as_of=as_of)
+    burn_rate_s = count / (time.perf_counter() - started)
+    _, burn_p99 = await time_calls([
+        (lambda pid=p["id"]: calc.calculate_burn_rate(pid, as_of)) for p in sample
+    ])
+    predicted_demand = np.array([float(b.weighted_burn_rate) for b in burn])
+
+    # ---------- StockoutPredictor ----------
+    started = time.perf_counter()
+    predictions = await predictor.predict_batch(products)
+    stockout_rate_s = count / (time.perf_counter() - started)
+    _, stockout_p99 = await time_calls([
+        (lambda p=p: predictor.predict_stockout(p["id"], p["current_quantity"], p["par_level"], product_name=p["name"]))
+        for p in sample
+    ])
+    by_id = {p.product_id: p for p in predictions}
+    predicted_hours = np.array([float(by_id[pid].hours_to_stockout) for pid in catalog.product_ids])
+    stockout_recall, stockout_precision = recall_precision(predicted_hours, actual_hours)
+
+    # ---------- MLInterface ----------
+    durations = []
+    depletion_hours = np.empty(count)
+    started = time.perf_counter()
+    for i, (p, b) in enumerate(zip(products, burn)):
+        t0 = time.perf_counter()
+        result = ml.predict_depletion(p["id"], p["current_quantity"], [b.burn_rate_7d, b.burn_rate_30d, b.burn_rate_90d])
+        durations.append(time.perf_counter() - t0)
+        depletion_hours[i] = result.value if p["current_quantity"] > 0 else 0
+    depletion_rate_s = count / (time.perf_counter() - started)
+    depletion_p99 = p99_ms(durations)
+    depletion_recall, depletion_precision = recall_precision(depletion_hours, actual_hours)
+
+    detector = StreamingAnomalyDetector()
+    days = max(1, min(catalog.history_days, ANOMALY_OBSERVATIONS // count))
+    observations = catalog.demand[:, catalog.history_days - days:catalog.history_days]
+    observed = 0
+    started = time.perf_counter()
+    for i, pid in enumerate(catalog.product_ids[:ANOMALY_OBSERVATIONS]):
+        for value in observations[i].tolist():
+            detector.observe("consumption", pid, value)
+            observed += 1
+    anomaly_rate_s = observed / (time.perf_counter() - started)
+
+    # ---------- DemandForecaster ----------
+    forecaster = SyntheticForecaster(catalog)
+    started = time.perf_counter()
+    # The synthetic fit's history ends on as_of, so forecasts start the day
+    # after, aligned with the catalog's future
+    forecasts = await forecaster.forecast(catalog.product_ids, FORECAST_HORIZON_DAYS, as_of=as_of)
+    forecast_rate_s = count / (time.perf_counter() - started)
+    predicted_forecast = np.array([float(sum(f.daily_forecast)) / FORECAST_HORIZON_DAYS for f in forecasts])
+    future = catalog.demand[:, catalog.history_days:catalog.history_days + FORECAST_HORIZON_DAYS]
+
+    return {
+        "products": f"{count:,}",
+        "generate_s": f"{generate_seconds:.2f}",
+        "burn_mape_%": f"{mape(predicted_demand, actual_demand):.1f}",
+        "burn_bulk_/s": f"{burn_rate_s:,.0f}",
+        "burn_p99_ms": f"{burn_p99:.2f}",
+        "stockout_recall_%": f"{stockout_recall:.1f}",
+        "stockout_precision_%": f"{stockout_precision:.1f}",
+        "stockout_batch_/s": f"{stockout_rate_s:,.0f}",
+        "stockout_p99_ms": f"{stockout_p99:.2f}",
+        "depletion_recall_%": f"{depletion_recall:.1f}",
+        "depletion_precision_%": f"{depletion_precision:.1f}",
+        "depletion_/s": f"{depletion_rate_s:,.0f}",
+        "depletion_p99_ms": f"{depletion_p99:.3f}",
+        "anomaly_obs_/s": f"{anomaly_rate_s:,.0f}",
+        "forecast_mape_%": f"{mape(predicted_forecast, future.mean(axis=1)):.1f}",
+        "forecast_/s": f"{forecast_rate_s:,.0f}",
+    }
+
+
+async def run(sizes: List[int], seed: int) -> None:
+    rows = [await run_size(count, seed) for count in sizes]
+
+    names = list(rows[0])
+    width = max(len(n) for n in names)
+    print(f"seed {seed}, alert window {ALERT_WINDOW_HOURS}h, per-call sample {SAMPLE_SIZE}")
+    for name in names:
+        print(f"{name:<{width}}  " + "  ".join(f"{row[name]:>12}" for row in rows))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    asyncio.run(run([int(s) for s in args.sizes.split(",")], args.seed))
+
+
+if __name__ == "__main__":
+    main()
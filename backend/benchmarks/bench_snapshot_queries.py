@@ -0,0 +1,238 @@
+"""
+PROVENIQ Ops - Snapshot Query Benchmark (PostgreSQL)
+
+Loads the same synthetic scan history into two layouts of
+inventory_snapshots and times the hot queries against each:
+- legacy: one heap, btree on product_id, scanned_at and scanned_by
+- partitioned: monthly range partitions, (product_id, scanned_at DESC),
+  (scanned_by, scanned_at DESC) and BRIN on scanned_at (migration 008)
+
+Queries (p50/p99 over random products):
+- latest: newest snapshot for a product (below-par LATERAL, latest endpoint)
+- window_90d: a product's last 90 days ordered by time (burn rate)
+- list_100: a product's 100 most recent snapshots (list_snapshots)
+- recent_range: all scans in the last hour (dashboards, rollups)
+
+Also reports total index size per layout, and the time to roll up a month
+in the partitioned layout. Runs in a scratch schema (bench_snapshots) that is
+dropped afterwards unless --keep. Loading 100M rows takes a while and
+needs ~15 GB of disk per layout.
+
+Usage:
+    python -m benchmarks.bench_snapshot_queries [--rows 100000000] [--products 20000] \
+        [--months 12] [--samples 500] [--dsn postgresql://...] [--keep]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Dict, List, Sequence
+
+import asyncpg
+
+from app.core.config import settings
+
+
+SCHEMA = "bench_snapshots"
+LOAD_CHUNK = 5_000_000
+
+LAYOUTS: Dict[str, List[str]] = {
+    "legacy": [
+        """CREATE TABLE {t} (
+            id uuid NOT NULL PRIMARY KEY,
+            product_id uuid NOT NULL,
+            quantity integer NOT NULL,
+            scanned_at timestamptz NOT NULL,
+            scanned_by varchar(100) NOT NULL
+        )""",
+    ],
+    "partitioned": [
+        """CREATE TABLE {t} (
+            id uuid NOT NULL,
+            product_id uuid NOT NULL,
+            quantity integer NOT NULL,
+            scanned_at timestamptz NOT NULL,
+            scanned_by varchar(100) NOT NULL,
+            PRIMARY KEY (id, scanned_at)
+        ) PARTITION BY RANGE (scanned_at)""",
+        """DO $$
+        DECLARE m date := date_trunc('month', now() AT TIME ZONE 'UTC')::date - make_interval(months => {months});
+        BEGIN
+            WHILE m <= date_trunc('month', now() AT TIME ZONE 'UTC')::date LOOP
+                EXECUTE format('CREATE TABLE {schema}.%I PARTITION OF {t} FOR VALUES FROM (%L) TO (%L)',
+                    '{layout}_' || to_char(m, 'YYYY_MM'),
+                    m::timestamp AT TIME ZONE 'UTC', (m + interval '1 month')::timestamp AT TIME ZONE 'UTC');
+                m := (m + interval '1 month')::date;
+            END LOOP;
+        END $$""",
+        "CREATE TABLE {t}_default PARTITION OF {t} DEFAULT",
+    ],
+}
+
+INDEXES: Dict[str, List[str]] = {
+    "legacy": [
+        "CREATE INDEX ON {t} (product_id)",
+        "CREATE INDEX ON {t} (scanned_at)",
+        "CREATE INDEX ON {t} (scanned_by)",
+    ],
+    "partitioned": [
+        "CREATE INDEX ON {t} (product_id, scanned_at DESC)",
+        "CREATE INDEX ON {t} (scanned_by, scanned_at DESC)",
+        "CREATE INDEX ON {t} USING brin (scanned_at)",
+    ],
+}
+
+QUERIES = {
+    "latest": "SELECT quantity, scanned_at FROM {t} WHERE product_id = $1 ORDER BY scanned_at DESC LIMIT 1",
+    "window_90d": (
+        "SELECT scanned_at, quantity FROM {t} WHERE product_id = $1 "
+        "AND scanned_at >= now() - interval '90 days' ORDER BY scanned_at"
+    ),
+    "list_100": "SELECT * FROM {t} WHERE product_id = $1 ORDER BY scanned_at DESC LIMIT 100",
+    "recent_range": "SELECT count(*) FROM {t} WHERE scanned_at >= now() - interval '1 hour'",
+}
+
+# Product ids are md5-derived from an integer so queries can pick them cheaply
+LOAD_SQL = """
+    INSERT INTO {t} (id, product_id, quantity, scanned_at, scanned_by)
+    SELECT
+        gen_random_uuid(),
+        md5((g % $3)::text)::uuid,
+        (random() * 200)::int,
+        now() - (random() * $4) * interval '1 day',
+        'bishop-' || (g % 50)
+    FROM generate_series($1::bigint, $2::bigint) AS g
+"""
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def load(conn: asyncpg.Connection, layout: str, rows: int, products: int, months: int) -> float:
+    table = f"{SCHEMA}.{layout}"
+    for ddl in LAYOUTS[layout]:
+        await conn.execute(ddl.format(t=table, schema=SCHEMA, layout=layout, months=months))
+
+    started = time.perf_counter()
+    days = months * 30
+    for start in range(0, rows, LOAD_CHUNK):
+        end = min(rows, start + LOAD_CHUNK) - 1
+        await conn.execute(LOAD_SQL.format(t=table), start, end, products, days)
+        print(f"  {layout}: loaded {end + 1:,} rows", flush=True)
+    for ddl in INDEXES[layout]:
+        await conn.execute(ddl.format(t=table))
+    await conn.execute(f"ANALYZE {table}")
+    return time.perf_counter() - started
+
+
+async def index_size(conn: asyncpg.Connection, layout: str) -> int:
+    return await conn.fetchval(
+        """
+        SELECT coalesce(sum(pg_relation_size(i.indexrelid)), 0)
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = $1 AND (c.relname = $2 OR c.relname LIKE $2 || '\\_%')
+        """,
+        SCHEMA, layout,
+    )
+
+
+async def time_queries(conn: asyncpg.Connection, layout: str, products: int, samples: int, seed: int) -> Dict[str, List[float]]:
+    table = f"{SCHEMA}.{layout}"
+    rng = random.Random(seed)
+    product_ids = await conn.fetch(
+        "SELECT md5(g::text)::uuid AS id FROM unnest($1::int[]) AS g",
+        [rng.randrange(products) for _ in range(samples)],
+    )
+
+    timings: Dict[str, List[float]] = {}
+    for name, sql in QUERIES.items():
+        statement = await conn.prepare(sql.format(t=table))
+        args_list = [[row["id"]] for row in product_ids] if "$1" in sql else [[]] * min(samples, 50)
+        # One warm-up pass per query so caches are comparable across layouts
+        await statement.fetch(*args_list[0])
+        durations = []
+        for args in args_list:
+            started = time.perf_counter()
+            await statement.fetch(*args)
+            durations.append((time.perf_counter() - started) * 1000)
+        timings[name] = durations
+    return timings
+
+
+async def time_rollup(conn: asyncpg.Connection, months: int) -> float:
+    """Roll the oldest month of the partitioned layout into daily rows, then drop it"""
+    table = f"{SCHEMA}.partitioned"
+    oldest = await conn.fetchval(
+        "SELECT to_char(date_trunc('month', now() AT TIME ZONE 'UTC') - make_interval(months => $1), 'YYYY_MM')",
+        months,
+    )
+    started = time.perf_counter()
+    async with conn.transaction():
+        await conn.execute(f"""
+            CREATE TABLE {SCHEMA}.daily AS
+            SELECT product_id, (scanned_at AT TIME ZONE 'UTC')::date AS day,
+                   (array_agg(quantity ORDER BY scanned_at))[1] AS open_quantity,
+                   (array_agg(quantity ORDER BY scanned_at DESC))[1] AS close_quantity,
+                   min(quantity), max(quantity), count(*)
+            FROM {table}_{oldest}
+            GROUP BY 1, 2
+        """)
+        await conn.execute(f"ALTER TABLE {table} DETACH PARTITION {table}_{oldest}")
+        await conn.execute(f"DROP TABLE {table}_{oldest}")
+    return time.perf_counter() - started
+
+
+async def run(args: argparse.Namespace) -> None:
+    dsn = args.dsn or settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+
+        results = {}
+        for layout in LAYOUTS:
+            load_seconds = await load(conn, layout, args.rows, args.products, args.months)
+            results[layout] = {
+                "load_s": load_seconds,
+                "index_mb": await index_size(conn, layout) / 2**20,
+                "timings": await time_queries(conn, layout, args.products, args.samples, args.seed),
+            }
+        rollup_seconds = await time_rollup(conn, args.months)
+
+        print(f"\n{args.rows:,} rows, {args.products:,} products, {args.months} months, {args.samples} samples")
+        print(f"{'query':<14} " + "  ".join(f"{layout + ' p50/p99 ms':>28}" for layout in LAYOUTS))
+        for name in QUERIES:
+            cells = []
+            for layout in LAYOUTS:
+                durations = results[layout]["timings"][name]
+                cells.append(f"{statistics.median(durations):>12.2f} / {percentile(durations, 0.99):>10.2f}")
+            print(f"{name:<14} " + "  ".join(f"{cell:>28}" for cell in cells))
+        for layout in LAYOUTS:
+            print(f"{layout}: load {results[layout]['load_s']:.0f}s, indexes {results[layout]['index_mb']:,.0f} MB")
+        print(f"partitioned: rollup + drop of oldest month {rollup_seconds:.1f}s")
+    finally:
+        if not args.keep:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000_000)
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dsn", default=None, help="Defaults to DATABASE_URL")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
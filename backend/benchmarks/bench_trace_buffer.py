@@ -0,0 +1,145 @@
+"""
+PROVENIQ Ops - Trace Buffer Benchmark
+
+Compares the compact TraceBuffer against the previous layout (one pydantic
+TraceEvent per event, serialized with model_dump_json):
+- retained memory per trace (tracemalloc)
+- to_json time per trace
+
+Usage:
+    python -m benchmarks.bench_trace_buffer [--traces 2000]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel, Field
+
+from app.decision.dag import GateType
+from app.decision.policies import PolicyResult
+from app.decision.trace import DecisionTrace, TraceEvent
+
+
+NODES = ["verify_stock", "check_vendor", "check_liquidity", "approval", "submit_order"]
+
+
+class LegacyTrace(BaseModel):
+    """The previous DecisionTrace layout: a list of TraceEvent models"""
+    trace_id: UUID = Field(default_factory=uuid4)
+    dag_id: UUID
+    dag_name: str
+    org_id: UUID
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    duration_ms: Optional[int] = None
+    initial_context: Dict[str, Any] = {}
+    final_context: Dict[str, Any] = {}
+    events: List[TraceEvent] = []
+    status: str = "pending"
+    error: Optional[str] = None
+
+    def log(self, event_type: str, message: str, node_id=None, gate_id=None, details: Dict[str, Any] = {}) -> None:
+        self.events.append(TraceEvent(
+            event_type=event_type,
+            node_id=node_id,
+            gate_id=gate_id,
+            message=message,
+            details=details,
+        ))
+
+
+def _gate_result(node_id: str) -> PolicyResult:
+    return PolicyResult(
+        passed=True,
+        gate_type=GateType.THRESHOLD,
+        message="Stock (2) is below par level (20)",
+        details={"current_quantity": 2, "par_level": 20, "node": node_id},
+    )
+
+
+def build_compact() -> DecisionTrace:
+    trace = DecisionTrace(dag_id=uuid4(), dag_name="Reorder Decision", org_id=uuid4())
+    trace.start()
+    for node_id in NODES:
+        trace.log_node_start(node_id, node_id.replace("_", " ").title())
+        trace.log_gate_result(node_id, f"{node_id}_gate", _gate_result(node_id))
+        trace.log_node_complete(node_id, {})
+    trace.complete("passed", {})
+    return trace
+
+
+def build_legacy() -> LegacyTrace:
+    trace = LegacyTrace(dag_id=uuid4(), dag_name="Reorder Decision", org_id=uuid4())
+    trace.log("trace_started", "Decision execution started")
+    for node_id in NODES:
+        trace.log("node_started", f"Node '{node_id.replace('_', ' ').title()}' started", node_id=node_id)
+        result = _gate_result(node_id)
+        trace.log(
+            "gate_evaluated",
+            f"Gate '{node_id}_gate' evaluated: passed",
+            node_id=node_id,
+            gate_id=f"{node_id}_gate",
+            details={"passed": result.passed, "message": result.message, "details": result.details},
+        )
+        trace.log("node_completed", "Node completed successfully", node_id=node_id, details={"result": {}})
+    trace.log("trace_completed", "Decision execution completed: passed")
+    return trace
+
+
+def measure_memory(build: Callable[[], Any], count: int) -> float:
+    """Retained bytes per trace"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    traces = [build() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del traces
+    return (after - before) / count
+
+
+def measure_to_json(traces: List[Any], serialize: Callable[[Any], str]) -> float:
+    """Microseconds per to_json call"""
+    start = time.perf_counter()
+    for trace in traces:
+        serialize(trace)
+    return (time.perf_counter() - start) / len(traces) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--traces", type=int, default=2000)
+    args = parser.parse_args()
+
+    legacy_bytes = measure_memory(build_legacy, args.traces)
+    compact_bytes = measure_memory(build_compact, args.traces)
+    # Same trace with no events: isolates the event log from the model itself
+    base_bytes = measure_memory(
+        lambda: DecisionTrace(dag_id=uuid4(), dag_name="Reorder Decision", org_id=uuid4()),
+        args.traces,
+    )
+    legacy_log = legacy_bytes - base_bytes
+    compact_log = compact_bytes - base_bytes
+
+    legacy = [build_legacy() for _ in range(args.traces)]
+    compact = [build_compact() for _ in range(args.traces)]
+    # Both compact, so the comparison is of layouts rather than whitespace
+    legacy_us = measure_to_json(legacy, lambda t: t.model_dump_json())
+    compact_us = measure_to_json(compact, lambda t: t.to_json())
+
+    print(f"traces: {args.traces} x {compact[0].event_count} events")
+    print(f"{'memory/trace':<16} legacy {legacy_bytes:10.0f} B   compact {compact_bytes:10.0f} B   "
+          f"({legacy_bytes / compact_bytes:.1f}x)")
+    print(f"{'event log/trace':<16} legacy {legacy_log:10.0f} B   compact {compact_log:10.0f} B   "
+          f"({legacy_log / compact_log:.1f}x)")
+    print(f"{'to_json/trace':<16} legacy {legacy_us:10.1f} us  compact {compact_us:10.1f} us  "
+          f"({legacy_us / compact_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
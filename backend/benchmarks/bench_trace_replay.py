@@ -0,0 +1,162 @@
+"""
+PROVENIQ Ops - Trace Replay Benchmark
+
+Replays decision traces through the current policy code and reports
+throughput and divergence. Exits non-zero on any divergence, so it can run
+as a regression gate before deploying new policies.
+
+Usage:
+    # Synthetic reorder/disposal traces (seeded)
+    python -m benchmarks.bench_trace_replay --traces 100000 --workers 8
+
+    # Stored production traces, one DecisionTrace JSON per line
+    python -m benchmarks.bench_trace_replay --input traces.jsonl
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from typing import Iterator, List
+from uuid import UUID
+
+from app.decision import (
+    CheckpointStore,
+    DecisionExecutor,
+    TraceStore,
+    create_disposal_dag,
+    create_reorder_dag,
+    replay_many,
+)
+from app.decision.replay import register_dag_factory
+
+
+ORG_ID = UUID("00000000-0000-0000-0000-000000000001")
+
+
+APPROVAL_REORDER = "Reorder Decision (Approval Required)"
+
+
+def create_approval_reorder_dag(ctx):
+    """Reorder DAG whose approval gate is mandatory"""
+    dag = create_reorder_dag(
+        product_id=ctx.get("product_id"),
+        quantity=ctx.get("quantity", 0),
+        vendor_id=ctx.get("vendor_id", ""),
+    )
+    dag.name = APPROVAL_REORDER
+    dag.nodes["approval"].gates[0].required = True
+    return dag
+
+
+def register_factories() -> None:
+    register_dag_factory(APPROVAL_REORDER, create_approval_reorder_dag)
+
+
+async def _submit_order(ctx):
+    return {"order_id": f"ORD-{ctx['quantity']}", "status": "submitted"}
+
+
+async def _execute_disposal(ctx):
+    return {"disposal_id": f"DSP-{ctx['quantity']}", "status": "completed"}
+
+
+async def _file_claim(ctx):
+    return {"claim_id": "CLM-1", "status": "submitted"}
+
+
+async def generate_traces(count: int, seed: int) -> List[str]:
+    """Execute seeded reorder/disposal decisions and serialize their traces"""
+    rng = random.Random(seed)
+    payloads = []
+
+    for i in range(count):
+        executor = DecisionExecutor(ORG_ID, TraceStore(), CheckpointStore())
+        executor.register_executor("submit_order_to_vendor", _submit_order)
+        executor.register_executor("execute_disposal", _execute_disposal)
+        executor.register_executor("file_insurance_claim", _file_claim)
+
+        if rng.random() < 0.7:
+            product_id = UUID(int=rng.getrandbits(128))
+            quantity = rng.randint(1, 200)
+            context = {
+                "product_id": str(product_id),
+                "quantity": quantity,
+                "vendor_id": "sysco",
+                "order_amount_cents": rng.randint(1_000, 200_000),
+                "current_quantity": rng.randint(0, 40),
+                "par_level": 20,
+            }
+            # A share of orders requires sign-off and resumes after approval
+            needs_approval = rng.random() < 0.2
+            if needs_approval:
+                dag = create_approval_reorder_dag(context)
+            else:
+                dag = create_reorder_dag(product_id=product_id, quantity=quantity, vendor_id="sysco")
+            trace = await executor.execute(dag, context)
+            if needs_approval and dag.nodes["approval"].error:
+                trace = await executor.provide_approval(
+                    dag, "approval", UUID(int=rng.getrandbits(128)), f"token-{i}", context,
+                )
+        else:
+            item_id = UUID(int=rng.getrandbits(128))
+            quantity = rng.randint(1, 50)
+            dag = create_disposal_dag(item_id=item_id, quantity=quantity, reason="expiration")
+            context = {
+                "item_id": str(item_id),
+                "quantity": quantity,
+                "reason": "expiration",
+                "estimated_value_cents": rng.randint(100, 50_000),
+                "loss_type": rng.choice(["spoilage", "damage", "theft"]),
+            }
+            trace = await executor.execute(dag, context)
+
+        payloads.append(trace.to_json())
+
+    return payloads
+
+
+def read_traces(path: str) -> Iterator[str]:
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield line
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="JSONL file of stored traces")
+    parser.add_argument("--traces", type=int, default=20000, help="Synthetic traces to generate")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None, help="Process count (0 = in-process)")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    if args.input:
+        payloads = read_traces(args.input)
+    else:
+        started = time.perf_counter()
+        payloads = asyncio.run(generate_traces(args.traces, args.seed))
+        print(f"generated {len(payloads)} traces in {time.perf_counter() - started:.1f}s")
+
+    report = replay_many(
+        payloads,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        initializer=register_factories,
+    )
+
+    print(f"replayed   {report.total} traces with {report.workers} workers")
+    print(f"elapsed    {report.elapsed_seconds:.2f}s ({report.traces_per_second:,.0f} traces/s)")
+    print(f"matched    {report.matched}")
+    print(f"diverged   {report.diverged}")
+    print(f"errors     {report.errors}")
+    for sample in report.samples[:10]:
+        print(f"  {sample.trace_id} [{sample.dag_name}] {sample.error or '; '.join(sample.divergences)}")
+
+    sys.exit(0 if report.is_clean else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+PROVENIQ Ops - Waste Inference Benchmark
+
+Simulates kitchen tablets uploading waste photos concurrently and compares
+images/s through WasteInferenceService:
+- per_request: max_batch_size=1, one model call per image (the old
+  one-image-per-request shape)
+- batched: micro-batches of up to --batch images or --delay-ms
+- cached: every tablet re-uploads images already classified
+
+The model is a NumPy MLP standing in for an ONNX network: a byte
+histogram feeds two 2048-wide dense layers (~17 MB of float32 weights),
+so, as with a real CPU model, each call is dominated by streaming the
+weights and per-call overhead rather than by per-image arithmetic.
+
+Usage:
+    python -m benchmarks.bench_waste_inference [--tablets 64] [--images 2000] [--workers 1]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import List
+
+import numpy as np
+
+from app.ml.waste_inference import WASTE_CLASSES, WasteInferenceService
+
+
+HIDDEN = 2048
+
+
+class MLPWasteModel:
+    """Dense byte-histogram classifier with fixed seeded weights"""
+
+    name = "bench_mlp"
+    version = "bench"
+
+    def __init__(self):
+        rng = np.random.default_rng(0)
+        self.w1 = rng.standard_normal((256, HIDDEN), dtype=np.float32) / 16
+        self.w2 = rng.standard_normal((HIDDEN, HIDDEN), dtype=np.float32) / 45
+        self.w3 = rng.standard_normal((HIDDEN, len(WASTE_CLASSES)), dtype=np.float32) / 45
+
+    def predict(self, images: List[bytes]) -> np.ndarray:
+        features = np.stack([
+            np.bincount(np.frombuffer(image, dtype=np.uint8), minlength=256) for image in images
+        ]).astype(np.float32)
+        features /= features.sum(axis=1, keepdims=True)
+        hidden = np.maximum(features @ self.w1, 0)
+        hidden = np.maximum(hidden @ self.w2, 0)
+        logits = hidden @ self.w3
+        shifted = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+def generate_images(count: int, size: int, seed: int) -> List[bytes]:
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, size=size, dtype=np.uint8).tobytes() for _ in range(count)]
+
+
+async def run_scenario(service: WasteInferenceService, images: List[bytes], tablets: int) -> float:
+    """images/s with `tablets` clients each uploading its share in turn"""
+    async def tablet(share: List[bytes]) -> None:
+        for image in share:
+            await service.classify(image)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(tablet(images[i::tablets]) for i in range(tablets)))
+    return len(images) / (time.perf_counter() - started)
+
+
+async def run(tablets: int, count: int, image_size: int, batch: int, delay_ms: float, workers: int, seed: int) -> None:
+    images = generate_images(count, image_size, seed)
+
+    print(f"{tablets} tablets, {count} images of {image_size // 1024} KB, {workers} worker process(es)")
+    print(f"{'scenario':<12} {'images/s':>10} {'avg batch':>10} {'speedup':>8}")
+
+    baseline = None
+    for name, batch_size in (("per_request", 1), ("batched", batch)):
+        service = WasteInferenceService(MLPWasteModel, max_batch_size=batch_size, max_delay_ms=delay_ms, workers=workers)
+        await service.start()
+        # Warm up worker processes before timing
+        await service.classify(b"warmup")
+        rate = await run_scenario(service, images, tablets)
+        stats = service.get_stats()
+        if name == "batched":
+            cached = await run_scenario(service, images, tablets)
+        await service.stop()
+
+        baseline = baseline or rate
+        print(f"{name:<12} {rate:>10,.0f} {stats['avg_batch_size']:>10} {rate / baseline:>7.1f}x")
+
+    print(f"{'cached':<12} {cached:>10,.0f} {'-':>10} {cached / baseline:>7.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tablets", type=int, default=64)
+    parser.add_argument("--images", type=int, default=2000)
+    parser.add_argument("--image-kb", type=int, default=64)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--delay-ms", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.tablets, args.images, args.image_kb * 1024, args.batch, args.delay_ms, args.workers, args.seed))
+
+
+if __name__ == "__main__":
+    main()
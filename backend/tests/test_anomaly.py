@@ -0,0 +1,90 @@
+"""
+Tests for anomaly detection.
+
+Covers the streaming detector against the history-based fallback and
+batch scoring.
+"""
+
+from decimal import Decimal
+import random
+from uuid import UUID
+
+from app.ml.anomaly import Observation, RunningStats, StreamingAnomalyDetector
+from app.ml.interfaces import MLInterface
+
+
+ENTITY = UUID("00000000-0000-0000-0000-00000000a001")
+
+
+class TestRunningStats:
+
+    def test_matches_two_pass_statistics(self):
+        rng = random.Random(3)
+        values = [rng.uniform(0, 500) for _ in range(1000)]
+        
+        stats = RunningStats.from_values(values)
+        mean = sum(values) / len(values)
+        variance = sum((x - mean) ** 2 for x in values) / len(values)
+        
+        assert stats.count == 1000
+        assert abs(stats.mean - mean) < 1e-9
+        assert abs(stats.variance - variance) < 1e-6
+
+
+class TestStreamingDetector:
+
+    def test_streaming_matches_history_fallback(self):
+        rng = random.Random(5)
+        values = [rng.randint(80, 120) for _ in range(50)] + [400, 10]
+        ml = MLInterface()
+        detector = StreamingAnomalyDetector()
+        
+        for i, value in enumerate(values):
+            streamed = detector.observe("scan", ENTITY, value)
+            if i == 0:
+                assert streamed.model_used == "fallback_no_history"
+                continue
+            full = ml.detect_anomaly("scan", ENTITY, value, values[:i])
+            assert streamed.is_anomaly == full.is_anomaly
+            assert streamed.anomaly_type == full.anomaly_type
+            assert streamed.deviation_factor == full.deviation_factor
+        
+        assert detector.get_state("scan", ENTITY).count == len(values)
+    
+    def test_batch_equals_sequential(self):
+        rng = random.Random(9)
+        entities = [UUID(int=rng.getrandbits(128)) for _ in range(5)]
+        observations = [
+            Observation(entity_type="order", entity_id=rng.choice(entities), value=rng.gauss(50, 5))
+            for _ in range(300)
+        ]
+        
+        sequential = StreamingAnomalyDetector()
+        expected = [sequential.observe(o.entity_type, o.entity_id, o.value) for o in observations]
+        batched = StreamingAnomalyDetector().observe_batch(observations)
+        
+        assert [(r.is_anomaly, r.anomaly_score) for r in batched] == \
+            [(r.is_anomaly, r.anomaly_score) for r in expected]
+    
+    def test_ewma_baseline_follows_level_shift(self):
+        detector = StreamingAnomalyDetector(alpha=0.3)
+        for _ in range(30):
+            detector.observe("price", ENTITY, 100)
+        
+        assert detector.observe("price", ENTITY, 200).is_anomaly
+        for _ in range(30):
+            detector.observe("price", ENTITY, 200)
+        
+        result = detector.observe("price", ENTITY, 200)
+        assert not result.is_anomaly
+        assert result.model_used == "streaming_ewma"
+        assert result.anomaly_score < Decimal("0.01")
+    
+    def test_non_numeric_does_not_touch_state(self):
+        detector = StreamingAnomalyDetector()
+        detector.seed("scan", ENTITY, [1, 2, "n/a", 3])
+        
+        result = detector.observe("scan", ENTITY, "n/a")
+        
+        assert result.model_used == "fallback_non_numeric"
+        assert detector.get_state("scan", ENTITY).count == 3
@@ -0,0 +1,129 @@
+"""
+Tests for the barcode resolution cache and bulk resolve endpoint.
+
+Repeat scans must not reach the database, a scan pass must resolve in
+one query, and committed product writes must drop stale entries.
+"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import UUID
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.inventory import get_product_by_barcode, resolve_barcodes
+from app.db import Product
+from app.models.schemas import BarcodeResolveRequest
+from app.services import barcode_cache
+from app.services.barcode_cache import (
+    BarcodeCache,
+    _apply_product_writes,
+    _collect_product_writes,
+    _discard_product_writes,
+)
+
+
+T0 = datetime(2026, 1, 1)
+
+
+def _product(number, barcode=None):
+    return SimpleNamespace(
+        id=UUID(int=number), name=f"SKU {number}", barcode=barcode or f"0000{number}",
+        par_level=10, risk_category="standard", created_at=T0, updated_at=T0,
+    )
+
+
+class CatalogSession:
+    """AsyncSession stand-in answering barcode queries from a catalog"""
+    
+    def __init__(self, products):
+        self.products = {p.barcode: p for p in products}
+        self.queries = []
+    
+    async def execute(self, statement, params=None):
+        barcodes = statement.compile().params["barcodes"]
+        self.queries.append(barcodes)
+        rows = [self.products[b] for b in barcodes if b in self.products]
+        return SimpleNamespace(scalars=lambda: iter(rows))
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    instance = BarcodeCache()
+    monkeypatch.setattr(barcode_cache, "_cache_instance", instance)
+    return instance
+
+
+class TestBarcodeCache:
+
+    def test_repeat_scans_are_served_from_memory(self, cache):
+        db = CatalogSession([_product(1)])
+        
+        for _ in range(100):
+            product = asyncio.run(get_product_by_barcode("00001", db))
+        
+        assert product.id == UUID(int=1)
+        assert len(db.queries) == 1
+        assert cache.get_stats()["hits"] == 99
+    
+    def test_scan_pass_resolves_in_one_query(self, cache):
+        db = CatalogSession([_product(i) for i in range(1, 501)])
+        asyncio.run(cache.resolve(db, ["00001", "00002"]))
+        
+        barcodes = [f"0000{i}" for i in range(1, 501)] + ["unknown", "00001"]
+        result = asyncio.run(resolve_barcodes(BarcodeResolveRequest(barcodes=barcodes), db))
+        
+        assert len(result.products) == 500
+        assert result.missing == ["unknown"]
+        # Cached barcodes are not asked for again; unknown ones are, next time
+        assert len(db.queries[1]) == 499
+        asyncio.run(cache.resolve(db, ["unknown"]))
+        assert db.queries[2] == ["unknown"]
+    
+    def test_unknown_barcode_is_404(self, cache):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(get_product_by_barcode("nope", CatalogSession([])))
+        assert exc.value.status_code == 404
+    
+    def test_lookup_racing_an_invalidation_is_not_stored(self, cache):
+        db = CatalogSession([_product(1)])
+        execute = db.execute
+        
+        async def execute_then_invalidate(statement, params=None):
+            result = await execute(statement, params)
+            cache.invalidate(barcodes=["00001"])
+            return result
+        
+        db.execute = execute_then_invalidate
+        asyncio.run(cache.resolve(db, ["00001"]))
+        
+        assert cache.get_stats()["barcodes"] == 0
+
+
+class TestInvalidation:
+
+    def _session(self, new=(), dirty=()):
+        return SimpleNamespace(info={}, new=list(new), dirty=list(dirty), deleted=[])
+    
+    def test_committed_barcode_change_drops_old_entry(self, cache):
+        asyncio.run(cache.resolve(CatalogSession([_product(1)]), ["00001"]))
+        
+        renamed = Product(id=UUID(int=1), name="SKU 1", barcode="99999")
+        session = self._session(dirty=[renamed])
+        _collect_product_writes(session, None)
+        _apply_product_writes(session)
+        
+        assert cache.get_stats()["barcodes"] == 0
+        assert barcode_cache.PENDING_KEY not in session.info
+    
+    def test_rolled_back_writes_are_discarded(self, cache):
+        asyncio.run(cache.resolve(CatalogSession([_product(1)]), ["00001"]))
+        
+        session = self._session(new=[Product(id=UUID(int=2), name="SKU 2", barcode="00001")])
+        _collect_product_writes(session, None)
+        _discard_product_writes(session, None)
+        _apply_product_writes(session)
+        
+        assert cache.get_stats()["barcodes"] == 1
@@ -0,0 +1,112 @@
+"""
+Tests for bulk snapshot ingestion (POST /inventory/snapshots:bulk).
+
+A full-shelf scan must cost a fixed number of statements, report a
+status per row and keep the current_inventory read model in step.
+"""
+
+import asyncio
+import time
+from uuid import UUID
+
+import pytest
+from pydantic import ValidationError
+
+from app.api import inventory
+from app.api.inventory import create_snapshots_bulk
+from app.db.session import _run_after_commit
+from app.ml.usage_stats import UsageStatisticsWorker
+from app.models.schemas import InventorySnapshotBulkCreate
+
+
+class KnownProductsSession:
+    """AsyncSession stand-in: the first query returns the known product ids"""
+    
+    def __init__(self, known):
+        self.known = known
+        self.calls = []
+        self.info = {}
+    
+    async def execute(self, statement, params=None):
+        self.calls.append((statement, params))
+        known = self.known
+        
+        class Result:
+            def scalars(self):
+                return iter(known)
+        
+        return Result()
+
+
+def _payload(count, unknown=()):
+    return InventorySnapshotBulkCreate.model_validate({
+        "snapshots": [
+            {
+                "product_id": str(UUID(int=10**6 + i) if i in unknown else UUID(int=i % 2000 + 1)),
+                "quantity": i % 50,
+                "scan_method": "barcode",
+                "location_tag": "aisle-4",
+            }
+            for i in range(count)
+        ]
+    })
+
+
+class TestBulkSnapshots:
+
+    def test_ten_thousand_rows_fixed_statements(self):
+        session = KnownProductsSession([UUID(int=i) for i in range(1, 2001)])
+        payload = _payload(10_000, unknown={7, 9_999})
+        
+        started = time.perf_counter()
+        result = asyncio.run(create_snapshots_bulk(payload, session))
+        elapsed = time.perf_counter() - started
+        
+        assert (result.created, result.rejected) == (9_998, 2)
+        assert [r.index for r in result.results if r.status == "rejected"] == [7, 9_999]
+        assert [r.index for r in result.results] == list(range(10_000))
+        
+        # Product check, snapshot insert, current_inventory upsert
+        assert len(session.calls) == 3
+        inserted, upserted = session.calls[1][1], session.calls[2][1]
+        assert len(inserted) == 9_998
+        assert len(upserted) == 2_000
+        assert all(row["scanned_at"] == result.scanned_at for row in inserted)
+        assert elapsed < 1.0
+    
+    def test_latest_row_per_product_reaches_read_model(self):
+        session = KnownProductsSession([UUID(int=1)])
+        payload = InventorySnapshotBulkCreate.model_validate({
+            "snapshots": [
+                {"product_id": str(UUID(int=1)), "quantity": 5},
+                {"product_id": str(UUID(int=1)), "quantity": 3},
+            ]
+        })
+        
+        result = asyncio.run(create_snapshots_bulk(payload, session))
+        
+        upserted = session.calls[2][1]
+        assert [row["quantity"] for row in upserted] == [3]
+        assert upserted[0]["snapshot_id"] == result.results[1].snapshot_id
+    
+    def test_workers_hear_of_rows_after_commit(self, monkeypatch):
+        worker = UsageStatisticsWorker()
+        monkeypatch.setattr(inventory, "get_usage_worker", lambda: worker)
+        session = KnownProductsSession([UUID(int=1), UUID(int=2)])
+        
+        asyncio.run(create_snapshots_bulk(_payload(2), session))
+        assert worker._queue.qsize() == 0
+        
+        _run_after_commit(session)
+        assert worker._queue.qsize() == 2
+    
+    def test_all_unknown_writes_nothing(self):
+        session = KnownProductsSession([])
+        result = asyncio.run(create_snapshots_bulk(_payload(3), session))
+        
+        assert result.created == 0
+        assert len(session.calls) == 1
+    
+    def test_request_size_is_capped(self):
+        with pytest.raises(ValidationError):
+            _payload(10_001)
@@ -0,0 +1,335 @@
+"""
+Tests for burn rate calculation.
+
+Covers the fixed-point math, the bulk (single-scan) path and the
+materialized usage statistics.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, ROUND_HALF_UP
+import random
+from uuid import UUID
+
+from sqlalchemy.dialects import postgresql
+
+from app.ml.burn_rate import BurnRateCalculator, SnapshotSeries, window_start
+from app.ml.usage_stats import HORIZON_DAYS, Observation, ProductUsage, UsageStatisticsWorker
+
+
+AS_OF = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class InMemoryCalculator(BurnRateCalculator):
+    """Calculator serving snapshots from a dict, in small batches"""
+    
+    def __init__(self, history, batch_size=7, use_materialized=True):
+        super().__init__(use_materialized=use_materialized)
+        self.history = history
+        self.batch_size = batch_size
+    
+    async def _get_snapshot_series(self, product_id, as_of, days):
+        series = SnapshotSeries()
+        for scanned_at, quantity in self.history.get(product_id, []):
+            if window_start(as_of, days) <= scanned_at <= as_of:
+                series.append(scanned_at, quantity)
+        return series
+    
+    async def _stream_snapshot_rows(self, filter_ids, product_ids, start_date, end_date):
+        rows = [
+            (product_id, scanned_at, quantity)
+            for product_id in sorted(filter_ids if filter_ids is not None else self.history)
+            for scanned_at, quantity in self.history.get(product_id, [])
+            if start_date <= scanned_at <= end_date
+        ]
+        for i in range(0, len(rows), self.batch_size):
+            yield rows[i:i + self.batch_size]
+    
+    async def _get_products_with_snapshots(self):
+        return list(self.history)
+
+
+def _history(products=20, days=120, seed=7, scans_per_day=1):
+    rng = random.Random(seed)
+    history = {}
+    for _ in range(products):
+        quantity = rng.randint(50, 200)
+        rows = []
+        for day in range(days, 0, -1):
+            for scan in range(scans_per_day):
+                quantity = max(0, quantity - rng.randint(0, 15) + (rng.randint(30, 60) if day % 6 == 0 and scan == 0 else 0))
+                rows.append((AS_OF - timedelta(days=day, hours=-8 * scan), quantity))
+        history[UUID(int=rng.getrandbits(128))] = rows
+    return history
+
+
+class TestBulkBurnRate:
+    """The bulk path must match the per-product path exactly"""
+    
+    def test_bulk_matches_per_product(self):
+        calc = InMemoryCalculator(_history())
+        
+        async def run():
+            per_product = await calc.calculate_all_burn_rates(as_of=AS_OF, bulk=False)
+            bulk = await calc.calculate_all_burn_rates(as_of=AS_OF)
+            return per_product, bulk
+        
+        per_product, bulk = asyncio.run(run())
+        
+        assert len(bulk) == len(per_product) == 20
+        for a, b in zip(per_product, bulk):
+            assert a.model_dump(exclude={"calculated_at"}) == b.model_dump(exclude={"calculated_at"})
+    
+    def test_requested_products_without_snapshots(self):
+        history = _history(products=3)
+        missing = UUID(int=0)
+        calc = InMemoryCalculator(history)
+        
+        ids = [missing] + list(history)
+        results = asyncio.run(calc.calculate_burn_rates_bulk(ids, as_of=AS_OF))
+        
+        assert [r.product_id for r in results] == ids
+        assert results[0].burn_rate_90d == 0
+        assert results[0].data_points_90d == 0
+
+
+class TestTimezones:
+    """scanned_at comes back from asyncpg as an aware datetime"""
+    
+    def test_naive_as_of_against_aware_history(self):
+        history = _history(products=3)
+        calc = InMemoryCalculator(history)
+        
+        aware = asyncio.run(calc.calculate_all_burn_rates(as_of=AS_OF))
+        naive = asyncio.run(calc.calculate_all_burn_rates(as_of=AS_OF.replace(tzinfo=None)))
+        
+        for a, b in zip(aware, naive):
+            assert a.model_dump(exclude={"calculated_at"}) == b.model_dump(exclude={"calculated_at"})
+        assert aware[0].data_points_7d > 0
+    
+    def test_default_as_of(self):
+        product_id = UUID(int=5)
+        now = datetime.now(timezone.utc)
+        calc = InMemoryCalculator({product_id: [(now - timedelta(days=day), 10 * day) for day in range(30, 0, -1)]})
+        
+        result = asyncio.run(calc.calculate_burn_rate(product_id))
+        
+        assert result.burn_rate_7d == Decimal("10")
+        assert result.last_snapshot_at.tzinfo is not None
+    
+    def test_naive_series(self):
+        timestamps = [datetime(2026, 1, 1) + timedelta(days=day) for day in range(10)]
+        series = SnapshotSeries(timestamps)
+        
+        assert series.start_index(datetime(2026, 1, 4, tzinfo=timezone.utc)) == 3
+
+
+class TestFixedPoint:
+    """Rates are exact fixed-point decimals, never floats"""
+    
+    def test_rates_have_four_places(self):
+        calc = BurnRateCalculator()
+        
+        rate = calc._average_burn_rate([5, 10, 10])
+        
+        assert rate == Decimal("8.3333")
+        assert rate.as_tuple().exponent == -4
+    
+    def test_variance_coefficient(self):
+        calc = BurnRateCalculator()
+        
+        # mean 5, population std 2 -> cv 0.4
+        assert calc._calculate_variance_coefficient([2, 4, 4, 4, 5, 5, 7, 9]) == Decimal("0.4")
+        assert calc._calculate_variance_coefficient([3, 3, 3]) == 0
+        assert calc._calculate_variance_coefficient([1]) == 0
+    
+    def test_trend_threshold(self):
+        calc = BurnRateCalculator()
+        
+        # Second half exactly 10% higher is still stable
+        assert calc._detect_trend([10] * 5 + [11] * 5) == "stable"
+        assert calc._detect_trend([10] * 5 + [12] * 5) == "increasing"
+        assert calc._detect_trend([10] * 5 + [8] * 5) == "decreasing"
+
+
+class TestUsageStatistics:
+    """Incrementally maintained usage aggregates"""
+    
+    def _observations(self, days=120, seed=3):
+        rng = random.Random(seed)
+        product_id = UUID(int=1)
+        quantity = 100
+        observations = []
+        for day in range(days, 0, -1):
+            at = AS_OF - timedelta(days=day, hours=-9)
+            if rng.random() < 0.2:
+                continue  # missed scan
+            if rng.random() < 0.3:
+                delta = -rng.randint(1, 5)
+                quantity = max(0, quantity + delta)
+                observations.append(Observation(product_id=product_id, observed_at=at, qty_delta=delta))
+                at += timedelta(hours=1)
+            quantity = max(0, quantity - rng.randint(0, 12) + (40 if day % 7 == 0 else 0))
+            observations.append(Observation(product_id=product_id, observed_at=at, quantity=quantity))
+        return product_id, observations
+    
+    def test_incremental_matches_recomputed(self):
+        product_id, observations = self._observations()
+        usage = ProductUsage(product_id, observations[0].observed_at.date())
+        for observation in observations:
+            observation.apply(usage)
+        usage.roll_to(AS_OF.date() + timedelta(days=3))
+        
+        buckets = [(day, list(bucket)) for day, bucket in usage.buckets.items()]
+        fresh = ProductUsage.from_rows(product_id, usage.as_of_day, None, None, buckets)
+        
+        for window in (7, 15, 30, 90):
+            in_window = [bucket for day, bucket in buckets if (usage.as_of_day - day).days < window]
+            assert usage.consumed[window] == fresh.consumed[window] == sum(b[0] for b in in_window)
+            assert usage.intervals[window] == fresh.intervals[window] == sum(b[2] for b in in_window)
+            assert usage.burn_intervals[window] == fresh.burn_intervals[window] == sum(b[3] for b in in_window)
+            assert usage.squares[window] == fresh.squares[window] == sum(b[4] for b in in_window)
+        assert max(usage.buckets) <= usage.as_of_day
+        assert (usage.as_of_day - min(usage.buckets)).days < 90
+    
+    def test_event_moves_snapshot_baseline(self):
+        product_id = UUID(int=2)
+        usage = ProductUsage(product_id, AS_OF.date())
+        
+        usage.observe_snapshot(AS_OF, 50)
+        usage.observe_event(AS_OF + timedelta(hours=1), -5)
+        usage.observe_snapshot(AS_OF + timedelta(hours=2), 42)
+        
+        # 5 recorded + 3 unrecorded, not 5 + 8
+        assert usage.consumed[7] == 8
+        assert usage.intervals[7] == 1
+    
+    def test_calculator_reads_materialized(self, monkeypatch):
+        from app.ml import usage_stats
+        
+        product_id, observations = self._observations()
+        worker = UsageStatisticsWorker()
+        monkeypatch.setattr(usage_stats, "_worker_instance", worker)
+        asyncio.run(worker.apply(observations))
+        
+        usage = worker._states[product_id]
+        calc = InMemoryCalculator({})
+        result = asyncio.run(calc.calculate_burn_rate(product_id, AS_OF))
+        bulk = asyncio.run(calc.calculate_burn_rates_bulk([product_id], AS_OF))
+        
+        expected = Decimal(usage.consumed[30]) / usage.intervals[30]
+        assert result.burn_rate_30d == expected.quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
+        assert result.data_points_30d == usage.intervals[30]
+        assert bulk[0].model_dump(exclude={"calculated_at"}) == result.model_dump(exclude={"calculated_at"})
+    
+    def test_busy_queue_still_rolls_forward(self, monkeypatch):
+        from app.ml import usage_stats
+        
+        worker = UsageStatisticsWorker()
+        worker._rolled_day -= timedelta(days=1)
+        rolled = []
+        monkeypatch.setattr(worker, "roll_forward", lambda: rolled.append(True) or asyncio.sleep(0))
+        # Midnight never times out the wait; only the batch loop can roll
+        monkeypatch.setattr(usage_stats, "_seconds_until_midnight", lambda: 3600.0)
+        
+        async def run():
+            await worker.start()
+            worker.submit_snapshot(UUID(int=1), datetime.utcnow(), 10)
+            await worker.stop()
+        
+        asyncio.run(run())
+        
+        assert rolled == [True]
+        assert worker._rolled_day == datetime.utcnow().date()
+    
+    def test_materialized_matches_raw(self, monkeypatch):
+        from app.ml import usage_stats
+        
+        for scans_per_day in (1, 3):
+            for as_of in (AS_OF, AS_OF + timedelta(hours=14)):
+                history = _history(products=5, scans_per_day=scans_per_day)
+                history = {
+                    product_id: [(at, qty) for at, qty in rows if at <= as_of]
+                    for product_id, rows in history.items()
+                }
+                worker = UsageStatisticsWorker()
+                monkeypatch.setattr(usage_stats, "_worker_instance", worker)
+                asyncio.run(worker.apply([
+                    Observation(product_id=product_id, observed_at=at, quantity=qty)
+                    for product_id, rows in history.items()
+                    for at, qty in rows
+                ]))
+                
+                raw = asyncio.run(InMemoryCalculator(history, use_materialized=False).calculate_burn_rates_bulk(list(history), as_of))
+                materialized = asyncio.run(InMemoryCalculator({}).calculate_burn_rates_bulk(list(history), as_of))
+                
+                for a, b in zip(raw, materialized):
+                    assert a.data_points_7d > 0
+                    assert a.model_dump(exclude={"calculated_at"}) == b.model_dump(exclude={"calculated_at"})
+
+
+class EmptyResult:
+    def all(self):
+        return []
+    
+    def __iter__(self):
+        return iter(())
+
+
+class RecordingSession:
+    """AsyncSession stand-in with no stored state; fails statements touching `poison`"""
+    
+    def __init__(self, log, poison=None):
+        self.log = log
+        self.poison = poison
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    async def execute(self, statement):
+        compiled = statement.compile(dialect=postgresql.dialect())
+        if self.poison is not None and self.poison in str(compiled.params):
+            raise RuntimeError("constraint violation")
+        self.log.append((str(compiled), compiled.params))
+        return EmptyResult()
+    
+    async def commit(self):
+        self.log.append(("COMMIT", {}))
+
+
+class TestUsagePersistence:
+    """Bucket rows follow the in-memory horizon; failed batches are retried"""
+    
+    def test_evicted_buckets_are_deleted(self):
+        log = []
+        worker = UsageStatisticsWorker(lambda: RecordingSession(log))
+        product_id = UUID(int=1)
+        
+        asyncio.run(worker.apply([
+            Observation(product_id=product_id, observed_at=AS_OF - timedelta(days=120), quantity=50),
+            Observation(product_id=product_id, observed_at=AS_OF, quantity=40),
+        ]))
+        
+        deletes = [(sql, params) for sql, params in log if sql.startswith("DELETE FROM usage_daily_buckets")]
+        assert len(deletes) == 1
+        assert "usage_daily_buckets.day < " in deletes[0][0]
+        assert AS_OF.date() - timedelta(days=HORIZON_DAYS - 1) in deletes[0][1].values()
+        assert log[-1][0] == "COMMIT"
+    
+    def test_failed_batch_is_retried_per_product(self):
+        log = []
+        worker = UsageStatisticsWorker(lambda: RecordingSession(log, poison=str(UUID(int=2))), retry_delay=0)
+        batch = [
+            Observation(product_id=UUID(int=product), observed_at=AS_OF, quantity=10)
+            for product in (1, 2)
+        ]
+        
+        asyncio.run(worker._apply_safely(batch))
+        
+        # The batch fails every attempt; product 1 then goes through alone
+        assert [sql for sql, _ in log].count("COMMIT") == 1
+        assert any(str(UUID(int=1)) in str(params) for sql, params in log if sql.startswith("INSERT INTO usage_statistics"))
+
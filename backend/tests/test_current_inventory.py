@@ -0,0 +1,98 @@
+"""
+Tests for the current_inventory read model and the below-par query.
+
+Below-par must cost one round trip regardless of catalog size, and the
+read model must keep the newest snapshot per product.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import UUID
+
+from sqlalchemy.dialects import postgresql
+
+from app.api.inventory import get_products_below_par
+from app.db import InventorySnapshot
+from app.services.current_inventory import below_par_query, latest_per_product, snapshot_row, upsert_current_inventory
+
+
+T0 = datetime(2026, 1, 1)
+
+
+def _snapshot(product, minutes, quantity, snapshot_id):
+    return snapshot_row(InventorySnapshot(
+        id=UUID(int=snapshot_id),
+        product_id=UUID(int=product),
+        quantity=quantity,
+        scanned_at=T0 + timedelta(minutes=minutes),
+        location_tag="walk-in",
+    ))
+
+
+class RecordingSession:
+    """AsyncSession stand-in recording executed statements"""
+    
+    def __init__(self, rows=()):
+        self.statements = []
+        self.rows = rows
+    
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return iter(self.rows)
+
+
+def _sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestReadModelMaintenance:
+
+    def test_keeps_newest_snapshot_per_product(self):
+        rows = latest_per_product([
+            _snapshot(2, 10, 5, 1),
+            _snapshot(1, 30, 7, 2),
+            _snapshot(2, 5, 9, 3),   # older scan arriving later
+            _snapshot(1, 30, 8, 4),  # same instant: later snapshot wins
+        ])
+        
+        assert [(r["product_id"].int, r["quantity"]) for r in rows] == [(1, 8), (2, 5)]
+    
+    def test_upsert_is_one_guarded_statement(self):
+        db = RecordingSession()
+        touched = asyncio.run(upsert_current_inventory(db, [_snapshot(i, i, i, i) for i in range(1, 50)]))
+        
+        assert touched == 49
+        assert len(db.statements) == 1
+        sql = _sql(db.statements[0])
+        assert "ON CONFLICT (product_id) DO UPDATE" in sql
+        assert "WHERE current_inventory.scanned_at <= excluded.scanned_at" in sql
+
+
+class TestBelowPar:
+
+    def test_single_query_for_any_catalog_size(self):
+        rows = [
+            SimpleNamespace(
+                id=UUID(int=i), name=f"SKU {i}", barcode=None, risk_category="standard",
+                par_level=10, current_quantity=i % 10, shortage=10 - i % 10,
+                confidence_score=None, scanned_at=T0, location_tag="walk-in",
+            )
+            for i in range(10_000)
+        ]
+        db = RecordingSession(rows)
+        
+        result = asyncio.run(get_products_below_par(None, None, False, db))
+        
+        assert len(result) == 10_000
+        assert len(db.statements) == 1
+    
+    def test_filters_and_sources(self):
+        read_model = _sql(below_par_query("perishable", "walk-in"))
+        assert "LEFT OUTER JOIN current_inventory" in read_model
+        assert "products.risk_category" in read_model
+        assert "current_inventory.location_tag" in read_model
+        
+        lateral = _sql(below_par_query(from_snapshots=True))
+        assert "LEFT OUTER JOIN LATERAL" in lateral
+        assert "current_inventory" not in lateral
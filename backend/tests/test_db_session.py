@@ -0,0 +1,132 @@
+"""
+Tests for the unified database engine and read routing.
+
+Reads must never commit or hold a read-write primary transaction; the
+replica path runs against two local Postgres instances when
+TEST_DATABASE_URL and TEST_REPLICA_URL are set.
+"""
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine as create_sync_engine, text
+from sqlalchemy.exc import DBAPIError
+
+from app.core import database
+from app.db import session as db_session
+from app.api import inventory, vendors
+
+
+def _dependencies(path, method):
+    for route in inventory.router.routes + vendors.router.routes:
+        if getattr(route, "path", None) == path and method in route.methods:
+            return {d.call for d in route.dependant.dependencies}
+    raise AssertionError(f"{method} {path} not routed")
+
+
+class TestEngines:
+
+    def test_single_pool_per_database(self):
+        assert database.engine is db_session.engine
+        assert database.async_session_maker is db_session.async_session_factory
+        # Without a replica, read-only sessions share the primary pool
+        assert db_session.replica_engine is None
+        assert db_session.read_engine.sync_engine.pool is db_session.engine.sync_engine.pool
+        assert db_session.read_engine.get_execution_options()["postgresql_readonly"] is True
+    
+    def test_read_session_never_commits(self, monkeypatch):
+        calls = []
+        
+        class FakeSession:
+            async def __aenter__(self):
+                return self
+            
+            async def __aexit__(self, *exc):
+                calls.append("close")
+            
+            async def commit(self):
+                calls.append("commit")
+        
+        monkeypatch.setattr(db_session, "read_session_factory", FakeSession)
+        
+        async def run():
+            async for _ in db_session.get_read_db():
+                pass
+        
+        asyncio.run(run())
+        assert calls == ["close"]
+    
+    def test_routes_pick_read_or_write_sessions(self):
+        assert db_session.get_read_db in _dependencies("/inventory/products", "GET")
+        assert db_session.get_read_db in _dependencies("/inventory/snapshots", "GET")
+        assert db_session.get_read_db in _dependencies("/vendors/", "GET")
+        assert db_session.get_primary_read_db in _dependencies("/inventory/products/barcode/{barcode}", "GET")
+        assert db_session.get_db in _dependencies("/inventory/snapshots", "POST")
+        assert db_session.get_db in _dependencies("/inventory/products", "POST")
+    
+    def test_query_and_pool_metrics(self):
+        engine = create_sync_engine("sqlite://")
+        db_session.instrument_engine(SimpleNamespace(sync_engine=engine), "test")
+        queries = db_session.QUERY_DURATION.count(database="test")
+        
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            assert db_session.CONNECTIONS_IN_USE.value(database="test") == 1
+            with pytest.raises(DBAPIError):
+                conn.execute(text("SELECT * FROM missing_table"))
+            assert conn.info["query_started"] == []
+        
+        assert db_session.QUERY_DURATION.count(database="test") == queries + 1
+        assert db_session.CONNECTION_HELD.count(database="test") >= 1
+        assert db_session.CONNECTIONS_IN_USE.value(database="test") == 0
+    
+    def test_after_commit_runs_only_on_commit(self):
+        from sqlalchemy.orm import Session
+        
+        ran = []
+        with Session(create_sync_engine("sqlite://")) as session:
+            db_session.after_commit(session, lambda: ran.append("rolled back"))
+            session.execute(text("SELECT 1"))
+            session.rollback()
+            
+            db_session.after_commit(session, lambda: 1 / 0)
+            db_session.after_commit(session, lambda: ran.append("committed"))
+            session.execute(text("SELECT 1"))
+            assert ran == []
+            session.commit()
+        
+        # A failing callback doesn't stop the rest
+        assert ran == ["committed"]
+
+
+@pytest.mark.skipif(
+    not (os.environ.get("TEST_DATABASE_URL") and os.environ.get("TEST_REPLICA_URL")),
+    reason="needs two local Postgres instances (TEST_DATABASE_URL, TEST_REPLICA_URL)",
+)
+class TestReplicaRouting:
+
+    def test_reads_go_to_replica_read_only(self):
+        primary = db_session.create_engine(os.environ["TEST_DATABASE_URL"], "primary")
+        replica = db_session.create_engine(os.environ["TEST_REPLICA_URL"], "replica") \
+            .execution_options(postgresql_readonly=True)
+        
+        async def run():
+            try:
+                async with db_session._session_factory(primary) as session:
+                    primary_id = (await session.execute(text("SELECT system_identifier FROM pg_control_system()"))).scalar()
+                async with db_session._session_factory(replica) as session:
+                    replica_id = (await session.execute(text("SELECT system_identifier FROM pg_control_system()"))).scalar()
+                    read_only = (await session.execute(text("SHOW transaction_read_only"))).scalar()
+                async with db_session._session_factory(primary.execution_options(postgresql_readonly=True)) as session:
+                    with pytest.raises(DBAPIError):
+                        await session.execute(text("CREATE TEMP TABLE t (x int)"))
+                return primary_id, replica_id, read_only
+            finally:
+                await primary.dispose()
+                await replica.dispose()
+        
+        primary_id, replica_id, read_only = asyncio.run(run())
+        assert primary_id != replica_id
+        assert read_only == "on"
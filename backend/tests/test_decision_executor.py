@@ -0,0 +1,262 @@
+"""
+PROVENIQ Ops - Decision Executor Tests
+
+Checkpointed execution, approval resumption, trace replay and
+latency instrumentation.
+"""
+
+import asyncio
+from datetime import timedelta
+from uuid import uuid4
+
+from app.decision import (
+    CheckpointStore,
+    DecisionExecutor,
+    DecisionTrace,
+    TraceStore,
+    create_reorder_dag,
+    replay_many,
+    replay_trace,
+)
+from app.core.metrics import metrics
+from app.decision.checkpoint import NodeCheckpoint
+from app.decision.dag import DecisionGate, GateType, NodeStatus
+from app.decision.executor import GATE_DURATION, GATE_REUSED
+from app.decision.replay import register_dag_factory
+
+
+ORG_ID = uuid4()
+
+
+def _reorder_context(order_amount_cents: int = 120000) -> dict:
+    return {
+        "product_id": str(uuid4()),
+        "quantity": 10,
+        "vendor_id": "sysco",
+        "order_amount_cents": order_amount_cents,
+        "current_quantity": 2,
+        "par_level": 20,
+    }
+
+
+def _approval_required_dag():
+    dag = create_reorder_dag(product_id=uuid4(), quantity=10, vendor_id="sysco")
+    dag.nodes["approval"].gates[0].required = True
+    return dag
+
+
+def _counting_executor() -> tuple:
+    executor = DecisionExecutor(ORG_ID, TraceStore(), CheckpointStore())
+    evaluated = []
+    evaluate_gate = executor.policy_engine.evaluate_gate
+
+    async def counting_evaluate_gate(gate, context):
+        evaluated.append(gate.gate_id)
+        return await evaluate_gate(gate, context)
+
+    executor.policy_engine.evaluate_gate = counting_evaluate_gate
+
+    async def submit_order(ctx):
+        return {"order_id": "ORD-1", "status": "submitted"}
+
+    executor.register_executor("submit_order_to_vendor", submit_order)
+    return executor, evaluated
+
+
+class TestCheckpointedResume:
+    """Approval resumption must not re-walk passed nodes."""
+
+    def test_blocked_dag_checkpoints_every_node(self):
+        """Each visited node must leave a checkpoint."""
+        executor, _ = _counting_executor()
+        dag = _approval_required_dag()
+
+        asyncio.run(executor.execute(dag, _reorder_context()))
+        checkpoints = asyncio.run(executor.checkpoint_store.load(dag.trace_id))
+
+        assert set(checkpoints) == set(dag.nodes)
+        assert checkpoints["check_liquidity"].status == NodeStatus.PASSED
+        assert checkpoints["approval"].status == NodeStatus.BLOCKED
+
+    def test_resume_skips_passed_gates_and_appends_to_trace(self):
+        """Resuming must only evaluate the approval gate and reuse the trace."""
+        executor, evaluated = _counting_executor()
+        dag = _approval_required_dag()
+        context = _reorder_context()
+
+        first = asyncio.run(executor.execute(dag, context))
+        events_before = len(first.events)
+        evaluated.clear()
+
+        resumed = asyncio.run(executor.provide_approval(
+            dag, "approval", uuid4(), "token-123", context,
+        ))
+
+        assert resumed is first
+        assert evaluated == ["approval_gate"]
+        assert dag.nodes["approval"].status == NodeStatus.PASSED
+        assert len(resumed.events) > events_before
+        assert any(e.event_type == "trace_resumed" for e in resumed.events)
+        assert dag.nodes["submit_order"].result["order_id"] == "ORD-1"
+
+    def test_resume_restores_from_checkpoints_on_fresh_dag_state(self):
+        """Checkpoints must be enough to resume without in-memory node state."""
+        executor, evaluated = _counting_executor()
+        dag = _approval_required_dag()
+        context = _reorder_context()
+
+        asyncio.run(executor.execute(dag, context))
+        for node in dag.nodes.values():
+            node.status = NodeStatus.PENDING
+            for gate in node.gates:
+                gate.status = NodeStatus.PENDING
+        evaluated.clear()
+
+        trace = asyncio.run(executor.provide_approval(
+            dag, "approval", uuid4(), "token-123", context,
+        ))
+
+        assert evaluated == ["approval_gate"]
+        assert dag.nodes["submit_order"].status == NodeStatus.PASSED
+
+    def test_finished_traces_drop_their_checkpoints(self):
+        """Checkpoints must only outlive a trace that can still be resumed."""
+        executor, _ = _counting_executor()
+        dag = _approval_required_dag()
+        context = _reorder_context()
+        store = executor.checkpoint_store
+
+        asyncio.run(executor.execute(dag, context))
+        assert asyncio.run(store.load(dag.trace_id))
+
+        asyncio.run(executor.provide_approval(dag, "approval", uuid4(), "token-123", context))
+        assert asyncio.run(store.load(dag.trace_id)) == {}
+
+        passed = create_reorder_dag(product_id=uuid4(), quantity=10, vendor_id="sysco")
+        asyncio.run(executor.execute(passed, _reorder_context()))
+        assert asyncio.run(store.load(passed.trace_id)) == {}
+
+    def test_abandoned_checkpoints_expire(self):
+        """A trace never approved must not keep its checkpoints forever."""
+        store = CheckpointStore(max_age=timedelta(days=7))
+        stale, fresh = uuid4(), uuid4()
+        old = NodeCheckpoint(node_id="approval", status=NodeStatus.BLOCKED)
+        old.recorded_at -= timedelta(days=8)
+
+        asyncio.run(store.save(stale, old))
+        asyncio.run(store.save(fresh, NodeCheckpoint(node_id="approval", status=NodeStatus.BLOCKED)))
+
+        assert asyncio.run(store.load(stale)) == {}
+        assert set(asyncio.run(store.load(fresh))) == {"approval"}
+
+
+class TestReplay:
+    """Replaying a stored trace must reproduce its outcome."""
+
+    def test_replay_matches_resumed_trace(self):
+        """A resumed trace must replay without divergence or bridge calls."""
+        executor, _ = _counting_executor()
+        dag = _approval_required_dag()
+        dag.name = "Reorder Decision (Approval Required)"
+        context = _reorder_context()
+        asyncio.run(executor.execute(dag, context))
+        trace = asyncio.run(executor.provide_approval(dag, "approval", uuid4(), "token-123", context))
+
+        def factory(ctx):
+            replay_dag = _approval_required_dag()
+            replay_dag.name = "Reorder Decision (Approval Required)"
+            return replay_dag
+
+        register_dag_factory("Reorder Decision (Approval Required)", factory)
+        result = asyncio.run(replay_trace(DecisionTrace.from_json(trace.to_json())))
+
+        assert result.matched, result.divergences
+
+    def test_replay_reports_divergence(self):
+        """Changing the stored input must surface as a divergence."""
+        executor, _ = _counting_executor()
+        dag = create_reorder_dag(product_id=uuid4(), quantity=10, vendor_id="sysco")
+        trace = asyncio.run(executor.execute(dag, _reorder_context()))
+
+        stored = DecisionTrace.from_json(trace.to_json())
+        stored.initial_context["current_quantity"] = 50
+
+        result = asyncio.run(replay_trace(stored))
+
+        assert not result.matched
+        assert any("verify_stock" in d for d in result.divergences)
+
+    def test_replay_many_in_process(self):
+        """Bulk replay must count matches."""
+        executor, _ = _counting_executor()
+        payloads = []
+        for _ in range(3):
+            dag = create_reorder_dag(product_id=uuid4(), quantity=10, vendor_id="sysco")
+            payloads.append(asyncio.run(executor.execute(dag, _reorder_context())).to_json())
+
+        report = replay_many(payloads, workers=0)
+
+        assert report.total == 3
+        assert report.is_clean
+
+
+class TestInstrumentation:
+    """Executions must record latency on the trace and in metrics."""
+
+    def test_timings_attached_to_trace_and_histograms(self):
+        """DAG, node, gate and executor timings must be recorded."""
+        executor, _ = _counting_executor()
+        dag = create_reorder_dag(product_id=uuid4(), quantity=10, vendor_id="sysco")
+        before = GATE_DURATION.count(gate_type="liquidity", gate="liquidity_check", source="live")
+
+        trace = asyncio.run(executor.execute(dag, _reorder_context()))
+
+        assert trace.timings.dag_ms > 0
+        assert set(trace.timings.node_ms) == set(dag.nodes)
+        assert "check_liquidity/liquidity_check" in trace.timings.gate_ms
+        assert "submit_order_to_vendor" in trace.timings.executor_ms
+        assert GATE_DURATION.count(gate_type="liquidity", gate="liquidity_check", source="live") == before + 1
+        assert "decision_dag_duration_seconds_bucket" in metrics.render()
+
+    def test_resume_only_times_reevaluated_gates(self):
+        """Upstream gates must not be re-timed (or re-evaluated) on resume."""
+        executor, _ = _counting_executor()
+        dag = _approval_required_dag()
+        context = _reorder_context()
+        before = GATE_DURATION.count(gate_type="approval", gate="approval_gate", source="live")
+        asyncio.run(executor.execute(dag, context))
+        liquidity = GATE_DURATION.count(gate_type="liquidity", gate="liquidity_check", source="live")
+
+        asyncio.run(executor.provide_approval(dag, "approval", uuid4(), "token-123", context))
+
+        assert GATE_DURATION.count(gate_type="approval", gate="approval_gate", source="live") == before + 2
+        assert GATE_DURATION.count(gate_type="liquidity", gate="liquidity_check", source="live") == liquidity
+
+    def test_reused_gates_are_counted_not_timed(self):
+        """A gate that passed before the block must not be observed as a 0s run."""
+        executor, evaluated = _counting_executor()
+        dag = _approval_required_dag()
+        approval = dag.nodes["approval"]
+        approval.gates.insert(0, DecisionGate(
+            gate_id="approval_funds",
+            gate_type=GateType.LIQUIDITY,
+            description="Funds re-checked at approval",
+        ))
+        context = _reorder_context()
+        asyncio.run(executor.execute(dag, context))
+        timed = sum(
+            GATE_DURATION.count(gate_type="liquidity", gate="approval_funds", source=source)
+            for source in ("live", "replay")
+        )
+        reused = GATE_REUSED.value(gate_type="liquidity", gate="approval_funds")
+        evaluated.clear()
+
+        asyncio.run(executor.provide_approval(dag, "approval", uuid4(), "token-123", context))
+
+        assert evaluated == ["approval_gate"]
+        assert timed == sum(
+            GATE_DURATION.count(gate_type="liquidity", gate="approval_funds", source=source)
+            for source in ("live", "replay")
+        )
+        assert GATE_REUSED.value(gate_type="liquidity", gate="approval_funds") == reused + 1
+        assert "decision_gate_reused_total{" in metrics.render()
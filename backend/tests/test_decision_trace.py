@@ -0,0 +1,88 @@
+"""
+PROVENIQ Ops - Decision Trace Tests
+
+Compact event buffer, lazy materialization and storage round-trips.
+"""
+
+from uuid import uuid4
+
+from app.decision.dag import GateType
+from app.decision.policies import PolicyResult
+from app.decision.trace import DecisionTrace
+
+
+def _trace() -> DecisionTrace:
+    trace = DecisionTrace(dag_id=uuid4(), dag_name="Reorder Decision", org_id=uuid4())
+    trace.start()
+    trace.log_node_start("verify_stock", "Verify Stock Levels")
+    trace.log_gate_result("verify_stock", "threshold_check", PolicyResult(
+        passed=True,
+        gate_type=GateType.THRESHOLD,
+        message="Stock (2) is below par level (20)",
+        details={"current_quantity": 2, "par_level": 20},
+    ))
+    trace.log_node_complete("verify_stock", {"order_id": "ORD-1"})
+    trace.log_node_error("submit_order", "vendor timeout")
+    trace.complete("failed", {"quantity": 10})
+    return trace
+
+
+class TestCompactTrace:
+    """Trace events must be recorded compactly and materialize faithfully."""
+
+    def test_events_materialize_with_messages_and_details(self):
+        """Materialized events must match the previous TraceEvent shape."""
+        trace = _trace()
+
+        assert trace.event_count == 6
+        gate = trace.events[2]
+        assert gate.event_type == "gate_evaluated"
+        assert gate.message == "Gate 'threshold_check' evaluated: passed"
+        assert gate.details["details"] == {"current_quantity": 2, "par_level": 20}
+        assert trace.events[3].details == {"result": {"order_id": "ORD-1"}}
+        assert trace.events[4].message == "Node failed: vendor timeout"
+        assert trace.events[0].details == {}
+
+    def test_event_ids_are_stable(self):
+        """Event IDs must not change between materializations."""
+        trace = _trace()
+        first_ids = [e.event_id for e in trace.events]
+        trace.log_node_blocked("approval", "Dependencies not met")
+
+        assert [e.event_id for e in trace.events[:6]] == first_ids
+        assert len(trace.events) == 7
+
+    def test_json_round_trip(self):
+        """to_json/from_json must preserve every event."""
+        trace = _trace()
+        restored = DecisionTrace.from_json(trace.to_json())
+
+        assert restored.trace_id == trace.trace_id
+        assert restored.status == "failed"
+        assert [e.model_dump() for e in restored.events] == [e.model_dump() for e in trace.events]
+        assert restored.explain() == trace.explain()
+
+    def test_legacy_json_is_accepted(self):
+        """Traces stored with a plain `events` list must still load."""
+        trace = _trace()
+        legacy = trace.model_dump_json()
+        legacy = legacy[:-1] + ',"events":' + "[" + ",".join(
+            e.model_dump_json() for e in trace.events
+        ) + "]}"
+
+        restored = DecisionTrace.from_json(legacy)
+
+        assert [e.model_dump() for e in restored.events] == [e.model_dump() for e in trace.events]
+
+    def test_explain_does_not_materialize(self):
+        """explain() must render from the buffer, matching the events."""
+        trace = _trace()
+
+        explanation = trace.explain()
+
+        assert trace._materialized is None
+        assert "[verify_stock/threshold_check] Gate 'threshold_check' evaluated: passed" in explanation
+        assert "           passed: True" in explanation
+        assert "result:" not in explanation
+        first = trace.events[0].timestamp.strftime("%H:%M:%S.%f")[:-3]
+        assert f"  {first}  Decision execution started" in explanation
@@ -0,0 +1,236 @@
+"""
+Tests for the event publisher's fan-out bus.
+
+A slow subscriber must not hold up the publisher or other subscribers,
+each full-queue policy must keep its promise, and the event log must
+stay bounded and indexed by type.
+"""
+
+import asyncio
+import logging
+import threading
+from types import SimpleNamespace
+
+from app.services.events import BackpressurePolicy, EventLog, EventPublisher, OpsEventType, Subscription
+from app.services.events.publisher import EventPayload
+
+
+TYPE = OpsEventType.INVENTORY_UPDATED
+
+
+class Recorder:
+    """Subscriber recording payload numbers; waits on `gate` when one is set"""
+    
+    def __init__(self, gate=None, fail_on=None):
+        self.gate = gate
+        self.fail_on = fail_on
+        self.seen = []
+    
+    async def __call__(self, event):
+        if self.gate is not None:
+            await self.gate.wait()
+        if event.payload["n"] == self.fail_on:
+            raise RuntimeError("boom")
+        self.seen.append(event.payload["n"])
+
+
+async def _publish(publisher, *numbers):
+    for n in numbers:
+        await publisher.publish(TYPE, {"n": n})
+
+
+class TestFanOut:
+    
+    def test_slow_subscriber_does_not_stall_publisher_or_others(self):
+        async def scenario():
+            publisher = EventPublisher()
+            slow, fast = Recorder(gate=asyncio.Event()), Recorder()
+            publisher.subscribe(TYPE.value, slow)
+            publisher.subscribe(TYPE.value, fast)
+            
+            await asyncio.wait_for(_publish(publisher, *range(5)), timeout=1)
+            await asyncio.sleep(0.01)
+            assert fast.seen == [0, 1, 2, 3, 4]
+            assert slow.seen == []
+            
+            slow.gate.set()
+            await publisher.stop()
+            return slow
+        
+        assert asyncio.run(scenario()).seen == [0, 1, 2, 3, 4]
+    
+    def test_failing_handler_keeps_receiving(self):
+        async def scenario():
+            publisher = EventPublisher()
+            recorder = Recorder(fail_on=1)
+            subscription = publisher.subscribe(TYPE.value, recorder)
+            await _publish(publisher, 0, 1, 2)
+            await publisher.drain()
+            return recorder, subscription.get_stats()
+        
+        recorder, stats = asyncio.run(scenario())
+        assert recorder.seen == [0, 2]
+        assert (stats["delivered"], stats["failed"]) == (2, 1)
+    
+    def test_stop_gives_up_on_a_stuck_subscriber(self, caplog):
+        async def scenario():
+            publisher = EventPublisher()
+            stuck = Recorder(gate=asyncio.Event())
+            publisher.subscribe(TYPE.value, stuck)
+            await _publish(publisher, 0, 1, 2)
+            await asyncio.wait_for(publisher.stop(timeout=0.05), timeout=1)
+            return stuck
+        
+        with caplog.at_level(logging.WARNING):
+            stuck = asyncio.run(scenario())
+        
+        assert stuck.seen == []
+        assert "3 events undelivered after 0.05s" in caplog.text
+    
+    def test_unsubscribed_handler_gets_nothing_more(self):
+        async def scenario():
+            publisher = EventPublisher()
+            recorder = Recorder()
+            publisher.subscribe(TYPE.value, recorder)
+            await _publish(publisher, 0)
+            await publisher.drain()
+            publisher.unsubscribe(TYPE.value, recorder)
+            await _publish(publisher, 1)
+            await asyncio.sleep(0.01)
+            return recorder
+        
+        assert asyncio.run(scenario()).seen == [0]
+
+
+class TestBackpressure:
+    
+    def test_block_waits_for_room_and_keeps_order(self):
+        async def scenario():
+            publisher = EventPublisher()
+            recorder = Recorder(gate=asyncio.Event())
+            publisher.subscribe(TYPE.value, recorder, queue_size=1, policy=BackpressurePolicy.BLOCK)
+            
+            await _publish(publisher, 0)
+            await asyncio.sleep(0)  # Worker takes 0 and waits on the gate
+            await _publish(publisher, 1)
+            blocked = asyncio.create_task(_publish(publisher, 2, 3))
+            await asyncio.sleep(0.01)
+            assert not blocked.done()
+            
+            recorder.gate.set()
+            await blocked
+            await publisher.drain()
+            return recorder
+        
+        assert asyncio.run(scenario()).seen == [0, 1, 2, 3]
+    
+    def test_drop_oldest_keeps_newest(self):
+        async def scenario():
+            publisher = EventPublisher()
+            recorder = Recorder(gate=asyncio.Event())
+            subscription = publisher.subscribe(
+                TYPE.value, recorder, queue_size=2, policy=BackpressurePolicy.DROP_OLDEST,
+            )
+            
+            await _publish(publisher, 0)
+            await asyncio.sleep(0)
+            await asyncio.wait_for(_publish(publisher, 1, 2, 3, 4), timeout=1)
+            recorder.gate.set()
+            await publisher.drain()
+            return recorder, subscription
+        
+        recorder, subscription = asyncio.run(scenario())
+        assert recorder.seen == [0, 3, 4]
+        assert subscription.dropped == 2
+    
+    def test_spill_overflow_is_delivered_in_order(self, tmp_path):
+        async def scenario():
+            recorder = Recorder(gate=asyncio.Event())
+            subscription = Subscription(
+                TYPE.value, recorder, EventPayload.model_validate,
+                queue_size=2, policy=BackpressurePolicy.SPILL, spill_dir=str(tmp_path),
+            )
+            
+            async def offer(n):
+                await subscription.offer(EventPayload(event_type=TYPE.value, payload={"n": n}))
+            
+            await offer(0)
+            await asyncio.sleep(0)
+            for n in range(1, 8):
+                await asyncio.wait_for(offer(n), timeout=1)
+            assert subscription.get_stats()["spooled"] == 5
+            assert subscription.depth == 7
+            
+            recorder.gate.set()
+            await subscription.drain()
+            subscription.close()
+            return recorder, subscription
+        
+        recorder, subscription = asyncio.run(scenario())
+        assert recorder.seen == list(range(8))
+        assert subscription.spilled == 5
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_spill_file_io_runs_off_the_event_loop(self, tmp_path):
+        async def scenario():
+            recorder = Recorder(gate=asyncio.Event())
+            subscription = Subscription(
+                TYPE.value, recorder, EventPayload.model_validate,
+                queue_size=1, policy=BackpressurePolicy.SPILL, spill_dir=str(tmp_path),
+            )
+            spool, threads = subscription.spool, set()
+            for name in ("append", "read", "commit"):
+                method = getattr(spool, name)
+                
+                def traced(*args, _method=method, _name=name):
+                    threads.add((_name, threading.current_thread() is threading.main_thread()))
+                    return _method(*args)
+                
+                setattr(spool, name, traced)
+            
+            for n in range(4):
+                await subscription.offer(EventPayload(event_type=TYPE.value, payload={"n": n}))
+                await asyncio.sleep(0)
+            recorder.gate.set()
+            await subscription.drain()
+            subscription.close()
+            return recorder, threads
+        
+        recorder, threads = asyncio.run(scenario())
+        assert recorder.seen == [0, 1, 2, 3]
+        assert threads == {("append", False), ("read", False), ("commit", False)}
+
+
+class TestEventLog:
+    
+    def _event(self, event_type, n):
+        return SimpleNamespace(event_type=event_type, n=n)
+    
+    def test_ring_buffer_evicts_oldest_and_index_follows(self):
+        log = EventLog(max_events=3)
+        for n, event_type in enumerate(["a", "b", "a", "b", "c"]):
+            log.append(self._event(event_type, n))
+        
+        assert [e.n for e in log.all()] == [2, 3, 4]
+        assert [e.n for e in log.of_type("a")] == [2]
+        assert [e.n for e in log.of_type("b")] == [3]
+        assert [e.n for e in log.of_type("c")] == [4]
+    
+    def test_evicting_last_of_a_type_drops_it_from_index(self):
+        log = EventLog(max_events=2)
+        for n, event_type in enumerate(["a", "b", "b"]):
+            log.append(self._event(event_type, n))
+        
+        assert log.of_type("a") == []
+        assert len(log) == 2
+    
+    def test_publisher_lookup_by_type(self):
+        async def scenario():
+            publisher = EventPublisher()
+            await publisher.publish(OpsEventType.SCAN_INITIATED, {"n": 0})
+            await publisher.publish(TYPE, {"n": 1})
+            return publisher
+        
+        publisher = asyncio.run(scenario())
+        assert [e["payload"]["n"] for e in publisher.get_events_by_type(TYPE.value)] == [1]
+        assert len(publisher.get_event_log()) == 2
@@ -0,0 +1,117 @@
+"""
+Tests for the shared outbound HTTP client registry.
+
+Calls to one service must share one keep-alive pool, and the pools
+must be rebuilt after shutdown closed them.
+"""
+
+import asyncio
+
+import httpx
+
+from app.core import http
+from app.core.http import HttpClientRegistry, origin_of
+
+
+class TestHttpClientRegistry:
+    def test_one_client_per_origin(self):
+        async def scenario():
+            registry = HttpClientRegistry()
+            ledger = registry.get("http://ledger:8006/v1/ledger/events")
+            assert registry.get("http://ledger:8006/health") is ledger
+            assert registry.get("http://claimsiq:3000/api/v1/shrinkage") is not ledger
+            assert registry.get("https://ledger:8006/health") is not ledger
+            assert registry.get_stats() == {"clients": 3}
+            await registry.aclose()
+    
+        asyncio.run(scenario())
+    
+    def test_origin_includes_port(self):
+        assert origin_of("http://ledger:8006/a") == ("http", "ledger", 8006)
+        assert origin_of("https://ledger/a") == ("https", "ledger", None)
+    
+    def test_aclose_closes_and_recreates(self):
+        async def scenario():
+            registry = HttpClientRegistry()
+            client = registry.get("http://ledger:8006")
+            await registry.aclose()
+            assert client.is_closed
+            assert registry.get_stats() == {"clients": 0}
+    
+            replacement = registry.get("http://ledger:8006")
+            assert replacement is not client and not replacement.is_closed
+            await registry.aclose()
+    
+        asyncio.run(scenario())
+    
+    def test_closed_client_is_replaced(self):
+        async def scenario():
+            registry = HttpClientRegistry()
+            client = registry.get("http://ledger:8006")
+            await client.aclose()
+            assert registry.get("http://ledger:8006") is not client
+            await registry.aclose()
+    
+        asyncio.run(scenario())
+    
+    def test_http2_only_on_tls(self, monkeypatch):
+        monkeypatch.setattr(http, "HTTP2_AVAILABLE", True)
+        registry = HttpClientRegistry(http2=True)
+        plain = registry.get("http://ledger:8006")._transport._pool._http2
+        tls = registry.get("https://ledger:8006")._transport._pool._http2
+        assert (plain, tls) == (False, True)
+    
+    def test_requests_reuse_one_connection(self):
+        async def scenario():
+            connections = 0
+    
+            async def handle(reader, writer):
+                nonlocal connections
+                connections += 1
+                try:
+                    while True:
+                        await reader.readuntil(b"\r\n\r\n")
+                        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}")
+                        await writer.drain()
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    pass
+                finally:
+                    writer.close()
+    
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            registry = HttpClientRegistry()
+            try:
+                for _ in range(5):
+                    response = await registry.get(f"http://127.0.0.1:{port}").get(f"http://127.0.0.1:{port}/health")
+                    assert response.status_code == 200
+            finally:
+                await registry.aclose()
+                server.close()
+                await server.wait_closed()
+            return connections
+    
+        assert asyncio.run(scenario()) == 1
+    
+    def test_callers_use_registry_timeouts(self, monkeypatch, tmp_path):
+        from app.bridges.ledger import LedgerBridge
+        
+        timeouts = {}
+        
+        def handler(request):
+            timeouts[request.url.path] = request.extensions["timeout"]["read"]
+            return httpx.Response(201, json={})
+        
+        class Registry(HttpClientRegistry):
+            def _create(self, origin):
+                return httpx.AsyncClient(timeout=self.timeout, transport=httpx.MockTransport(handler))
+        
+        monkeypatch.setattr(http, "_registry_instance", Registry(timeout=7.0))
+        bridge = LedgerBridge("http://ledger", dead_letter_path=str(tmp_path / "dead.ndjson"))
+        
+        asyncio.run(bridge.write_event("OPS_SCAN_COMPLETED", None, "user-1", {}))
+        asyncio.run(bridge.post_events([{"n": 0}, {"n": 1}]))
+        
+        assert timeouts["/api/v1/events/canonical"] == 7.0
+        assert timeouts["/api/v1/events/canonical/batch"] == 30.0
+
@@ -0,0 +1,136 @@
+"""
+Tests for vendor lead-time statistics.
+
+Covers quantiles against a sorted reference, vendor-wide fallback,
+change-based cache invalidation and recording deliveries on commit.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+import math
+import random
+from types import SimpleNamespace
+from uuid import UUID
+
+from app.api import vendors
+from app.db.session import _run_after_commit
+from app.ml.lead_times import LeadTimeStatistics
+
+
+VENDOR = UUID(int=10)
+PRODUCT = UUID(int=20)
+OTHER_PRODUCT = UUID(int=21)
+
+
+def _nearest_rank(values, level):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(level * len(ordered))) - 1]
+
+
+class TestLeadTimeStatistics:
+
+    def test_quantiles_match_sorted_reference(self):
+        rng = random.Random(8)
+        hours = [rng.choice([24, 36, 48]) + int(rng.expovariate(1 / 10)) for _ in range(2000)]
+        stats = LeadTimeStatistics()
+        for h in hours:
+            stats.record_delivery(VENDOR, PRODUCT, h)
+        
+        result = stats.get(VENDOR, PRODUCT)
+        
+        assert result.samples == 2000
+        assert result.p50_hours == _nearest_rank(hours, 0.5)
+        assert result.p90_hours == _nearest_rank(hours, 0.9)
+        assert result.p99_hours == _nearest_rank(hours, 0.99)
+        assert abs(float(result.mean_hours) - sum(hours) / len(hours)) < 0.01
+    
+    def test_pair_falls_back_to_vendor_distribution(self):
+        stats = LeadTimeStatistics(min_samples=3)
+        for h in (20, 24, 28):
+            stats.record_delivery(VENDOR, OTHER_PRODUCT, h)
+        stats.record_delivery(VENDOR, PRODUCT, 100)
+        
+        fallback = stats.get(VENDOR, PRODUCT)
+        assert fallback.product_id is None
+        assert fallback.samples == 4
+        
+        assert stats.get(UUID(int=99), PRODUCT) is None
+    
+    def test_cache_invalidated_only_for_changed_keys(self):
+        stats = LeadTimeStatistics(min_samples=1)
+        stats.record_delivery(VENDOR, PRODUCT, 24)
+        stats.record_delivery(UUID(int=11), PRODUCT, 48)
+        
+        first = stats.get(VENDOR, PRODUCT)
+        untouched = stats.get(UUID(int=11), PRODUCT)
+        assert stats.get(VENDOR, PRODUCT) is first
+        
+        stats.record_delivery(VENDOR, PRODUCT, 72)
+        
+        updated = stats.get(VENDOR, PRODUCT)
+        assert updated is not first
+        assert updated.version == first.version + 1
+        assert updated.p99_hours == 72
+        assert stats.get(UUID(int=11), PRODUCT) is untouched
+    
+    def test_mean_with_delivery_matches_recording(self):
+        stats = LeadTimeStatistics(min_samples=3)
+        stats.record_delivery(VENDOR, PRODUCT, 20)
+        assert stats.mean_with_delivery(VENDOR, PRODUCT, 31) is None
+        
+        stats.record_delivery(VENDOR, PRODUCT, 24)
+        expected = stats.mean_with_delivery(VENDOR, PRODUCT, 31)
+        stats.record_delivery(VENDOR, PRODUCT, 31)
+        
+        assert expected == stats.get(VENDOR, PRODUCT).mean_hours
+
+
+class OrderSession:
+    """AsyncSession stand-in: the first query returns the order"""
+    
+    def __init__(self, order):
+        self.order = order
+        self.statements = []
+        self.info = {}
+    
+    async def execute(self, statement):
+        self.statements.append(statement)
+        order = self.order
+        
+        class Result:
+            def scalar_one_or_none(self):
+                return order
+        
+        return Result()
+
+
+class TestMarkDelivered:
+    
+    def test_delivery_recorded_after_commit(self, monkeypatch):
+        stats = LeadTimeStatistics(min_samples=1)
+        stats._loaded = True
+        monkeypatch.setattr(vendors, "get_lead_time_stats", lambda: stats)
+        submitted_at = datetime.now(timezone.utc) - timedelta(hours=30)
+        order = SimpleNamespace(
+            vendor_id=VENDOR,
+            status="submitted",
+            submitted_at=submitted_at,
+            delivered_at=None,
+            items=[SimpleNamespace(product_id=PRODUCT)],
+        )
+        session = OrderSession(order)
+        
+        response = asyncio.run(vendors.mark_order_delivered(UUID(int=1), session))
+        
+        assert response["lead_time_hours"] == 30
+        assert order.status == "delivered"
+        assert order.delivered_at > submitted_at
+        # The avg_lead_time_hours upsert went out in the transaction...
+        assert len(session.statements) == 2
+        # ...but the distributions only change once it commits
+        assert stats.get(VENDOR, PRODUCT) is None
+        
+        _run_after_commit(session)
+        
+        assert stats.get(VENDOR, PRODUCT).samples == 1
+        assert stats.get(VENDOR, PRODUCT).p50_hours == 30
@@ -0,0 +1,239 @@
+"""
+Tests for the batched, spooled Ledger writer.
+
+Events must reach the Ledger in submission order, in batches, and
+survive a Ledger outage (and a restart during one) via the spool.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.bridges import ledger_writer
+from app.bridges.ledger import LedgerBridge
+from app.bridges.ledger_writer import LedgerWriter
+from app.core import http
+from app.core.spool import FileSpool
+
+
+class FakeLedger:
+    """Sender recording batches; handles `accept` events per call while up"""
+    
+    def __init__(self, up=True, accept=None):
+        self.up = up
+        self.accept = accept
+        self.batches = []
+    
+    async def __call__(self, events):
+        if not self.up:
+            return 0
+        handled = len(events) if self.accept is None else min(self.accept, len(events))
+        self.batches.append([e["n"] for e in events[:handled]])
+        return handled
+    
+    @property
+    def received(self):
+        return [n for batch in self.batches for n in batch]
+
+
+def _writer(tmp_path, ledger, **kwargs):
+    options = dict(batch_size=3, flush_interval=10.0, retry_interval=0.02, max_buffer=1000)
+    options.update(kwargs)
+    return LedgerWriter(ledger, spool_path=str(tmp_path / "spool.ndjson"), **options)
+
+
+class TestLedgerWriter:
+    
+    def test_posts_full_batches_in_order(self, tmp_path):
+        ledger = FakeLedger()
+        
+        async def scenario():
+            writer = _writer(tmp_path, ledger)
+            for n in range(7):
+                writer.submit({"n": n})
+            await asyncio.sleep(0.05)
+            assert ledger.batches == [[0, 1, 2], [3, 4, 5]]
+            await writer.stop()
+        
+        asyncio.run(scenario())
+        assert ledger.batches == [[0, 1, 2], [3, 4, 5], [6]]
+    
+    def test_partial_batch_flushed_at_deadline(self, tmp_path):
+        ledger = FakeLedger()
+        
+        async def scenario():
+            writer = _writer(tmp_path, ledger, flush_interval=0.05)
+            writer.submit({"n": 0})
+            await asyncio.sleep(0.01)
+            assert ledger.batches == []
+            await asyncio.sleep(0.1)
+            assert ledger.batches == [[0]]
+            await writer.stop()
+        
+        asyncio.run(scenario())
+    
+    def test_outage_spools_then_replays_in_order(self, tmp_path):
+        ledger = FakeLedger(up=False)
+        
+        async def scenario():
+            writer = _writer(tmp_path, ledger, retry_interval=0.05)
+            for n in range(5):
+                writer.submit({"n": n})
+            await asyncio.sleep(0.02)
+            assert writer.spool.pending == 5
+            
+            ledger.up = True
+            writer.submit({"n": 5})
+            await asyncio.sleep(0.01)
+            # Newer events wait behind the spool until it is replayed
+            assert ledger.received == []
+            
+            await asyncio.sleep(0.1)
+            await writer.stop()
+            return writer
+        
+        writer = asyncio.run(scenario())
+        assert ledger.received == list(range(6))
+        assert writer.spool.pending == 0
+        assert not (tmp_path / "spool.ndjson").exists()
+    
+    def test_unsent_rest_of_batch_is_spooled(self, tmp_path):
+        ledger = FakeLedger(accept=1)
+        
+        async def scenario():
+            writer = _writer(tmp_path, ledger, retry_interval=60.0)
+            for n in range(3):
+                writer.submit({"n": n})
+            await writer.stop()
+            return writer
+        
+        writer = asyncio.run(scenario())
+        assert ledger.received == [0]
+        assert [e["n"] for _, e in writer.spool.read(10)] == [1, 2]
+    
+    def test_spool_replayed_by_next_process(self, tmp_path):
+        down = FakeLedger(up=False)
+        
+        async def first():
+            writer = _writer(tmp_path, down)
+            for n in range(4):
+                writer.submit({"n": n})
+            await writer.stop()
+        
+        asyncio.run(first())
+        
+        up = FakeLedger()
+        
+        async def second():
+            writer = _writer(tmp_path, up)
+            assert writer.spool.pending == 4
+            await writer.start()
+            await asyncio.sleep(0.05)
+            await writer.stop()
+        
+        asyncio.run(second())
+        assert up.batches == [[0, 1, 2], [3]]
+
+
+class TestFileSpool:
+    
+    def test_replay_resumes_from_committed_offset(self, tmp_path):
+        spool = FileSpool(str(tmp_path / "spool.ndjson"))
+        spool.append([{"n": n} for n in range(5)])
+        entries = spool.read(2)
+        spool.commit(entries[-1][0], 2)
+        
+        reopened = FileSpool(str(tmp_path / "spool.ndjson"))
+        assert reopened.pending == 3
+        assert [e["n"] for _, e in reopened.read(10)] == [2, 3, 4]
+    
+    def test_torn_last_line_is_dropped(self, tmp_path):
+        path = tmp_path / "spool.ndjson"
+        path.write_text(json.dumps({"n": 0}) + "\n" + '{"n": 1')
+        
+        spool = FileSpool(str(path))
+        assert spool.pending == 1
+        spool.append([{"n": 2}])
+        assert [e["n"] for _, e in spool.read(10)] == [0, 2]
+
+
+class TestLedgerBridge:
+    
+    @pytest.fixture
+    def ledger_http(self, monkeypatch):
+        requests = []
+        responses = {}
+        
+        def handler(request):
+            requests.append((request.url.path, json.loads(request.content)))
+            queued = responses.get(request.url.path)
+            return httpx.Response(queued.pop(0) if queued else 201, json={})
+        
+        class Clients:
+            def get(self, url):
+                return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        
+        monkeypatch.setattr(http, "_registry_instance", Clients())
+        return requests, responses
+    
+    def test_batch_endpoint(self, ledger_http):
+        requests, _ = ledger_http
+        bridge = LedgerBridge("http://ledger")
+        
+        assert asyncio.run(bridge.post_events([{"n": 0}, {"n": 1}])) == 2
+        assert requests == [("/api/v1/events/canonical/batch", {"events": [{"n": 0}, {"n": 1}]})]
+    
+    def test_falls_back_to_single_posts_without_batch_endpoint(self, ledger_http):
+        requests, responses = ledger_http
+        responses["/api/v1/events/canonical/batch"] = [404]
+        responses["/api/v1/events/canonical"] = [201, 503]
+        bridge = LedgerBridge("http://ledger")
+        events = [{"n": n, "idempotency_key": f"k{n}"} for n in range(3)]
+        
+        # Second single post hits a busy Ledger: only the first is handled
+        assert asyncio.run(bridge.post_events(events)) == 1
+        assert [path for path, _ in requests] == [
+            "/api/v1/events/canonical/batch",
+            "/api/v1/events/canonical",
+            "/api/v1/events/canonical",
+        ]
+        
+        requests.clear()
+        assert asyncio.run(bridge.post_events(events[1:])) == 2
+        assert [path for path, _ in requests] == ["/api/v1/events/canonical"] * 2
+    
+    def test_rejected_events_go_to_dead_letters(self, ledger_http, tmp_path):
+        requests, responses = ledger_http
+        responses["/api/v1/events/canonical/batch"] = [422]
+        responses["/api/v1/events/canonical"] = [201, 422, 401]
+        bridge = LedgerBridge("http://ledger", dead_letter_path=str(tmp_path / "dead.ndjson"))
+        events = [{"n": n, "idempotency_key": f"k{n}"} for n in range(4)]
+        
+        # 422 is kept aside and counts as handled; 401 stops the batch for a retry
+        assert asyncio.run(bridge.post_events(events)) == 2
+        
+        dead = FileSpool(str(tmp_path / "dead.ndjson")).read(10)
+        assert [(entry["event"]["n"], entry["status_code"]) for _, entry in dead] == [(1, 422)]
+    
+    def test_server_and_auth_errors_are_retried(self, ledger_http, tmp_path):
+        _, responses = ledger_http
+        bridge = LedgerBridge("http://ledger", dead_letter_path=str(tmp_path / "dead.ndjson"))
+        
+        for status_code in (401, 403, 501, 507):
+            responses["/api/v1/events/canonical/batch"] = [status_code]
+            assert asyncio.run(bridge.post_events([{"n": 0}, {"n": 1}])) == 0
+        assert bridge.dead_letters.pending == 0
+    
+    def test_scan_completed_is_queued(self, tmp_path, monkeypatch):
+        writer = _writer(tmp_path, FakeLedger())
+        monkeypatch.setattr(ledger_writer, "_writer_instance", writer)
+        
+        ack = asyncio.run(LedgerBridge().write_scan_completed("loc-1", "user-1", 40, 2))
+        
+        assert writer.get_stats()["buffered"] == 1
+        queued = writer._buffer[0]
+        assert queued["event_type"] == "OPS_SCAN_COMPLETED"
+        assert queued["idempotency_key"] == ack.idempotency_key
+        assert queued["payload"]["items_scanned"] == 40
@@ -0,0 +1,175 @@
+"""
+Tests for keyset pagination and NDJSON streaming of inventory listings.
+
+Pages must chain through opaque cursors without offsets, and exports
+must stream chunk by chunk rather than build the whole list.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import UUID
+
+import pytest
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from starlette.requests import Request
+
+from app.api.inventory import list_products, list_snapshots
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, stream_ndjson
+from app.db import Product
+from app.models.schemas import ProductRead
+
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _request(accept="application/json"):
+    return Request({"type": "http", "headers": [(b"accept", accept.encode())]})
+
+
+def _snapshot(number):
+    return SimpleNamespace(
+        id=UUID(int=number), product_id=UUID(int=1), quantity=number, confidence_score=None,
+        scanned_at=T0 - timedelta(minutes=number), scanned_by="bishop-1", scan_method="barcode",
+        location_tag=None,
+    )
+
+
+def _product(number):
+    return SimpleNamespace(
+        id=UUID(int=number), name=f"SKU {number:05d}", barcode=None, par_level=1,
+        risk_category="standard", created_at=T0, updated_at=T0,
+    )
+
+
+class _Scalars(list):
+    """ScalarResult stand-in"""
+    
+    def all(self):
+        return list(self)
+
+
+class ListingSession:
+    """AsyncSession stand-in serving pages of page_size (+1 look-ahead row) in order"""
+    
+    def __init__(self, rows, page_size=None):
+        self.rows = rows
+        self.page_size = page_size
+        self.served = 0
+        self.statements = []
+    
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        if self.page_size is None:
+            rows = self.rows
+        else:
+            rows = self.rows[self.served:self.served + self.page_size + 1]
+            self.served += self.page_size
+        return SimpleNamespace(scalars=lambda: _Scalars(rows))
+
+
+class TestCursors:
+
+    def test_round_trip(self):
+        key = (T0, UUID(int=7))
+        assert decode_cursor(encode_cursor("snapshots", key), "snapshots", (datetime, UUID)) == key
+    
+    @pytest.mark.parametrize("cursor", [
+        encode_cursor("products", ("SKU", UUID(int=1))),
+        encode_cursor("snapshots", (T0,)),
+        "not-a-cursor",
+    ])
+    def test_foreign_or_malformed_cursor_is_400(self, cursor):
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor(cursor, "snapshots", (datetime, UUID))
+        assert exc.value.status_code == 400
+
+
+class TestKeysetPages:
+
+    def test_snapshot_pages_chain_through_cursor(self):
+        db = ListingSession([_snapshot(i) for i in range(1, 251)], page_size=100)
+        seen, cursor = [], None
+        while True:
+            response = Response()
+            page = asyncio.run(list_snapshots(
+                _request(), response, UUID(int=1), None, None, 100, cursor, db,
+            ))
+            seen.extend(s.quantity for s in page)
+            cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if cursor is None:
+                break
+        
+        assert seen == list(range(1, 251))
+        sql = str(db.statements[-1].compile(dialect=postgresql.dialect()))
+        assert "(inventory_snapshots.scanned_at, inventory_snapshots.id) < (" in sql
+        assert "ORDER BY inventory_snapshots.scanned_at DESC, inventory_snapshots.id DESC" in sql
+    
+    def test_unfiltered_snapshots_have_no_implicit_window(self):
+        db = ListingSession([_snapshot(i) for i in range(1, 11)])
+        
+        asyncio.run(list_snapshots(_request(), Response(), None, None, None, 100, None, db))
+        asyncio.run(list_snapshots(_request(), Response(), None, None, T0 - timedelta(days=3), 100, None, db))
+        
+        unfiltered, since = (str(s.compile(dialect=postgresql.dialect())) for s in db.statements)
+        assert "WHERE" not in unfiltered
+        assert "inventory_snapshots.scanned_at >= " in since
+    
+    def test_products_unpaged_without_limit(self):
+        db = ListingSession([_product(i) for i in range(1, 1501)])
+        response = Response()
+        
+        products = asyncio.run(list_products(_request(), response, None, None, None, db))
+        
+        assert len(products) == 1500
+        assert NEXT_CURSOR_HEADER not in response.headers
+        sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+        assert "ORDER BY products.name, products.id" in sql
+
+
+class TestNdjsonStreaming:
+
+    def test_streams_one_chunk_per_partition(self):
+        chunks_served = []
+        
+        class StreamSession:
+            async def __aenter__(self):
+                return self
+            
+            async def __aexit__(self, *exc):
+                return False
+            
+            async def stream_scalars(self, statement):
+                assert statement.get_execution_options()["yield_per"] == 500
+                
+                async def partitions():
+                    for start in range(0, 1200, 500):
+                        chunks_served.append(start)
+                        yield [_product(i) for i in range(start, min(start + 500, 1200))]
+                
+                return SimpleNamespace(partitions=partitions)
+        
+        async def collect():
+            stream = stream_ndjson(select(Product), ProductRead, StreamSession)
+            first = await stream.__anext__()
+            # Nothing is read ahead of what the client has consumed
+            assert chunks_served == [0]
+            return [first] + [chunk async for chunk in stream]
+        
+        chunks = asyncio.run(collect())
+        lines = b"".join(chunks).decode().splitlines()
+        
+        assert len(chunks) == 3
+        assert len(lines) == 1200
+        assert ProductRead.model_validate_json(lines[-1]).name == "SKU 01199"
+    
+    def test_ndjson_accept_returns_stream(self):
+        response = asyncio.run(list_products(
+            _request("application/x-ndjson"), Response(), None, None, None, ListingSession([]),
+        ))
+        
+        assert isinstance(response, StreamingResponse)
+        assert response.media_type == "application/x-ndjson"
@@ -0,0 +1,110 @@
+"""
+Tests for per-request query statistics and N+1 detection.
+
+A statement issued in a loop must be flagged against its route, while
+a batched request doing the same work in one statement must not be.
+"""
+
+import logging
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import bindparam, create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core import query_stats as query_stats_module
+from app.core.query_stats import QueryStatsMiddleware, QueryStatsRegistry, statement_shape
+from app.db.session import instrument_engine
+from app.main import app as main_app
+
+
+@pytest.fixture
+def engine():
+    # One shared in-memory database across the test client's threads
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    instrument_engine(SimpleNamespace(sync_engine=engine), "test")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id integer primary key, name text)"))
+        conn.execute(text("INSERT INTO items VALUES (1, 'a'), (2, 'b'), (3, 'c')"))
+    return engine
+
+
+@pytest.fixture
+def client(engine):
+    registry = QueryStatsRegistry()
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, registry=registry)
+    
+    @app.get("/loop/{count}")
+    def loop(count: int):
+        with engine.connect() as conn:
+            for i in range(count):
+                conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": i % 3 + 1})
+        return {}
+    
+    @app.get("/batched/{count}")
+    def batched(count: int):
+        with engine.connect() as conn:
+            conn.execute(
+                text("SELECT name FROM items WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+                {"ids": [i % 3 + 1 for i in range(count)]},
+            )
+        return {}
+    
+    return TestClient(app), registry
+
+
+class TestStatementShape:
+
+    def test_folds_literals_and_bind_lists(self):
+        assert statement_shape("SELECT * FROM t WHERE id IN ($1, $2, $3) AND n = 5") == \
+            "SELECT * FROM t WHERE id IN (?...) AND n = ?"
+        assert statement_shape("SELECT *\n  FROM t WHERE name = 'o''brien'") == \
+            "SELECT * FROM t WHERE name = ?"
+
+
+class TestRequestAccounting:
+
+    def test_loop_is_flagged_as_n_plus_one(self, client):
+        http, registry = client
+        for _ in range(3):
+            http.get("/loop/25")
+        
+        [route] = registry.report()
+        assert route["route"] == "GET /loop/{count}"
+        assert (route["requests"], route["queries"], route["max_queries"]) == (3, 75, 25)
+        assert route["n_plus_one_requests"] == 3
+        assert route["n_plus_one"][0]["statement"] == "SELECT name FROM items WHERE id = ?"
+        assert route["n_plus_one"][0]["max_repeats"] == 25
+    
+    def test_batched_work_is_not_flagged(self, client):
+        http, registry = client
+        http.get("/batched/25")
+        http.get("/loop/3")
+        
+        report = {row["route"]: row for row in registry.report(sort="requests")}
+        assert report["GET /batched/{count}"]["queries"] == 1
+        assert report["GET /batched/{count}"]["n_plus_one"] == []
+        assert report["GET /loop/{count}"]["n_plus_one_requests"] == 0
+    
+    def test_slow_queries_logged_outside_requests(self, engine, monkeypatch, caplog):
+        monkeypatch.setattr(query_stats_module, "SLOW_QUERY_MS", 0)
+        with caplog.at_level(logging.WARNING, logger="app.core.query_stats"):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 42"))
+        
+        assert "Slow query" in caplog.text
+        assert "SELECT ?" in caplog.text
+
+
+class TestAdminEndpoint:
+
+    def test_reports_routes(self):
+        http = TestClient(main_app)
+        response = http.get("/admin/query-stats", params={"sort": "queries"})
+        
+        assert response.status_code == 200
+        assert set(response.json()) == {"enabled", "slow_query_ms", "n_plus_one_threshold", "routes"}
+        assert http.get("/admin/query-stats", params={"sort": "bogus"}).status_code == 422
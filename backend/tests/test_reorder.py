@@ -0,0 +1,156 @@
+"""
+Tests for batch reorder-quantity optimization.
+
+Covers vendor constraints, pending orders, agreement with the textbook
+EOQ/safety-stock formulas, and whole-catalog throughput.
+"""
+
+import asyncio
+from decimal import Decimal
+import math
+import random
+from statistics import NormalDist
+import time
+from uuid import UUID
+
+from app.ml.burn_rate import BurnRateCalculator, BurnRateResult
+from app.ml.reorder import ReorderOptimizer, VendorTerms, get_vendor_terms
+
+
+class PresetBurnRates(BurnRateCalculator):
+    """Calculator returning preset (rate, cv) pairs"""
+    
+    def __init__(self, rates):
+        super().__init__(use_materialized=False)
+        self.rates = rates
+    
+    async def calculate_all_burn_rates(self, product_ids=None, as_of=None, bulk=True):
+        return [
+            BurnRateResult(
+                product_id=pid,
+                weighted_burn_rate=self.rates[pid][0],
+                variance_coefficient=self.rates[pid][1],
+            )
+            for pid in product_ids
+        ]
+
+
+PRODUCT = UUID(int=1)
+
+
+def _optimize(current_quantity, terms, rate=Decimal("10"), cv=Decimal("0.3"), pending=None):
+    optimizer = ReorderOptimizer(PresetBurnRates({PRODUCT: (rate, cv)}))
+    products = [{"id": PRODUCT, "name": "Flour", "current_quantity": current_quantity}]
+    pending_orders = {PRODUCT: [{"quantity": pending}]} if pending else None
+    return asyncio.run(optimizer.optimize(products, pending_orders, {PRODUCT: terms}))[0]
+
+
+class TestReorderPolicy:
+
+    def test_matches_eoq_and_safety_stock_formulas(self):
+        terms = VendorTerms(unit_cost_micros=2_000_000, lead_time_hours=72, lead_time_std_hours=Decimal("12"))
+        result = _optimize(0, terms)
+        
+        z = NormalDist().inv_cdf(0.95)
+        safety = z * math.sqrt(3 * 3.0 ** 2 + 10 ** 2 * 0.5 ** 2)
+        eoq = math.sqrt(2 * 10 * 365 * 25_000_000 / (2_000_000 * 0.25))
+        
+        assert result.safety_stock == math.ceil(safety)
+        assert result.reorder_point == math.ceil(30 + safety)
+        assert result.economic_order_qty == math.ceil(eoq)
+        assert result.recommended_order_qty == math.ceil(30 + safety + eoq)
+        assert result.order_cost_micros == result.recommended_order_qty * 2_000_000
+    
+    def test_pending_orders_cover_the_reorder_point(self):
+        terms = VendorTerms(unit_cost_micros=2_000_000)
+        assert _optimize(10, terms).recommended_order_qty > 0
+        
+        covered = _optimize(10, terms, pending=200)
+        assert covered.inventory_position == 210
+        assert covered.recommended_order_qty == 0
+    
+    def test_min_order_and_case_pack(self):
+        small = VendorTerms(unit_cost_micros=500_000_000, min_order_qty=100)
+        result = _optimize(0, small)
+        assert result.recommended_order_qty == 100
+        assert result.constrained_by == "min_order_qty"
+        
+        cased = VendorTerms(unit_cost_micros=500_000_000, min_order_qty=100, case_pack=24)
+        result = _optimize(0, cased)
+        assert result.recommended_order_qty == 120
+        assert result.constrained_by == "case_pack"
+        
+        # No demand, no order: minimums never force one
+        assert _optimize(0, cased, rate=Decimal("0")).recommended_order_qty == 0
+    
+    def test_full_catalog_in_one_call(self):
+        rng = random.Random(4)
+        rates, products, terms = {}, [], {}
+        for i in range(10_000):
+            product_id = UUID(int=rng.getrandbits(128))
+            rates[product_id] = (Decimal(rng.randint(0, 300)) / 10, Decimal(rng.randint(0, 80)) / 100)
+            products.append({"id": product_id, "name": f"SKU {i}", "current_quantity": rng.randint(0, 200)})
+            terms[product_id] = VendorTerms(
+                unit_cost_micros=rng.randint(1, 50) * 1_000_000,
+                min_order_qty=rng.choice([1, 6, 12]),
+                case_pack=rng.choice([1, 6, 24]),
+                lead_time_hours=rng.choice([24, 48, 96]),
+            )
+        optimizer = ReorderOptimizer(PresetBurnRates(rates))
+        
+        started = time.perf_counter()
+        proposal = asyncio.run(optimizer.order_proposal(products, vendor_terms=terms))
+        elapsed = time.perf_counter() - started
+        
+        assert proposal
+        assert all(r.recommended_order_qty % terms[r.product_id].case_pack == 0 for r in proposal)
+        assert all(r.recommended_order_qty >= terms[r.product_id].min_order_qty for r in proposal)
+        assert elapsed < 1.0
+
+
+class RecordingSession:
+    """AsyncSession stand-in answering statements with preset rows, in order"""
+    
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+    
+    async def execute(self, statement):
+        self.statements.append(str(statement))
+        return iter(self.results.pop(0) if self.results else ())
+
+
+class TestVendorTerms:
+
+    def test_loads_cheapest_vendor_terms(self):
+        # Regression: VendorLeadTime was imported from app.db, which doesn't export it
+        vendor_id = UUID(int=9)
+        session = RecordingSession([(PRODUCT, vendor_id, Decimal("2.50"), 10, 6, 48, Decimal("0.9"))])
+        
+        terms = asyncio.run(get_vendor_terms(session, [PRODUCT]))[PRODUCT]
+        
+        assert "vendor_lead_times" in session.statements[0]
+        assert "SELECT DISTINCT ON (vendor_products.product_id)" in session.statements[0]
+        assert terms.vendor_id == vendor_id
+        assert terms.unit_cost_micros == 2_500_000
+        assert (terms.min_order_qty, terms.case_pack) == (10, 6)
+        assert terms.lead_time_hours == 48
+        assert terms.lead_time_std_hours == Decimal("4.8")
+    
+    def test_request_overrides_merge_into_stored_terms(self, monkeypatch):
+        from app.api import predictions
+        
+        session = RecordingSession([(PRODUCT, UUID(int=9), Decimal("2.50"), 10, 6, 48, Decimal("0.9"))])
+        calculator = PresetBurnRates({PRODUCT: (Decimal("10"), Decimal("0.3"))})
+        calculator.db = session
+        monkeypatch.setattr(predictions, "get_reorder_optimizer", lambda: ReorderOptimizer(calculator))
+        
+        request = predictions.ReorderRequest(products=[
+            {"product_id": str(PRODUCT), "current_quantity": 0, "par_level": 50, "case_pack": 12},
+        ])
+        result = asyncio.run(predictions.propose_reorders(request, only_needed=False))[0]
+        
+        # case_pack from the request, the rest from the vendor on file
+        assert result.vendor_id == str(UUID(int=9))
+        assert result.recommended_order_qty % 12 == 0
+        assert result.recommended_order_qty >= 10
@@ -0,0 +1,55 @@
+"""
+Tests for inventory_snapshots partitioning and retention.
+
+Expired months are dropped as whole partitions; the table and its
+indexes must stay time-ordered for the hot per-product queries.
+"""
+
+from datetime import date
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.db import InventorySnapshot
+from app.services.snapshot_retention import expired_partitions, month_start
+
+
+class TestRetentionWindow:
+
+    def test_month_start_crosses_year_boundary(self):
+        assert month_start(date(2026, 3, 17)) == date(2026, 3, 1)
+        assert month_start(date(2026, 3, 17), 6) == date(2025, 9, 1)
+        assert month_start(date(2026, 1, 31), 13) == date(2024, 12, 1)
+    
+    def test_only_whole_months_before_cutoff_expire(self):
+        names = [
+            "inventory_snapshots_2026_04",
+            "inventory_snapshots_default",
+            "inventory_snapshots_2026_03",
+            "inventory_snapshots_2025_12",
+            "inventory_snapshots_2026_02",
+        ]
+        
+        assert expired_partitions(names, date(2026, 3, 1)) == [
+            "inventory_snapshots_2025_12",
+            "inventory_snapshots_2026_02",
+        ]
+
+
+class TestSnapshotSchema:
+
+    def test_table_is_partitioned_by_scan_time(self):
+        ddl = str(CreateTable(InventorySnapshot.__table__).compile(dialect=postgresql.dialect()))
+        
+        assert "PARTITION BY RANGE (scanned_at)" in ddl
+        assert "PRIMARY KEY (id, scanned_at)" in ddl
+    
+    def test_time_ordered_indexes(self):
+        indexes = {
+            index.name: str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+            for index in InventorySnapshot.__table__.indexes
+        }
+        
+        assert "(product_id, scanned_at DESC)" in indexes["idx_snapshots_product_time"]
+        assert "(scanned_by, scanned_at DESC)" in indexes["idx_snapshots_scanned_by_time"]
+        assert "USING brin (scanned_at)" in indexes["idx_snapshots_scanned_at_brin"]
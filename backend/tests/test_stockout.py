@@ -0,0 +1,226 @@
+"""
+Tests for stockout prediction.
+
+Covers the batch path against per-product predictions, and the
+precomputed dashboard snapshots built on it.
+"""
+
+import asyncio
+from decimal import Decimal
+import random
+from types import SimpleNamespace
+from uuid import UUID
+
+from app.ml.burn_rate import BurnRateCalculator, BurnRateResult
+from app.ml.dashboard import DEFAULT_ORG_ID, DashboardRefresher
+from app.ml.stockout import StockoutPredictor
+
+
+class FixedBurnRates(BurnRateCalculator):
+    """Calculator returning preset burn rates; counts calls"""
+    
+    def __init__(self, rates):
+        super().__init__(use_materialized=False)
+        self.rates = rates
+        self.single_calls = 0
+        self.bulk_calls = 0
+    
+    def _result(self, product_id):
+        rate = self.rates[product_id]
+        return BurnRateResult(
+            product_id=product_id,
+            weighted_burn_rate=rate,
+            data_points_7d=6,
+            confidence=Decimal("0.8"),
+        )
+    
+    async def calculate_burn_rate(self, product_id, as_of=None):
+        self.single_calls += 1
+        return self._result(product_id)
+    
+    async def calculate_all_burn_rates(self, product_ids=None, as_of=None, bulk=True):
+        self.bulk_calls += 1
+        return [self._result(pid) for pid in product_ids]
+
+
+def _products(count=50, seed=11):
+    rng = random.Random(seed)
+    products, rates = [], {}
+    for i in range(count):
+        product_id = UUID(int=rng.getrandbits(128))
+        rates[product_id] = Decimal(rng.randint(0, 400)) / 10
+        products.append({
+            "id": product_id,
+            "name": f"Product {i}",
+            "current_quantity": rng.randint(0, 150),
+            "par_level": rng.randint(5, 40),
+        })
+    return products, rates
+
+
+def _comparable(prediction):
+    return prediction.model_dump(exclude={"predicted_at", "stockout_date", "par_date"})
+
+
+class TestBatchPrediction:
+    """predict_batch against sequential predict_stockout"""
+    
+    def test_matches_sequential(self):
+        products, rates = _products()
+        pending = {products[0]["id"]: [{"quantity": 12}, {"quantity": 3}]}
+        predictor = StockoutPredictor(FixedBurnRates(rates))
+        
+        async def run():
+            sequential = []
+            for p in products:
+                sequential.append(await predictor.predict_stockout(
+                    product_id=p["id"],
+                    current_quantity=p["current_quantity"],
+                    par_level=p["par_level"],
+                    pending_orders=pending.get(p["id"]),
+                    product_name=p["name"],
+                ))
+            batch = await predictor.predict_batch(products, pending)
+            return sequential, batch
+        
+        sequential, batch = asyncio.run(run())
+        sequential.sort(key=lambda p: p.risk_score, reverse=True)
+        
+        assert [_comparable(p) for p in batch] == [_comparable(p) for p in sequential]
+        assert batch[[p.product_id for p in batch].index(products[0]["id"])].pending_orders_qty == 15
+    
+    def test_single_prediction_loads_open_orders(self):
+        products, rates = _products(count=3)
+        predictor = StockoutPredictor(FixedBurnRates(rates))
+        on_order = {products[1]["id"]: 40}
+        
+        async def open_orders(product_ids):
+            return {pid: on_order[pid] for pid in product_ids if pid in on_order}
+        
+        predictor._get_pending_quantities = open_orders
+        p = products[1]
+        
+        single = asyncio.run(predictor.predict_stockout(
+            product_id=p["id"],
+            current_quantity=p["current_quantity"],
+            par_level=p["par_level"],
+            product_name=p["name"],
+        ))
+        batch = asyncio.run(predictor.predict_batch(products))
+        
+        assert single.pending_orders_qty == 40
+        assert _comparable(single) == _comparable(next(b for b in batch if b.product_id == p["id"]))
+    
+    def test_one_bulk_burn_rate_call(self):
+        products, rates = _products()
+        calculator = FixedBurnRates(rates)
+        
+        asyncio.run(StockoutPredictor(calculator).predict_batch(products))
+        
+        assert calculator.bulk_calls == 1
+        assert calculator.single_calls == 0
+    
+    def test_top_k_matches_full_ranking(self):
+        products, rates = _products(count=200)
+        predictor = StockoutPredictor(FixedBurnRates(rates))
+        
+        full = asyncio.run(predictor.predict_batch(products))
+        top = asyncio.run(predictor.predict_batch(products, top_k=5))
+        
+        assert [p.product_id for p in top] == [p.product_id for p in full[:5]]
+    
+    def test_alerts_from_batch(self):
+        products, rates = _products()
+        predictor = StockoutPredictor(FixedBurnRates(rates))
+        
+        alerts = asyncio.run(predictor.get_alerts(products, threshold_hours=48))
+        
+        assert alerts
+        assert all(a.hours_remaining <= 48 for a in alerts)
+
+
+class TestDashboardSnapshots:
+    """Versioned, precomputed dashboards"""
+    
+    def _refresher(self, **kwargs):
+        products, rates = _products(count=20)
+        calls = []
+        
+        async def catalog(org_id):
+            calls.append(org_id)
+            await asyncio.sleep(0)  # yield like a real catalog query
+            return products
+        
+        refresher = DashboardRefresher(
+            predictor=StockoutPredictor(FixedBurnRates(rates)),
+            catalog_loader=catalog,
+            **kwargs,
+        )
+        return refresher, products, calls
+    
+    def test_version_changes_only_with_content(self):
+        refresher, products, _ = self._refresher()
+        
+        async def run():
+            first = await refresher.refresh(DEFAULT_ORG_ID)
+            same = await refresher.refresh(DEFAULT_ORG_ID)
+            products[0]["current_quantity"] = 0
+            products[0]["par_level"] = 500
+            changed = await refresher.refresh(DEFAULT_ORG_ID)
+            return first, same, changed
+        
+        first, same, changed = asyncio.run(run())
+        
+        assert (first.version, same.version, changed.version) == (1, 1, 2)
+        assert first.etag == same.etag != changed.etag
+    
+    def test_concurrent_refreshes_share_one_computation(self):
+        refresher, _, calls = self._refresher()
+        
+        async def run():
+            return await asyncio.gather(*(refresher.refresh(DEFAULT_ORG_ID) for _ in range(10)))
+        
+        snapshots = asyncio.run(run())
+        
+        assert len(calls) == 1
+        assert len({s.etag for s in snapshots}) == 1
+    
+    def test_inventory_event_triggers_refresh(self):
+        refresher, _, calls = self._refresher(interval_seconds=3600, debounce_seconds=0)
+        
+        async def run():
+            await refresher.start()
+            await asyncio.sleep(0.05)  # scheduled refresh on start
+            scheduled = len(calls)
+            await refresher.on_inventory_event(SimpleNamespace(payload={"product_id": "x"}))
+            await refresher.on_inventory_event(SimpleNamespace(payload={}))
+            await asyncio.sleep(0.05)
+            await refresher.stop()
+            return scheduled
+        
+        scheduled = asyncio.run(run())
+        
+        assert scheduled == 1
+        assert len(calls) == 2  # both events coalesced into one refresh
+    
+    def test_orgs_are_bounded(self):
+        refresher, _, calls = self._refresher(max_orgs=3)
+        orgs = [UUID(int=i) for i in range(1, 6)]
+        
+        async def run():
+            for org_id in orgs:
+                await refresher.get_or_refresh(org_id)
+            await refresher.get_or_refresh(orgs[-1])
+        
+        asyncio.run(run())
+        
+        assert list(refresher._orgs) == orgs[-3:]
+        assert set(refresher._snapshots) == set(orgs[-3:])
+        assert len(calls) == 5
+        
+        # Events for orgs nobody is viewing don't grow the set
+        refresher.mark_dirty(UUID(int=99))
+        refresher.mark_dirty(orgs[-1])
+        assert refresher._dirty == {orgs[-1]}
+        assert UUID(int=99) not in refresher._orgs
+
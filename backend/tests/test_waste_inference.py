@@ -0,0 +1,167 @@
+"""
+Tests for micro-batched waste image inference.
+
+Covers batching by size and deadline, content-hash caching, sharing of
+in-flight requests, error propagation and the rule-based fallback.
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
+from decimal import Decimal
+
+import numpy as np
+
+from app.ml.waste_inference import WASTE_CLASSES, InvalidImageError, WasteInferenceService
+
+
+class RecordingModel:
+    """Model that favours one class per image and records batch sizes"""
+    
+    name = "test_model"
+    version = "v1"
+    batches = []
+    
+    def predict(self, images):
+        RecordingModel.batches.append(len(images))
+        probabilities = np.full((len(images), len(WASTE_CLASSES)), 0.025)
+        for i, image in enumerate(images):
+            probabilities[i, image[0] % len(WASTE_CLASSES)] = 0.9
+        return probabilities
+
+
+class FailingModel:
+    name = "failing"
+    version = "v0"
+    
+    def predict(self, images):
+        raise ValueError("model crashed")
+
+
+class PickyModel(RecordingModel):
+    """Rejects any batch holding an image that starts with bad"""
+    
+    def predict(self, images):
+        if any(image.startswith(b"bad") for image in images):
+            RecordingModel.batches.append(len(images))
+            raise InvalidImageError("Undecodable image")
+        return super().predict(images)
+
+
+def _service(**kwargs):
+    RecordingModel.batches = []
+    return WasteInferenceService(RecordingModel, workers=0, **kwargs)
+
+
+async def _with_service(service, run):
+    try:
+        return await run(service)
+    finally:
+        await service.stop()
+
+
+class TestWasteInference:
+
+    def test_concurrent_requests_share_batches(self):
+        service = _service(max_batch_size=8, max_delay_ms=50)
+        images = [bytes([i, 1, 2, 3]) for i in range(20)]
+        
+        results = asyncio.run(_with_service(service, lambda s: s.classify_many(images)))
+        
+        assert [r.predicted_class for r in results] == [WASTE_CLASSES[i % 5] for i in range(20)]
+        assert all(r.confidence == Decimal("0.9") for r in results)
+        assert RecordingModel.batches == [8, 8, 4]
+    
+    def test_deadline_flushes_partial_batch(self):
+        service = _service(max_batch_size=64, max_delay_ms=5)
+        
+        result = asyncio.run(_with_service(service, lambda s: s.classify(b"\x02single")))
+        
+        assert result.predicted_class == "contamination"
+        assert RecordingModel.batches == [1]
+    
+    def test_identical_images_run_once(self):
+        service = _service(max_batch_size=8, max_delay_ms=20)
+        
+        async def run(s):
+            first = await s.classify_many([b"\x01same"] * 5)
+            again = await s.classify(b"\x01same")
+            return first, again
+        
+        first, again = asyncio.run(_with_service(service, run))
+        
+        assert RecordingModel.batches == [1]
+        assert {r.image_hash for r in first} == {again.image_hash}
+        assert again.predicted_class == "damage"
+        assert service.get_stats()["cache_hits"] == 1
+    
+    def test_low_confidence_goes_to_review(self):
+        class Uncertain(RecordingModel):
+            def predict(self, images):
+                return np.full((len(images), len(WASTE_CLASSES)), 0.2)
+        
+        service = WasteInferenceService(Uncertain, workers=0)
+        result = asyncio.run(_with_service(service, lambda s: s.classify(b"blurry")))
+        
+        assert result.predicted_class == "requires_human_review"
+        assert result.class_probabilities["spoilage"] == 0.2
+    
+    def test_bad_image_fails_only_its_caller(self):
+        RecordingModel.batches = []
+        service = WasteInferenceService(PickyModel, workers=0, max_delay_ms=20)
+        images = [b"\x00good", b"bad image", b"\x01good"]
+        
+        async def run(s):
+            results = await asyncio.gather(*(s.classify(image) for image in images), return_exceptions=True)
+            again = await asyncio.gather(s.classify(b"bad image"), return_exceptions=True)
+            return results, again[0]
+        
+        (first, bad, last), again = asyncio.run(_with_service(service, run))
+        
+        assert first.predicted_class == "spoilage"
+        assert last.predicted_class == "damage"
+        assert isinstance(bad, InvalidImageError)
+        # Whole batch, then one image at a time; the bad image is not cached
+        assert RecordingModel.batches == [3, 1, 1, 1, 1]
+        assert isinstance(again, InvalidImageError)
+    
+    def test_model_errors_reach_every_caller(self):
+        service = WasteInferenceService(FailingModel, workers=0, max_delay_ms=20)
+        
+        async def run(s):
+            return await asyncio.gather(s.classify(b"a"), s.classify(b"b"), return_exceptions=True)
+        
+        results = asyncio.run(_with_service(service, run))
+        assert all(isinstance(r, ValueError) and str(r) == "model crashed" for r in results)
+    
+    def test_broken_pool_is_replaced_and_shut_down(self):
+        class BrokenPool(Executor):
+            def __init__(self):
+                self.shut_down = False
+            
+            def submit(self, fn, *args, **kwargs):
+                raise BrokenProcessPool("worker died")
+            
+            def shutdown(self, wait=True, *, cancel_futures=False):
+                self.shut_down = True
+        
+        pools = []
+        
+        class Service(WasteInferenceService):
+            def _create_executor(self):
+                pools.append(BrokenPool())
+                return pools[-1]
+        
+        service = Service(RecordingModel, workers=1)
+        result = asyncio.run(_with_service(service, lambda s: asyncio.gather(s.classify(b"a"), return_exceptions=True)))
+        
+        assert isinstance(result[0], BrokenProcessPool)
+        assert len(pools) == 2
+        assert pools[0].shut_down
+    
+    def test_no_model_uses_fallback(self):
+        service = WasteInferenceService(None)
+        result = asyncio.run(service.classify(b"image"))
+        
+        assert result.predicted_class == "requires_human_review"
+        assert result.model_used == "fallback_no_cv_model"